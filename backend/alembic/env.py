@@ -17,6 +17,8 @@ if config.config_file_name is not None:
 
 from app.core import Base
 from app.core.auth.user import User  # noqa: F401 — siempre presente
+from app.core.scheduler_node import SchedulerNode  # noqa: F401
+from app.core.dedup_key import DedupKey  # noqa: F401
 from app.core.module_loader import import_all_models, get_all_schemas
 
 import_all_models()
@@ -0,0 +1,34 @@
+"""add automation trigger lookup index
+
+Revision ID: a1f3c9d2e4b5
+Revises: 800779485bb7
+Create Date: 2026-10-17 10:12:41.201733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f3c9d2e4b5'
+down_revision: Union[str, Sequence[str], None] = '800779485bb7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_automations_trigger_lookup',
+        'automations',
+        ['trigger_ref', 'is_active', 'user_id'],
+        unique=False,
+        schema='automations',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_automations_trigger_lookup', table_name='automations', schema='automations')
@@ -0,0 +1,43 @@
+"""add node_latency_stats for per-node latency profiles
+
+Revision ID: a4c9e2f7b3d5
+Revises: f3b8d1a6c4e7
+Create Date: 2026-10-17 18:41:09.203517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f7b3d5'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d1a6c4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('node_latency_stats',
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('node_id', sa.String(length=100), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('total_ms', sa.BigInteger(), nullable=False),
+    sa.Column('max_ms', sa.Integer(), nullable=False),
+    sa.Column('histogram', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.ForeignKeyConstraint(['automation_id'], ['automations.automations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('automation_id', 'node_id', 'bucket_start'),
+    schema='automations'
+    )
+    op.create_index('ix_automations_node_latency_stats_bucket', 'node_latency_stats', ['node_id', 'bucket_start'], unique=False, schema='automations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_automations_node_latency_stats_bucket', table_name='node_latency_stats', schema='automations')
+    op.drop_table('node_latency_stats', schema='automations')
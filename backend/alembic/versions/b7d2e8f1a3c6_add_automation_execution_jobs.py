@@ -0,0 +1,56 @@
+"""add automation execution jobs
+
+Revision ID: b7d2e8f1a3c6
+Revises: a1f3c9d2e4b5
+Create Date: 2026-10-17 11:02:17.384120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e8f1a3c6'
+down_revision: Union[str, Sequence[str], None] = 'a1f3c9d2e4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('execution_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('trigger_ref', sa.String(length=200), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'DONE', 'FAILED', name='executionjobstatus', schema='automations'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('execution_id', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['automation_id'], ['automations.automations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['core.users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    schema='automations'
+    )
+    op.create_index(op.f('ix_automations_execution_jobs_id'), 'execution_jobs', ['id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_execution_jobs_automation_id'), 'execution_jobs', ['automation_id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_execution_jobs_user_id'), 'execution_jobs', ['user_id'], unique=False, schema='automations')
+    op.create_index('ix_execution_jobs_claim', 'execution_jobs', ['status', 'available_at'], unique=False, schema='automations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_execution_jobs_claim', table_name='execution_jobs', schema='automations')
+    op.drop_index(op.f('ix_automations_execution_jobs_user_id'), table_name='execution_jobs', schema='automations')
+    op.drop_index(op.f('ix_automations_execution_jobs_automation_id'), table_name='execution_jobs', schema='automations')
+    op.drop_index(op.f('ix_automations_execution_jobs_id'), table_name='execution_jobs', schema='automations')
+    op.drop_table('execution_jobs', schema='automations')
+    sa.Enum(name='executionjobstatus', schema='automations').drop(op.get_bind(), checkfirst=True)
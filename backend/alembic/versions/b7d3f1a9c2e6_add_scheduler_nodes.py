@@ -0,0 +1,36 @@
+"""add core.scheduler_nodes for sharded scheduler membership
+
+Revision ID: b7d3f1a9c2e6
+Revises: a4c9e2f7b3d5
+Create Date: 2026-10-17 21:12:40.518264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3f1a9c2e6'
+down_revision: Union[str, Sequence[str], None] = 'a4c9e2f7b3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduler_nodes',
+    sa.Column('node_id', sa.String(length=200), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('node_id'),
+    schema='core'
+    )
+    op.create_index(op.f('ix_core_scheduler_nodes_heartbeat_at'), 'scheduler_nodes', ['heartbeat_at'], unique=False, schema='core')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_core_scheduler_nodes_heartbeat_at'), table_name='scheduler_nodes', schema='core')
+    op.drop_table('scheduler_nodes', schema='core')
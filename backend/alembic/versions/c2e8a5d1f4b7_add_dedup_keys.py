@@ -0,0 +1,37 @@
+"""add core.dedup_keys (UNLOGGED) for scheduler deduplication
+
+Revision ID: c2e8a5d1f4b7
+Revises: b7d3f1a9c2e6
+Create Date: 2026-10-17 22:03:15.204718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8a5d1f4b7'
+down_revision: Union[str, Sequence[str], None] = 'b7d3f1a9c2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dedup_keys',
+    sa.Column('namespace', sa.String(length=100), nullable=False),
+    sa.Column('key', sa.String(length=300), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('namespace', 'key'),
+    schema='core',
+    prefixes=['UNLOGGED']
+    )
+    op.create_index(op.f('ix_core_dedup_keys_expires_at'), 'dedup_keys', ['expires_at'], unique=False, schema='core')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_core_dedup_keys_expires_at'), table_name='dedup_keys', schema='core')
+    op.drop_table('dedup_keys', schema='core')
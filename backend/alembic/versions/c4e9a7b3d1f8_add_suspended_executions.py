@@ -0,0 +1,54 @@
+"""add suspended executions
+
+Revision ID: c4e9a7b3d1f8
+Revises: b7d2e8f1a3c6
+Create Date: 2026-10-17 12:20:05.917342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a7b3d1f8'
+down_revision: Union[str, Sequence[str], None] = 'b7d2e8f1a3c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE automations.executionstatus ADD VALUE IF NOT EXISTS 'WAITING' AFTER 'RUNNING'")
+    op.create_table('suspended_executions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('execution_id', sa.Integer(), nullable=False),
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('resume_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('cursor', sa.JSON(), nullable=False),
+    sa.Column('ctx', sa.JSON(), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['automation_id'], ['automations.automations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['core.users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('execution_id'),
+    schema='automations'
+    )
+    op.create_index(op.f('ix_automations_suspended_executions_id'), 'suspended_executions', ['id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_suspended_executions_automation_id'), 'suspended_executions', ['automation_id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_suspended_executions_user_id'), 'suspended_executions', ['user_id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_suspended_executions_resume_at'), 'suspended_executions', ['resume_at'], unique=False, schema='automations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_automations_suspended_executions_resume_at'), table_name='suspended_executions', schema='automations')
+    op.drop_index(op.f('ix_automations_suspended_executions_user_id'), table_name='suspended_executions', schema='automations')
+    op.drop_index(op.f('ix_automations_suspended_executions_automation_id'), table_name='suspended_executions', schema='automations')
+    op.drop_index(op.f('ix_automations_suspended_executions_id'), table_name='suspended_executions', schema='automations')
+    op.drop_table('suspended_executions', schema='automations')
+    # Postgres no permite quitar valores de un enum — las ejecuciones WAITING pasan a FAILED
+    op.execute("UPDATE automations.executions SET status = 'FAILED' WHERE status = 'WAITING'")
@@ -0,0 +1,47 @@
+"""add automations.trigger_config (JSONB + GIN) denormalized from the flow trigger node
+
+Revision ID: d4f1b8e6a3c9
+Revises: c2e8a5d1f4b7
+Create Date: 2026-10-17 22:41:08.913562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f1b8e6a3c9'
+down_revision: Union[str, Sequence[str], None] = 'c2e8a5d1f4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('automations', sa.Column('trigger_config', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False), schema='automations')
+    # Backfill: config del primer nodo trigger del flow (igual que extract_trigger_config)
+    op.execute("""
+        UPDATE automations.automations a
+        SET trigger_config = t.config
+        FROM (
+            SELECT DISTINCT ON (a2.id) a2.id, (n.node -> 'config')::jsonb AS config
+            FROM automations.automations a2
+            CROSS JOIN LATERAL json_array_elements(
+                CASE WHEN json_typeof(a2.flow -> 'nodes') = 'array' THEN a2.flow -> 'nodes' ELSE '[]'::json END
+            ) WITH ORDINALITY AS n(node, position)
+            WHERE n.node ->> 'type' = 'trigger'
+              AND json_typeof(n.node -> 'config') = 'object'
+            ORDER BY a2.id, n.position
+        ) t
+        WHERE a.id = t.id
+    """)
+    op.create_index('ix_automations_trigger_config', 'automations', ['trigger_config'], unique=False, schema='automations', postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_automations_trigger_config', table_name='automations', schema='automations', postgresql_using='gin')
+    op.drop_column('automations', 'trigger_config', schema='automations')
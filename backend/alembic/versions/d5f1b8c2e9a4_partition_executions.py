@@ -0,0 +1,148 @@
+"""partition executions by month, add retention policies and daily stats
+
+Revision ID: d5f1b8c2e9a4
+Revises: c4e9a7b3d1f8
+Create Date: 2026-10-17 14:05:41.220913
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1b8c2e9a4'
+down_revision: Union[str, Sequence[str], None] = 'c4e9a7b3d1f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Meses por delante que se crean ya particionados (el job diario mantiene el resto)
+PARTITIONS_AHEAD = 2
+
+COLUMNS = (
+    "id, automation_id, user_id, trigger_payload, status, started_at, "
+    "finished_at, duration_ms, error_message, node_logs"
+)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return moment.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_executions_indexes() -> None:
+    op.create_index(op.f('ix_automations_executions_automation_id'), 'executions', ['automation_id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_executions_id'), 'executions', ['id'], unique=False, schema='automations')
+    op.create_index(op.f('ix_automations_executions_user_id'), 'executions', ['user_id'], unique=False, schema='automations')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. La tabla actual pasa a executions_legacy (liberando los nombres de índices)
+    op.execute("ALTER TABLE automations.executions RENAME TO executions_legacy")
+    op.execute("ALTER TABLE automations.executions_legacy RENAME CONSTRAINT executions_pkey TO executions_legacy_pkey")
+    op.execute("DROP INDEX automations.ix_automations_executions_automation_id")
+    op.execute("DROP INDEX automations.ix_automations_executions_id")
+    op.execute("DROP INDEX automations.ix_automations_executions_user_id")
+
+    # 2. Tabla particionada; reutiliza la secuencia de id para no repetir ids
+    op.execute("""
+        CREATE TABLE automations.executions (
+            id              INTEGER NOT NULL DEFAULT nextval('automations.executions_id_seq'),
+            automation_id   INTEGER NOT NULL REFERENCES automations.automations (id) ON DELETE CASCADE,
+            user_id         INTEGER NOT NULL REFERENCES core.users (id) ON DELETE CASCADE,
+            trigger_payload JSON,
+            status          automations.executionstatus NOT NULL,
+            started_at      TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            finished_at     TIMESTAMP WITH TIME ZONE,
+            duration_ms     INTEGER,
+            error_message   TEXT,
+            node_logs       JSON,
+            PRIMARY KEY (id, started_at)
+        ) PARTITION BY RANGE (started_at)
+    """)
+    op.execute("ALTER SEQUENCE automations.executions_id_seq OWNED BY automations.executions.id")
+    op.execute("CREATE TABLE automations.executions_default PARTITION OF automations.executions DEFAULT")
+
+    # 3. Una partición por mes desde la ejecución más antigua hasta PARTITIONS_AHEAD meses por delante
+    oldest = op.get_bind().execute(sa.text("SELECT min(started_at) FROM automations.executions_legacy")).scalar()
+    now    = datetime.now(timezone.utc)
+    month  = (oldest or now).astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last   = _add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), PARTITIONS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE automations.executions_p{month.year:04d}{month.month:02d} "
+            f"PARTITION OF automations.executions "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    # 4. Copiar y eliminar la tabla antigua
+    op.execute(f"INSERT INTO automations.executions ({COLUMNS}) SELECT {COLUMNS} FROM automations.executions_legacy")
+    op.execute("DROP TABLE automations.executions_legacy")
+    _create_executions_indexes()
+    op.create_index('ix_automations_executions_automation_started', 'executions', ['automation_id', 'started_at'], unique=False, schema='automations')
+
+    op.create_table('execution_retention_policies',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('retention_days', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['core.users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id'),
+    schema='automations'
+    )
+    op.create_table('execution_daily_stats',
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('success_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('other_count', sa.Integer(), nullable=False),
+    sa.Column('p50_duration_ms', sa.Integer(), nullable=True),
+    sa.Column('p95_duration_ms', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['automation_id'], ['automations.automations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['core.users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('automation_id', 'day'),
+    schema='automations'
+    )
+    op.create_index(op.f('ix_automations_execution_daily_stats_user_id'), 'execution_daily_stats', ['user_id'], unique=False, schema='automations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_automations_execution_daily_stats_user_id'), table_name='execution_daily_stats', schema='automations')
+    op.drop_table('execution_daily_stats', schema='automations')
+    op.drop_table('execution_retention_policies', schema='automations')
+
+    # Vuelta a una tabla normal: se conservan todas las filas de todas las particiones
+    op.execute("ALTER TABLE automations.executions RENAME TO executions_partitioned")
+    op.execute("ALTER TABLE automations.executions_partitioned RENAME CONSTRAINT executions_pkey TO executions_partitioned_pkey")
+    op.execute("DROP INDEX automations.ix_automations_executions_automation_started")
+    op.execute("DROP INDEX automations.ix_automations_executions_automation_id")
+    op.execute("DROP INDEX automations.ix_automations_executions_id")
+    op.execute("DROP INDEX automations.ix_automations_executions_user_id")
+    op.create_table('executions',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('automations.executions_id_seq')"), nullable=False),
+    sa.Column('automation_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('trigger_payload', sa.JSON(), nullable=True),
+    sa.Column('status', postgresql.ENUM(name='executionstatus', schema='automations', create_type=False), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('node_logs', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['automation_id'], ['automations.automations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['core.users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    schema='automations'
+    )
+    op.execute("ALTER SEQUENCE automations.executions_id_seq OWNED BY automations.executions.id")
+    op.execute(f"INSERT INTO automations.executions ({COLUMNS}) SELECT {COLUMNS} FROM automations.executions_partitioned")
+    op.execute("DROP TABLE automations.executions_partitioned")
+    _create_executions_indexes()
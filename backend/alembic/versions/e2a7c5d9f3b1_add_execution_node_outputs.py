@@ -0,0 +1,29 @@
+"""add compressed node outputs to executions
+
+Revision ID: e2a7c5d9f3b1
+Revises: d5f1b8c2e9a4
+Create Date: 2026-10-17 15:12:09.481207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5d9f3b1'
+down_revision: Union[str, Sequence[str], None] = 'd5f1b8c2e9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # En la tabla particionada: Postgres la propaga a todas las particiones
+    op.add_column('executions', sa.Column('node_outputs', sa.LargeBinary(), nullable=True), schema='automations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('executions', 'node_outputs', schema='automations')
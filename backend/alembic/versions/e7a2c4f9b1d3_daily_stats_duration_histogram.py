@@ -0,0 +1,31 @@
+"""add duration histogram to automations.execution_daily_stats
+
+Revision ID: e7a2c4f9b1d3
+Revises: d4f1b8e6a3c9
+Create Date: 2026-10-18 10:12:44.207391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2c4f9b1d3'
+down_revision: Union[str, Sequence[str], None] = 'd4f1b8e6a3c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('execution_daily_stats', sa.Column('max_duration_ms', sa.Integer(), nullable=True), schema='automations')
+    op.add_column('execution_daily_stats', sa.Column('duration_histogram', postgresql.ARRAY(sa.Integer()), nullable=True), schema='automations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('execution_daily_stats', 'duration_histogram', schema='automations')
+    op.drop_column('execution_daily_stats', 'max_duration_ms', schema='automations')
@@ -0,0 +1,34 @@
+"""add next_run_at to automations for indexed cron scheduling
+
+Revision ID: f3b8d1a6c4e7
+Revises: e2a7c5d9f3b1
+Create Date: 2026-10-17 16:02:37.518344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1a6c4e7'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c5d9f3b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las CRON existentes quedan a NULL: cron_scheduler.sync_missing() las calcula al arrancar
+    op.add_column('automations', sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=True), schema='automations')
+    op.create_index(
+        'ix_automations_next_run_at', 'automations', ['next_run_at'], unique=False, schema='automations',
+        postgresql_where=sa.text('next_run_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_automations_next_run_at', table_name='automations', schema='automations')
+    op.drop_column('automations', 'next_run_at', schema='automations')
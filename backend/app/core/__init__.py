@@ -1,5 +1,5 @@
 # app/core/__init__.py
 from .config import settings
-from .database import Base, engine, get_db
+from .database import Base, engine, get_db, get_async_db
 
-__all__ = ['settings', 'Base', 'engine', 'get_db']
\ No newline at end of file
+__all__ = ['settings', 'Base', 'engine', 'get_db', 'get_async_db']
\ No newline at end of file
@@ -21,6 +21,20 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Centro Control"
     DEBUG: bool = False
 
+    # Scheduler compartido (app/core/scheduler.py): un solo líder por cluster
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_THREADS: int = 10
+    SCHEDULER_LEADER_POLL_SECONDS: float = 15
+    SCHEDULER_LEADER_LOCK_KEY: int = 7_420_001
+    # Modo sharding: cada nodo procesa user_id % nodos == índice
+    SCHEDULER_SHARDING_ENABLED: bool = False
+    SCHEDULER_NODE_TTL_SECONDS: float = 45
+    SCHEDULER_SHARD_LOCK_KEY: int = 7_420_002
+
+    # Deduplicación de los schedulers (app/core/dedup.py): "postgres" | "memory"
+    DEDUP_BACKEND: str = "postgres"
+    DEDUP_MEMORY_MAX_ENTRIES: int = 100_000
+
     # Módulos — auto-descubiertos, nunca se tocan
     INSTALLED_MODULES: List[str] = []
 
@@ -0,0 +1,168 @@
+"""
+Deduplicación con TTL compartida por los schedulers de los módulos.
+
+Antes cada scheduler guardaba sus claves ya disparadas en un dict/set del
+proceso: la mayoría nunca se purgaba (crecía mientras viviera el proceso), se
+perdía al reiniciar (disparos duplicados) y no se compartía entre workers.
+
+dedup.claim(namespace, key, ttl) devuelve True solo a quien reclama la clave
+primero; la clave vuelve a estar libre cuando vence el TTL.
+dedup.claim_many(...) reclama un lote de claves en una sola operación y
+devuelve las que se han conseguido.
+
+Backends (DEDUP_BACKEND):
+- "postgres" (por defecto): tabla UNLOGGED core.dedup_keys e
+  INSERT ... ON CONFLICT DO UPDATE ... WHERE expires_at <= now() RETURNING:
+  la clave se inserta si no existe o si la existente ha vencido, de forma
+  atómica — a lo sumo una vez por TTL en todo el cluster. Cada reclamación
+  va en su propia transacción, independiente de la sesión del job.
+- "memory": LRU acotado (DEDUP_MEMORY_MAX_ENTRIES) con expiración. Por
+  proceso; para desarrollo y tests.
+
+purge_expired() borra las claves vencidas; corre cada hora en el scheduler.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Hashable, Iterable, Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .dedup_key import DedupKey
+
+logger = logging.getLogger(__name__)
+
+_keys = DedupKey.__table__
+
+
+def _key(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return ":".join(str(part) for part in key)
+    return str(key)
+
+
+class MemoryDedupBackend:
+
+    def __init__(self, max_entries: int):
+        self._max     = max_entries
+        self._entries: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._lock    = threading.Lock()
+
+    def claim_many(self, namespace: str, keys: list[str], ttl: timedelta) -> set[str]:
+        now, expires = time.monotonic(), time.monotonic() + ttl.total_seconds()
+        claimed = set()
+        with self._lock:
+            for key in keys:
+                entry = (namespace, key)
+                if self._entries.get(entry, 0) > now:
+                    continue
+                self._entries[entry] = expires
+                self._entries.move_to_end(entry)
+                claimed.add(key)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+        return claimed
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for entry in [e for e in self._entries if e[0] == namespace]:
+                del self._entries[entry]
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [entry for entry, expires in self._entries.items() if expires <= now]
+            for entry in expired:
+                del self._entries[entry]
+        return len(expired)
+
+
+class PostgresDedupBackend:
+
+    def __init__(self, bind: Optional[Engine] = None):
+        self._bind = bind
+
+    @property
+    def bind(self) -> Engine:
+        if self._bind is None:
+            from .database import engine
+            self._bind = engine
+        return self._bind
+
+    def claim_many(self, namespace: str, keys: list[str], ttl: timedelta) -> set[str]:
+        expires = func.now() + ttl
+        stmt = pg_insert(_keys).values([
+            {"namespace": namespace, "key": key, "expires_at": expires} for key in keys
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_keys.c.namespace, _keys.c.key],
+            set_={"expires_at": stmt.excluded.expires_at},
+            where=_keys.c.expires_at <= func.now(),
+        ).returning(_keys.c.key)
+        with self.bind.begin() as conn:
+            return set(conn.execute(stmt).scalars())
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        stmt = delete(_keys)
+        if namespace is not None:
+            stmt = stmt.where(_keys.c.namespace == namespace)
+        with self.bind.begin() as conn:
+            conn.execute(stmt)
+
+    def purge_expired(self) -> int:
+        with self.bind.begin() as conn:
+            return conn.execute(delete(_keys).where(_keys.c.expires_at <= func.now())).rowcount
+
+
+class DedupService:
+
+    def __init__(self, backend=None):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.DEDUP_BACKEND == "memory":
+                self._backend = MemoryDedupBackend(settings.DEDUP_MEMORY_MAX_ENTRIES)
+            else:
+                self._backend = PostgresDedupBackend()
+        return self._backend
+
+    def claim(self, namespace: str, key: Hashable, ttl: timedelta) -> bool:
+        """True si esta llamada reclama la clave (no estaba o había vencido)."""
+        return bool(self.claim_many(namespace, [key], ttl))
+
+    def claim_many(self, namespace: str, keys: Iterable[Hashable], ttl: timedelta) -> set:
+        """Reclama un lote de claves; devuelve las conseguidas (en su forma original)."""
+        by_str = {_key(key): key for key in keys}
+        if not by_str:
+            return set()
+        claimed = self.backend.claim_many(namespace, list(by_str), ttl)
+        return {by_str[key] for key in claimed}
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        self.backend.clear(namespace)
+
+    def purge_expired(self) -> int:
+        purged = self.backend.purge_expired()
+        if purged:
+            logger.info(f"Dedup: {purged} claves vencidas purgadas")
+        return purged
+
+
+# Singleton global
+dedup = DedupService()
+
+
+def start_dedup_purge() -> None:
+    """Registra la purga horaria de claves vencidas en el scheduler compartido."""
+    from .scheduler import scheduler_host
+    scheduler_host.add_job(dedup.purge_expired, "interval", hours=1, id="core_dedup_purge")
@@ -0,0 +1,18 @@
+# app/core/dedup_key.py
+
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+
+class DedupKey(Base):
+    """
+    Clave de deduplicación reclamada por un scheduler (ver app/core/dedup.py).
+    Tabla UNLOGGED: no pasa por el WAL; tras un crash Postgres la vacía, lo que
+    como mucho repite un disparo — igual que antes al reiniciar el proceso.
+    """
+    __tablename__ = 'dedup_keys'
+    __table_args__ = {'schema': 'core', 'prefixes': ['UNLOGGED']}
+
+    namespace  = Column(String(100), primary_key=True)
+    key        = Column(String(300), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
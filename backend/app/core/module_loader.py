@@ -152,7 +152,12 @@ def register_automation_handlers(registry) -> None:
     Mismo mecanismo que get_installed_modules() — solo necesitas pegar la
     carpeta del módulo en app/modules/ para que sus automatizaciones aparezcan.
     No hay lista manual que mantener.
+
+    Los handlers se resuelven al registrar: un handler_path roto lanza
+    HandlerResolutionError y la app no arranca.
     """
+    from app.modules.automations_engine.core.registry import HandlerResolutionError
+
     for module_name in get_installed_modules():
         try:
             automation_module = importlib.import_module(
@@ -160,6 +165,9 @@ def register_automation_handlers(registry) -> None:
             )
             if hasattr(automation_module, "register"):
                 automation_module.register(registry)
+        except HandlerResolutionError:
+            # Un handler_path roto es un error de programación — fallar en el arranque
+            raise
         except ModuleNotFoundError:
             # El módulo no tiene automation_registry.py — se ignora silenciosamente
             pass
@@ -0,0 +1,391 @@
+"""
+Scheduler compartido de los jobs periódicos de los módulos.
+
+Antes cada módulo arrancaba su propio BackgroundScheduler en cada worker de
+uvicorn/gunicorn: con N workers cada job corría N veces (N escaneos de
+Automation, N envíos de notificaciones, N syncs de calendario). Ahora:
+
+- Los módulos registran sus jobs en scheduler_host.add_job() (misma firma
+  que BackgroundScheduler.add_job) y los servicios con hilo propio que solo
+  deben correr una vez por cluster en add_leader_service(start, stop).
+- Un único BackgroundScheduler por proceso con un pool de
+  SCHEDULER_THREADS hilos; arranca en pausa.
+- Solo el proceso que tiene el advisory lock de Postgres
+  (pg_try_advisory_lock(SCHEDULER_LEADER_LOCK_KEY), a nivel de sesión)
+  reanuda el scheduler. El lock vive en una conexión dedicada (fuera del
+  pool): si el proceso muere, Postgres lo libera al cerrarse la conexión y
+  otro proceso lo toma en el siguiente intento (cada
+  SCHEDULER_LEADER_POLL_SECONDS).
+- Si la conexión del lock se cae, el líder pausa sus jobs antes de volver
+  a competir por el lock.
+
+Modo sharding (SCHEDULER_SHARDING_ENABLED): los jobs por usuario
+(add_job(..., sharded=True)) corren en todos los nodos y cada uno filtra sus
+queries con shard_clause(Model.user_id) — user_id % nodos == índice.
+
+- Cada nodo late en core.scheduler_nodes; los que no laten en
+  SCHEDULER_NODE_TTL_SECONDS se borran y su rango se reparte.
+- El índice es la posición del node_id entre los nodos vivos ordenados.
+  Cuando la membresía cambia el nodo suelta su shard y adopta el nuevo en
+  el siguiente latido si no ha vuelto a cambiar: para entonces todos los
+  nodos han soltado el reparto anterior.
+- El shard solo cambia entre jobs: cada job sharded (o iteración de un
+  servicio, con sharded_run()) fija el shard al empezar y retiene un advisory
+  lock compartido (SCHEDULER_SHARD_LOCK_KEY) mientras corre. Para adoptar un
+  shard el nodo toma ese lock en exclusiva, así que espera a que terminen los
+  jobs que siguen con el reparto anterior en cualquier nodo: ningún user_id
+  se procesa dos veces.
+- Los jobs globales (sharded=False: mantenimiento de particiones) siguen
+  corriendo solo en el líder.
+
+Con SCHEDULER_ENABLED=false el proceso no compite (workers solo de API).
+"""
+import functools
+import logging
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, delete, false, func, select, text, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+from .config import settings
+from .database import engine
+from .scheduler_node import SchedulerNode
+
+logger = logging.getLogger(__name__)
+
+_nodes = SchedulerNode.__table__
+
+
+@dataclass
+class LeaderService:
+    start:   Callable[[], None]
+    stop:    Callable[[], None]
+    sharded: bool = False
+    running: bool = False
+
+
+class SchedulerHost:
+
+    def __init__(self, bind: Optional[Engine] = None, node_id: Optional[str] = None):
+        self._bind      = bind or engine
+        self.node_id    = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._jobs:     list[tuple[Callable, str, dict]] = []
+        self._services: list[LeaderService]              = []
+        self._scheduler = None
+        self._lock_engine: Optional[Engine]   = None
+        self._lock_conn:   Optional[Connection] = None
+        self._leader    = False
+        self._sharding  = False
+        self._node_ttl  = 45.0
+        self._drain_timeout = 5.0   # espera máxima por los jobs del reparto anterior en cada latido
+        self._view:  Optional[tuple[str, ...]]   = None
+        self._shard: Optional[tuple[int, int]]   = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop      = threading.Event()
+        self._mutex     = threading.Lock()
+        self._local     = threading.local()   # shard fijado por el job en curso de cada hilo
+
+    # ── Registro ──────────────────────────────────────────────────────────────
+
+    def add_job(self, func: Callable, trigger: str, sharded: bool = False, **kwargs) -> None:
+        """
+        Registra un job (argumentos de BackgroundScheduler.add_job); id obligatorio.
+        sharded=True: el job filtra por shard_clause() y en modo sharding corre en todos los nodos.
+        """
+        kwargs.setdefault("replace_existing", True)
+        job = (self._guarded(func, sharded), trigger, kwargs)
+        with self._mutex:
+            self._jobs = [j for j in self._jobs if j[2]["id"] != kwargs["id"]]
+            self._jobs.append(job)
+            if self._scheduler is not None:
+                self._scheduler.add_job(job[0], trigger, **kwargs)
+
+    def add_leader_service(self, start: Callable[[], None], stop: Callable[[], None], sharded: bool = False) -> None:
+        """Servicio con hilo propio que solo corre en el líder (en todos los nodos si sharded y hay sharding)."""
+        with self._mutex:
+            self._services.append(LeaderService(start, stop, sharded))
+        self._sync()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    @property
+    def shard(self) -> Optional[tuple[int, int]]:
+        """(índice, nodos) de este nodo en modo sharding; None sin sharding o mientras se reparte."""
+        return getattr(self._local, "shard", self._shard)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def may_run(self, sharded: bool) -> bool:
+        if sharded and self._sharding:
+            return self._shard is not None
+        return self._leader
+
+    def shard_clause(self, user_id_column):
+        """Filtro SQL de los user_id de este nodo (todos sin sharding, ninguno sin shard asignado)."""
+        if not self._sharding:
+            return true()
+        shard = self.shard
+        if shard is None:
+            return false()
+        index, count = shard
+        return user_id_column % count == index
+
+    @contextmanager
+    def sharded_run(self):
+        """
+        Una ejecución de trabajo sharded: fija el shard del hilo hasta que termina
+        y retiene el lock compartido que impide a cualquier nodo cambiar de shard.
+        """
+        if not self._sharding:
+            yield self._shard
+            return
+        conn = self._bind.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            conn.execute(text("SELECT pg_advisory_lock_shared(:key)"), {"key": settings.SCHEDULER_SHARD_LOCK_KEY})
+            self._local.shard = self._shard
+            try:
+                yield self._local.shard
+            finally:
+                del self._local.shard
+                conn.execute(text("SELECT pg_advisory_unlock_shared(:key)"), {"key": settings.SCHEDULER_SHARD_LOCK_KEY})
+        finally:
+            conn.close()
+
+    def _guarded(self, func: Callable, sharded: bool) -> Callable:
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            if not self.may_run(sharded):
+                return
+            if not (sharded and self._sharding):
+                return func(*args, **kwargs)
+            with self.sharded_run() as shard:
+                if shard is not None:
+                    return func(*args, **kwargs)
+        return run
+
+    # ── Ciclo de vida ─────────────────────────────────────────────────────────
+
+    def start(self, threads: int, poll_seconds: float, sharding: bool = False, node_ttl: Optional[float] = None) -> None:
+        if self.running:
+            return
+        from apscheduler.executors.pool import ThreadPoolExecutor
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        if sharding and self._bind.dialect.name != "postgresql":
+            logger.warning("Scheduler: el sharding necesita Postgres — se usa solo el líder")
+            sharding = False
+        self._sharding = sharding
+        self._node_ttl = node_ttl or poll_seconds * 3
+        self._drain_timeout = poll_seconds / 2
+
+        with self._mutex:
+            self._scheduler = BackgroundScheduler(
+                timezone="UTC",
+                executors={"default": ThreadPoolExecutor(threads)},
+                # Un tick perdido (failover, pausa) no se recupera en ráfaga
+                job_defaults={"coalesce": True, "max_instances": 1},
+            )
+            for func, trigger, kwargs in self._jobs:
+                self._scheduler.add_job(func, trigger, **kwargs)
+            self._scheduler.start(paused=True)
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(poll_seconds,), name="scheduler-leader", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self._step_down()
+        if self._sharding:
+            self._shard, self._view = None, None
+            self._sync()
+            try:
+                self.leave()
+            except Exception as e:
+                logger.error(f"Scheduler: no se pudo borrar el nodo {self.node_id}: {e}")
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+
+    def _loop(self, poll_seconds: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.elect()
+            except Exception as e:
+                logger.error(f"Elección de líder del scheduler falló: {e}")
+            if self._sharding:
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.error(f"Latido del scheduler falló: {e}")
+                    self._shard, self._view = None, None
+                    self._sync()
+            self._stop.wait(poll_seconds)
+
+    def _sync(self) -> None:
+        """Ajusta pausa del scheduler y servicios al estado actual (líder / shard)."""
+        from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+
+        active = self._leader or self._shard is not None
+        with self._mutex:
+            if self._scheduler is not None:
+                if active and self._scheduler.state == STATE_PAUSED:
+                    self._scheduler.resume()
+                elif not active and self._scheduler.state == STATE_RUNNING:
+                    self._scheduler.pause()
+            services = list(self._services)
+
+        for service in services:
+            should_run = self.may_run(service.sharded)
+            if should_run == service.running:
+                continue
+            try:
+                (service.start if should_run else service.stop)()
+                service.running = should_run
+            except Exception as e:
+                logger.error(f"Scheduler: error {'arrancando' if should_run else 'parando'} servicio: {e}")
+
+    # ── Elección ──────────────────────────────────────────────────────────────
+
+    def elect(self) -> bool:
+        """Una ronda: confirma el lock si somos líder o intenta tomarlo. Devuelve is_leader."""
+        if self._leader:
+            if not self._still_holding():
+                logger.warning("Scheduler: conexión del lock de líder perdida — jobs globales en pausa")
+                self._step_down()
+            return self._leader
+
+        if self._try_acquire():
+            self._leader = True
+            self._sync()
+            logger.info("✅ Scheduler: este proceso es el líder — jobs activos")
+        return self._leader
+
+    def _try_acquire(self) -> bool:
+        if self._bind.dialect.name != "postgresql":
+            return True   # sin advisory locks (SQLite en desarrollo): un solo proceso
+        if self._lock_engine is None:
+            self._lock_engine = create_engine(self._bind.url, poolclass=NullPool)
+        conn = self._lock_engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": settings.SCHEDULER_LEADER_LOCK_KEY},
+            ).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._lock_conn = conn
+        return True
+
+    def _still_holding(self) -> bool:
+        if self._lock_conn is None:
+            return self._bind.dialect.name != "postgresql"
+        try:
+            self._lock_conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
+
+    def _step_down(self) -> None:
+        self._leader = False
+        self._sync()
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is not None:
+            try:
+                conn.close()   # cierra la sesión: Postgres libera el advisory lock
+            except Exception:
+                pass
+
+    # ── Membresía (modo sharding) ─────────────────────────────────────────────
+
+    def heartbeat(self) -> Optional[tuple[int, int]]:
+        """Renueva el latido de este nodo, purga los caídos y recalcula el shard."""
+        cutoff = func.now() - timedelta(seconds=self._node_ttl)
+        with self._bind.begin() as conn:
+            conn.execute(
+                pg_insert(_nodes).values(node_id=self.node_id).on_conflict_do_update(
+                    index_elements=[_nodes.c.node_id], set_={"heartbeat_at": func.now()},
+                )
+            )
+            conn.execute(delete(_nodes).where(_nodes.c.heartbeat_at < cutoff))
+            view = tuple(conn.execute(select(_nodes.c.node_id).order_by(_nodes.c.node_id)).scalars())
+
+        if view != self._view:
+            # Se suelta el reparto anterior y se adopta este en el próximo latido si se mantiene
+            if self._shard is not None:
+                logger.info(f"Scheduler: cambio de nodos ({len(view)} vivos) — rebalanceando")
+            self._view, self._shard = view, None
+        elif self._shard is None and self._drained():
+            self._shard = (view.index(self.node_id), len(view))
+            logger.info(f"✅ Scheduler: shard {self._shard[0] + 1}/{self._shard[1]} asignado a {self.node_id}")
+        self._sync()
+        return self._shard
+
+    def _drained(self) -> bool:
+        """
+        Espera a que ningún nodo tenga un job sharded en curso (lock exclusivo).
+        Los jobs que arrancan mientras tanto esperan detrás: no hay inanición.
+        """
+        try:
+            with self._bind.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = '{int(self._drain_timeout * 1000)}ms'"))
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": settings.SCHEDULER_SHARD_LOCK_KEY})
+            return True
+        except OperationalError:
+            logger.info("Scheduler: hay jobs con el reparto anterior en curso — el shard se adopta en el próximo latido")
+            return False
+
+    def leave(self) -> None:
+        with self._bind.begin() as conn:
+            conn.execute(delete(_nodes).where(_nodes.c.node_id == self.node_id))
+
+
+# Singleton global
+scheduler_host = SchedulerHost()
+
+
+def shard_clause(user_id_column):
+    """Filtro para las queries de los jobs sharded: solo los user_id de este nodo."""
+    return scheduler_host.shard_clause(user_id_column)
+
+
+def sharded_run():
+    """Context manager para cada iteración de un servicio sharded con hilo propio."""
+    return scheduler_host.sharded_run()
+
+
+def start_scheduler_host() -> None:
+    """Arranca el scheduler compartido (llamar después de que los módulos registren sus jobs)."""
+    if not settings.SCHEDULER_ENABLED:
+        logger.info("Scheduler desactivado en este proceso (SCHEDULER_ENABLED=false)")
+        return
+    scheduler_host.start(
+        settings.SCHEDULER_THREADS,
+        settings.SCHEDULER_LEADER_POLL_SECONDS,
+        sharding=settings.SCHEDULER_SHARDING_ENABLED,
+        node_ttl=settings.SCHEDULER_NODE_TTL_SECONDS,
+    )
+    mode = "sharding" if settings.SCHEDULER_SHARDING_ENABLED else "líder único"
+    logger.info(f"Scheduler iniciado ({settings.SCHEDULER_THREADS} hilos, {mode})")
@@ -0,0 +1,15 @@
+# app/core/scheduler_node.py
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SchedulerNode(Base):
+    """Nodo vivo del scheduler en modo sharding (ver app/core/scheduler.py)."""
+    __tablename__ = 'scheduler_nodes'
+    __table_args__ = {'schema': 'core'}
+
+    node_id      = Column(String(200), primary_key=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    started_at   = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,74 @@
+import time
+from datetime import timedelta
+import pytest
+from sqlalchemy import text
+from app.core.dedup import DedupService, MemoryDedupBackend, PostgresDedupBackend
+
+DAY = timedelta(days=1)
+
+
+@pytest.fixture
+def postgres(db):
+    yield DedupService(PostgresDedupBackend(bind=db.get_bind()))
+    db.execute(text("DELETE FROM core.dedup_keys"))
+    db.commit()
+
+
+@pytest.fixture
+def memory():
+    return DedupService(MemoryDedupBackend(max_entries=3))
+
+
+class TestMemoryBackend:
+
+    def test_claim_once(self, memory):
+        assert memory.claim("ns", (1, "2026-01-01"), DAY) is True
+        assert memory.claim("ns", (1, "2026-01-01"), DAY) is False
+        assert memory.claim("other", (1, "2026-01-01"), DAY) is True
+
+    def test_claim_again_after_ttl(self, memory):
+        assert memory.claim("ns", 1, timedelta(milliseconds=20))
+        time.sleep(0.05)
+        assert memory.claim("ns", 1, DAY)
+
+    def test_bounded_lru(self, memory):
+        memory.claim_many("ns", [1, 2, 3, 4], DAY)
+        assert memory.claim("ns", 1, DAY) is True     # la más antigua se desalojó
+        assert memory.claim("ns", 4, DAY) is False
+
+    def test_purge_expired(self, memory):
+        memory.claim("ns", 1, timedelta(0))
+        memory.claim("ns", 2, DAY)
+        assert memory.purge_expired() == 1
+
+
+class TestPostgresBackend:
+
+    def test_claim_many_returns_new_keys(self, postgres):
+        assert postgres.claim_many("ns", [(1, "a"), (2, "a")], DAY) == {(1, "a"), (2, "a")}
+        assert postgres.claim_many("ns", [(2, "a"), (3, "a"), (3, "a")], DAY) == {(3, "a")}
+
+    def test_expired_key_can_be_claimed_again(self, db, postgres):
+        assert postgres.claim("ns", 1, DAY)
+        db.execute(text("UPDATE core.dedup_keys SET expires_at = now() - interval '1 second'"))
+        db.commit()
+        assert postgres.claim("ns", 1, DAY) is True
+        assert postgres.claim("ns", 1, DAY) is False
+
+    def test_two_services_share_claims(self, db, postgres):
+        other = DedupService(PostgresDedupBackend(bind=db.get_bind()))
+        assert postgres.claim("ns", 1, DAY) is True
+        assert other.claim("ns", 1, DAY) is False
+
+    def test_clear_and_purge(self, db, postgres):
+        postgres.claim_many("a", [1, 2], DAY)
+        postgres.claim("b", 1, DAY)
+        postgres.clear("a")
+        assert postgres.claim("a", 1, DAY) is True
+        db.execute(text("UPDATE core.dedup_keys SET expires_at = now() WHERE namespace = 'b'"))
+        db.commit()
+        assert postgres.purge_expired() == 1
+
+    def test_table_is_unlogged(self, db):
+        persistence = db.execute(text("SELECT relpersistence FROM pg_class WHERE oid = 'core.dedup_keys'::regclass")).scalar()
+        assert persistence == "u"
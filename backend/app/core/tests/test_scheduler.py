@@ -0,0 +1,190 @@
+import threading
+import time
+import pytest
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+from sqlalchemy import Integer, column, select, text, values
+from app.core.scheduler import SchedulerHost
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def hosts(db):
+    created = []
+
+    def _host(node_id=None, sharding=False):
+        host = SchedulerHost(bind=db.get_bind(), node_id=node_id)
+        host._sharding = sharding
+        created.append(host)
+        return host
+
+    yield _host
+    for host in created:
+        host.stop(timeout=2)
+    db.execute(text("DELETE FROM core.scheduler_nodes"))
+    db.commit()
+
+
+class TestLeaderElection:
+
+    def test_only_one_leader(self, hosts):
+        first, second = hosts(), hosts()
+        assert first.elect() is True
+        assert second.elect() is False
+        assert first.elect() is True
+
+    def test_failover_when_leader_releases(self, hosts):
+        first, second = hosts(), hosts()
+        first.elect()
+        first.stop()
+        assert second.elect() is True
+
+    def test_failover_when_leader_connection_dies(self, hosts):
+        first, second = hosts(), hosts()
+        first.elect()
+        first._lock_conn.invalidate()   # como si el proceso muriera: Postgres cierra la sesión
+
+        assert second.elect() is True
+        assert first.elect() is False
+        assert not first.is_leader
+
+
+class TestSharedScheduler:
+
+    def test_jobs_paused_until_leader(self, hosts):
+        blocker, host = hosts(), hosts()
+        blocker.elect()
+
+        host.add_job(lambda: None, "interval", seconds=60, id="job")
+        host.start(threads=2, poll_seconds=0.05)
+        time.sleep(0.2)
+        assert host._scheduler.state == STATE_PAUSED
+        assert [job.id for job in host._scheduler.get_jobs()] == ["job"]
+
+        blocker.stop()
+        assert _wait_for(lambda: host.is_leader)
+        assert host._scheduler.state == STATE_RUNNING
+
+    def test_leader_runs_jobs(self, hosts):
+        ran  = threading.Event()
+        host = hosts()
+        host.add_job(ran.set, "date", id="once", misfire_grace_time=None)
+        host.start(threads=1, poll_seconds=0.05)
+        assert ran.wait(3)
+
+    def test_add_job_replaces_same_id(self, hosts):
+        host = hosts()
+        host.add_job(lambda: None, "interval", seconds=60, id="job")
+        host.add_job(lambda: None, "interval", seconds=30, id="job")
+        host.start(threads=1, poll_seconds=60)
+        assert len(host._scheduler.get_jobs()) == 1
+
+    def test_leader_services_follow_leadership(self, hosts):
+        calls = []
+        host  = hosts()
+        host.add_leader_service(lambda: calls.append("start"), lambda: calls.append("stop"))
+
+        host.elect()
+        host.stop()
+        assert calls == ["start", "stop"]
+
+
+USERS = values(column("user_id", Integer), name="users").data([(i,) for i in range(1, 11)])
+
+
+def _owned(db, host):
+    return set(db.execute(select(USERS.c.user_id).where(host.shard_clause(USERS.c.user_id))).scalars())
+
+
+class TestSharding:
+
+    @pytest.fixture
+    def pair(self, hosts):
+        a, b = hosts("node-a", sharding=True), hosts("node-b", sharding=True)
+        for host in (a, b, a, b, a):
+            host.heartbeat()
+        return a, b
+
+    def test_shard_adopted_after_stable_view(self, hosts):
+        a, b = hosts("node-a", sharding=True), hosts("node-b", sharding=True)
+        assert a.heartbeat() is None      # primera vista: espera un latido
+        assert b.heartbeat() is None
+        assert a.heartbeat() is None      # node-b apareció: la vista cambió
+        assert b.heartbeat() == (1, 2)
+        assert a.heartbeat() == (0, 2)
+
+    def test_shards_partition_users(self, db, pair):
+        a, b = pair
+        assert _owned(db, a) | _owned(db, b) == set(range(1, 11))
+        assert not _owned(db, a) & _owned(db, b)
+
+    def test_rebalance_when_node_dies(self, db, pair):
+        a, _ = pair
+        db.execute(text("UPDATE core.scheduler_nodes SET heartbeat_at = now() - interval '1 hour' WHERE node_id = 'node-b'"))
+        db.commit()
+
+        assert a.heartbeat() is None      # suelta su mitad antes de tomar el rango de node-b
+        assert _owned(db, a) == set()
+        assert a.heartbeat() == (0, 1)
+        assert _owned(db, a) == set(range(1, 11))
+
+    def test_leave_removes_node(self, db, pair):
+        a, b = pair
+        b.stop()
+        a.heartbeat()
+        assert a.heartbeat() == (0, 1)
+
+    def test_sharded_jobs_run_on_members_global_on_leader(self, pair):
+        a, _ = pair
+        assert a.may_run(sharded=True)
+        assert not a.may_run(sharded=False)
+        a.elect()
+        assert a.may_run(sharded=False)
+
+    def test_sharded_service_follows_membership(self, hosts):
+        calls = []
+        host  = hosts("node-a", sharding=True)
+        host.add_leader_service(lambda: calls.append("start"), lambda: calls.append("stop"), sharded=True)
+
+        host.heartbeat()
+        assert calls == []
+        host.heartbeat()
+        assert calls == ["start"]
+        host.stop()
+        assert calls == ["start", "stop"]
+
+    def test_node_joining_waits_for_running_job(self, hosts, pair):
+        """El job en curso conserva su shard y nadie adopta el nuevo reparto hasta que termina."""
+        a, b = pair
+        started, release, seen = threading.Event(), threading.Event(), []
+
+        def job():
+            seen.append(a.shard)
+            started.set()
+            release.wait(5)
+            seen.append(a.shard)
+
+        worker = threading.Thread(target=a._guarded(job, sharded=True))
+        worker.start()
+        assert started.wait(2)
+
+        c = hosts("node-c", sharding=True)
+        for host in (a, b, c):
+            host._drain_timeout = 0.1
+        for host in (c, a, b, c, a, b, c):
+            assert host.heartbeat() is None        # job de node-a en curso con el reparto anterior
+
+        release.set()
+        worker.join(2)
+        assert seen == [(0, 2), (0, 2)]            # el shard solo cambia entre jobs
+        assert [host.heartbeat() for host in (a, b, c)] == [(0, 3), (1, 3), (2, 3)]
+
+    def test_without_sharding_clause_does_not_filter(self, db, hosts):
+        assert _owned(db, hosts()) == set(range(1, 11))
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_redoc_html
 from .core import engine, Base, settings
 from app.core import auth
+from app.core import scheduler_node  # noqa: F401 — tabla core.scheduler_nodes (modo sharding)
+from app.core import dedup_key  # noqa: F401 — tabla core.dedup_keys (deduplicación de schedulers)
 from app.core.module_loader import import_module, import_all_models, register_user_relationships, register_automation_handlers
 
 if __name__ == '__main__':
@@ -79,14 +81,56 @@ print(f"\n✅ {len(loaded_modules)} módulos cargados\n")
 async def startup_event():
     """
     Arranca schedulers que necesitan esperar a que la app esté completamente
-    inicializada (modelos, relaciones y mappers ya configurados).
+    inicializada (modelos, relaciones y mappers ya configurados). Los jobs
+    periódicos de los módulos se registran en el scheduler compartido
+    (app/core/scheduler.py), que solo los ejecuta en el proceso líder.
     """
     from app.modules.automations_engine.services.cron_scheduler_service import start_cron_scheduler
     from app.modules.calendar_tracker import start_calendar_scheduler
     from app.modules.expenses_tracker import start_expenses_scheduler
     from app.modules.flights_tracker import start_flights_scheduler
     start_cron_scheduler()
-    start_calendar_scheduler()
+    try:
+        from app.modules.automations_engine.services.execution_queue import start_execution_workers
+        start_execution_workers()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando automations workers: {e}")
+    try:
+        from app.modules.automations_engine.services.webhook_touch_buffer import start_webhook_touch_buffer
+        start_webhook_touch_buffer()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando webhook touch buffer: {e}")
+    try:
+        from app.modules.automations_engine.services.api_key_usage_buffer import start_api_key_usage_buffer
+        start_api_key_usage_buffer()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando API key usage buffer: {e}")
+    try:
+        from app.modules.automations_engine.services.execution_profile import start_execution_profile
+        start_execution_profile()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando execution profile: {e}")
+    try:
+        from app.modules.automations_engine.services.delay_resumer import start_delay_resumer
+        start_delay_resumer()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando delay resumer: {e}")
+    try:
+        from app.modules.automations_engine.services.execution_retention import start_execution_maintenance
+        start_execution_maintenance()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando mantenimiento de executions: {e}")
+    try:
+        start_calendar_scheduler()
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).error(f"Error iniciando calendar scheduler: {e}")
     try:
         start_expenses_scheduler()
     except Exception as e:
@@ -109,6 +153,18 @@ async def startup_event():
     except Exception as e:
         import logging
         logging.getLogger(__name__).error(f"Error iniciando macro scheduler: {e}")
+    # Un solo proceso del cluster (el que gana el advisory lock) ejecuta los jobs registrados arriba
+    from app.core.dedup import start_dedup_purge
+    start_dedup_purge()
+    from app.core.scheduler import start_scheduler_host
+    start_scheduler_host()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Suelta el liderazgo del scheduler para que otro proceso lo tome sin esperar a que caiga la conexión."""
+    from app.core.scheduler import scheduler_host
+    scheduler_host.stop(timeout=5)
 
 
 # ── Endpoints base ────────────────────────────────────────────────────────────
@@ -5,6 +5,7 @@ from .routers.executions_router import router as executions_router
 from .routers.webhooks_router import router as webhooks_router
 from .routers.api_keys_router import router as api_keys_router
 from .routers.registry_router import router as registry_router
+from .routers.retention_router import router as retention_router
 from .handlers import register_exception_handlers as register_handlers
 
 router = APIRouter()
@@ -13,6 +14,7 @@ router.include_router(executions_router)
 router.include_router(webhooks_router)
 router.include_router(api_keys_router)
 router.include_router(registry_router)
+router.include_router(retention_router)
 
 TAGS = [
     {"name": "Automations", "description": "Gestión de automatizaciones y flujos"},
@@ -38,6 +38,20 @@ def register(registry) -> None:
                                "options": ["minutes", "hours", "days"], "default": "minutes"},
             "active_from":    {"type": "time", "label": "Activo desde",  "required": False},
             "active_until":   {"type": "time", "label": "Activo hasta",  "required": False},
+            "timezone":       {"type": "string", "label": "Zona horaria", "required": False, "default": "UTC"},
+        },
+        handler       = "app.modules.automations_engine.core.node_handlers.trigger_handler.handle",
+    )
+
+    registry.register_trigger(
+        module_id     = "system",
+        trigger_id    = "schedule_cron",
+        label         = "Expresión cron",
+        config_schema = {
+            "expression":   {"type": "string", "label": "Expresión cron (5 campos)", "required": True},
+            "timezone":     {"type": "string", "label": "Zona horaria",  "required": False, "default": "UTC"},
+            "active_from":  {"type": "time",   "label": "Activo desde",  "required": False},
+            "active_until": {"type": "time",   "label": "Activo hasta",  "required": False},
         },
         handler       = "app.modules.automations_engine.core.node_handlers.trigger_handler.handle",
     )
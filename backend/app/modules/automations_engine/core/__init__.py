@@ -1,9 +1,13 @@
-from .registry import registry, AutomationRegistry, TriggerDef, ActionDef
-from .graph import build_graph, resolve_next_nodes, Graph, Node, Edge
+from .registry import registry, AutomationRegistry, TriggerDef, ActionDef, HandlerResolutionError, resolve_handler
+from .graph import build_graph, resolve_next_nodes, extract_trigger_config, Graph, Node, Edge
+from .trigger_index import trigger_index, TriggerIndex, TriggerIndexEntry
+from .compiled_flow import flow_cache, FlowCache, CompiledFlow, compile_flow
 
 __all__ = [
     "registry",
-    "AutomationRegistry", "TriggerDef", "ActionDef",
-    "build_graph", "resolve_next_nodes",
+    "AutomationRegistry", "TriggerDef", "ActionDef", "HandlerResolutionError", "resolve_handler",
+    "build_graph", "resolve_next_nodes", "extract_trigger_config",
     "Graph", "Node", "Edge",
+    "trigger_index", "TriggerIndex", "TriggerIndexEntry",
+    "flow_cache", "FlowCache", "CompiledFlow", "compile_flow",
 ]
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Caché en memoria de API keys validadas.
+
+ApiKeyService.validate hacía sha256 + SELECT por key_hash en cada petición
+autenticada con API key. En caliente la key se resuelve aquí por su hash.
+
+- Las entradas guardan los metadatos necesarios para autorizar (id, user_id,
+  automation_id, scopes, expires_at); la caducidad se comprueba en cada
+  llamada, no al cachear.
+- Los hashes desconocidos o revocados también se cachean.
+- ApiKeyService invalida al crear/revocar; AutomationService al borrar la
+  automation (el FK borra sus keys en cascada).
+- Cada proceso tiene su propia caché e invalidate solo limpia la local: una key
+  revocada en otro worker sigue aceptándose aquí hasta que caduca su entrada.
+  Por eso las keys válidas usan un TTL corto (AUTOMATIONS_API_KEY_CACHE_TTL_SECONDS,
+  5s por defecto), que es la ventana máxima de revocación entre procesos. Las
+  inválidas usan NEGATIVE_TTL_SECONDS: una key revocada no vuelve a ser válida.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from ..manifest import get_settings
+
+DEFAULT_MAX_ENTRIES  = 10_000
+NEGATIVE_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class ApiKeyEntry:
+    id:            int
+    user_id:       int
+    automation_id: Optional[int]
+    scopes:        frozenset[str]
+    expires_at:    Optional[datetime]
+
+
+class ApiKeyCache:
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Optional[ApiKeyEntry]]] = OrderedDict()
+        self._lock    = threading.Lock()
+        self._version = 0  # se incrementa en cada invalidación
+
+    def lookup(self, key_hash: str, db: Session) -> Optional[ApiKeyEntry]:
+        """API key activa con ese hash, o None si no existe o está revocada."""
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(key_hash)
+            if cached and cached[0] > now:
+                self._entries.move_to_end(key_hash)
+                return cached[1]
+            version = self._version
+
+        entry = self._load(key_hash, db)
+
+        with self._lock:
+            # Si hubo una invalidación mientras cargábamos, no guardar datos viejos
+            if version == self._version:
+                ttl = get_settings()["AUTOMATIONS_API_KEY_CACHE_TTL_SECONDS"] if entry else NEGATIVE_TTL_SECONDS
+                self._entries[key_hash] = (now + ttl, entry)
+                self._entries.move_to_end(key_hash)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def _load(self, key_hash: str, db: Session) -> Optional[ApiKeyEntry]:
+        from ..models.api_key import ApiKey
+
+        row = db.query(
+            ApiKey.id, ApiKey.user_id, ApiKey.automation_id, ApiKey.scopes, ApiKey.expires_at,
+        ).filter(
+            ApiKey.key_hash  == key_hash,
+            ApiKey.is_active == True,
+        ).first()
+        if row is None:
+            return None
+        return ApiKeyEntry(
+            id            = row.id,
+            user_id       = row.user_id,
+            automation_id = row.automation_id,
+            scopes        = frozenset(row.scopes or ()),
+            expires_at    = row.expires_at,
+        )
+
+    def invalidate(self, key_hash: str) -> None:
+        with self._lock:
+            self._entries.pop(key_hash, None)
+            self._version += 1
+
+    def invalidate_automation(self, automation_id: int) -> None:
+        with self._lock:
+            stale = [
+                key_hash for key_hash, (_, entry) in self._entries.items()
+                if entry is not None and entry.automation_id == automation_id
+            ]
+            for key_hash in stale:
+                del self._entries[key_hash]
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton global
+api_key_cache = ApiKeyCache()
@@ -0,0 +1,124 @@
+"""
+Flujos compilados y su caché.
+
+build_graph() reconstruye los dataclasses desde el JSON en cada ejecución.
+compile_flow() hace ese trabajo una vez y deja listo lo que el executor
+necesita en caliente:
+
+- root resuelto (sin recorrer los nodos buscando el trigger)
+- tabla de ramas por nodo: siguientes nodos para condition_result
+  True / False / None, en el orden original de los edges
+- rank topológico de cada nodo: el executor saca los nodos pendientes en ese
+  orden, así un nodo con varias entradas corre después de todas ellas
+- el callable execute del handler de cada nodo (None si el tipo es desconocido).
+  Si el módulo del handler define prepare(config), se llama aquí una vez y su
+  resultado (p.ej. el body_template compilado del webhook) se pasa a execute
+  como prepared=... en cada ejecución
+- con "parallel": true en el flow, los descendientes de cada nodo: el
+  executor solo lanza a la vez nodos pendientes que no dependen entre sí
+
+flow_cache guarda los compilados por (automation.id, automation.updated_at):
+editar el flujo cambia updated_at y la siguiente ejecución recompila.
+"""
+import threading
+from functools import partial
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from .graph import Node, build_graph, descendants, topological_order
+from .node_handlers import NODE_HANDLERS
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+@dataclass(frozen=True)
+class CompiledFlow:
+    nodes:    dict[str, Node]
+    root:     Optional[Node]
+    handlers: dict[str, Optional[Callable[..., dict[str, Any]]]]  # node_id -> handler.execute
+    branches: dict[str, dict[Optional[bool], tuple[Node, ...]]]   # node_id -> {True|False|None: nodos}
+    rank:     dict[str, int]                                      # node_id -> posición topológica
+    parallel: bool = False                                        # ramas independientes en paralelo
+    reach:    dict[str, frozenset[str]] = field(default_factory=dict)  # node_id -> descendientes (solo parallel)
+
+    def next_nodes(self, node_id: str, condition_result: Optional[bool]) -> tuple[Node, ...]:
+        table = self.branches.get(node_id)
+        if not table:
+            return ()
+        # condition_result solo selecciona rama si es exactamente True/False
+        key = condition_result if condition_result is True or condition_result is False else None
+        return table[key]
+
+
+def compile_flow(flow: dict) -> CompiledFlow:
+    graph = build_graph(flow)
+
+    branches: dict[str, dict[Optional[bool], tuple[Node, ...]]] = {}
+    for node_id, edges in graph.edges.items():
+        always   = [graph.nodes[e.to_node] for e in edges if e.when is None]
+        on_true  = [graph.nodes[e.to_node] for e in edges if e.when in (None, "true")]
+        on_false = [graph.nodes[e.to_node] for e in edges if e.when in (None, "false")]
+        branches[node_id] = {None: tuple(always), True: tuple(on_true), False: tuple(on_false)}
+
+    handlers = {}
+    for node in graph.nodes.values():
+        module = NODE_HANDLERS.get(node.type)
+        if module is None:
+            handlers[node.id] = None
+        elif hasattr(module, "prepare"):
+            handlers[node.id] = partial(module.execute, prepared=module.prepare(node.config))
+        else:
+            handlers[node.id] = module.execute
+
+    rank = {node_id: index for index, node_id in enumerate(topological_order(graph))}
+
+    parallel = bool(flow.get("parallel"))
+
+    return CompiledFlow(
+        nodes=graph.nodes, root=graph.root, handlers=handlers, branches=branches, rank=rank,
+        parallel=parallel, reach=descendants(graph) if parallel else {},
+    )
+
+
+class FlowCache:
+    """LRU de CompiledFlow por automation. Una entrada por id; updated_at actúa de versión."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[Any, CompiledFlow]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, automation) -> CompiledFlow:
+        key     = automation.id
+        version = automation.updated_at
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] == version:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        compiled = compile_flow(automation.flow)
+
+        with self._lock:
+            self._entries[key] = (version, compiled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, automation_id: int) -> None:
+        with self._lock:
+            self._entries.pop(automation_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton global — compartido por flow_executor y automation_call_handler
+flow_cache = FlowCache()
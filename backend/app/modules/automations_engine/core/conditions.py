@@ -0,0 +1,192 @@
+"""
+Condiciones compiladas para los nodos condition.
+
+condition_handler fusionaba {**payload, **vars}, partía el field por puntos y
+recorría un match sobre el operador en cada evaluación. compile_condition()
+hace ese trabajo una vez y devuelve un predicado predicate(ctx) -> bool:
+
+- Hoja: {"field": "a.b", "op": "gt", "value": 10}. La ruta se parte al compilar
+  y se resuelve con resolve_path (vars y después payload, sin fusionar).
+- Grupos: {"and": [...]}, {"or": [...]}, {"not": {...}}, anidables.
+  "and" vacío es True, "or" vacío es False.
+
+Operadores: eq, neq, gt, lt, gte, lte, in, not_in, between ([min, max]
+inclusivo), regex (re.search, compilada una vez), contains, exists, not_exists.
+
+Coerción numérica: si los dos lados se pueden leer como número ("42", 42.0),
+eq/neq/in/not_in y las comparaciones trabajan con el número. Si no, se compara
+el valor tal cual; un TypeError cuenta como False.
+
+Una configuración mal formada lanza ValueError (la validación del flujo lo
+convierte en InvalidFlowError). Un operador desconocido en un flujo ya guardado
+evalúa a False, como antes.
+"""
+import operator
+import re
+from typing import Any, Callable
+
+from ..enums import ConditionOperator
+from .template import resolve_path
+
+Predicate = Callable[[dict], bool]
+
+GROUP_KEYS = ("and", "or", "not")
+
+
+def _number(value: Any) -> float | None:
+    """Valor numérico de value, o None si no es un número ni un string numérico."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _equals(left: Any, right: Any, right_number: float | None) -> bool:
+    if left == right:
+        return True
+    if right_number is None:
+        return False
+    left_number = _number(left)
+    return left_number is not None and left_number == right_number
+
+
+# ── Fábricas de operadores: value de la config → test(field_val) ──────────────
+
+def _eq(value: Any) -> Callable[[Any], bool]:
+    target = _number(value)
+    return lambda field_val: _equals(field_val, value, target)
+
+
+def _neq(value: Any) -> Callable[[Any], bool]:
+    target = _number(value)
+    return lambda field_val: not _equals(field_val, value, target)
+
+
+def _ordering(compare: Callable[[Any, Any], bool]) -> Callable[[Any], Callable[[Any], bool]]:
+    def factory(value: Any) -> Callable[[Any], bool]:
+        target = _number(value)
+
+        def test(field_val: Any) -> bool:
+            if field_val is None:
+                return False
+            if target is not None:
+                number = _number(field_val)
+                if number is not None:
+                    return compare(number, target)
+            try:
+                return compare(field_val, value)
+            except TypeError:
+                return False
+        return test
+    return factory
+
+
+def _in(value: Any) -> Callable[[Any], bool]:
+    if not isinstance(value, list):
+        raise ValueError("'in' y 'not_in' requieren una lista en value")
+    options = [(option, _number(option)) for option in value]
+    return lambda field_val: any(_equals(field_val, option, number) for option, number in options)
+
+
+def _not_in(value: Any) -> Callable[[Any], bool]:
+    test = _in(value)
+    return lambda field_val: not test(field_val)
+
+
+def _between(value: Any) -> Callable[[Any], bool]:
+    if not isinstance(value, list) or len(value) != 2:
+        raise ValueError("'between' requiere value = [min, max]")
+    above = _ordering(operator.ge)(value[0])
+    below = _ordering(operator.le)(value[1])
+    return lambda field_val: above(field_val) and below(field_val)
+
+
+def _regex(value: Any) -> Callable[[Any], bool]:
+    if not isinstance(value, str):
+        raise ValueError("'regex' requiere un patrón string en value")
+    try:
+        pattern = re.compile(value)
+    except re.error as e:
+        raise ValueError(f"regex inválida: {e}")
+    return lambda field_val: field_val is not None and pattern.search(str(field_val)) is not None
+
+
+def _contains(value: Any) -> Callable[[Any], bool]:
+    def test(field_val: Any) -> bool:
+        if field_val is None:
+            return False
+        try:
+            return value in field_val
+        except TypeError:
+            return False
+    return test
+
+
+OPERATORS: dict[str, Callable[[Any], Callable[[Any], bool]]] = {
+    ConditionOperator.EQ:         _eq,
+    ConditionOperator.NEQ:        _neq,
+    ConditionOperator.GT:         _ordering(operator.gt),
+    ConditionOperator.LT:         _ordering(operator.lt),
+    ConditionOperator.GTE:        _ordering(operator.ge),
+    ConditionOperator.LTE:        _ordering(operator.le),
+    ConditionOperator.IN:         _in,
+    ConditionOperator.NOT_IN:     _not_in,
+    ConditionOperator.BETWEEN:    _between,
+    ConditionOperator.REGEX:      _regex,
+    ConditionOperator.CONTAINS:   _contains,
+    ConditionOperator.EXISTS:     lambda value: lambda field_val: field_val is not None,
+    ConditionOperator.NOT_EXISTS: lambda value: lambda field_val: field_val is None,
+}
+
+
+# ── Compilación ───────────────────────────────────────────────────────────────
+
+def _compile_leaf(config: dict, strict: bool) -> Predicate:
+    op      = config.get("op", ConditionOperator.EQ)
+    factory = OPERATORS.get(op)
+    if factory is None:
+        if strict:
+            raise ValueError(f"operador desconocido: {op}")
+        return lambda ctx: False
+
+    test  = factory(config.get("value"))
+    parts = tuple(config.get("field", "").split("."))
+    return lambda ctx: test(resolve_path(ctx, parts))
+
+
+def _compile(config: Any, strict: bool) -> Predicate:
+    if not isinstance(config, dict):
+        raise ValueError("cada condición debe ser un objeto")
+
+    groups = [key for key in GROUP_KEYS if key in config]
+    if not groups:
+        return _compile_leaf(config, strict)
+    if len(groups) > 1:
+        raise ValueError(f"una condición solo puede tener una de {', '.join(GROUP_KEYS)}")
+
+    key = groups[0]
+    if key == "not":
+        inner = _compile(config["not"], strict)
+        return lambda ctx: not inner(ctx)
+
+    members = config[key]
+    if not isinstance(members, list):
+        raise ValueError(f"'{key}' requiere una lista de condiciones")
+    predicates = tuple(_compile(member, strict) for member in members)
+    if key == "and":
+        return lambda ctx: all(predicate(ctx) for predicate in predicates)
+    return lambda ctx: any(predicate(ctx) for predicate in predicates)
+
+
+def compile_condition(config: dict, strict: bool = False) -> Predicate:
+    """
+    Compila la config de un nodo condition en predicate(ctx) -> bool.
+    strict=True (validación del flujo) también rechaza operadores desconocidos.
+    """
+    return _compile(config, strict)
@@ -0,0 +1,143 @@
+"""
+Bus en proceso de eventos de ejecución en vivo.
+
+POST /trigger/stream solo podía seguir la ejecución que arrancaba la propia
+petición. Ahora flow_executor publica node_start / node / done de todas las
+ejecuciones (dispatcher, cola, CRON, webhook, delay reanudado) y
+GET /automations/{id}/executions/live las sigue sin ejecutar nada.
+
+- publish() se llama desde hilos de ejecución (síncronos); cada Subscription
+  pertenece al event loop que la creó y recibe los eventos con
+  call_soon_threadsafe.
+- Sin suscriptores de la automation, publish() es un lookup en un dict.
+- Cada suscriptor tiene un buffer acotado (AUTOMATIONS_LIVE_BUFFER_SIZE): si
+  se llena se descartan los eventos más viejos y el cliente recibe
+  {"type": "dropped", "count": n} antes del siguiente.
+- El bus es por proceso: con varios workers de uvicorn, el cliente solo ve
+  las ejecuciones que corren en el proceso que atiende su conexión.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from ..manifest import get_settings
+
+
+class Subscription:
+
+    def __init__(self, automation_id: int, loop: asyncio.AbstractEventLoop, max_events: int):
+        self.automation_id = automation_id
+        self._loop    = loop
+        self._events: deque[dict] = deque(maxlen=max_events)
+        self._ready   = asyncio.Event()
+        self._dropped = 0
+
+    def _push(self, event: dict) -> None:
+        """Corre en el event loop del suscriptor."""
+        if len(self._events) == self._events.maxlen:
+            self._dropped += 1
+        self._events.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Siguiente evento, o None si pasa timeout sin ninguno."""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._dropped:
+            dropped, self._dropped = self._dropped, 0
+            return {"type": "dropped", "count": dropped}
+        return self._events.popleft()
+
+
+class ExecutionEventBus:
+
+    def __init__(self):
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, automation_id: int) -> bool:
+        return automation_id in self._subscribers
+
+    def subscribe(self, automation_id: int, max_events: Optional[int] = None) -> Subscription:
+        """Llamar desde el event loop que va a consumir los eventos."""
+        subscription = Subscription(
+            automation_id,
+            asyncio.get_running_loop(),
+            max_events or get_settings()["AUTOMATIONS_LIVE_BUFFER_SIZE"],
+        )
+        with self._lock:
+            self._subscribers.setdefault(automation_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.automation_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.automation_id]
+
+    @contextmanager
+    def subscribed(self, automation_id: int, max_events: Optional[int] = None) -> Iterator[Subscription]:
+        subscription = self.subscribe(automation_id, max_events)
+        try:
+            yield subscription
+        finally:
+            self.unsubscribe(subscription)
+
+    def publish(self, automation_id: int, event: dict) -> None:
+        if automation_id not in self._subscribers:
+            return
+        with self._lock:
+            subscriptions = list(self._subscribers.get(automation_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._push, event)
+            except RuntimeError:
+                # Event loop cerrado: el cliente ya no está
+                self.unsubscribe(subscription)
+
+    async def tail(self, automation_id: int, heartbeat_seconds: float) -> AsyncIterator[Optional[dict]]:
+        """Eventos de la automation; None cada heartbeat_seconds sin actividad."""
+        with self.subscribed(automation_id) as subscription:
+            while True:
+                yield await subscription.get(timeout=heartbeat_seconds)
+
+
+class LiveChannel:
+    """Publica los eventos de una ejecución concreta en el bus."""
+
+    def __init__(self, automation_id: int, execution_id: Optional[int], bus: Optional[ExecutionEventBus] = None):
+        self.automation_id = automation_id
+        self.execution_id  = execution_id
+        self._bus     = bus or execution_bus
+        self._started = time.monotonic()
+
+    def publish(self, event: dict) -> None:
+        if self._bus.has_subscribers(self.automation_id):
+            self._bus.publish(self.automation_id, {**event, "execution_id": self.execution_id})
+
+    def done(self, result: dict) -> None:
+        if not self._bus.has_subscribers(self.automation_id):
+            return
+        event = {
+            "type":          "done",
+            "status":        result["status"],
+            "duration_ms":   int((time.monotonic() - self._started) * 1000),
+            "error_message": result.get("error"),
+        }
+        if result.get("resume_at"):
+            event["resume_at"] = result["resume_at"].isoformat()
+        self.publish(event)
+
+
+# Singleton global
+execution_bus = ExecutionEventBus()
@@ -1,3 +1,4 @@
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Optional, Any
 
@@ -51,6 +52,82 @@ def build_graph(flow: dict) -> Graph:
     return Graph(nodes=nodes, edges=edges, root=root)
 
 
+def topological_order(graph: Graph) -> list[str]:
+    """
+    Orden topológico (Kahn) de los nodos, estable respecto al orden de
+    declaración y de los edges. Los nodos atrapados en un ciclo (flujos
+    guardados antes de validar ciclos) van al final en orden de declaración.
+    """
+    indegree = {node_id: 0 for node_id in graph.nodes}
+    for edges in graph.edges.values():
+        for edge in edges:
+            if edge.to_node in indegree:
+                indegree[edge.to_node] += 1
+
+    ready = deque(node_id for node_id, degree in indegree.items() if degree == 0)
+    order = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for edge in graph.edges.get(node_id, []):
+            if edge.to_node in indegree:
+                indegree[edge.to_node] -= 1
+                if indegree[edge.to_node] == 0:
+                    ready.append(edge.to_node)
+
+    placed = set(order)
+    return order + [node_id for node_id in graph.nodes if node_id not in placed]
+
+
+def find_cycle(graph: Graph) -> Optional[list[str]]:
+    """Un ciclo del grafo como [a, b, ..., a], o None si es acíclico."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = {node_id: WHITE for node_id in graph.nodes}
+
+    for start in graph.nodes:
+        if color[start] != WHITE:
+            continue
+        path  = [start]
+        stack = [iter(graph.edges.get(start, []))]
+        color[start] = GREY
+        while stack:
+            edge = next(stack[-1], None)
+            if edge is None:
+                color[path.pop()] = BLACK
+                stack.pop()
+                continue
+            target = edge.to_node
+            if color.get(target) == GREY:
+                return path[path.index(target):] + [target]
+            if color.get(target) == WHITE:
+                color[target] = GREY
+                path.append(target)
+                stack.append(iter(graph.edges.get(target, [])))
+    return None
+
+
+def descendants(graph: Graph) -> dict[str, frozenset[str]]:
+    """Nodos alcanzables desde cada nodo (sin incluirlo, salvo que esté en un ciclo)."""
+    reach: dict[str, frozenset[str]] = {}
+    for start in graph.nodes:
+        seen, stack = set(), [start]
+        while stack:
+            for edge in graph.edges.get(stack.pop(), []):
+                if edge.to_node in graph.nodes and edge.to_node not in seen:
+                    seen.add(edge.to_node)
+                    stack.append(edge.to_node)
+        reach[start] = frozenset(seen)
+    return reach
+
+
+def extract_trigger_config(flow: dict | None) -> dict:
+    """Devuelve el config del nodo trigger del flow JSON ({} si no hay trigger)."""
+    for n in (flow or {}).get("nodes", []):
+        if n.get("type") == "trigger":
+            return n.get("config", {}) or {}
+    return {}
+
+
 def resolve_next_nodes(graph: Graph, node_id: str, condition_result: Optional[bool]) -> list[Node]:
     candidates = graph.edges.get(node_id, [])
     resolved = []
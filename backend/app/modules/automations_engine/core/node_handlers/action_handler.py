@@ -1,4 +1,3 @@
-import importlib
 from typing import Any
 from ...core.registry import registry
 from ...exceptions import ActionNotFoundInRegistryError
@@ -11,17 +10,10 @@ def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
     if not action_def:
         raise ActionNotFoundInRegistryError(action_id)
 
-    handler = _import_handler(action_def.handler_path)
-    result  = handler(
+    result = action_def.handler(
         payload=ctx.get("payload", {}),
         config=node_config,
         db=db,
         user_id=user_id,
     )
     return result
-
-
-def _import_handler(handler_path: str):
-    module_path, func_name = handler_path.rsplit(".", 1)
-    module = importlib.import_module(module_path)
-    return getattr(module, func_name)
\ No newline at end of file
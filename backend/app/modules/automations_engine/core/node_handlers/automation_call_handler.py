@@ -14,6 +14,7 @@ def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
     # Import aquí para evitar circular imports
     from ...models.automation import Automation
     from ...services.flow_executor import flow_executor
+    from ..compiled_flow import flow_cache
 
     automation = db.query(Automation).filter(
         Automation.id      == automation_id,
@@ -31,8 +32,8 @@ def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
         "user_id": user_id,
     }
 
-    result = flow_executor.execute_flow(
-        flow=automation.flow,
+    result = flow_executor.execute_compiled(
+        compiled=flow_cache.get(automation),
         ctx=child_ctx,
         db=db,
         user_id=user_id,
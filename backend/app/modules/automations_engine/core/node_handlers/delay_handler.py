@@ -1,5 +1,5 @@
+from datetime import datetime, timezone, timedelta
 from typing import Any
-import time
 
 UNIT_TO_SECONDS = {
     'seconds': 1,
@@ -8,7 +8,17 @@ UNIT_TO_SECONDS = {
     'days':    86400,
 }
 
-MAX_SECONDS = 300  # máximo 5 minutos en modo síncrono
+MAX_SECONDS = 90 * 86400  # máximo 90 días de suspensión
+
+
+class SuspendExecution(Exception):
+    """
+    Excepción interna para suspender el flujo hasta resume_at.
+    El executor guarda la cola de nodos pendientes y el delay_resumer la continúa.
+    """
+    def __init__(self, resume_at: datetime, output: dict):
+        self.resume_at = resume_at
+        self.output    = output
 
 
 def handle(payload: dict, config: dict, db, user_id: int) -> dict:
@@ -20,20 +30,27 @@ def handle(payload: dict, config: dict, db, user_id: int) -> dict:
 def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
     """
     Espera N segundos/minutos/horas/días antes de continuar el flujo.
-    En modo síncrono el máximo es 5 minutos (300s).
+    Suspende la ejecución (no bloquea el hilo). Un flujo hijo de automation_call
+    corre dentro del nodo del padre y no se puede suspender: la validación del
+    flujo lo impide y aquí el nodo falla en lugar de dormir el hilo.
     """
     value = node_config.get("delay_value") or node_config.get("minutes", 1)
     unit  = node_config.get("delay_unit", "minutes")
 
-    multiplier     = UNIT_TO_SECONDS.get(unit, 60)
-    total_seconds  = int(value) * multiplier
-    capped_seconds = min(total_seconds, MAX_SECONDS)
+    multiplier    = UNIT_TO_SECONDS.get(unit, 60)
+    total_seconds = int(value) * multiplier
+
+    if ctx.get("_depth", 0) > 0:
+        from ...exceptions import InvalidFlowError
+        raise InvalidFlowError("un flujo llamado con automation_call no puede tener nodos delay")
 
-    time.sleep(capped_seconds)
+    capped_seconds = min(total_seconds, MAX_SECONDS)
+    resume_at      = datetime.now(timezone.utc) + timedelta(seconds=capped_seconds)
 
-    return {
+    raise SuspendExecution(resume_at, {
         "delayed_seconds": capped_seconds,
+        "resume_at":       resume_at.isoformat(),
         "requested_value": value,
         "requested_unit":  unit,
         "capped":          total_seconds > MAX_SECONDS,
-    }
\ No newline at end of file
+    })
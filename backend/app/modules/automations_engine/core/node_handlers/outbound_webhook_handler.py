@@ -1,6 +1,6 @@
-import httpx
-import re
 from typing import Any
+from ..template import CompiledTemplate, compile_template
+from ..webhook_client import webhook_client
 
 
 def handle(payload: dict, config: dict, db, user_id: int) -> dict:
@@ -9,55 +9,42 @@ def handle(payload: dict, config: dict, db, user_id: int) -> dict:
     return execute(config, ctx, db, user_id)
 
 
-def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
+def prepare(node_config: dict) -> CompiledTemplate:
+    """Se llama una vez al compilar el flujo: body_template compilado."""
+    return compile_template(node_config.get("body_template", {}))
+
+
+def execute(
+    node_config: dict, ctx: dict, db, user_id: int, prepared: CompiledTemplate | None = None,
+) -> dict[str, Any]:
     url     = node_config.get("url")
     method  = node_config.get("method", "POST").upper()
     headers = node_config.get("headers", {})
     timeout = node_config.get("timeout_seconds", 10)
-    body_template = node_config.get("body_template", {})
+    template = prepared if prepared is not None else prepare(node_config)
 
-    resolved_body = _resolve_template(body_template, ctx)
+    resolved_body = template.render(ctx)
 
     try:
-        response = httpx.request(
+        result = webhook_client.request(
             method=method,
             url=url,
             json=resolved_body,
             headers=headers,
             timeout=timeout,
+            retries=node_config.get("retries"),
         )
-        return {
-            "status_code": response.status_code,
-            "success":     response.is_success,
-            "body":        response.text[:1000],
-        }
-    except httpx.TimeoutException:
-        return {"success": False, "error": "timeout"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-
-def _resolve_path(data: dict, path: str) -> Any:
-    parts = path.split(".")
-    val = data
-    for part in parts:
-        if isinstance(val, dict):
-            val = val.get(part)
-        else:
-            return None
-    return val
-
-
-def _resolve_template(template: Any, ctx: dict) -> Any:
-    flat = {**ctx.get("payload", {}), **ctx.get("vars", {})}
-    if isinstance(template, str):
-        return re.sub(
-            r"\{\{\s*([\w.]+)\s*\}\}",
-            lambda m: str(_resolve_path(flat, m.group(1)) or ""),
-            template,
-        )
-    if isinstance(template, dict):
-        return {k: _resolve_template(v, ctx) for k, v in template.items()}
-    if isinstance(template, list):
-        return [_resolve_template(i, ctx) for i in template]
-    return template
\ No newline at end of file
+    output = {
+        "success":    result.success,
+        "attempts":   result.attempts,
+        "latency_ms": result.latency_ms,
+    }
+    if result.error is not None:
+        output["error"] = result.error
+    else:
+        output["status_code"] = result.status_code
+        output["body"]        = result.body
+    return output
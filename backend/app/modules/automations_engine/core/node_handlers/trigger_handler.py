@@ -1,4 +1,3 @@
-import importlib
 from typing import Any
 from ..registry import registry
 from .stop_handler import StopExecution
@@ -20,8 +19,7 @@ def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
         # Trigger no registrado o sin trigger_id — pasar (backwards compat)
         return {"matched": True, "payload": ctx.get("payload", {})}
 
-    handler = _import_handler(trigger_def.handler_path)
-    result  = handler(
+    result = trigger_def.handler(
         payload=ctx.get("payload", {}),
         config=node_config,
         db=db,
@@ -34,8 +32,3 @@ def execute(node_config: dict, ctx: dict, db, user_id: int) -> dict[str, Any]:
     result.setdefault("condition_result", True)
     return result
 
-
-def _import_handler(handler_path: str):
-    module_path, func_name = handler_path.rsplit(".", 1)
-    module = importlib.import_module(module_path)
-    return getattr(module, func_name)
\ No newline at end of file
@@ -1,14 +1,44 @@
+import importlib
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, Optional
+
+
+class HandlerResolutionError(Exception):
+    """handler_path que no se puede importar. Se lanza al registrar para que el arranque falle."""
+
+    def __init__(self, handler_path: str, reason: str):
+        self.handler_path = handler_path
+        super().__init__(f"No se puede resolver el handler '{handler_path}': {reason}")
+
+
+def resolve_handler(handler_path: str) -> Callable:
+    """Importa 'paquete.modulo.funcion' y devuelve la función."""
+    try:
+        module_path, func_name = handler_path.rsplit(".", 1)
+        handler = getattr(importlib.import_module(module_path), func_name)
+    except (ValueError, ImportError, AttributeError) as e:
+        raise HandlerResolutionError(handler_path, str(e)) from e
+    if not callable(handler):
+        raise HandlerResolutionError(handler_path, "no es callable")
+    return handler
 
 
 @dataclass
 class TriggerDef:
-    ref_id:        str
-    module_id:     str
-    label:         str
-    config_schema: dict
-    handler_path:  str
+    """
+    prefilter(payload, config) -> str | None: la parte del handler que solo
+    mira el payload y el config del trigger, sin BD. Devuelve el motivo por
+    el que el evento no puede coincidir, o None si hay que ejecutar el flujo.
+    execution_queue.dispatch lo evalúa antes de crear nada.
+    """
+    ref_id:          str
+    module_id:       str
+    label:           str
+    config_schema:   dict
+    handler_path:    str
+    handler:         Optional[Callable] = field(default=None, repr=False, compare=False)
+    prefilter_path:  Optional[str] = None
+    prefilter:       Optional[Callable] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -18,6 +48,7 @@ class ActionDef:
     label:         str
     config_schema: dict
     handler_path:  str
+    handler:       Optional[Callable] = field(default=None, repr=False, compare=False)
 
 
 class AutomationRegistry:
@@ -33,6 +64,7 @@ class AutomationRegistry:
         label:         str,
         config_schema: dict,
         handler:       str,
+        prefilter:     Optional[str] = None,
     ) -> None:
         key = f"{module_id}.{trigger_id}"
         self._triggers[key] = TriggerDef(
@@ -41,6 +73,9 @@ class AutomationRegistry:
             label=label,
             config_schema=config_schema,
             handler_path=handler,
+            handler=resolve_handler(handler),
+            prefilter_path=prefilter,
+            prefilter=resolve_handler(prefilter) if prefilter else None,
         )
 
     def register_action(
@@ -58,6 +93,7 @@ class AutomationRegistry:
             label=label,
             config_schema=config_schema,
             handler_path=handler,
+            handler=resolve_handler(handler),
         )
 
     def get_trigger(self, ref_id: str) -> Optional[TriggerDef]:
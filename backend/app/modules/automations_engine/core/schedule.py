@@ -0,0 +1,187 @@
+"""
+Cálculo de next_run_at para los triggers de sistema de tipo CRON.
+
+compute_next_run(trigger_id, config, last_run_at, now) devuelve la próxima
+ejecución (UTC) o None si no hay más:
+
+- system.schedule_once: run_at, solo si nunca se ha ejecutado.
+- system.schedule_interval: last_run_at + intervalo (o ya, si nunca se ejecutó).
+- system.schedule_cron: siguiente disparo de una expresión cron estándar de
+  5 campos ("*/15 9-18 * * 1-5"), evaluada en config["timezone"]. Día del mes
+  y día de la semana restringidos a la vez se combinan con AND (APScheduler).
+
+Ventana activa opcional (active_from / active_until, "HH:MM") en la zona
+horaria de config["timezone"] (IANA, UTC por defecto). Si from > until la
+ventana cruza la medianoche (22:00–06:00). Un disparo fuera de la ventana se
+mueve al siguiente inicio de ventana (interval) o al siguiente disparo cron
+dentro de ella.
+
+validate_schedule() lanza ValueError con config mal formada; la validación del
+flujo lo convierte en InvalidFlowError.
+"""
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from apscheduler.triggers.cron import CronTrigger
+
+SCHEDULE_ONCE     = "system.schedule_once"
+SCHEDULE_INTERVAL = "system.schedule_interval"
+SCHEDULE_CRON     = "system.schedule_cron"
+SCHEDULE_TRIGGERS = {SCHEDULE_ONCE, SCHEDULE_INTERVAL, SCHEDULE_CRON}
+
+INTERVAL_UNITS = {"minutes": "minutes", "hours": "hours", "days": "days"}
+DAY_NAMES      = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+# Búsqueda acotada de un disparo cron dentro de la ventana activa
+MAX_WINDOW_SEARCH = 370
+
+
+def _zone(config: dict) -> ZoneInfo:
+    name = config.get("timezone") or "UTC"
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"zona horaria desconocida: {name}")
+
+
+def _parse_time(value: str) -> time:
+    try:
+        hours, minutes = (int(part) for part in value.split(":"))
+        return time(hours, minutes)
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError(f"hora inválida (HH:MM): {value}")
+
+
+def _window(config: dict) -> Optional[tuple[time, time]]:
+    active_from, active_until = config.get("active_from"), config.get("active_until")
+    if not (active_from and active_until):
+        return None
+    return _parse_time(active_from), _parse_time(active_until)
+
+
+def _in_window(moment: datetime, window: tuple[time, time], zone: ZoneInfo) -> bool:
+    start, end = window
+    local = moment.astimezone(zone).time().replace(second=0, microsecond=0)
+    if start <= end:
+        return start <= local <= end
+    return local >= start or local <= end
+
+
+def _next_window_start(moment: datetime, window: tuple[time, time], zone: ZoneInfo) -> datetime:
+    local = moment.astimezone(zone)
+    start = datetime.combine(local.date(), window[0], tzinfo=zone)
+    if start <= local:
+        start = datetime.combine(local.date() + timedelta(days=1), window[0], tzinfo=zone)
+    return start.astimezone(timezone.utc)
+
+
+def _interval(config: dict) -> timedelta:
+    unit = INTERVAL_UNITS.get(config.get("interval_unit", "minutes"))
+    if unit is None:
+        raise ValueError(f"unidad de intervalo inválida: {config.get('interval_unit')}")
+    try:
+        value = int(config.get("interval_value", 30))
+    except (ValueError, TypeError):
+        raise ValueError(f"intervalo inválido: {config.get('interval_value')}")
+    # Un intervalo <= 0 dejaría next_run_at siempre vencido y el cron en bucle
+    if value < 1:
+        raise ValueError(f"el intervalo debe ser >= 1: {value}")
+    return timedelta(**{unit: value})
+
+
+def _standard_day_of_week(field: str) -> str:
+    """
+    APScheduler numera los días desde el lunes (0=mon); cron estándar desde el
+    domingo (0 y 7 = domingo). Los campos numéricos se traducen a nombres.
+    """
+    if not any(char.isdigit() for char in field) or any(char.isalpha() for char in field):
+        return field
+
+    days: set[int] = set()
+    for token in field.split(","):
+        base, _, step = token.partition("/")
+        if base == "*":
+            first, last = 0, 6
+        elif "-" in base:
+            first, last = (int(part) for part in base.split("-"))
+        else:
+            first = last = int(base)
+            if step:
+                last = 6
+        if not (0 <= first <= 7 and 0 <= last <= 7 and first <= last):
+            raise ValueError(f"día de la semana inválido: {token}")
+        days.update(day % 7 for day in range(first, last + 1, int(step or 1)))
+    return ",".join(DAY_NAMES[day] for day in sorted(days))
+
+
+def cron_trigger(expression: str, zone: ZoneInfo) -> CronTrigger:
+    """CronTrigger de APScheduler para una expresión cron estándar de 5 campos."""
+    fields = (expression or "").split()
+    if len(fields) != 5:
+        raise ValueError(f"la expresión cron debe tener 5 campos: '{expression}'")
+    minute, hour, day, month, day_of_week = fields
+    return CronTrigger(
+        minute=minute, hour=hour, day=day, month=month,
+        day_of_week=_standard_day_of_week(day_of_week), timezone=zone,
+    )
+
+
+def validate_schedule(trigger_id: str, config: dict) -> None:
+    """Lanza ValueError si la config del trigger no se puede planificar."""
+    if trigger_id not in SCHEDULE_TRIGGERS:
+        return
+    zone = _zone(config)
+    _window(config)
+    if trigger_id == SCHEDULE_CRON:
+        cron_trigger(config.get("expression"), zone)
+    elif trigger_id == SCHEDULE_INTERVAL:
+        _interval(config)
+    elif trigger_id == SCHEDULE_ONCE and config.get("run_at"):
+        _parse_run_at(config["run_at"])
+
+
+def _parse_run_at(value: str) -> datetime:
+    try:
+        run_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError(f"run_at inválido: {value}")
+    return run_at if run_at.tzinfo else run_at.replace(tzinfo=timezone.utc)
+
+
+def compute_next_run(
+    trigger_id: str, config: dict, last_run_at: Optional[datetime], now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Próxima ejecución en UTC, o None si el trigger no vuelve a dispararse."""
+    now = now or datetime.now(timezone.utc)
+    try:
+        if trigger_id == SCHEDULE_ONCE:
+            if last_run_at is not None or not config.get("run_at"):
+                return None
+            return _parse_run_at(config["run_at"]).astimezone(timezone.utc)
+
+        zone   = _zone(config)
+        window = _window(config)
+
+        if trigger_id == SCHEDULE_INTERVAL:
+            delta     = _interval(config)
+            candidate = max(now, last_run_at + delta) if last_run_at else now
+            if window and not _in_window(candidate, window, zone):
+                candidate = _next_window_start(candidate, window, zone)
+            return candidate
+
+        if trigger_id == SCHEDULE_CRON:
+            trigger = cron_trigger(config.get("expression"), zone)
+            # +1s tras una ejecución: el disparo del mismo minuto no se repite
+            after   = max(now, last_run_at + timedelta(seconds=1)) if last_run_at else now
+            for _ in range(MAX_WINDOW_SEARCH):
+                fire = trigger.get_next_fire_time(None, after)
+                if fire is None:
+                    return None
+                if not window or _in_window(fire, window, zone):
+                    return fire.astimezone(timezone.utc)
+                after = _next_window_start(fire, window, zone)
+            return None
+    except ValueError:
+        return None
+    return None
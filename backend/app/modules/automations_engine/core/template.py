@@ -0,0 +1,143 @@
+"""
+Plantillas {{ruta}} compiladas.
+
+_resolve_template recorría la plantilla entera en cada llamada: construía
+{**payload, **vars} y pasaba re.sub con una lambda por cada string. Ahora la
+plantilla se compila una vez (compile_template) en un árbol de:
+
+- constantes (todo lo que no lleva {{...}}, devuelto tal cual)
+- accesores de ruta: el string es exactamente "{{ruta}}" → se devuelve el valor
+  con su tipo ({{amount}} sigue siendo un número; si no existe, None)
+- strings mixtos: segmentos literales + accesores, unidos como texto
+  (None se pinta como "")
+- dicts y listas de lo anterior
+
+Las rutas se resuelven sin diccionario fusionado: el primer segmento se busca en
+vars y, si no está, en payload (vars tiene prioridad, como en {**payload, **vars}).
+"""
+import re
+from typing import Any
+
+PLACEHOLDER = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+
+
+def resolve_path(ctx: dict, parts: tuple[str, ...]) -> Any:
+    """Valor de una ruta ya partida por puntos. None si algún tramo no existe."""
+    variables = ctx.get("vars") or {}
+    head      = parts[0]
+    if head in variables:
+        value = variables[head]
+    else:
+        value = (ctx.get("payload") or {}).get(head)
+
+    for part in parts[1:]:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class CompiledTemplate:
+    """Nodo del árbol compilado. render(ctx) devuelve la plantilla resuelta."""
+
+    __slots__ = ()
+
+    def render(self, ctx: dict) -> Any:
+        raise NotImplementedError
+
+
+class _Constant(CompiledTemplate):
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def render(self, ctx: dict) -> Any:
+        return self.value
+
+
+class _Path(CompiledTemplate):
+    __slots__ = ("parts",)
+
+    def __init__(self, path: str):
+        self.parts = tuple(path.split("."))
+
+    def render(self, ctx: dict) -> Any:
+        return resolve_path(ctx, self.parts)
+
+
+class _Text(CompiledTemplate):
+    """String con literales y rutas intercalados. Los str son literales, las tuplas rutas."""
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: list):
+        self.segments = tuple(segments)
+
+    def render(self, ctx: dict) -> str:
+        out = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                out.append(segment)
+            else:
+                value = resolve_path(ctx, segment)
+                if value is not None:
+                    out.append(str(value))
+        return "".join(out)
+
+
+class _Dict(CompiledTemplate):
+    __slots__ = ("items",)
+
+    def __init__(self, items: list[tuple[Any, CompiledTemplate]]):
+        self.items = tuple(items)
+
+    def render(self, ctx: dict) -> dict:
+        return {key: item.render(ctx) for key, item in self.items}
+
+
+class _List(CompiledTemplate):
+    __slots__ = ("items",)
+
+    def __init__(self, items: list[CompiledTemplate]):
+        self.items = tuple(items)
+
+    def render(self, ctx: dict) -> list:
+        return [item.render(ctx) for item in self.items]
+
+
+def _compile_string(template: str) -> CompiledTemplate:
+    matches = list(PLACEHOLDER.finditer(template))
+    if not matches:
+        return _Constant(template)
+    if len(matches) == 1 and matches[0].span() == (0, len(template)):
+        return _Path(matches[0].group(1))
+
+    segments, cursor = [], 0
+    for match in matches:
+        if match.start() > cursor:
+            segments.append(template[cursor:match.start()])
+        segments.append(tuple(match.group(1).split(".")))
+        cursor = match.end()
+    if cursor < len(template):
+        segments.append(template[cursor:])
+    return _Text(segments)
+
+
+def compile_template(template: Any) -> CompiledTemplate:
+    """Compila una plantilla (str, dict, list o escalar). Las partes sin {{...}} quedan constantes."""
+    if isinstance(template, str):
+        return _compile_string(template)
+
+    if isinstance(template, dict):
+        items = [(key, compile_template(value)) for key, value in template.items()]
+        if all(isinstance(item, _Constant) for _, item in items):
+            return _Constant({key: item.value for key, item in items})
+        return _Dict(items)
+
+    if isinstance(template, list):
+        items = [compile_template(value) for value in template]
+        if all(isinstance(item, _Constant) for item in items):
+            return _Constant([item.value for item in items])
+        return _List(items)
+
+    return _Constant(template)
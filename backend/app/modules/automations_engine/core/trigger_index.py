@@ -0,0 +1,203 @@
+"""
+Índice en memoria de automatizaciones activas por (trigger_ref, user_id).
+
+Los dispatchers de los módulos lo consultan en cada escritura de dominio
+(registrar comida, crear gasto, terminar workout...). En caliente, una
+escritura que no coincide con ninguna automatización no toca la BD.
+
+- Las entradas guardan los ids de las automations activas y el config de su
+  nodo trigger (columna trigger_config: no se lee el flow).
+- También se cachean los resultados vacíos (caso más frecuente).
+- AutomationService invalida las entradas del usuario al crear, editar o borrar.
+- El TTL acota la desincronización entre workers: cada proceso tiene su propio índice.
+- Un miss en frío usa el índice compuesto ix_automations_trigger_lookup.
+- match() aplica el prefilter del trigger (si lo registra) al payload y al
+  config cacheado: los eventos que el trigger rechazaría seguro no crean
+  Execution ni job.
+- lookup_many() / match_many() resuelven un lote de eventos de un scheduler
+  (muchos usuarios, un trigger_ref) con una sola query para todos los misses.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy.orm import Session
+
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+@dataclass(frozen=True)
+class TriggerIndexEntry:
+    automation_id:  int
+    trigger_config: dict
+
+
+class TriggerIndex:
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._ttl         = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int], tuple[float, list[TriggerIndexEntry]]] = OrderedDict()
+        self._lock        = threading.Lock()
+        self._version     = 0  # se incrementa en cada invalidación
+
+    def lookup(self, trigger_ref: str, user_id: int, db: Session) -> list[TriggerIndexEntry]:
+        """Devuelve las automations activas suscritas a trigger_ref para el usuario."""
+        key = (trigger_ref, user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] > now:
+                self._entries.move_to_end(key)
+                return cached[1]
+            version = self._version
+
+        entries = self._load(trigger_ref, user_id, db)
+
+        with self._lock:
+            # Si hubo una invalidación mientras cargábamos, no guardar datos viejos
+            if version == self._version:
+                self._entries[key] = (now + self._ttl, entries)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entries
+
+    def lookup_many(self, trigger_ref: str, user_ids: list[int], db: Session) -> dict[int, list[TriggerIndexEntry]]:
+        """lookup() para varios usuarios: los que no están en caché se cargan en una query."""
+        now     = time.monotonic()
+        result: dict[int, list[TriggerIndexEntry]] = {}
+        missing = []
+
+        with self._lock:
+            for user_id in dict.fromkeys(user_ids):
+                key    = (trigger_ref, user_id)
+                cached = self._entries.get(key)
+                if cached and cached[0] > now:
+                    self._entries.move_to_end(key)
+                    result[user_id] = cached[1]
+                else:
+                    missing.append(user_id)
+            version = self._version
+
+        if not missing:
+            return result
+
+        loaded = self._load_many(trigger_ref, missing, db)
+
+        with self._lock:
+            if version == self._version:
+                for user_id in missing:
+                    self._entries[(trigger_ref, user_id)] = (now + self._ttl, loaded[user_id])
+                    self._entries.move_to_end((trigger_ref, user_id))
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        result.update(loaded)
+        return result
+
+    def match(self, trigger_ref: str, payload: dict, user_id: int, db: Session) -> list[TriggerIndexEntry]:
+        """
+        Las entradas de lookup() cuyo trigger puede coincidir con payload.
+        Si el prefilter falla se deja pasar: el handler del trigger decide.
+        """
+        entries = self.lookup(trigger_ref, user_id, db)
+        if not entries:
+            return entries
+        prefilter = self._prefilter(trigger_ref)
+        return [entry for entry in entries if self._accepts(trigger_ref, prefilter, entry, payload)]
+
+    def match_many(
+        self, trigger_ref: str, events: list[tuple[int, dict]], db: Session,
+    ) -> list[tuple[TriggerIndexEntry, int, dict]]:
+        """
+        match() para un lote de eventos (user_id, payload). Devuelve
+        (entrada, user_id, payload) por cada automation que hay que ejecutar,
+        en el orden de los eventos.
+        """
+        if not events:
+            return []
+        entries_by_user = self.lookup_many(trigger_ref, [user_id for user_id, _ in events], db)
+        prefilter       = self._prefilter(trigger_ref)
+        return [
+            (entry, user_id, payload)
+            for user_id, payload in events
+            for entry in entries_by_user.get(user_id, ())
+            if self._accepts(trigger_ref, prefilter, entry, payload)
+        ]
+
+    def _prefilter(self, trigger_ref: str):
+        trigger_def = registry.get_trigger(trigger_ref)
+        return trigger_def.prefilter if trigger_def else None
+
+    def _accepts(self, trigger_ref: str, prefilter, entry: TriggerIndexEntry, payload: dict) -> bool:
+        if prefilter is None:
+            return True
+        try:
+            reason = prefilter(payload, entry.trigger_config)
+        except Exception as e:
+            logger.warning(f"prefilter de {trigger_ref} falló (automation_id={entry.automation_id}): {e}")
+            return True
+        if reason is not None:
+            logger.debug(f"{trigger_ref} descartado antes de ejecutar (automation_id={entry.automation_id}): {reason}")
+        return reason is None
+
+    def get_automations(
+        self, trigger_ref: str, user_id: int, db: Session, entries: list[TriggerIndexEntry] | None = None,
+    ) -> list:
+        """
+        Carga las Automation coincidentes (las de entries si se pasan). Sin
+        coincidencias no hace ninguna query. Se vuelve a filtrar por is_active
+        por si la entrada viene de otro worker desfasado.
+        """
+        from ..models.automation import Automation
+
+        if entries is None:
+            entries = self.lookup(trigger_ref, user_id, db)
+        if not entries:
+            return []
+
+        return db.query(Automation).filter(
+            Automation.id.in_([e.automation_id for e in entries]),
+            Automation.is_active == True,
+        ).order_by(Automation.id).all()
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            for key in [k for k in self._entries if k[1] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def _load(self, trigger_ref: str, user_id: int, db: Session) -> list[TriggerIndexEntry]:
+        return self._load_many(trigger_ref, [user_id], db)[user_id]
+
+    def _load_many(self, trigger_ref: str, user_ids: list[int], db: Session) -> dict[int, list[TriggerIndexEntry]]:
+        from ..models.automation import Automation
+
+        rows = db.query(Automation.id, Automation.user_id, Automation.trigger_config).filter(
+            Automation.trigger_ref == trigger_ref,
+            Automation.is_active   == True,
+            Automation.user_id.in_(user_ids),
+        ).order_by(Automation.id).all()
+
+        loaded: dict[int, list[TriggerIndexEntry]] = {user_id: [] for user_id in user_ids}
+        for row in rows:
+            loaded[row.user_id].append(
+                TriggerIndexEntry(automation_id=row.id, trigger_config=row.trigger_config or {})
+            )
+        return loaded
+
+
+# Singleton global — compartido por todos los dispatchers del proceso
+trigger_index = TriggerIndex()
@@ -0,0 +1,183 @@
+"""
+Cliente HTTP compartido para los nodos outbound_webhook.
+
+Antes cada nodo llamaba a httpx.request(), que abre conexión (y handshake
+TLS) en cada ejecución. Aquí hay un único httpx.Client por proceso con
+keep-alive y, alrededor:
+
+- límite global de peticiones en vuelo (AUTOMATIONS_WEBHOOK_MAX_IN_FLIGHT)
+- límite por host (AUTOMATIONS_WEBHOOK_MAX_PER_HOST) para no saturar un
+  destino lento con todos los workers. La espera por un hueco está acotada
+  por AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS (no por el timeout del nodo) y
+  el semáforo de un host solo vive mientras alguien lo usa o espera: las URLs
+  las escribe el usuario y el dict no puede crecer sin límite.
+- reintentos con backoff exponencial ante 5xx, timeouts y errores de red
+  (conexión, lectura, protocolo remoto). Los errores permanentes (URL
+  inválida, protocolo no soportado) fallan al primer intento.
+- latencia e intentos de cada llamada, que el nodo añade a su node_log
+
+Es síncrono a propósito: el executor corre en hilos (workers de la cola,
+schedulers) y el pool de httpx.Client es thread-safe.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Errores transitorios: el mismo request puede salir bien al reintentar
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+class PooledHttpClient(httpx.Client):
+    """httpx.Client del pool de webhooks (subclase propia: se puede parchear sin afectar a otros clientes)."""
+
+
+@dataclass
+class WebhookResult:
+    status_code: Optional[int]
+    success:     bool
+    body:        str
+    error:       Optional[str]
+    attempts:    int
+    latency_ms:  int
+
+
+class WebhookClient:
+
+    def __init__(self):
+        self._client: Optional[PooledHttpClient] = None
+        self._lock          = threading.Lock()
+        self._in_flight:    Optional[threading.BoundedSemaphore] = None
+        self._host_slots:   dict[str, list] = {}   # host → [semáforo, usuarios]
+        self._max_per_host  = 0
+        self._stats         = {"requests": 0, "retries": 0, "failures": 0}
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        json: Any = None,
+        headers: Optional[dict] = None,
+        timeout: float = 10,
+        retries: Optional[int] = None,
+    ) -> WebhookResult:
+        config  = self._config()
+        client  = self._get_client(config)
+        retries = config["AUTOMATIONS_WEBHOOK_RETRIES"] if retries is None else max(0, int(retries))
+        backoff = config["AUTOMATIONS_WEBHOOK_BACKOFF_SECONDS"]
+        queue   = config["AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS"]
+        started = time.monotonic()
+
+        if not self._in_flight.acquire(timeout=queue):
+            return self._done(None, "límite de peticiones en vuelo alcanzado", 0, started)
+        try:
+            with self._host_slot(url) as host_slot:
+                if not host_slot.acquire(timeout=queue):
+                    return self._done(None, "límite de conexiones por host alcanzado", 0, started)
+                try:
+                    attempt = 0
+                    while True:
+                        attempt += 1
+                        response, error, retryable = self._attempt(client, method, url, json, headers, timeout)
+
+                        if response is not None:
+                            retryable = response.status_code >= 500
+                        if not retryable or attempt > retries:
+                            return self._done(response, error, attempt, started)
+
+                        with self._lock:
+                            self._stats["retries"] += 1
+                        time.sleep(backoff * (2 ** (attempt - 1)))
+                finally:
+                    host_slot.release()
+        finally:
+            self._in_flight.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client     = None
+            self._in_flight  = None
+            self._host_slots = {}
+
+    def _attempt(self, client, method, url, json, headers, timeout) -> tuple[Optional[httpx.Response], Optional[str], bool]:
+        """(response, error, reintentable)."""
+        try:
+            response = client.request(method=method, url=url, json=json, headers=headers, timeout=timeout)
+            return response, None, False
+        except httpx.TimeoutException:
+            return None, "timeout", True
+        except RETRYABLE_ERRORS as e:
+            return None, str(e) or type(e).__name__, True
+        except (httpx.TransportError, httpx.InvalidURL) as e:
+            return None, str(e) or type(e).__name__, False
+
+    def _done(self, response, error: Optional[str], attempts: int, started: float) -> WebhookResult:
+        latency_ms = int((time.monotonic() - started) * 1000)
+        success    = response is not None and response.is_success
+        with self._lock:
+            self._stats["requests"] += 1
+            if not success:
+                self._stats["failures"] += 1
+        return WebhookResult(
+            status_code = response.status_code if response is not None else None,
+            success     = success,
+            body        = response.text[:1000] if response is not None else "",
+            error       = error,
+            attempts    = attempts,
+            latency_ms  = latency_ms,
+        )
+
+    def _get_client(self, config: dict) -> PooledHttpClient:
+        with self._lock:
+            if self._client is None:
+                self._client = PooledHttpClient(
+                    limits=httpx.Limits(
+                        max_connections=config["AUTOMATIONS_WEBHOOK_MAX_CONNECTIONS"],
+                        max_keepalive_connections=config["AUTOMATIONS_WEBHOOK_MAX_CONNECTIONS"],
+                        keepalive_expiry=30,
+                    ),
+                )
+                self._in_flight    = threading.BoundedSemaphore(config["AUTOMATIONS_WEBHOOK_MAX_IN_FLIGHT"])
+                self._max_per_host = config["AUTOMATIONS_WEBHOOK_MAX_PER_HOST"]
+            return self._client
+
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Semáforo del host, contado por usuarios; se descarta cuando nadie lo usa."""
+        try:
+            host = urlsplit(url).netloc.lower()
+        except ValueError:
+            host = ""
+        with self._lock:
+            entry = self._host_slots.get(host)
+            if entry is None:
+                entry = self._host_slots[host] = [threading.BoundedSemaphore(self._max_per_host), 0]
+            entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0 and self._host_slots.get(host) is entry:
+                    del self._host_slots[host]
+
+    def _config(self) -> dict:
+        from ..manifest import get_settings
+        return get_settings()
+
+
+# Singleton global — un pool de conexiones por proceso
+webhook_client = WebhookClient()
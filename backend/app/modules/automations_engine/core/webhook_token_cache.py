@@ -0,0 +1,102 @@
+"""
+Caché en memoria de tokens de webhooks entrantes.
+
+POST /webhooks/in/{token} consultaba webhooks_inbound (y la automation) en
+cada llamada. En caliente, el token se resuelve aquí sin tocar la BD.
+
+- Las entradas guardan (webhook_id, automation_id, user_id); los tokens
+  inválidos también se cachean, para que un emisor con un token viejo no
+  golpee la BD en cada intento.
+- WebhookService invalida al crear/borrar un webhook; AutomationService al
+  borrar la automation.
+- El TTL (AUTOMATIONS_WEBHOOK_TOKEN_TTL_SECONDS) acota la desincronización
+  entre procesos: cada uno tiene su propia caché.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from ..manifest import get_settings
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+@dataclass(frozen=True)
+class WebhookTokenEntry:
+    webhook_id:    int
+    automation_id: int
+    user_id:       int
+
+
+class WebhookTokenCache:
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Optional[WebhookTokenEntry]]] = OrderedDict()
+        self._lock    = threading.Lock()
+        self._version = 0  # se incrementa en cada invalidación
+
+    def lookup(self, token: str, db: Session) -> Optional[WebhookTokenEntry]:
+        """Webhook activo del token, o None si no existe o está inactivo."""
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(token)
+            if cached and cached[0] > now:
+                self._entries.move_to_end(token)
+                return cached[1]
+            version = self._version
+
+        entry = self._load(token, db)
+
+        with self._lock:
+            # Si hubo una invalidación mientras cargábamos, no guardar datos viejos
+            if version == self._version:
+                self._entries[token] = (now + get_settings()["AUTOMATIONS_WEBHOOK_TOKEN_TTL_SECONDS"], entry)
+                self._entries.move_to_end(token)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def _load(self, token: str, db: Session) -> Optional[WebhookTokenEntry]:
+        from ..models.webhook_inbound import WebhookInbound
+
+        row = db.query(
+            WebhookInbound.id, WebhookInbound.automation_id, WebhookInbound.user_id,
+        ).filter(
+            WebhookInbound.token     == token,
+            WebhookInbound.is_active == True,
+        ).first()
+        if row is None:
+            return None
+        return WebhookTokenEntry(webhook_id=row.id, automation_id=row.automation_id, user_id=row.user_id)
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+            self._version += 1
+
+    def invalidate_automation(self, automation_id: int) -> None:
+        with self._lock:
+            stale = [
+                token for token, (_, entry) in self._entries.items()
+                if entry is not None and entry.automation_id == automation_id
+            ]
+            for token in stale:
+                del self._entries[token]
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton global
+webhook_token_cache = WebhookTokenCache()
@@ -1,5 +1,5 @@
 from .automation_enums import AutomationTriggerType, NodeType, ConditionOperator
-from .execution_enums import ExecutionStatus
+from .execution_enums import ExecutionStatus, ExecutionJobStatus
 from .api_key_enums import ApiKeyScope
 
 __all__ = [
@@ -7,5 +7,6 @@ __all__ = [
     "NodeType",
     "ConditionOperator",
     "ExecutionStatus",
+    "ExecutionJobStatus",
     "ApiKeyScope",
 ]
\ No newline at end of file
@@ -22,6 +22,12 @@ class ConditionOperator(str, Enum):
     NEQ        = "neq"
     GT         = "gt"
     LT         = "lt"
+    GTE        = "gte"
+    LTE        = "lte"
+    IN         = "in"
+    NOT_IN     = "not_in"
+    BETWEEN    = "between"
+    REGEX      = "regex"
     CONTAINS   = "contains"
     EXISTS     = "exists"
-    NOT_EXISTS = "not_exists"
\ No newline at end of file
+    NOT_EXISTS = "not_exists"
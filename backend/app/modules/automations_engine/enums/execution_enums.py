@@ -4,6 +4,13 @@ from enum import Enum
 class ExecutionStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
+    WAITING = "waiting"   # suspendida en un nodo delay
     SUCCESS = "success"
     FAILED  = "failed"
-    SKIPPED = "skipped"
\ No newline at end of file
+    SKIPPED = "skipped"
+
+class ExecutionJobStatus(str, Enum):
+    QUEUED  = "queued"
+    RUNNING = "running"
+    DONE    = "done"
+    FAILED  = "failed"
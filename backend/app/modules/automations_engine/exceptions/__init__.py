@@ -3,15 +3,18 @@ from .automation_exceptions import (
     AutomationNameAlreadyExistsError,
     InvalidFlowError,
     ExecutionNotFoundError,
+    ExecutionNodeNotFoundError,
     ApiKeyNotFoundError,
     ApiKeyInvalidError,
     ApiKeyExpiredError,
     ApiKeyInsufficientScopeError,
     WebhookNotFoundError,
     WebhookTokenInvalidError,
+    WebhookBatchTooLargeError,
     FlowDepthExceededError,
     TriggerNotFoundInRegistryError,
     ActionNotFoundInRegistryError,
+    InvalidRetentionPolicyError,
 )
 
 __all__ = [
@@ -19,13 +22,16 @@ __all__ = [
     "AutomationNameAlreadyExistsError",
     "InvalidFlowError",
     "ExecutionNotFoundError",
+    "ExecutionNodeNotFoundError",
     "ApiKeyNotFoundError",
     "ApiKeyInvalidError",
     "ApiKeyExpiredError",
     "ApiKeyInsufficientScopeError",
     "WebhookNotFoundError",
     "WebhookTokenInvalidError",
+    "WebhookBatchTooLargeError",
     "FlowDepthExceededError",
     "TriggerNotFoundInRegistryError",
     "ActionNotFoundInRegistryError",
+    "InvalidRetentionPolicyError",
 ]
\ No newline at end of file
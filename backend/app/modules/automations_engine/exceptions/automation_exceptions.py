@@ -37,6 +37,16 @@ class ExecutionNotFoundError(AppException):
         self.execution_id = execution_id
 
 
+class ExecutionNodeNotFoundError(AppException):
+    def __init__(self, execution_id: int, node_id: str):
+        super().__init__(
+            message=f"El nodo '{node_id}' no aparece en la ejecución {execution_id}",
+            status_code=404,
+        )
+        self.execution_id = execution_id
+        self.node_id      = node_id
+
+
 class ApiKeyNotFoundError(AppException):
     def __init__(self, key_id: int):
         super().__init__(
@@ -88,6 +98,15 @@ class WebhookTokenInvalidError(AppException):
         )
 
 
+class WebhookBatchTooLargeError(AppException):
+    def __init__(self, size: int, max_events: int):
+        super().__init__(
+            message=f"Demasiados eventos en un webhook ({size}): máximo {max_events}",
+            status_code=413,
+        )
+        self.size = size
+
+
 class FlowDepthExceededError(AppException):
     def __init__(self, max_depth: int):
         super().__init__(
@@ -112,4 +131,13 @@ class ActionNotFoundInRegistryError(AppException):
             message=f"Acción '{ref_id}' no está registrada en ningún módulo instalado",
             status_code=422,
         )
-        self.ref_id = ref_id
\ No newline at end of file
+        self.ref_id = ref_id
+
+
+class InvalidRetentionPolicyError(AppException):
+    def __init__(self, retention_days: int, max_days: int):
+        super().__init__(
+            message=f"Retención inválida ({retention_days} días): debe estar entre 1 y {max_days}",
+            status_code=422,
+        )
+        self.retention_days = retention_days
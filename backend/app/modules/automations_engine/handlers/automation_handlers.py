@@ -5,15 +5,18 @@ from ..exceptions import (
     AutomationNameAlreadyExistsError,
     InvalidFlowError,
     ExecutionNotFoundError,
+    ExecutionNodeNotFoundError,
     ApiKeyNotFoundError,
     ApiKeyInvalidError,
     ApiKeyExpiredError,
     ApiKeyInsufficientScopeError,
     WebhookNotFoundError,
     WebhookTokenInvalidError,
+    WebhookBatchTooLargeError,
     FlowDepthExceededError,
     TriggerNotFoundInRegistryError,
     ActionNotFoundInRegistryError,
+    InvalidRetentionPolicyError,
 )
 
 
@@ -33,6 +36,10 @@ async def execution_not_found_handler(request: Request, exc: ExecutionNotFoundEr
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
 
+async def execution_node_not_found_handler(request: Request, exc: ExecutionNodeNotFoundError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+
 async def api_key_not_found_handler(request: Request, exc: ApiKeyNotFoundError):
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
@@ -57,6 +64,10 @@ async def webhook_token_invalid_handler(request: Request, exc: WebhookTokenInval
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
 
+async def webhook_batch_too_large_handler(request: Request, exc: WebhookBatchTooLargeError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+
 async def flow_depth_exceeded_handler(request: Request, exc: FlowDepthExceededError):
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
@@ -69,18 +80,25 @@ async def action_not_found_in_registry_handler(request: Request, exc: ActionNotF
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
 
+async def invalid_retention_policy_handler(request: Request, exc: InvalidRetentionPolicyError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
+
 AUTOMATION_EXCEPTION_HANDLERS = {
     AutomationNotFoundError:           automation_not_found_handler,
     AutomationNameAlreadyExistsError:  automation_name_already_exists_handler,
     InvalidFlowError:                  invalid_flow_handler,
     ExecutionNotFoundError:            execution_not_found_handler,
+    ExecutionNodeNotFoundError:        execution_node_not_found_handler,
     ApiKeyNotFoundError:               api_key_not_found_handler,
     ApiKeyInvalidError:                api_key_invalid_handler,
     ApiKeyExpiredError:                api_key_expired_handler,
     ApiKeyInsufficientScopeError:      api_key_insufficient_scope_handler,
     WebhookNotFoundError:              webhook_not_found_handler,
     WebhookTokenInvalidError:          webhook_token_invalid_handler,
+    WebhookBatchTooLargeError:         webhook_batch_too_large_handler,
     FlowDepthExceededError:            flow_depth_exceeded_handler,
     TriggerNotFoundInRegistryError:    trigger_not_found_in_registry_handler,
     ActionNotFoundInRegistryError:     action_not_found_in_registry_handler,
+    InvalidRetentionPolicyError:       invalid_retention_policy_handler,
 }
\ No newline at end of file
@@ -1,5 +1,74 @@
 SCHEMA_NAME = "automations"
 
+
+def get_settings():
+    """Lazy import para evitar importar Settings antes de que esté lista."""
+    import os
+    from app.core.config import settings
+    return {
+        # "queue" encola en execution_jobs y ejecutan los workers; "inline" ejecuta en el request
+        "AUTOMATIONS_EXECUTION_MODE":       os.environ.get("AUTOMATIONS_EXECUTION_MODE")       or getattr(settings, "AUTOMATIONS_EXECUTION_MODE", "queue"),
+        "AUTOMATIONS_WORKER_COUNT":         int(os.environ.get("AUTOMATIONS_WORKER_COUNT")     or getattr(settings, "AUTOMATIONS_WORKER_COUNT", 4)),
+        "AUTOMATIONS_WORKER_POLL_SECONDS":  float(os.environ.get("AUTOMATIONS_WORKER_POLL_SECONDS") or getattr(settings, "AUTOMATIONS_WORKER_POLL_SECONDS", 1.0)),
+        "AUTOMATIONS_JOB_MAX_ATTEMPTS":     int(os.environ.get("AUTOMATIONS_JOB_MAX_ATTEMPTS") or getattr(settings, "AUTOMATIONS_JOB_MAX_ATTEMPTS", 5)),
+        "AUTOMATIONS_JOB_BACKOFF_SECONDS":  float(os.environ.get("AUTOMATIONS_JOB_BACKOFF_SECONDS") or getattr(settings, "AUTOMATIONS_JOB_BACKOFF_SECONDS", 10)),
+        # Debe superar la duración máxima de un flujo (un delay en un flujo hijo espera hasta 300s)
+        "AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS": int(
+            os.environ.get("AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS") or getattr(settings, "AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS", 900)
+        ),
+        # Reanudación de ejecuciones suspendidas en nodos delay
+        "AUTOMATIONS_DELAY_RESUMER_ENABLED": str(
+            os.environ.get("AUTOMATIONS_DELAY_RESUMER_ENABLED") or getattr(settings, "AUTOMATIONS_DELAY_RESUMER_ENABLED", "true")
+        ).lower() not in ("0", "false", "no"),
+        "AUTOMATIONS_DELAY_POLL_SECONDS":   float(os.environ.get("AUTOMATIONS_DELAY_POLL_SECONDS") or getattr(settings, "AUTOMATIONS_DELAY_POLL_SECONDS", 30)),
+        # Write-behind de los cierres de ejecución (triggers de mucho volumen)
+        "AUTOMATIONS_EXECUTION_WRITE_BEHIND": str(
+            os.environ.get("AUTOMATIONS_EXECUTION_WRITE_BEHIND") or getattr(settings, "AUTOMATIONS_EXECUTION_WRITE_BEHIND", "false")
+        ).lower() not in ("0", "false", "no"),
+        "AUTOMATIONS_EXECUTION_FLUSH_SIZE":    int(os.environ.get("AUTOMATIONS_EXECUTION_FLUSH_SIZE")      or getattr(settings, "AUTOMATIONS_EXECUTION_FLUSH_SIZE", 100)),
+        "AUTOMATIONS_EXECUTION_FLUSH_SECONDS": float(os.environ.get("AUTOMATIONS_EXECUTION_FLUSH_SECONDS") or getattr(settings, "AUTOMATIONS_EXECUTION_FLUSH_SECONDS", 1.0)),
+        # Outputs de nodo más grandes (JSON) se recortan en node_logs y se guardan comprimidos aparte
+        "AUTOMATIONS_NODE_OUTPUT_MAX_BYTES": int(os.environ.get("AUTOMATIONS_NODE_OUTPUT_MAX_BYTES") or getattr(settings, "AUTOMATIONS_NODE_OUTPUT_MAX_BYTES", 2048)),
+        # Retención de executions (particiones mensuales + resumen diario)
+        "AUTOMATIONS_EXECUTION_MAINTENANCE_ENABLED": str(
+            os.environ.get("AUTOMATIONS_EXECUTION_MAINTENANCE_ENABLED") or getattr(settings, "AUTOMATIONS_EXECUTION_MAINTENANCE_ENABLED", "true")
+        ).lower() not in ("0", "false", "no"),
+        "AUTOMATIONS_EXECUTION_RETENTION_DAYS":     int(os.environ.get("AUTOMATIONS_EXECUTION_RETENTION_DAYS")     or getattr(settings, "AUTOMATIONS_EXECUTION_RETENTION_DAYS", 90)),
+        "AUTOMATIONS_EXECUTION_MAX_RETENTION_DAYS": int(os.environ.get("AUTOMATIONS_EXECUTION_MAX_RETENTION_DAYS") or getattr(settings, "AUTOMATIONS_EXECUTION_MAX_RETENTION_DAYS", 365)),
+        "AUTOMATIONS_EXECUTION_PARTITIONS_AHEAD":   int(os.environ.get("AUTOMATIONS_EXECUTION_PARTITIONS_AHEAD")   or getattr(settings, "AUTOMATIONS_EXECUTION_PARTITIONS_AHEAD", 2)),
+        # Scheduler CRON (next_run_at indexado); el poll solo acota el retraso ante cambios de otros procesos
+        "AUTOMATIONS_CRON_SCHEDULER_ENABLED": str(
+            os.environ.get("AUTOMATIONS_CRON_SCHEDULER_ENABLED") or getattr(settings, "AUTOMATIONS_CRON_SCHEDULER_ENABLED", "true")
+        ).lower() not in ("0", "false", "no"),
+        "AUTOMATIONS_CRON_POLL_SECONDS": float(os.environ.get("AUTOMATIONS_CRON_POLL_SECONDS") or getattr(settings, "AUTOMATIONS_CRON_POLL_SECONDS", 60)),
+        # Cliente HTTP compartido de los nodos outbound_webhook
+        "AUTOMATIONS_WEBHOOK_MAX_CONNECTIONS": int(os.environ.get("AUTOMATIONS_WEBHOOK_MAX_CONNECTIONS") or getattr(settings, "AUTOMATIONS_WEBHOOK_MAX_CONNECTIONS", 100)),
+        "AUTOMATIONS_WEBHOOK_MAX_PER_HOST":    int(os.environ.get("AUTOMATIONS_WEBHOOK_MAX_PER_HOST")    or getattr(settings, "AUTOMATIONS_WEBHOOK_MAX_PER_HOST", 10)),
+        "AUTOMATIONS_WEBHOOK_MAX_IN_FLIGHT":   int(os.environ.get("AUTOMATIONS_WEBHOOK_MAX_IN_FLIGHT")   or getattr(settings, "AUTOMATIONS_WEBHOOK_MAX_IN_FLIGHT", 50)),
+        "AUTOMATIONS_WEBHOOK_RETRIES":         int(os.environ.get("AUTOMATIONS_WEBHOOK_RETRIES")         or getattr(settings, "AUTOMATIONS_WEBHOOK_RETRIES", 2)),
+        "AUTOMATIONS_WEBHOOK_BACKOFF_SECONDS": float(os.environ.get("AUTOMATIONS_WEBHOOK_BACKOFF_SECONDS") or getattr(settings, "AUTOMATIONS_WEBHOOK_BACKOFF_SECONDS", 0.5)),
+        "AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS": float(os.environ.get("AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS") or getattr(settings, "AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS", 2)),
+        # Ingress de webhooks entrantes: caché de tokens, last_triggered_at agrupado y eventos por request
+        "AUTOMATIONS_WEBHOOK_TOKEN_TTL_SECONDS":   float(os.environ.get("AUTOMATIONS_WEBHOOK_TOKEN_TTL_SECONDS")   or getattr(settings, "AUTOMATIONS_WEBHOOK_TOKEN_TTL_SECONDS", 60)),
+        "AUTOMATIONS_WEBHOOK_TOUCH_FLUSH_SECONDS": float(os.environ.get("AUTOMATIONS_WEBHOOK_TOUCH_FLUSH_SECONDS") or getattr(settings, "AUTOMATIONS_WEBHOOK_TOUCH_FLUSH_SECONDS", 10)),
+        "AUTOMATIONS_WEBHOOK_MAX_EVENTS":          int(os.environ.get("AUTOMATIONS_WEBHOOK_MAX_EVENTS")            or getattr(settings, "AUTOMATIONS_WEBHOOK_MAX_EVENTS", 100)),
+        # API keys: caché de validación (el TTL es la ventana de revocación entre workers) y last_used_at agrupado
+        "AUTOMATIONS_API_KEY_CACHE_TTL_SECONDS":   float(os.environ.get("AUTOMATIONS_API_KEY_CACHE_TTL_SECONDS")   or getattr(settings, "AUTOMATIONS_API_KEY_CACHE_TTL_SECONDS", 5)),
+        "AUTOMATIONS_API_KEY_TOUCH_FLUSH_SECONDS": float(os.environ.get("AUTOMATIONS_API_KEY_TOUCH_FLUSH_SECONDS") or getattr(settings, "AUTOMATIONS_API_KEY_TOUCH_FLUSH_SECONDS", 5)),
+        # Seguimiento en vivo: eventos por suscriptor y keepalive SSE
+        "AUTOMATIONS_LIVE_BUFFER_SIZE":       int(os.environ.get("AUTOMATIONS_LIVE_BUFFER_SIZE")         or getattr(settings, "AUTOMATIONS_LIVE_BUFFER_SIZE", 256)),
+        "AUTOMATIONS_LIVE_HEARTBEAT_SECONDS": float(os.environ.get("AUTOMATIONS_LIVE_HEARTBEAT_SECONDS") or getattr(settings, "AUTOMATIONS_LIVE_HEARTBEAT_SECONDS", 15)),
+        # Presupuesto de cada recorrido del flujo (se comprueba entre nodos)
+        "AUTOMATIONS_MAX_NODES_PER_EXECUTION":    int(os.environ.get("AUTOMATIONS_MAX_NODES_PER_EXECUTION")      or getattr(settings, "AUTOMATIONS_MAX_NODES_PER_EXECUTION", 1000)),
+        "AUTOMATIONS_EXECUTION_DEADLINE_SECONDS": float(os.environ.get("AUTOMATIONS_EXECUTION_DEADLINE_SECONDS") or getattr(settings, "AUTOMATIONS_EXECUTION_DEADLINE_SECONDS", 300)),
+        # Hilos compartidos por las ramas de los flujos con "parallel": true
+        "AUTOMATIONS_PARALLEL_MAX_WORKERS": int(os.environ.get("AUTOMATIONS_PARALLEL_MAX_WORKERS") or getattr(settings, "AUTOMATIONS_PARALLEL_MAX_WORKERS", 8)),
+        # Perfil de latencias por nodo: volcado de histogramas y días que se conservan
+        "AUTOMATIONS_PROFILE_FLUSH_SECONDS":  float(os.environ.get("AUTOMATIONS_PROFILE_FLUSH_SECONDS") or getattr(settings, "AUTOMATIONS_PROFILE_FLUSH_SECONDS", 10)),
+        "AUTOMATIONS_PROFILE_RETENTION_DAYS": int(os.environ.get("AUTOMATIONS_PROFILE_RETENTION_DAYS")  or getattr(settings, "AUTOMATIONS_PROFILE_RETENTION_DAYS", 30)),
+    }
+
+
 USER_RELATIONSHIPS = [
     {
         "name": "automations",
@@ -2,11 +2,19 @@
 from .models.automation import Automation
 from .models.api_key import ApiKey
 from .models.execution import Execution
+from .models.execution_daily_stat import ExecutionDailyStat
+from .models.execution_job import ExecutionJob
+from .models.execution_retention_policy import ExecutionRetentionPolicy
+from .models.suspended_execution import SuspendedExecution
 from .models.webhook_inbound import WebhookInbound
 
 __all__ = [
     "Automation",
     "ApiKey",
     "Execution",
+    "ExecutionDailyStat",
+    "ExecutionJob",
+    "ExecutionRetentionPolicy",
+    "SuspendedExecution",
     "WebhookInbound",
 ]
\ No newline at end of file
@@ -1,11 +1,21 @@
 from .automation import Automation
 from .api_key import ApiKey
 from .execution import Execution
+from .execution_daily_stat import ExecutionDailyStat
+from .execution_job import ExecutionJob
+from .execution_retention_policy import ExecutionRetentionPolicy
+from .node_latency_stat import NodeLatencyStat
+from .suspended_execution import SuspendedExecution
 from .webhook_inbound import WebhookInbound
 
 __all__ = [
     "Automation",
     "ApiKey",
     "Execution",
+    "ExecutionDailyStat",
+    "ExecutionJob",
+    "ExecutionRetentionPolicy",
+    "NodeLatencyStat",
+    "SuspendedExecution",
     "WebhookInbound",
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Enum as SAEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Index, Enum as SAEnum, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core import Base
@@ -7,7 +8,15 @@ from ..enums import AutomationTriggerType
 
 class Automation(Base):
     __tablename__ = "automations"
-    __table_args__ = {"schema": "automations", "extend_existing": True}
+    __table_args__ = (
+        # Cubre los misses en frío del trigger_index de los dispatchers
+        Index("ix_automations_trigger_lookup", "trigger_ref", "is_active", "user_id"),
+        # El scheduler CRON solo consulta las filas vencidas
+        Index("ix_automations_next_run_at", "next_run_at", postgresql_where=text("next_run_at IS NOT NULL")),
+        # Filtros de los schedulers por config del trigger (@>, ?) sin leer el flow
+        Index("ix_automations_trigger_config", "trigger_config", postgresql_using="gin"),
+        {"schema": "automations", "extend_existing": True},
+    )
 
     id           = Column(Integer, primary_key=True, index=True)
     user_id      = Column(Integer, ForeignKey("core.users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -21,8 +30,10 @@ class Automation(Base):
         default=AutomationTriggerType.MODULE_EVENT,
     )
     trigger_ref  = Column(String(200), nullable=True)
+    trigger_config = Column(JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb"))  # config del nodo trigger; lo mantiene AutomationService
     run_count    = Column(Integer, nullable=False, default=0)
     last_run_at  = Column(DateTime(timezone=True), nullable=True)
+    next_run_at  = Column(DateTime(timezone=True), nullable=True)   # solo CRON activas; lo mantiene cron_scheduler
     created_at   = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at   = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
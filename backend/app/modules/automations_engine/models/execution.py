@@ -1,15 +1,27 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Enum as SAEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, LargeBinary, Index, DDL, event, Enum as SAEnum
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core import Base
 from ..enums import ExecutionStatus
 
 
 class Execution(Base):
+    """
+    Tabla particionada por rango mensual de started_at (ver services/execution_retention.py).
+    La PK de la tabla es (id, started_at) porque Postgres exige la clave de partición
+    en la PK; para el ORM la identidad sigue siendo solo id.
+    """
     __tablename__ = "executions"
-    __table_args__ = {"schema": "automations", "extend_existing": True}
+    __table_args__ = (
+        Index("ix_automations_executions_automation_started", "automation_id", "started_at"),
+        {
+            "schema": "automations",
+            "extend_existing": True,
+            "postgresql_partition_by": "RANGE (started_at)",
+        },
+    )
 
-    id              = Column(Integer, primary_key=True, index=True)
+    id              = Column(Integer, primary_key=True, autoincrement=True, index=True)
     automation_id   = Column(Integer, ForeignKey("automations.automations.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id         = Column(Integer, ForeignKey("core.users.id", ondelete="CASCADE"), nullable=False, index=True)
     trigger_payload = Column(JSON, nullable=True)
@@ -18,11 +30,24 @@ class Execution(Base):
         nullable=False,
         default=ExecutionStatus.PENDING,
     )
-    started_at    = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at    = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False)
     finished_at   = Column(DateTime(timezone=True), nullable=True)
     duration_ms   = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
     node_logs     = Column(JSON, nullable=True)
+    # Outputs completos de los nodos recortados en node_logs (zlib). Solo lo carga el detalle de nodo
+    node_outputs  = deferred(Column(LargeBinary, nullable=True))
 
     user       = relationship("User",       back_populates="auto_executions")
-    automation = relationship("Automation", back_populates="executions")
\ No newline at end of file
+    automation = relationship("Automation", back_populates="executions")
+
+    __mapper_args__ = {"primary_key": [id]}
+
+
+# Partición DEFAULT: recoge lo que caiga fuera de las particiones mensuales
+# (p. ej. antes de que corra el mantenimiento por primera vez)
+event.listen(
+    Execution.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS automations.executions_default PARTITION OF automations.executions DEFAULT"),
+)
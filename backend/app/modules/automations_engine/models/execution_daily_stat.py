@@ -0,0 +1,41 @@
+from typing import Optional
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.core import Base
+
+
+class ExecutionDailyStat(Base):
+    """
+    Resumen diario por automation de las ejecuciones ya borradas por la retención.
+    Lo escribe execution_retention antes de borrar filas o particiones.
+    Los percentiles exactos solo valen si el día se resumió de una vez; si no,
+    se interpolan del histograma (las filas anteriores al histograma, sin él, quedan en None).
+    """
+    __tablename__ = "execution_daily_stats"
+    __table_args__ = {"schema": "automations", "extend_existing": True}
+
+    automation_id  = Column(Integer, ForeignKey("automations.automations.id", ondelete="CASCADE"), primary_key=True)
+    day            = Column(Date, primary_key=True)
+    user_id        = Column(Integer, ForeignKey("core.users.id", ondelete="CASCADE"), nullable=False, index=True)
+    total          = Column(Integer, nullable=False, default=0)
+    success_count  = Column(Integer, nullable=False, default=0)
+    failed_count   = Column(Integer, nullable=False, default=0)
+    other_count    = Column(Integer, nullable=False, default=0)
+    exact_p50_ms       = Column("p50_duration_ms", Integer, nullable=True)
+    exact_p95_ms       = Column("p95_duration_ms", Integer, nullable=True)
+    max_duration_ms    = Column(Integer, nullable=True)
+    duration_histogram = Column(ARRAY(Integer), nullable=True)
+
+    @property
+    def p50_duration_ms(self) -> Optional[int]:
+        return self._percentile(self.exact_p50_ms, 0.50)
+
+    @property
+    def p95_duration_ms(self) -> Optional[int]:
+        return self._percentile(self.exact_p95_ms, 0.95)
+
+    def _percentile(self, exact: Optional[int], q: float) -> Optional[int]:
+        if exact is not None or self.duration_histogram is None:
+            return exact
+        from ..services.execution_profile import percentile
+        return percentile(self.duration_histogram, q, self.max_duration_ms or 0)
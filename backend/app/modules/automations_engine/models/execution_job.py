@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, Enum as SAEnum
+from sqlalchemy.sql import func
+from app.core import Base
+from ..enums import ExecutionJobStatus
+
+
+class ExecutionJob(Base):
+    """
+    Cola persistente de ejecuciones pendientes.
+    Los dispatchers encolan (automation_id, payload) y los workers del motor
+    reclaman los jobs con FOR UPDATE SKIP LOCKED.
+    """
+    __tablename__ = "execution_jobs"
+    __table_args__ = (
+        # Cubre la query de claim: jobs disponibles por orden de llegada
+        Index("ix_execution_jobs_claim", "status", "available_at"),
+        {"schema": "automations", "extend_existing": True},
+    )
+
+    id            = Column(Integer, primary_key=True, index=True)
+    automation_id = Column(Integer, ForeignKey("automations.automations.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id       = Column(Integer, ForeignKey("core.users.id", ondelete="CASCADE"), nullable=False, index=True)
+    trigger_ref   = Column(String(200), nullable=True)
+    payload       = Column(JSON, nullable=True)
+    status        = Column(
+        SAEnum(ExecutionJobStatus, schema="automations", name="executionjobstatus"),
+        nullable=False,
+        default=ExecutionJobStatus.QUEUED,
+    )
+    attempts      = Column(Integer, nullable=False, default=0)
+    max_attempts  = Column(Integer, nullable=False, default=5)
+    available_at  = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until  = Column(DateTime(timezone=True), nullable=True)
+    execution_id  = Column(Integer, nullable=True)  # última Execution creada para este job
+    last_error    = Column(Text, nullable=True)
+    created_at    = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at   = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core import Base
+
+
+class ExecutionRetentionPolicy(Base):
+    """
+    Días que se conservan las ejecuciones de un usuario.
+    Sin fila se aplica AUTOMATIONS_EXECUTION_RETENTION_DAYS.
+    """
+    __tablename__ = "execution_retention_policies"
+    __table_args__ = {"schema": "automations", "extend_existing": True}
+
+    user_id        = Column(Integer, ForeignKey("core.users.id", ondelete="CASCADE"), primary_key=True)
+    retention_days = Column(Integer, nullable=False)
+    updated_at     = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
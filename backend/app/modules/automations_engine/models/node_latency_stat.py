@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.core import Base
+
+
+class NodeLatencyStat(Base):
+    """
+    Histograma horario de duraciones por automation y nodo (ver services/execution_profile.py).
+    node_id = "" guarda la ejecución completa. Se actualiza con un upsert al cerrar
+    cada ejecución; /profile agrega las horas de la ventana pedida.
+    """
+    __tablename__ = "node_latency_stats"
+    __table_args__ = (
+        Index("ix_automations_node_latency_stats_bucket", "node_id", "bucket_start"),
+        {"schema": "automations", "extend_existing": True},
+    )
+
+    automation_id = Column(Integer, ForeignKey("automations.automations.id", ondelete="CASCADE"), primary_key=True)
+    node_id       = Column(String(100), primary_key=True)
+    bucket_start  = Column(DateTime(timezone=True), primary_key=True)
+    calls         = Column(Integer, nullable=False, default=0)
+    errors        = Column(Integer, nullable=False, default=0)
+    total_ms      = Column(BigInteger, nullable=False, default=0)
+    max_ms        = Column(Integer, nullable=False, default=0)
+    histogram     = Column(ARRAY(Integer), nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.core import Base
+
+
+class SuspendedExecution(Base):
+    """
+    Estado de una Execution parada en un nodo delay.
+    cursor: ids de los nodos pendientes de la cola BFS del executor.
+    ctx:    contexto de ejecución (payload, vars, user_id) para continuar.
+    El delay_resumer la recoge cuando llega resume_at.
+    """
+    __tablename__ = "suspended_executions"
+    __table_args__ = {"schema": "automations", "extend_existing": True}
+
+    id            = Column(Integer, primary_key=True, index=True)
+    execution_id  = Column(Integer, nullable=False, unique=True)
+    automation_id = Column(Integer, ForeignKey("automations.automations.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id       = Column(Integer, ForeignKey("core.users.id", ondelete="CASCADE"), nullable=False, index=True)
+    resume_at     = Column(DateTime(timezone=True), nullable=False, index=True)
+    cursor        = Column(JSON, nullable=False)
+    ctx           = Column(JSON, nullable=False)
+    locked_until  = Column(DateTime(timezone=True), nullable=True)
+    created_at    = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -3,6 +3,7 @@ from .executions_router  import router as executions_router
 from .webhooks_router    import router as webhooks_router
 from .api_keys_router    import router as api_keys_router
 from .registry_router    import router as registry_router
+from .retention_router   import router as retention_router
 
 __all__ = [
     "automations_router",
@@ -10,4 +11,5 @@ __all__ = [
     "webhooks_router",
     "api_keys_router",
     "registry_router",
+    "retention_router",
 ]
\ No newline at end of file
@@ -6,6 +6,7 @@ from typing import List
 from ..schemas import AutomationCreate, AutomationUpdate, AutomationFlowUpdate, AutomationResponse
 from ..schemas.execution_schema import ExecutionTriggerRequest, ExecutionResponse
 from ..services import automation_service, execution_service, flow_executor
+from ..services.execution_service import execution_id_of
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.core.auth.user import User
@@ -76,21 +77,15 @@ def trigger_automation(
     user: User    = Depends(get_current_user),
 ):
     automation = automation_service.get_by_id(automation_id, db, user_id=user.id)
-    execution  = execution_service.create(automation_id, user.id, data.payload, db)
-    execution  = execution_service.mark_running(execution, db)
+    execution  = execution_service.start(automation_id, user.id, data.payload, db)
 
     try:
-        result = flow_executor.execute(automation, data.payload, db, user.id)
+        result = flow_executor.execute(automation, data.payload, db, user.id, execution_id=execution_id_of(execution))
     except Exception as e:
-        execution = execution_service.mark_failed(execution, str(e), [], db)
-        return execution
+        db.rollback()
+        return execution_service.fail(execution, str(e), db)
 
-    if result["status"] == "success":
-        execution = execution_service.mark_success(execution, result["node_logs"], db)
-    else:
-        execution = execution_service.mark_failed(execution, result.get("error", ""), result["node_logs"], db)
-
-    return execution
+    return execution_service.finish(execution, result, db)
 
 
 @router.post("/{automation_id}/trigger/stream")
@@ -106,12 +101,10 @@ def trigger_automation_stream(
     El evento "done" incluye node_logs completos para guardar la ejecución en el historial.
     """
     automation = automation_service.get_by_id(automation_id, db, user_id=user.id)
-    execution  = execution_service.create(automation_id, user.id, data.payload, db)
-    execution  = execution_service.mark_running(execution, db)
-
     # Capturar IDs antes de que la sesión se cierre al retornar el endpoint
     automation_id_val = automation.id
-    execution_id_val  = execution.id
+    execution         = execution_service.start(automation_id, user.id, data.payload, db)
+    execution_id_val  = execution_id_of(execution)
     user_id_val       = user.id
     payload_val       = data.payload
 
@@ -125,21 +118,20 @@ def trigger_automation_stream(
             stream_execution  = stream_db.get(Execution, execution_id_val)
             final_event       = None
 
-            for event in flow_executor.execute_stream(stream_automation, payload_val, stream_db, user_id_val):
+            for event in flow_executor.execute_stream(
+                stream_automation, payload_val, stream_db, user_id_val, execution_id=execution_id_val,
+            ):
+                suspension = event.pop("suspension", None)
                 yield f"data: {json.dumps(event)}\n\n"
                 if event["type"] == "done":
                     final_event = event
 
             if final_event:
-                if final_event["status"] == "success":
-                    execution_service.mark_success(stream_execution, final_event["node_logs"], stream_db)
-                else:
-                    execution_service.mark_failed(
-                        stream_execution,
-                        final_event.get("error_message", ""),
-                        final_event["node_logs"],
-                        stream_db,
-                    )
+                execution_service.finish(stream_execution, suspension or {
+                    "status":    final_event["status"],
+                    "error":     final_event.get("error_message", ""),
+                    "node_logs": final_event["node_logs"],
+                }, stream_db)
         finally:
             stream_db.close()
 
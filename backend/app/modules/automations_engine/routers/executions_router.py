@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends
+import json
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
-from ..schemas.execution_schema import ExecutionResponse
+from ..schemas.execution_schema import (
+    ExecutionResponse, ExecutionSummaryResponse, ExecutionDailyStatResponse, NodeLogEntry,
+    AutomationProfileResponse, SlowAutomationResponse,
+)
+from ..core.event_bus import execution_bus
+from ..manifest import get_settings
 from ..services import execution_service
+from ..services.execution_profile import execution_profile
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.core.auth.user import User
@@ -11,7 +19,7 @@ from ..services import automation_service
 router = APIRouter(prefix="/automations", tags=["Executions"])
 
 
-@router.get("/{automation_id}/executions", response_model=List[ExecutionResponse])
+@router.get("/{automation_id}/executions", response_model=List[ExecutionSummaryResponse])
 def get_executions(
     automation_id: int,
     db:   Session = Depends(get_db),
@@ -21,6 +29,39 @@ def get_executions(
     return execution_service.get_all(automation_id, db, user_id=user.id)
 
 
+@router.get("/{automation_id}/executions/live")
+def tail_executions(
+    automation_id: int,
+    db:   Session = Depends(get_db),
+    user: User    = Depends(get_current_user),
+):
+    """
+    SSE con los eventos node_start / node / done de todas las ejecuciones de la
+    automation, vengan de donde vengan. No ejecuta nada; cada evento lleva
+    execution_id. Un comentario ": keepalive" cada AUTOMATIONS_LIVE_HEARTBEAT_SECONDS
+    sin actividad mantiene viva la conexión.
+    """
+    automation_service.get_by_id(automation_id, db, user_id=user.id)  # ← lanza 404 si no es suya
+    heartbeat_seconds = get_settings()["AUTOMATIONS_LIVE_HEARTBEAT_SECONDS"]
+
+    async def generate():
+        yield ": connected\n\n"
+        async for event in execution_bus.tail(automation_id, heartbeat_seconds):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control":    "no-cache",
+            "X-Accel-Buffering": "no",   # evita que nginx bufferice la respuesta
+        },
+    )
+
+
 @router.get("/{automation_id}/executions/{execution_id}", response_model=ExecutionResponse)
 def get_execution(
     automation_id: int,
@@ -29,4 +70,53 @@ def get_execution(
     user: User    = Depends(get_current_user),
 ):
     automation_service.get_by_id(automation_id, db, user_id=user.id)  # ← lanza 404 si no es suya
-    return execution_service.get_by_id(execution_id, db, user_id=user.id)
\ No newline at end of file
+    return execution_service.get_by_id(execution_id, db, user_id=user.id)
+
+
+@router.get("/{automation_id}/executions/{execution_id}/nodes/{node_id}", response_model=NodeLogEntry)
+def get_execution_node(
+    automation_id: int,
+    execution_id:  int,
+    node_id:       str,
+    db:   Session = Depends(get_db),
+    user: User    = Depends(get_current_user),
+):
+    """Log de un nodo con el output completo, aunque en node_logs aparezca recortado."""
+    automation_service.get_by_id(automation_id, db, user_id=user.id)  # ← lanza 404 si no es suya
+    return execution_service.get_node_log(execution_id, node_id, db, user_id=user.id)
+
+
+@router.get("/{automation_id}/stats/daily", response_model=List[ExecutionDailyStatResponse])
+def get_daily_stats(
+    automation_id: int,
+    days: int     = Query(90, ge=1, le=366),
+    db:   Session = Depends(get_db),
+    user: User    = Depends(get_current_user),
+):
+    """Conteos y p50/p95 por día de las ejecuciones que ya eliminó la retención."""
+    automation_service.get_by_id(automation_id, db, user_id=user.id)  # ← lanza 404 si no es suya
+    return execution_service.get_daily_stats(automation_id, db, user_id=user.id, days=days)
+
+
+
+@router.get("/profile/slowest", response_model=List[SlowAutomationResponse])
+def get_slowest_automations(
+    hours: int    = Query(24, ge=1, le=720),
+    limit: int    = Query(10, ge=1, le=100),
+    db:    Session = Depends(get_db),
+    user:  User    = Depends(get_current_user),
+):
+    """Automations del usuario con mayor p95 de ejecución en las últimas `hours` horas."""
+    return execution_profile.slowest(db, user_id=user.id, hours=hours, limit=limit)
+
+
+@router.get("/{automation_id}/profile", response_model=AutomationProfileResponse)
+def get_automation_profile(
+    automation_id: int,
+    hours: int    = Query(24, ge=1, le=720),
+    db:    Session = Depends(get_db),
+    user:  User    = Depends(get_current_user),
+):
+    """Llamadas, tasa de error y p50/p95/p99 por nodo en las últimas `hours` horas."""
+    automation_service.get_by_id(automation_id, db, user_id=user.id)  # ← lanza 404 si no es suya
+    return execution_profile.get_profile(automation_id, db, hours=hours)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..schemas.execution_schema import RetentionPolicyUpdate, RetentionPolicyResponse
+from ..services.execution_retention import execution_retention
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.auth.user import User
+
+router = APIRouter(prefix="/automations/retention", tags=["Executions"])
+
+
+@router.get("/", response_model=RetentionPolicyResponse)
+def get_retention(
+    db:   Session = Depends(get_db),
+    user: User    = Depends(get_current_user),
+):
+    return execution_retention.get_policy(user.id, db)
+
+
+@router.put("/", response_model=RetentionPolicyResponse)
+def update_retention(
+    data: RetentionPolicyUpdate,
+    db:   Session = Depends(get_db),
+    user: User    = Depends(get_current_user),
+):
+    return execution_retention.set_policy(user.id, data.retention_days, db)
+
+
+@router.delete("/", response_model=RetentionPolicyResponse)
+def reset_retention(
+    db:   Session = Depends(get_db),
+    user: User    = Depends(get_current_user),
+):
+    """Vuelve a la retención por defecto."""
+    return execution_retention.reset_policy(user.id, db)
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from typing import List
-from ..schemas.webhook_schema import WebhookCreate, WebhookResponse, WebhookInboundPayload
-from ..schemas.execution_schema import ExecutionResponse
-from ..services import webhook_service, execution_service, automation_service, flow_executor
+from typing import List, Union
+from ..schemas.webhook_schema import WebhookCreate, WebhookResponse, WebhookInboundPayload, WebhookInboundAccepted
+from ..services import webhook_service, automation_service
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.core.auth.user import User
@@ -40,30 +39,18 @@ def delete_webhook(
     webhook_service.delete(webhook_id, db, user_id=user.id)
 
 
-@router.post("/webhooks/in/{token}", status_code=status.HTTP_202_ACCEPTED)
+@router.post(
+    "/webhooks/in/{token}",
+    response_model=Union[WebhookInboundAccepted, List[WebhookInboundAccepted]],
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def inbound_webhook(
     token:   str,
-    payload: WebhookInboundPayload,
+    payload: Union[WebhookInboundPayload, List[WebhookInboundPayload]],
     db:      Session = Depends(get_db),
 ):
-    webhook    = webhook_service.get_by_token(token, db)
-    automation = automation_service.get_by_id(webhook.automation_id, db, user_id=webhook.user_id)
-    
+    """Un evento o un array de eventos (una ejecución por evento). Encola y responde 202."""
+    events = payload if isinstance(payload, list) else [payload]
     # Fusiona source + data para que el flow tenga acceso a ambos
-    trigger_payload = {"source": payload.source, **payload.data}
-    
-    execution  = execution_service.create(automation.id, webhook.user_id, trigger_payload, db)
-    execution  = execution_service.mark_running(execution, db)
-
-    try:
-        result = flow_executor.execute(automation, trigger_payload, db, webhook.user_id)
-    except Exception as e:
-        execution = execution_service.mark_failed(execution, str(e), [], db)
-        return {"execution_id": execution.id, "status": execution.status}
-
-    if result["status"] == "success":
-        execution = execution_service.mark_success(execution, result["node_logs"], db)
-    else:
-        execution = execution_service.mark_failed(execution, result.get("error", ""), result["node_logs"], db)
-
-    return {"execution_id": execution.id, "status": execution.status}
\ No newline at end of file
+    results = webhook_service.ingest(token, [{"source": e.source, **e.data} for e in events], db)
+    return results if isinstance(payload, list) else results[0]
@@ -2,14 +2,20 @@ from .automation_schema import (
     AutomationCreate, AutomationUpdate, AutomationFlowUpdate,
     AutomationResponse, Flow, FlowNode, FlowEdge,
 )
-from .execution_schema import ExecutionResponse, NodeLogEntry, ExecutionTriggerRequest
+from .execution_schema import (
+    ExecutionResponse, ExecutionSummaryResponse, NodeLogEntry, ExecutionTriggerRequest,
+    ExecutionDailyStatResponse, RetentionPolicyUpdate, RetentionPolicyResponse,
+    AutomationProfileResponse, NodeLatencyResponse, LatencySummary, SlowAutomationResponse,
+)
 from .api_key_schema import ApiKeyCreate, ApiKeyResponse, ApiKeyCreateResponse
-from .webhook_schema import WebhookCreate, WebhookResponse, WebhookInboundPayload
+from .webhook_schema import WebhookCreate, WebhookResponse, WebhookInboundPayload, WebhookInboundAccepted
 
 __all__ = [
     "AutomationCreate", "AutomationUpdate", "AutomationFlowUpdate",
     "AutomationResponse", "Flow", "FlowNode", "FlowEdge",
-    "ExecutionResponse", "NodeLogEntry", "ExecutionTriggerRequest",
+    "ExecutionResponse", "ExecutionSummaryResponse", "NodeLogEntry", "ExecutionTriggerRequest",
+    "ExecutionDailyStatResponse", "RetentionPolicyUpdate", "RetentionPolicyResponse",
+    "AutomationProfileResponse", "NodeLatencyResponse", "LatencySummary", "SlowAutomationResponse",
     "ApiKeyCreate", "ApiKeyResponse", "ApiKeyCreateResponse",
-    "WebhookCreate", "WebhookResponse", "WebhookInboundPayload",
+    "WebhookCreate", "WebhookResponse", "WebhookInboundPayload", "WebhookInboundAccepted",
 ]
\ No newline at end of file
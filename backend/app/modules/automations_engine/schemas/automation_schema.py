@@ -22,6 +22,8 @@ class FlowEdge(BaseModel):
 class Flow(BaseModel):
     nodes: list[FlowNode] = Field(default_factory=list)
     edges: list[FlowEdge] = Field(default_factory=list)
+    # Ramas independientes de nodos action / outbound_webhook / automation_call en paralelo
+    parallel: bool = False
 
 
 class AutomationCreate(BaseModel):
@@ -57,5 +59,6 @@ class AutomationResponse(BaseModel):
     trigger_ref:  Optional[str]
     run_count:    int
     last_run_at:  Optional[datetime]
+    next_run_at:  Optional[datetime]
     created_at:   datetime
     updated_at:   Optional[datetime]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Any
 from ..enums import ExecutionStatus
 
@@ -11,6 +11,20 @@ class NodeLogEntry(BaseModel):
     output:           Optional[dict[str, Any]] = None
     error:            Optional[str] = None
     duration_ms:      Optional[int] = None
+    output_truncated: bool = False
+
+
+class ExecutionSummaryResponse(BaseModel):
+    """Fila ligera del historial: el detalle trae trigger_payload y node_logs."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id:            int
+    automation_id: int
+    status:        ExecutionStatus
+    started_at:    datetime
+    finished_at:   Optional[datetime]
+    duration_ms:   Optional[int]
+    error_message: Optional[str]
 
 
 class ExecutionResponse(BaseModel):
@@ -28,4 +42,53 @@ class ExecutionResponse(BaseModel):
 
 
 class ExecutionTriggerRequest(BaseModel):
-    payload: dict[str, Any] = Field(default_factory=dict)
\ No newline at end of file
+    payload: dict[str, Any] = Field(default_factory=dict)
+
+
+class ExecutionDailyStatResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    day:             date
+    total:           int
+    success_count:   int
+    failed_count:    int
+    other_count:     int
+    p50_duration_ms: Optional[int]
+    p95_duration_ms: Optional[int]
+
+
+class RetentionPolicyUpdate(BaseModel):
+    retention_days: int
+
+
+class RetentionPolicyResponse(BaseModel):
+    retention_days: int
+    is_default:     bool
+
+
+class LatencySummary(BaseModel):
+    calls:      int
+    errors:     int
+    error_rate: float
+    avg_ms:     Optional[int]
+    max_ms:     int
+    p50_ms:     Optional[int]
+    p95_ms:     Optional[int]
+    p99_ms:     Optional[int]
+
+
+class NodeLatencyResponse(LatencySummary):
+    node_id: str
+
+
+class AutomationProfileResponse(BaseModel):
+    automation_id: int
+    since:         datetime
+    hours:         int
+    execution:     Optional[LatencySummary]
+    nodes:         list[NodeLatencyResponse]
+
+
+class SlowAutomationResponse(LatencySummary):
+    automation_id: int
+    name:          str
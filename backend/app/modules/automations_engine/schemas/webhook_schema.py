@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional, Any
+from ..enums import ExecutionStatus
 
 
 class WebhookCreate(BaseModel):
@@ -22,4 +23,10 @@ class WebhookResponse(BaseModel):
 class WebhookInboundPayload(BaseModel):
     """Payload que recibe el endpoint público POST /webhooks/in/{token}"""
     source: Optional[str] = None
-    data:   dict[str, Any] = Field(default_factory=dict)
\ No newline at end of file
+    data:   dict[str, Any] = Field(default_factory=dict)
+
+
+class WebhookInboundAccepted(BaseModel):
+    """Respuesta del ingress: pending en modo queue, estado final en modo inline."""
+    execution_id: int
+    status:       ExecutionStatus
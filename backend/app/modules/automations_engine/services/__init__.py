@@ -3,6 +3,10 @@ from .execution_service import execution_service
 from .api_key_service import api_key_service
 from .webhook_service import webhook_service
 from .flow_executor import flow_executor
+from .automation_runner import automation_runner
+from .execution_queue import execution_queue
+from .execution_write_buffer import execution_write_buffer
+from .execution_retention import execution_retention
 
 __all__ = [
     "automation_service",
@@ -10,4 +14,8 @@ __all__ = [
     "api_key_service",
     "webhook_service",
     "flow_executor",
+    "automation_runner",
+    "execution_queue",
+    "execution_write_buffer",
+    "execution_retention",
 ]
\ No newline at end of file
@@ -3,6 +3,7 @@ import secrets
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from typing import List
+from ..core.api_key_cache import ApiKeyEntry, api_key_cache
 from ..models.api_key import ApiKey
 from ..schemas import ApiKeyCreate
 from ..exceptions import ApiKeyNotFoundError, ApiKeyInvalidError, ApiKeyExpiredError, ApiKeyInsufficientScopeError
@@ -33,6 +34,7 @@ class ApiKeyService:
         db.add(api_key)
         db.commit()
         db.refresh(api_key)
+        api_key_cache.invalidate(key_hash)
         return api_key, raw_token
 
     def revoke(self, key_id: int, db: Session, user_id: int) -> None:
@@ -45,26 +47,29 @@ class ApiKeyService:
             raise ApiKeyNotFoundError(key_id)
         api_key.is_active = False
         db.commit()
+        api_key_cache.invalidate(api_key.key_hash)
+
+    def validate(self, raw_token: str, required_scope: str, db: Session) -> ApiKeyEntry:
+        """
+        Metadatos de la key si es válida para required_scope. Resuelve desde
+        api_key_cache y deja last_used_at en api_key_usage_buffer: no escribe.
+        """
+        from .api_key_usage_buffer import api_key_usage_buffer
 
-    def validate(self, raw_token: str, required_scope: str, db: Session) -> ApiKey:
         key_hash = hashlib.sha256(raw_token.encode()).hexdigest()
-        api_key  = db.query(ApiKey).filter(
-            ApiKey.key_hash  == key_hash,
-            ApiKey.is_active == True,
-        ).first()
+        api_key  = api_key_cache.lookup(key_hash, db)
 
         if not api_key:
             raise ApiKeyInvalidError()
 
-        if api_key.expires_at and api_key.expires_at < datetime.now(timezone.utc):
+        now = datetime.now(timezone.utc)
+        if api_key.expires_at and api_key.expires_at < now:
             raise ApiKeyExpiredError()
 
         if required_scope not in api_key.scopes:
             raise ApiKeyInsufficientScopeError(required_scope)
 
-        api_key.last_used_at = datetime.now(timezone.utc)
-        db.commit()
+        api_key_usage_buffer.touch(api_key.id, now)
         return api_key
 
-
 api_key_service = ApiKeyService()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+last_used_at de las API keys, agrupado.
+
+ApiKeyService.validate hacía UPDATE + commit de api_keys.last_used_at en
+cada petición autenticada. Ahora solo anota aquí el último uso por key y un
+hilo daemon lo escribe cada AUTOMATIONS_API_KEY_TOUCH_FLUSH_SECONDS con un
+único UPDATE ... FROM (VALUES ...).
+
+last_used_at puede ir hasta ese intervalo por detrás; GREATEST evita que un
+volcado tardío lo haga retroceder.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Integer, column, func, update, values
+
+from app.core.database import SessionLocal
+from ..manifest import get_settings
+from ..models.api_key import ApiKey
+
+logger = logging.getLogger(__name__)
+
+_api_keys = ApiKey.__table__
+
+
+def usage_update(pending: dict[int, datetime]):
+    """UPDATE api_keys SET last_used_at = v.at FROM (VALUES ...) AS v(id, at) WHERE id = v.id."""
+    rows = values(
+        column("id", Integer), column("at", DateTime(timezone=True)), name="v",
+    ).data(list(pending.items()))
+    return update(_api_keys).where(_api_keys.c.id == rows.c.id).values(
+        last_used_at = func.greatest(_api_keys.c.last_used_at, rows.c.at),
+    )
+
+
+class ApiKeyUsageBuffer:
+
+    def __init__(self):
+        self._pending: dict[int, datetime] = {}   # api_key_id → último uso
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, api_key_id: int, at: datetime) -> None:
+        with self._lock:
+            previous = self._pending.get(api_key_id)
+            if previous is None or at > previous:
+                self._pending[api_key_id] = at
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def discard(self) -> None:
+        with self._lock:
+            self._pending = {}
+
+    def flush(self) -> int:
+        """Escribe los usos acumulados en una sentencia. Devuelve cuántas keys actualizó."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(usage_update(pending))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error volcando last_used_at de {len(pending)} API keys: {e}")
+            for api_key_id, at in pending.items():
+                self.touch(api_key_id, at)
+            return 0
+        finally:
+            db.close()
+        return len(pending)
+
+    # ── Hilo ──────────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, flush_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(flush_seconds,), name="automations-api-key-usage", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def _loop(self, flush_seconds: float) -> None:
+        while not self._stop.wait(flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"API key usage buffer error: {e}")
+
+
+# Singleton global
+api_key_usage_buffer = ApiKeyUsageBuffer()
+
+
+def start_api_key_usage_buffer() -> None:
+    """Arranca el volcado periódico de last_used_at."""
+    api_key_usage_buffer.start(get_settings()["AUTOMATIONS_API_KEY_TOUCH_FLUSH_SECONDS"])
+    logger.info("✅ Automations API key usage buffer iniciado")
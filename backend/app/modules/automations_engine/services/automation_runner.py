@@ -0,0 +1,76 @@
+"""
+Ejecución de una automation con su contabilidad: registro en executions,
+flow_executor y actualización de run_count / last_run_at.
+
+Es el único punto que usan los dispatchers (modo inline) y los workers
+de la cola, para que ambos caminos dejen el mismo rastro en BD.
+"""
+import logging
+from sqlalchemy.orm import Session
+
+from ..enums import ExecutionStatus
+from ..models.automation import Automation
+from ..models.execution import Execution
+from .execution_service import execution_id_of, execution_service, started_at_of
+from .execution_write_buffer import execution_write_buffer
+from .flow_executor import flow_executor
+
+logger = logging.getLogger(__name__)
+
+
+class AutomationRunner:
+
+    def run(
+        self,
+        automation: Automation,
+        payload: dict,
+        user_id: int,
+        db: Session,
+        execution: Execution | None = None,
+    ) -> Execution:
+        """
+        Ejecuta el flujo y devuelve la Execution terminada (o WAITING si un delay la suspende).
+        Si el flow_executor lanza, la Execution queda FAILED y la excepción se propaga.
+
+        Contabilidad: INSERT ... RETURNING en RUNNING al empezar y una transacción
+        al terminar (estado + node_logs + run_count/last_run_at). Con write-behind
+        activo, el cierre se encola en execution_write_buffer.
+        """
+        # Leídos antes de que los commits del flujo expiren la instancia
+        automation_id, name = automation.id, automation.name
+
+        if execution is None:
+            execution = execution_service.start(automation_id, user_id, payload, db)
+
+        try:
+            result = flow_executor.execute(automation, payload, db, user_id, execution_id=execution_id_of(execution))
+        except Exception as e:
+            db.rollback()
+            execution_service.fail(execution, str(e), db, automation_id=automation_id)
+            raise
+
+        if result["status"] != "waiting" and execution_write_buffer.enabled:
+            execution_write_buffer.add(
+                execution_id_of(execution),
+                started_at_of(execution),
+                automation_id,
+                ExecutionStatus.SUCCESS if result["status"] in ("success", "skipped") else ExecutionStatus.FAILED,
+                result["node_logs"],
+                error=result.get("error"),
+            )
+        else:
+            execution_service.finish(execution, result, db, automation_id=automation_id)
+
+        logger.info(f"Automatización '{name}' terminó con status={result['status']}")
+        return execution
+
+    def record_run(self, automation: Automation, db: Session) -> None:
+        """
+        Incrementa run_count y fija last_run_at sin tocar updated_at: updated_at
+        versiona el flujo en flow_cache y no debe cambiar en cada ejecución.
+        """
+        execution_service.record_run(automation.id, db)
+        db.commit()
+
+
+automation_runner = AutomationRunner()
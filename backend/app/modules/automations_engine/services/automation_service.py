@@ -4,7 +4,15 @@ from ..models.automation import Automation
 from ..schemas import AutomationCreate, AutomationUpdate, AutomationFlowUpdate
 from ..exceptions import AutomationNotFoundError, AutomationNameAlreadyExistsError
 from ..core.registry import registry
-from ..core.graph import build_graph
+from ..core.graph import build_graph, extract_trigger_config, find_cycle
+from ..core.trigger_index import trigger_index
+from ..core.compiled_flow import flow_cache
+from ..core.api_key_cache import api_key_cache
+from ..core.webhook_token_cache import webhook_token_cache
+from ..core.conditions import compile_condition
+from ..core.schedule import validate_schedule
+from .cron_scheduler_service import cron_scheduler
+from .execution_profile import execution_profile
 
 
 class AutomationService:
@@ -27,20 +35,25 @@ class AutomationService:
         self._validate_name_unique(db, user_id, data.name)
         flow_dict = data.flow.model_dump(by_alias=True)
         self._validate_flow(flow_dict)
+        self._validate_calls(db, user_id, flow_dict)
         trigger_ref = data.trigger_ref or self._extract_trigger_ref(flow_dict)
 
         automation = Automation(
-            user_id      = user_id,
-            name         = data.name,
-            description  = data.description,
-            is_active    = data.is_active,
-            flow         = flow_dict,
-            trigger_type = data.trigger_type,
-            trigger_ref  = trigger_ref,
+            user_id        = user_id,
+            name           = data.name,
+            description    = data.description,
+            is_active      = data.is_active,
+            flow           = flow_dict,
+            trigger_type   = data.trigger_type,
+            trigger_ref    = trigger_ref,
+            trigger_config = extract_trigger_config(flow_dict),
         )
+        cron_scheduler.reschedule(automation)
         db.add(automation)
         db.commit()
         db.refresh(automation)
+        trigger_index.invalidate_user(user_id)
+        cron_scheduler.notify(automation.next_run_at)
         return automation
 
     def update(self, automation_id: int, db: Session, data: AutomationUpdate, user_id: int) -> Automation:
@@ -52,29 +65,44 @@ class AutomationService:
 
         for key, value in update_data.items():
             setattr(automation, key, value)
+        cron_scheduler.reschedule(automation)
 
         db.commit()
         db.refresh(automation)
+        trigger_index.invalidate_user(user_id)
+        flow_cache.invalidate(automation.id)
+        cron_scheduler.notify(automation.next_run_at)
         return automation
 
     def update_flow(self, automation_id: int, db: Session, data: AutomationFlowUpdate, user_id: int) -> Automation:
         automation = self.get_by_id(automation_id, db, user_id)
         flow_dict = data.flow.model_dump(by_alias=True)
         self._validate_flow(flow_dict)
+        self._validate_calls(db, user_id, flow_dict, automation_id=automation.id)
 
-        automation.flow = flow_dict
+        automation.flow           = flow_dict
+        automation.trigger_config = extract_trigger_config(flow_dict)
         if data.trigger_type is not None:
             automation.trigger_type = data.trigger_type
         automation.trigger_ref = data.trigger_ref or self._extract_trigger_ref(flow_dict)
+        cron_scheduler.reschedule(automation)
 
         db.commit()
         db.refresh(automation)
+        trigger_index.invalidate_user(user_id)
+        flow_cache.invalidate(automation.id)
+        cron_scheduler.notify(automation.next_run_at)
         return automation
 
     def delete(self, automation_id: int, db: Session, user_id: int) -> None:
         automation = self.get_by_id(automation_id, db, user_id)
         db.delete(automation)
         db.commit()
+        trigger_index.invalidate_user(user_id)
+        flow_cache.invalidate(automation_id)
+        webhook_token_cache.invalidate_automation(automation_id)
+        api_key_cache.invalidate_automation(automation_id)
+        execution_profile.discard(automation_id)
 
     def _validate_name_unique(self, db: Session, user_id: int, name: str) -> None:
         exists = db.query(Automation).filter(
@@ -110,7 +138,16 @@ class AutomationService:
             if edge.get("to") not in node_ids:
                 raise InvalidFlowError(f"edge referencia nodo destino inexistente: {edge.get('to')}")
 
+        cycle = find_cycle(build_graph(flow))
+        if cycle:
+            raise InvalidFlowError(f"el flujo tiene un ciclo: {' → '.join(cycle)}")
+
         for node in nodes:
+            if node["type"] == "condition":
+                try:
+                    compile_condition(node.get("config", {}), strict=True)
+                except ValueError as e:
+                    raise InvalidFlowError(f"condición inválida en nodo {node['id']}: {e}")
             if node["type"] == "action":
                 action_id = node.get("config", {}).get("action_id")
                 if action_id and not registry.get_action(action_id):
@@ -119,6 +156,56 @@ class AutomationService:
                 trigger_id = node.get("config", {}).get("trigger_id")
                 if trigger_id and not registry.get_trigger(trigger_id):
                     raise TriggerNotFoundInRegistryError(trigger_id)
+                try:
+                    validate_schedule(trigger_id, node.get("config", {}))
+                except ValueError as e:
+                    raise InvalidFlowError(f"schedule inválido: {e}")
+
+
+    def _validate_calls(self, db: Session, user_id: int, flow: dict, automation_id: int | None = None) -> None:
+        """
+        Un flujo llamado con automation_call corre dentro del nodo del padre y no
+        se puede suspender: no puede tener nodos delay (ni llamar a otro que los tenga).
+        Se comprueba en los dos sentidos: lo que este flujo llama y quién llama a este.
+        """
+        from ..exceptions import InvalidFlowError
+        types = {n["type"] for n in flow.get("nodes", [])}
+        if not types & {"delay", "automation_call"}:
+            return
+
+        flows = dict(db.query(Automation.id, Automation.flow).filter(Automation.user_id == user_id).all())
+        if automation_id is not None:
+            flows[automation_id] = flow
+
+        for target in _called_ids(flow):
+            if _reaches_delay(target, flows):
+                raise InvalidFlowError(f"la automation {target} llamada con automation_call tiene nodos delay")
+
+        if automation_id is not None and _reaches_delay(automation_id, flows):
+            callers = [aid for aid, other in flows.items() if aid != automation_id and automation_id in _called_ids(other)]
+            if callers:
+                raise InvalidFlowError(
+                    f"la automation se llama con automation_call desde {callers} y no puede tener nodos delay"
+                )
+
+
+def _called_ids(flow: dict) -> set:
+    return {
+        n.get("config", {}).get("automation_id")
+        for n in (flow or {}).get("nodes", []) if n.get("type") == "automation_call"
+    }
+
+
+def _reaches_delay(automation_id: int, flows: dict, seen: set | None = None) -> bool:
+    """True si el flujo (o alguno de los que llama, recursivamente) tiene un nodo delay."""
+    seen = seen if seen is not None else set()
+    if automation_id in seen or automation_id not in flows:
+        return False
+    seen.add(automation_id)
+    flow = flows[automation_id] or {}
+    if any(n.get("type") == "delay" for n in flow.get("nodes", [])):
+        return True
+    return any(_reaches_delay(target, flows, seen) for target in _called_ids(flow))
 
 
 automation_service = AutomationService()
\ No newline at end of file
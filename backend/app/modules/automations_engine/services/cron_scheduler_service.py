@@ -1,164 +1,278 @@
 """
 Scheduler del automations_engine para triggers de tipo CRON.
 
-Detecta automations activas con trigger_type=CRON, evalúa si deben ejecutarse
-según su schedule (schedule_once o schedule_interval), y las lanza via flow_executor.
-
-Se ejecuta cada 60 segundos en background via APScheduler.
+Antes un job cada 60 segundos cargaba todas las automations CRON activas,
+releía su flow y evaluaba el schedule en Python. Ahora cada automation CRON
+activa guarda su próxima ejecución en automations.next_run_at (índice parcial)
+y el scheduler solo toca las filas vencidas:
+
+- reschedule() recalcula next_run_at al crear/editar/activar una automation
+  (core/schedule.compute_next_run: schedule_once, schedule_interval y
+  schedule_cron con expresión cron de 5 campos y zona horaria).
+- Un hilo duerme hasta el min(next_run_at) (o AUTOMATIONS_CRON_POLL_SECONDS,
+  para ver cambios de otros procesos); notify() lo despierta antes si el CRUD
+  adelanta la próxima ejecución.
+- run_due() reclama las vencidas con FOR UPDATE SKIP LOCKED y avanza su
+  next_run_at en la misma transacción: varios procesos no ejecutan dos veces
+  el mismo disparo. Un schedule_once se desactiva al reclamarlo.
+- En modo "queue" el hilo no ejecuta: encola un job por disparo en esa misma
+  transacción y los corre el pool de workers, así un flujo lento no retrasa al
+  resto del lote ni al siguiente tick. En modo "inline" (tests, desarrollo) los
+  ejecuta uno a uno en el propio hilo.
 """
 import logging
-from datetime import datetime, timezone, timedelta
+import threading
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, func, update
 from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
+from app.core.scheduler import shard_clause, sharded_run
+from ..core.schedule import SCHEDULE_ONCE, SCHEDULE_TRIGGERS, compute_next_run
+from ..enums import AutomationTriggerType
+from ..manifest import get_settings
+from ..models.automation import Automation
 
 logger = logging.getLogger(__name__)
 
-_SYSTEM_CRON_TRIGGERS = {"system.schedule_once", "system.schedule_interval"}
-
+DUE_BATCH_SIZE = 100
 
-def _get_trigger_config(automation) -> dict | None:
-    """Extrae el config del nodo trigger del flow JSON."""
-    for node in automation.flow.get("nodes", []):
-        if node.get("type") == "trigger":
-            return node.get("config", {})
-    return None
+_automations = Automation.__table__
 
+# next_run_at sin tocar updated_at (versiona el flujo en flow_cache)
+NEXT_RUN_UPDATE = update(_automations).where(_automations.c.id == bindparam("b_id")).values(
+    next_run_at = bindparam("b_next_run_at"),
+    updated_at  = _automations.c.updated_at,
+)
 
-def _should_run_once(config: dict, last_run_at) -> bool:
-    """schedule_once: ejecutar si run_at <= now y nunca se ha ejecutado."""
-    if last_run_at is not None:
-        return False
-    run_at_str = config.get("run_at")
-    if not run_at_str:
-        return False
-    try:
-        run_at = datetime.fromisoformat(run_at_str.replace("Z", "+00:00"))
-        return run_at <= datetime.now(timezone.utc)
-    except (ValueError, TypeError):
-        return False
-
-
-def _should_run_interval(config: dict, last_run_at) -> bool:
-    """schedule_interval: ejecutar si ha pasado el intervalo desde el último run."""
-    interval_value = config.get("interval_value", 30)
-    interval_unit  = config.get("interval_unit", "minutes")
-
-    if interval_unit == "minutes":
-        delta = timedelta(minutes=interval_value)
-    elif interval_unit == "hours":
-        delta = timedelta(hours=interval_value)
-    elif interval_unit == "days":
-        delta = timedelta(days=interval_value)
-    else:
-        return False
-
-    now = datetime.now(timezone.utc)
-
-    active_from  = config.get("active_from")
-    active_until = config.get("active_until")
-    if active_from and active_until:
-        try:
-            from_h, from_m   = (int(x) for x in active_from.split(":"))
-            until_h, until_m = (int(x) for x in active_until.split(":"))
-            now_minutes   = now.hour * 60 + now.minute
-            from_minutes  = from_h * 60 + from_m
-            until_minutes = until_h * 60 + until_m
-            if not (from_minutes <= now_minutes <= until_minutes):
-                return False
-        except (ValueError, TypeError):
-            pass
-
-    if last_run_at is None:
-        return True
 
-    return (now - last_run_at) >= delta
+def next_run_for(automation, now: datetime | None = None) -> datetime | None:
+    """next_run_at que le corresponde a una automation (None si no es CRON activa)."""
+    if not automation.is_active or automation.trigger_type != AutomationTriggerType.CRON:
+        return None
+    config = automation.trigger_config or {}
+    if config.get("trigger_id") not in SCHEDULE_TRIGGERS:
+        return None
+    return compute_next_run(config["trigger_id"], config, automation.last_run_at, now)
 
 
 def _execute_automation(automation, db: Session) -> None:
+    """Ejecuta y cierra la ejecución junto con run_count/last_run_at en una transacción."""
     from .flow_executor import flow_executor
-    from .execution_service import execution_service
+    from .execution_service import execution_id_of, execution_service
 
-    execution = execution_service.create(automation.id, automation.user_id, {}, db)
-    execution = execution_service.mark_running(execution, db)
+    automation_id = automation.id
+    user_id       = automation.user_id
+    execution     = execution_service.start(automation_id, user_id, {}, db)
 
     try:
-        result = flow_executor.execute(automation, payload={}, db=db, user_id=automation.user_id)
-        if result["status"] == "failed":
-            execution_service.mark_failed(execution, result.get("error", ""), result["node_logs"], db)
-        else:
-            execution_service.mark_success(execution, result["node_logs"], db)
+        result = flow_executor.execute(
+            automation, payload={}, db=db, user_id=user_id, execution_id=execution_id_of(execution),
+        )
     except Exception as e:
-        execution_service.mark_failed(execution, str(e), [], db)
+        db.rollback()
+        # Sin automation_id: run_due registra el run también en los fallos
+        execution_service.fail(execution, str(e), db)
         raise
+    execution_service.finish(execution, result, db, automation_id=automation_id)
 
 
-def start_cron_scheduler() -> None:
-    """Arranca el scheduler de CRON del automations_engine."""
-    from apscheduler.schedulers.background import BackgroundScheduler
-    import logging
+class CronScheduler:
 
-    scheduler = BackgroundScheduler(timezone="UTC")
-    scheduler.add_job(job_check_cron_automations, "interval", seconds=60, id="cron_automations")
-    scheduler.start()
-    logging.getLogger(__name__).info("✅ Automations CRON scheduler iniciado")
+    def __init__(self):
+        self._next_due: datetime | None = None
+        self._lock   = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop   = threading.Event()
+        self._thread: threading.Thread | None = None
 
+    # ── next_run_at ───────────────────────────────────────────────────────────
 
-def job_check_cron_automations() -> None:
-    """Evalúa y ejecuta automations con trigger_type=CRON según su schedule."""
-    from ..models.automation import Automation
-    from ..enums import AutomationTriggerType
+    def reschedule(self, automation, now: datetime | None = None) -> None:
+        """Fija automation.next_run_at (sin commit). Llamar tras cambios de flujo o is_active."""
+        automation.next_run_at = next_run_for(automation, now)
 
-    db = SessionLocal()
-    try:
+    def notify(self, next_run_at: datetime | None) -> None:
+        """Despierta el hilo si next_run_at es anterior a lo que está esperando."""
+        if next_run_at is None:
+            return
+        with self._lock:
+            if self._next_due is None or next_run_at < self._next_due:
+                self._next_due = next_run_at
+                self._wakeup.set()
+
+    def sync_missing(self, db: Session) -> int:
+        """Calcula next_run_at de las CRON activas que no lo tienen (filas previas a la columna)."""
         automations = db.query(Automation).filter(
             Automation.trigger_type == AutomationTriggerType.CRON,
             Automation.is_active    == True,
+            Automation.next_run_at  == None,
+            shard_clause(Automation.user_id),
         ).all()
-
+        params = []
         for automation in automations:
+            next_run_at = next_run_for(automation)
+            if next_run_at is not None:
+                params.append({"b_id": automation.id, "b_next_run_at": next_run_at})
+        if params:
+            db.execute(NEXT_RUN_UPDATE, params)
+        db.commit()
+        return len(params)
+
+    def next_due(self, db: Session) -> datetime | None:
+        return db.query(func.min(Automation.next_run_at)).filter(
+            Automation.trigger_type == AutomationTriggerType.CRON,
+            Automation.is_active    == True,
+            shard_clause(Automation.user_id),
+        ).scalar()
+
+    # ── Ejecución ─────────────────────────────────────────────────────────────
+
+    def run_due(self, db: Session, now: datetime | None = None) -> int:
+        """Reclama las automations vencidas y las ejecuta (o encola, en modo queue). Devuelve cuántas reclamó."""
+        now  = now or datetime.now(timezone.utc)
+        rows = db.query(Automation).filter(
+            Automation.next_run_at  <= now,
+            Automation.trigger_type == AutomationTriggerType.CRON,
+            Automation.is_active    == True,
+            shard_clause(Automation.user_id),
+        ).order_by(
+            Automation.next_run_at
+        ).limit(DUE_BATCH_SIZE).with_for_update(skip_locked=True).all()
+
+        claimed, params, deactivated = [], [], set()
+        for automation in rows:
+            config = automation.trigger_config or {}
+            claimed.append((automation.id, automation.user_id, config.get("trigger_id")))
+            params.append({
+                "b_id":          automation.id,
+                "b_next_run_at": compute_next_run(config.get("trigger_id"), config, now, now),
+            })
+            if config.get("trigger_id") == SCHEDULE_ONCE:
+                automation.is_active = False
+                deactivated.add(automation.user_id)
+        if params:
+            db.execute(NEXT_RUN_UPDATE, params)
+
+        queued = get_settings()["AUTOMATIONS_EXECUTION_MODE"] != "inline"
+        if queued and claimed:
+            from .execution_queue import execution_queue
+            execution_queue.enqueue_scheduled(claimed, db)
+        db.commit()
+
+        if deactivated:
+            from ..core.trigger_index import trigger_index
+            for user_id in deactivated:
+                trigger_index.invalidate_user(user_id)
+
+        if not queued:
+            for automation_id, _, trigger_id in claimed:
+                self._run(automation_id, trigger_id, db)
+        return len(claimed)
+
+    def _run(self, automation_id: int, trigger_id: str, db: Session) -> None:
+        from .automation_runner import automation_runner
+
+        automation = db.get(Automation, automation_id)
+        if automation is None:
+            return
+        try:
+            logger.info(
+                f"Ejecutando automation CRON '{automation.name}' "
+                f"(id={automation.id}, trigger={trigger_id})"
+            )
+            _execute_automation(automation, db)
+        except Exception as e:
+            logger.error(f"Error al procesar automation CRON id={automation_id}: {e}")
+            db.rollback()
+            # next_run_at ya avanzó al reclamar; se registra el run igualmente
             try:
-                config = _get_trigger_config(automation)
-                if config is None:
-                    continue
+                automation_runner.record_run(automation, db)
+            except Exception:
+                db.rollback()
 
-                trigger_id = config.get("trigger_id")
-                if trigger_id not in _SYSTEM_CRON_TRIGGERS:
-                    continue
+    # ── Hilo ──────────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, poll_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(poll_seconds,), name="automations-cron-scheduler", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self, poll_seconds: float) -> None:
+        db = SessionLocal()
+        try:
+            with sharded_run():
+                self.sync_missing(db)
+        except Exception as e:
+            logger.error(f"Cron scheduler sync error: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+        while not self._stop.is_set():
+            wait = poll_seconds
+            db   = SessionLocal()
+            try:
+                with sharded_run():
+                    if self.run_due(db) >= DUE_BATCH_SIZE:
+                        continue
+                    next_due = self.next_due(db)
+                with self._lock:
+                    self._next_due = next_due
+                if next_due is not None:
+                    wait = min(poll_seconds, max(0.0, (next_due - datetime.now(timezone.utc)).total_seconds()))
+            except Exception as e:
+                logger.error(f"Cron scheduler error: {e}")
+                db.rollback()
+            finally:
+                db.close()
 
-                if trigger_id == "system.schedule_once":
-                    should_run = _should_run_once(config, automation.last_run_at)
-                else:
-                    should_run = _should_run_interval(config, automation.last_run_at)
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
 
-                if not should_run:
-                    continue
 
-                logger.info(
-                    f"Ejecutando automation CRON '{automation.name}' "
-                    f"(id={automation.id}, trigger={trigger_id})"
-                )
+# Singleton global
+cron_scheduler = CronScheduler()
 
-                _execute_automation(automation, db)
 
-                automation.last_run_at = datetime.now(timezone.utc)
-                automation.run_count   = (automation.run_count or 0) + 1
-                if trigger_id == "system.schedule_once":
-                    automation.is_active = False
-                db.commit()
+def start_cron_scheduler() -> None:
+    """Registra el scheduler de CRON como servicio del líder (app/core/scheduler.py)."""
+    from app.core.scheduler import scheduler_host
+
+    config = get_settings()
+    if not config["AUTOMATIONS_CRON_SCHEDULER_ENABLED"]:
+        logger.info("Automations CRON scheduler desactivado")
+        return
+    scheduler_host.add_leader_service(
+        lambda: cron_scheduler.start(config["AUTOMATIONS_CRON_POLL_SECONDS"]),
+        cron_scheduler.stop,
+        sharded=True,
+    )
+    logger.info("✅ Automations CRON scheduler registrado (corre en el líder)")
 
-            except Exception as e:
-                logger.error(f"Error al procesar automation CRON id={automation.id}: {e}")
-                db.rollback()
-                # Actualizar last_run_at incluso en fallo para evitar retry infinito
-                try:
-                    automation.last_run_at = datetime.now(timezone.utc)
-                    automation.run_count   = (automation.run_count or 0) + 1
-                    db.commit()
-                except Exception:
-                    db.rollback()
 
+def job_check_cron_automations() -> None:
+    """Ejecuta una vez las automations CRON vencidas (sin esperar al hilo)."""
+    db = SessionLocal()
+    try:
+        cron_scheduler.run_due(db)
     except Exception as e:
         logger.error(f"job_check_cron_automations error: {e}")
+        db.rollback()
     finally:
         db.close()
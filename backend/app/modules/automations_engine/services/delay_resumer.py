@@ -0,0 +1,230 @@
+"""
+Reanudación de ejecuciones suspendidas en nodos delay.
+
+Un delay ya no duerme el hilo: flow_executor devuelve status "waiting" con
+el cursor (nodos pendientes) y el ctx, y suspend() lo persiste en
+suspended_executions. Un hilo del motor las continúa al llegar resume_at.
+
+- Heap en memoria con los resume_at conocidos: el hilo duerme exactamente
+  hasta el siguiente vencimiento (o hasta que suspend() le avisa de uno antes).
+- Cada AUTOMATIONS_DELAY_POLL_SECONDS se recargan del BD los vencimientos
+  próximos — cubre suspensiones creadas por otros procesos o antes de un reinicio.
+- El BD es la fuente de verdad: las filas se reclaman con FOR UPDATE SKIP
+  LOCKED y un locked_until, así que varios procesos pueden convivir y una
+  entrada duplicada en el heap solo provoca una vuelta en vacío.
+- En modo "queue" el hilo solo reclama: cada reanudación se encola como job
+  (execution_queue.enqueue_resumes) y la ejecutan los workers, así un flujo
+  lento no retrasa al resto del lote más allá de su locked_until. En modo
+  "inline" (tests, desarrollo) se reanudan en el propio hilo.
+"""
+import heapq
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from ..core.compiled_flow import flow_cache
+from ..core.event_bus import LiveChannel
+from ..enums import ExecutionStatus
+from ..manifest import get_settings
+from ..models.automation import Automation
+from ..models.execution import Execution
+from ..models.suspended_execution import SuspendedExecution
+from .execution_service import execution_service
+from .flow_executor import flow_executor
+
+logger = logging.getLogger(__name__)
+
+RESUME_BATCH_SIZE = 50
+
+
+class DelayResumer:
+
+    def __init__(self):
+        self._heap: list[float] = []           # timestamps de resume_at
+        self._lock   = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop   = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ── Suspensión ────────────────────────────────────────────────────────────
+
+    def suspend(self, execution: Execution, result: dict, db: Session, commit: bool = True) -> Execution:
+        """Persiste cursor + ctx de una ejecución "waiting" y la deja en WAITING."""
+        row = db.query(SuspendedExecution).filter(
+            SuspendedExecution.execution_id == execution.id,
+        ).first()
+        if row is None:
+            row = SuspendedExecution(
+                execution_id  = execution.id,
+                automation_id = execution.automation_id,
+                user_id       = execution.user_id,
+            )
+            db.add(row)
+
+        row.resume_at    = result["resume_at"]
+        row.cursor       = result["cursor"]
+        row.ctx          = result["ctx"]
+        row.locked_until = None
+
+        execution = execution_service.mark_waiting(execution, result["node_logs"], db, commit=commit)
+        self._schedule(result["resume_at"])
+        return execution
+
+    # ── Reanudación ───────────────────────────────────────────────────────────
+
+    def resume_due(self, db: Session, now: datetime | None = None) -> int:
+        """Reclama las suspensiones vencidas y las continúa (o encola, en modo queue). Devuelve cuántas reclamó."""
+        now  = now or datetime.now(timezone.utc)
+        rows = db.query(SuspendedExecution).filter(
+            SuspendedExecution.resume_at <= now,
+            or_(SuspendedExecution.locked_until == None, SuspendedExecution.locked_until <= now),
+        ).order_by(
+            SuspendedExecution.resume_at
+        ).limit(RESUME_BATCH_SIZE).with_for_update(skip_locked=True).all()
+
+        lock_until = now + timedelta(seconds=get_settings()["AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS"])
+        for row in rows:
+            row.locked_until = lock_until
+        claimed = [(row.execution_id, row.automation_id, row.user_id) for row in rows]
+        db.commit()
+
+        if get_settings()["AUTOMATIONS_EXECUTION_MODE"] != "inline":
+            from .execution_queue import execution_queue
+            execution_queue.enqueue_resumes(claimed, db)
+            return len(claimed)
+
+        for execution_id, _, _ in claimed:
+            try:
+                self.resume_execution(execution_id, db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error reanudando ejecución {execution_id}: {e}")
+        return len(claimed)
+
+    def resume_execution(self, execution_id: int, db: Session) -> None:
+        """Continúa una ejecución suspendida (nada si otro ya la reanudó)."""
+        row = db.query(SuspendedExecution).filter(SuspendedExecution.execution_id == execution_id).first()
+        if row is not None:
+            self._resume(row, db)
+
+    def _resume(self, row: SuspendedExecution, db: Session) -> None:
+        execution = db.get(Execution, row.execution_id)
+        if execution is None or execution.status != ExecutionStatus.WAITING:
+            db.delete(row)
+            db.commit()
+            return
+
+        automation = db.query(Automation).filter(
+            Automation.id        == row.automation_id,
+            Automation.is_active == True,
+        ).first()
+        if automation is None:
+            db.delete(row)
+            execution_service.mark_failed(
+                execution, "Automatización desactivada durante la espera", execution.node_logs or [], db,
+            )
+            return
+
+        logger.info(f"Reanudando ejecución {execution.id} de '{automation.name}' (id={automation.id})")
+        result = flow_executor.resume(
+            flow_cache.get(automation),
+            cursor=row.cursor,
+            ctx=row.ctx,
+            node_logs=list(execution.node_logs or []),
+            db=db,
+            user_id=row.user_id,
+            live=LiveChannel(automation.id, execution.id),
+        )
+
+        if result["status"] != "waiting":
+            db.delete(row)
+        execution_service.finish(execution, result, db, previous_outputs=execution.node_outputs)
+
+    # ── Hilo ──────────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, poll_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(poll_seconds,), name="automations-delay-resumer", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def next_wakeup(self, now: float, poll_seconds: float) -> float:
+        """Segundos hasta el próximo vencimiento conocido, como mucho poll_seconds."""
+        with self._lock:
+            if not self._heap:
+                return poll_seconds
+            return max(0.0, min(self._heap[0] - now, poll_seconds))
+
+    def _schedule(self, resume_at: datetime) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, resume_at.timestamp())
+        self._wakeup.set()
+
+    def _pop_due(self, now: float) -> int:
+        with self._lock:
+            due = 0
+            while self._heap and self._heap[0] <= now:
+                heapq.heappop(self._heap)
+                due += 1
+            return due
+
+    def _refill(self, db: Session, horizon_seconds: float) -> None:
+        """Carga en el heap los vencimientos de los próximos horizon_seconds."""
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=horizon_seconds)
+        rows = db.query(SuspendedExecution.resume_at).filter(
+            SuspendedExecution.resume_at <= horizon,
+        ).order_by(SuspendedExecution.resume_at).limit(RESUME_BATCH_SIZE).all()
+        with self._lock:
+            for (resume_at,) in rows:
+                heapq.heappush(self._heap, resume_at.timestamp())
+
+    def _loop(self, poll_seconds: float) -> None:
+        last_refill = 0.0
+        while not self._stop.is_set():
+            now = datetime.now(timezone.utc).timestamp()
+            db  = SessionLocal()
+            try:
+                if now - last_refill >= poll_seconds:
+                    self._refill(db, poll_seconds)
+                    last_refill = now
+                if self._pop_due(now):
+                    self.resume_due(db)
+            except Exception as e:
+                logger.error(f"Delay resumer error: {e}")
+                db.rollback()
+            finally:
+                db.close()
+
+            self._wakeup.clear()
+            self._wakeup.wait(self.next_wakeup(datetime.now(timezone.utc).timestamp(), poll_seconds))
+
+
+# Singleton global
+delay_resumer = DelayResumer()
+
+
+def start_delay_resumer() -> None:
+    """Arranca el hilo que reanuda las ejecuciones suspendidas en nodos delay."""
+    config = get_settings()
+    if not config["AUTOMATIONS_DELAY_RESUMER_ENABLED"]:
+        logger.info("Delay resumer desactivado")
+        return
+    delay_resumer.start(config["AUTOMATIONS_DELAY_POLL_SECONDS"])
+    logger.info("✅ Automations delay resumer iniciado")
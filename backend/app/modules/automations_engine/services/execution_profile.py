@@ -0,0 +1,341 @@
+"""
+Perfil de rendimiento por automation y nodo.
+
+Los node_logs ya traen duration_ms por nodo, pero nada los agregaba: saber qué
+nodo hace lenta una automation obligaba a revisar ejecuciones a mano. Ahora,
+al cerrar cada ejecución, sus duraciones se suman a un histograma horario en
+node_latency_stats (un upsert por lote, sin releer executions.node_logs):
+
+- Una fila por (automation, nodo, hora) con calls, errors, total_ms, max_ms y
+  un histograma de cubetas fijas (BOUNDS_MS, escala aproximadamente logarítmica).
+- node_id = "" es la ejecución completa: suma de las duraciones de sus nodos
+  (el tiempo de cómputo, sin contar la espera de los delays).
+- Los percentiles se interpolan dentro de la cubeta: el error está acotado por
+  el ancho de la cubeta, no por el número de ejecuciones.
+
+execution_service.finish (y el write-behind) solo suman en memoria; un hilo
+daemon vuelca lo acumulado cada AUTOMATIONS_PROFILE_FLUSH_SECONDS con un único
+upsert, así cerrar una ejecución no cuesta ninguna escritura más. Una
+ejecución suspendida en un delay registra sus nodos al suspenderse y, al
+reanudarse, solo los nuevos.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from ..manifest import get_settings
+from ..models.automation import Automation
+from ..models.node_latency_stat import NodeLatencyStat
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_NODE = ""
+
+# Límite superior (inclusive) de cada cubeta en ms; la última cubeta es "más de 60 s"
+BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 30_000, 60_000)
+BUCKETS   = len(BOUNDS_MS) + 1
+
+PERCENTILES = (0.50, 0.95, 0.99)
+
+_stats = NodeLatencyStat.__table__
+_insert = insert(_stats)
+
+# Los histogramas se suman elemento a elemento al chocar con la fila de la hora
+PROFILE_UPSERT = _insert.on_conflict_do_update(
+    index_elements=[_stats.c.automation_id, _stats.c.node_id, _stats.c.bucket_start],
+    set_={
+        "calls":     _stats.c.calls + _insert.excluded.calls,
+        "errors":    _stats.c.errors + _insert.excluded.errors,
+        "total_ms":  _stats.c.total_ms + _insert.excluded.total_ms,
+        "max_ms":    func.greatest(_stats.c.max_ms, _insert.excluded.max_ms),
+        "histogram": literal_column(
+            "ARRAY(SELECT a + b FROM unnest(automations.node_latency_stats.histogram, excluded.histogram) AS t(a, b))"
+        ),
+    },
+)
+
+
+def bucket_of(duration_ms: int) -> int:
+    return bisect_left(BOUNDS_MS, duration_ms)
+
+
+def hour_of(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _row(automation_id: int, node_id: str, bucket_start: datetime) -> dict:
+    return {
+        "automation_id": automation_id,
+        "node_id":       node_id,
+        "bucket_start":  bucket_start,
+        "calls":         0,
+        "errors":        0,
+        "total_ms":      0,
+        "max_ms":        0,
+        "histogram":     [0] * BUCKETS,
+    }
+
+
+def _add(row: dict, duration_ms: int, failed: bool) -> None:
+    row["calls"]    += 1
+    row["errors"]   += 1 if failed else 0
+    row["total_ms"] += duration_ms
+    row["max_ms"]    = max(row["max_ms"], duration_ms)
+    row["histogram"][bucket_of(duration_ms)] += 1
+
+
+def profile_rows(
+    automation_id: int,
+    node_logs: list,
+    status: str,
+    at: Optional[datetime] = None,
+    new_from: int = 0,
+) -> list[dict]:
+    """
+    Filas de upsert para una ejecución. node_logs[new_from:] son los nodos aún no
+    registrados; la fila de la ejecución completa solo se añade si status es
+    terminal (success/failed/skipped) y suma todos los nodos. Sin node_logs
+    (flow_executor lanzó) no hay duraciones que registrar.
+    """
+    bucket_start = hour_of(at or datetime.now(timezone.utc))
+    rows: dict[str, dict] = {}
+
+    for log in node_logs[new_from:]:
+        if log.get("status") not in ("success", "failed"):
+            continue
+        row = rows.get(log["node_id"])
+        if row is None:
+            row = rows[log["node_id"]] = _row(automation_id, log["node_id"], bucket_start)
+        _add(row, int(log.get("duration_ms") or 0), log["status"] == "failed")
+
+    if status != "waiting" and node_logs:
+        total = sum(int(log.get("duration_ms") or 0) for log in node_logs)
+        row   = rows[EXECUTION_NODE] = _row(automation_id, EXECUTION_NODE, bucket_start)
+        _add(row, total, status == "failed")
+
+    return list(rows.values())
+
+
+def merge_rows(merged: dict[tuple, dict], rows: Iterable[dict]) -> None:
+    """
+    Suma las filas en merged por clave: un INSERT multi-VALUES con ON CONFLICT
+    no puede tocar dos veces la misma fila.
+    """
+    for row in rows:
+        key     = (row["automation_id"], row["node_id"], row["bucket_start"])
+        current = merged.get(key)
+        if current is None:
+            merged[key] = {**row, "histogram": list(row["histogram"])}
+            continue
+        current["calls"]    += row["calls"]
+        current["errors"]   += row["errors"]
+        current["total_ms"] += row["total_ms"]
+        current["max_ms"]    = max(current["max_ms"], row["max_ms"])
+        current["histogram"] = [a + b for a, b in zip(current["histogram"], row["histogram"])]
+
+
+def percentile(histogram: list[int], q: float, max_ms: int) -> Optional[int]:
+    """Percentil q interpolado linealmente dentro de su cubeta."""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank       = q * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        if count and cumulative + count >= rank:
+            lower = BOUNDS_MS[index - 1] if index > 0 else 0
+            upper = BOUNDS_MS[index] if index < len(BOUNDS_MS) else max(max_ms, lower)
+            value = lower + (upper - lower) * (rank - cumulative) / count
+            return int(round(min(value, max_ms)))
+        cumulative += count
+    return max_ms
+
+
+def _summary(calls: int, errors: int, total_ms: int, max_ms: int, histogram: list[int]) -> dict:
+    p50, p95, p99 = (percentile(histogram, q, max_ms) for q in PERCENTILES)
+    return {
+        "calls":       calls,
+        "errors":      errors,
+        "error_rate":  round(errors / calls, 4) if calls else 0.0,
+        "avg_ms":      int(total_ms / calls) if calls else None,
+        "max_ms":      max_ms,
+        "p50_ms":      p50,
+        "p95_ms":      p95,
+        "p99_ms":      p99,
+    }
+
+
+def _aggregate(rows: Iterable[NodeLatencyStat]) -> dict[tuple, dict]:
+    totals: dict[tuple, list] = {}
+    for row in rows:
+        key     = (row.automation_id, row.node_id)
+        current = totals.get(key)
+        if current is None:
+            totals[key] = [row.calls, row.errors, row.total_ms, row.max_ms, list(row.histogram)]
+            continue
+        current[0] += row.calls
+        current[1] += row.errors
+        current[2] += row.total_ms
+        current[3]  = max(current[3], row.max_ms)
+        current[4]  = [a + b for a, b in zip(current[4], row.histogram)]
+    return {key: _summary(*values) for key, values in totals.items()}
+
+
+class ExecutionProfile:
+
+    def __init__(self):
+        self._pending: dict[tuple, dict] = {}   # (automation_id, node_id, hora) → fila
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, rows: list[dict]) -> None:
+        """Suma las filas de profile_rows a lo pendiente de volcar."""
+        if rows:
+            with self._lock:
+                merge_rows(self._pending, rows)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def discard(self, automation_id: Optional[int] = None) -> None:
+        """Descarta lo pendiente (de una automation, o todo)."""
+        with self._lock:
+            if automation_id is None:
+                self._pending = {}
+                return
+            self._pending = {key: row for key, row in self._pending.items() if key[0] != automation_id}
+
+    def flush(self) -> int:
+        """Escribe lo acumulado con un upsert. Devuelve cuántas filas tocó."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            # Las filas de automations ya borradas violarían la FK en cada reintento
+            # y bloquearían el volcado de todas; FOR KEY SHARE impide que una
+            # automation se borre entre esta lectura y el upsert.
+            automation_ids = {key[0] for key in pending}
+            existing = set(db.execute(
+                select(Automation.id).where(Automation.id.in_(automation_ids)).with_for_update(key_share=True)
+            ).scalars())
+            rows = [row for key, row in pending.items() if key[0] in existing]
+            if rows:
+                db.execute(PROFILE_UPSERT, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error volcando {len(pending)} filas del perfil de ejecución: {e}")
+            self.add(list(pending.values()))
+            return 0
+        finally:
+            db.close()
+        return len(rows)
+
+    def get_profile(self, automation_id: int, db: Session, hours: int = 24, now: datetime | None = None) -> dict:
+        """Resumen de la ejecución completa y de cada nodo (más tiempo total primero)."""
+        since = hour_of(now or datetime.now(timezone.utc)) - timedelta(hours=hours - 1)
+        rows  = db.query(NodeLatencyStat).filter(
+            NodeLatencyStat.automation_id == automation_id,
+            NodeLatencyStat.bucket_start  >= since,
+        ).all()
+
+        summaries = _aggregate(rows)
+        execution = summaries.pop((automation_id, EXECUTION_NODE), None)
+        nodes     = [{"node_id": node_id, **summary} for (_, node_id), summary in summaries.items()]
+        nodes.sort(key=lambda node: (node["avg_ms"] or 0) * node["calls"], reverse=True)
+        return {
+            "automation_id": automation_id,
+            "since":         since,
+            "hours":         hours,
+            "execution":     execution,
+            "nodes":         nodes,
+        }
+
+    def slowest(
+        self,
+        db: Session,
+        user_id: Optional[int] = None,
+        hours: int = 24,
+        limit: int = 10,
+        now: datetime | None = None,
+    ) -> list[dict]:
+        """
+        Automations con mayor p95 de ejecución completa en la ventana.
+        user_id=None las compara todas (uso de operación, p. ej. desde un job o shell).
+        """
+        since = hour_of(now or datetime.now(timezone.utc)) - timedelta(hours=hours - 1)
+        query = db.query(NodeLatencyStat, Automation.name, Automation.user_id).join(
+            Automation, Automation.id == NodeLatencyStat.automation_id,
+        ).filter(
+            NodeLatencyStat.node_id      == EXECUTION_NODE,
+            NodeLatencyStat.bucket_start >= since,
+        )
+        if user_id is not None:
+            query = query.filter(Automation.user_id == user_id)
+
+        rows   = query.all()
+        owners = {stat.automation_id: (name, owner) for stat, name, owner in rows}
+        ranked = [
+            {"automation_id": automation_id, "name": owners[automation_id][0], "user_id": owners[automation_id][1], **summary}
+            for (automation_id, _), summary in _aggregate(stat for stat, _, _ in rows).items()
+        ]
+        ranked.sort(key=lambda item: (item["p95_ms"] or 0, item["avg_ms"] or 0), reverse=True)
+        return ranked[:limit]
+
+    def purge(self, db: Session, now: datetime | None = None) -> int:
+        """Borra las horas más viejas que AUTOMATIONS_PROFILE_RETENTION_DAYS."""
+        cutoff  = hour_of(now or datetime.now(timezone.utc)) - timedelta(days=get_settings()["AUTOMATIONS_PROFILE_RETENTION_DAYS"])
+        deleted = db.query(NodeLatencyStat).filter(NodeLatencyStat.bucket_start < cutoff).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+
+    # ── Hilo ──────────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, flush_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(flush_seconds,), name="automations-execution-profile", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def _loop(self, flush_seconds: float) -> None:
+        while not self._stop.wait(flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Execution profile error: {e}")
+
+
+# Singleton global
+execution_profile = ExecutionProfile()
+
+
+def start_execution_profile() -> None:
+    """Arranca el volcado periódico del perfil de ejecución."""
+    execution_profile.start(get_settings()["AUTOMATIONS_PROFILE_FLUSH_SECONDS"])
+    logger.info("✅ Automations execution profile iniciado")
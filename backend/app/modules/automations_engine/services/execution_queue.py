@@ -0,0 +1,475 @@
+"""
+Cola de ejecuciones del automations_engine.
+
+Los dispatchers de los módulos llaman a execution_queue.dispatch() justo
+después de la escritura de dominio. En modo "queue" (por defecto) solo se
+inserta un job por automation suscrita y el request vuelve enseguida; los
+flujos (webhooks salientes, delays...) los ejecuta el pool de workers.
+
+- Claim con SELECT ... FOR UPDATE SKIP LOCKED: varios workers y varios
+  procesos comparten la tabla sin pisarse.
+- Visibility timeout: al reclamar un job se fija locked_until; si el worker
+  muere, el job vuelve a estar disponible cuando expira. Mientras el flujo
+  corre, un hilo de latido lo renueva cada tercio del timeout: un flujo
+  largo pero vivo no se vuelve a reclamar ni se marca "worker interrumpido".
+- Retry con backoff exponencial cuando la ejecución lanza (BD caída, bug...).
+  Un flujo que termina en "failed" ya queda registrado en executions y no
+  se reintenta — repetir sus nodos podría duplicar efectos externos.
+
+En modo "inline" (tests, desarrollo) dispatch() ejecuta en el propio request
+como antes.
+
+Los schedulers disparan con dispatch_many(): todos los eventos de un tick
+para un trigger_ref se resuelven contra el índice en una query y se encolan
+en un solo INSERT, en lugar de dos o tres queries por evento.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import insert, or_, and_, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from ..core.schedule import SCHEDULE_ONCE
+from ..core.trigger_index import trigger_index
+from ..enums import ExecutionJobStatus, ExecutionStatus
+from ..manifest import get_settings
+from ..models.automation import Automation
+from ..models.execution import Execution
+from ..models.execution_job import ExecutionJob
+from .automation_runner import automation_runner
+from .execution_service import execution_id_of, execution_service
+from .execution_write_buffer import start_execution_write_buffer
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 3600
+HEARTBEAT_FRACTION  = 3   # latidos por visibility timeout
+
+# trigger_ref de los jobs que reanudan una ejecución suspendida en un delay
+RESUME_TRIGGER_REF = "system.delay_resume"
+
+
+class ExecutionQueue:
+
+    def dispatch(self, trigger_ref: str, payload: dict, user_id: int, db: Session) -> None:
+        """
+        Encola (o ejecuta, en modo inline) las automations activas suscritas a
+        trigger_ref cuyo prefilter acepta el payload.
+        """
+        entries = trigger_index.match(trigger_ref, payload, user_id, db)
+        if not entries:
+            return
+
+        if get_settings()["AUTOMATIONS_EXECUTION_MODE"] == "inline":
+            self._run_inline(trigger_ref, entries, payload, user_id, db)
+            return
+
+        self.enqueue([e.automation_id for e in entries], trigger_ref, payload, user_id, db)
+
+    def dispatch_many(self, trigger_ref: str, events: list[tuple[int, dict]], db: Session) -> int:
+        """
+        dispatch() para un lote de eventos (user_id, payload) del mismo
+        trigger_ref. Número de queries constante respecto al tamaño del lote.
+        Devuelve cuántas ejecuciones se encolaron (o lanzaron, en modo inline).
+        """
+        matches = trigger_index.match_many(trigger_ref, events, db)
+        if not matches:
+            return 0
+
+        if get_settings()["AUTOMATIONS_EXECUTION_MODE"] == "inline":
+            self._run_inline_many(trigger_ref, matches, db)
+            return len(matches)
+
+        max_attempts = get_settings()["AUTOMATIONS_JOB_MAX_ATTEMPTS"]
+        db.execute(insert(ExecutionJob.__table__), [
+            {
+                "automation_id": entry.automation_id,
+                "user_id":       user_id,
+                "trigger_ref":   trigger_ref,
+                "payload":       payload,
+                "status":        ExecutionJobStatus.QUEUED,
+                "attempts":      0,
+                "max_attempts":  max_attempts,
+            }
+            for entry, user_id, payload in matches
+        ])
+        db.commit()
+        logger.info(f"Encolados {len(matches)} jobs via {trigger_ref} ({len(events)} eventos)")
+        return len(matches)
+
+    def enqueue(
+        self,
+        automation_ids: list[int],
+        trigger_ref: str | None,
+        payload: dict,
+        user_id: int,
+        db: Session,
+    ) -> list[ExecutionJob]:
+        max_attempts = get_settings()["AUTOMATIONS_JOB_MAX_ATTEMPTS"]
+        jobs = [
+            ExecutionJob(
+                automation_id = automation_id,
+                user_id       = user_id,
+                trigger_ref   = trigger_ref,
+                payload       = payload,
+                status        = ExecutionJobStatus.QUEUED,
+                attempts      = 0,
+                max_attempts  = max_attempts,
+            )
+            for automation_id in automation_ids
+        ]
+        db.add_all(jobs)
+        db.commit()
+        logger.info(f"Encolados {len(jobs)} jobs via {trigger_ref} (user_id={user_id})")
+        return jobs
+
+    def enqueue_executions(
+        self,
+        automation_id: int,
+        user_id: int,
+        trigger_ref: str | None,
+        payloads: list[dict],
+        db: Session,
+    ) -> list[int]:
+        """
+        Crea las Execution en PENDING y un job por cada una en una sola transacción.
+        El llamador tiene el execution_id antes de que corra el flujo; el worker
+        adopta esa Execution en lugar de crear otra. Devuelve los execution_id.
+        """
+        execution_ids = execution_service.start_many(automation_id, user_id, payloads, db)
+        max_attempts  = get_settings()["AUTOMATIONS_JOB_MAX_ATTEMPTS"]
+        db.execute(insert(ExecutionJob.__table__), [
+            {
+                "automation_id": automation_id,
+                "user_id":       user_id,
+                "trigger_ref":   trigger_ref,
+                "payload":       payload,
+                "status":        ExecutionJobStatus.QUEUED,
+                "attempts":      0,
+                "max_attempts":  max_attempts,
+                "execution_id":  execution_id,
+            }
+            for payload, execution_id in zip(payloads, execution_ids)
+        ])
+        db.commit()
+        logger.info(f"Encoladas {len(execution_ids)} ejecuciones de automation_id={automation_id} via {trigger_ref}")
+        return execution_ids
+
+    def enqueue_scheduled(self, runs: list[tuple[int, int, str]], db: Session) -> None:
+        """
+        Encola los disparos (automation_id, user_id, trigger_id) que cron_scheduler
+        acaba de reclamar. Sin commit: va en la transacción del claim, así un
+        disparo no se pierde ni se duplica entre el claim y el encolado.
+        """
+        max_attempts = get_settings()["AUTOMATIONS_JOB_MAX_ATTEMPTS"]
+        db.execute(insert(ExecutionJob.__table__), [
+            {
+                "automation_id": automation_id,
+                "user_id":       user_id,
+                "trigger_ref":   trigger_id,
+                "payload":       {},
+                "status":        ExecutionJobStatus.QUEUED,
+                "attempts":      0,
+                "max_attempts":  max_attempts,
+            }
+            for automation_id, user_id, trigger_id in runs
+        ])
+
+    def enqueue_resumes(self, suspended: list[tuple[int, int, int]], db: Session) -> int:
+        """
+        Encola la reanudación de ejecuciones suspendidas (execution_id, automation_id,
+        user_id) que delay_resumer ya reclamó. Si una ya tiene un job vivo (la cola
+        va con retraso y venció el locked_until de la fila) no se duplica.
+        """
+        if not suspended:
+            return 0
+        live = set(db.execute(select(ExecutionJob.execution_id).where(
+            ExecutionJob.trigger_ref  == RESUME_TRIGGER_REF,
+            ExecutionJob.execution_id.in_([execution_id for execution_id, _, _ in suspended]),
+            ExecutionJob.status.in_((ExecutionJobStatus.QUEUED, ExecutionJobStatus.RUNNING)),
+        )).scalars())
+        rows = [
+            {
+                "automation_id": automation_id,
+                "user_id":       user_id,
+                "trigger_ref":   RESUME_TRIGGER_REF,
+                "status":        ExecutionJobStatus.QUEUED,
+                "attempts":      0,
+                "max_attempts":  get_settings()["AUTOMATIONS_JOB_MAX_ATTEMPTS"],
+                "execution_id":  execution_id,
+            }
+            for execution_id, automation_id, user_id in suspended
+            if execution_id not in live
+        ]
+        if rows:
+            db.execute(insert(ExecutionJob.__table__), rows)
+        db.commit()
+        return len(rows)
+
+    def claim(self, db: Session) -> ExecutionJob | None:
+        """Reclama el siguiente job disponible (o con visibility timeout expirado)."""
+        now = datetime.now(timezone.utc)
+        job = db.query(ExecutionJob).filter(
+            or_(
+                and_(ExecutionJob.status == ExecutionJobStatus.QUEUED,  ExecutionJob.available_at <= now),
+                and_(ExecutionJob.status == ExecutionJobStatus.RUNNING, ExecutionJob.locked_until <= now),
+            )
+        ).order_by(
+            ExecutionJob.available_at, ExecutionJob.id
+        ).with_for_update(skip_locked=True).first()
+
+        if not job:
+            db.commit()
+            return None
+
+        job.status       = ExecutionJobStatus.RUNNING
+        job.attempts     = (job.attempts or 0) + 1
+        job.locked_until = now + timedelta(seconds=get_settings()["AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS"])
+        db.commit()
+        return job
+
+    def process_next(self, db: Session) -> ExecutionJob | None:
+        """Reclama y ejecuta un job. Devuelve el job procesado o None si la cola está vacía."""
+        job = self.claim(db)
+        if not job:
+            return None
+        if job.trigger_ref == RESUME_TRIGGER_REF:
+            return self._process_resume(job, db)
+
+        execution = self._adopt_or_abandon_execution(job, db)
+
+        if job.attempts > job.max_attempts:
+            self._finish(job, ExecutionJobStatus.FAILED, db, error="visibility timeout agotado")
+            return job
+
+        # Un schedule_once se desactiva al reclamarlo: su único disparo corre igualmente
+        automation = db.query(Automation).filter(
+            Automation.id == job.automation_id,
+            or_(Automation.is_active == True, job.trigger_ref == SCHEDULE_ONCE),
+        ).first()
+        if not automation:
+            # Desactivada o borrada desde que se encoló
+            if execution is not None:
+                execution_service.mark_failed(execution, "Automatización desactivada antes de ejecutarse", [], db)
+            self._finish(job, ExecutionJobStatus.DONE, db)
+            return job
+
+        try:
+            if execution is None:
+                execution = execution_service.start(automation.id, job.user_id, job.payload or {}, db, commit=False)
+                job.execution_id = execution_id_of(execution)
+            else:
+                execution.status = ExecutionStatus.RUNNING
+            db.commit()
+
+            logger.info(
+                f"Worker ejecutando automatización '{automation.name}' "
+                f"(id={automation.id}, job={job.id}, intento={job.attempts})"
+            )
+            with self._heartbeat(job):
+                automation_runner.run(automation, job.payload or {}, job.user_id, db, execution=execution)
+            self._finish(job, ExecutionJobStatus.DONE, db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error ejecutando job {job.id} (automation_id={job.automation_id}): {e}")
+            self._retry_or_fail(job, str(e), db)
+
+        return job
+
+    def _process_resume(self, job: ExecutionJob, db: Session) -> ExecutionJob:
+        from .delay_resumer import delay_resumer
+        try:
+            with self._heartbeat(job):
+                delay_resumer.resume_execution(job.execution_id, db)
+            self._finish(job, ExecutionJobStatus.DONE, db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error reanudando ejecución {job.execution_id} (job {job.id}): {e}")
+            self._retry_or_fail(job, str(e), db)
+        return job
+
+    def extend_lease(self, job_id: int, attempts: int) -> bool:
+        """
+        Renueva locked_until de un job en curso con su propia sesión (la del worker
+        está ocupada con el flujo). Solo si sigue siendo el mismo intento.
+        """
+        timeout = get_settings()["AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS"]
+        db = SessionLocal()
+        try:
+            updated = db.query(ExecutionJob).filter(
+                ExecutionJob.id       == job_id,
+                ExecutionJob.status   == ExecutionJobStatus.RUNNING,
+                ExecutionJob.attempts == attempts,
+            ).update(
+                {"locked_until": datetime.now(timezone.utc) + timedelta(seconds=timeout)},
+                synchronize_session=False,
+            )
+            db.commit()
+            return updated == 1
+        except Exception as e:
+            logger.error(f"No se pudo renovar locked_until del job {job_id}: {e}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    @contextmanager
+    def _heartbeat(self, job: ExecutionJob):
+        """Latido del job mientras corre el bloque: renueva locked_until cada tercio del timeout."""
+        interval = get_settings()["AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS"] / HEARTBEAT_FRACTION
+        job_id, attempts = job.id, job.attempts
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                self.extend_lease(job_id, attempts)
+
+        thread = threading.Thread(target=beat, name=f"automations-job-{job_id}-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def _run_inline(self, trigger_ref: str, entries: list, payload: dict, user_id: int, db: Session) -> None:
+        for automation in trigger_index.get_automations(trigger_ref, user_id, db, entries=entries):
+            try:
+                logger.info(
+                    f"Disparando automatización '{automation.name}' "
+                    f"(id={automation.id}) via {trigger_ref}"
+                )
+                automation_runner.run(automation, payload, user_id, db)
+            except Exception as e:
+                logger.error(
+                    f"Error ejecutando automatización '{automation.name}' "
+                    f"(id={automation.id}): {e}"
+                )
+
+    def _run_inline_many(self, trigger_ref: str, matches: list, db: Session) -> None:
+        automations = {
+            automation.id: automation
+            for automation in db.query(Automation).filter(
+                Automation.id.in_({entry.automation_id for entry, _, _ in matches}),
+                Automation.is_active == True,
+            ).all()
+        }
+        for entry, user_id, payload in matches:
+            automation = automations.get(entry.automation_id)
+            if automation is None:
+                continue
+            try:
+                logger.info(
+                    f"Disparando automatización '{automation.name}' "
+                    f"(id={automation.id}) via {trigger_ref}"
+                )
+                automation_runner.run(automation, payload, user_id, db)
+            except Exception as e:
+                logger.error(
+                    f"Error ejecutando automatización '{automation.name}' "
+                    f"(id={automation.id}): {e}"
+                )
+
+    def _adopt_or_abandon_execution(self, job: ExecutionJob, db: Session) -> Execution | None:
+        """
+        PENDING: la creó quien encoló (enqueue_executions) y se adopta.
+        RUNNING: el job viene de un worker caído; se cierra la Execution que dejó a medias.
+        """
+        if not job.execution_id:
+            return None
+        execution = db.query(Execution).filter(Execution.id == job.execution_id).first()
+        if execution is None:
+            return None
+        if execution.status == ExecutionStatus.PENDING:
+            return execution
+        if execution.status == ExecutionStatus.RUNNING:
+            execution_service.mark_failed(execution, "worker interrumpido", execution.node_logs or [], db)
+        return None
+
+    def _retry_or_fail(self, job: ExecutionJob, error: str, db: Session) -> None:
+        if job.attempts >= job.max_attempts:
+            self._finish(job, ExecutionJobStatus.FAILED, db, error=error)
+            return
+        job.status       = ExecutionJobStatus.QUEUED
+        job.available_at = datetime.now(timezone.utc) + timedelta(seconds=self._backoff(job.attempts))
+        job.locked_until = None
+        job.last_error   = error
+        db.commit()
+
+    def _backoff(self, attempts: int) -> float:
+        base = get_settings()["AUTOMATIONS_JOB_BACKOFF_SECONDS"]
+        return min(base * (2 ** (attempts - 1)), MAX_BACKOFF_SECONDS)
+
+    def _finish(self, job: ExecutionJob, status: ExecutionJobStatus, db: Session, error: str | None = None) -> None:
+        job.status       = status
+        job.finished_at  = datetime.now(timezone.utc)
+        job.locked_until = None
+        if error is not None:
+            job.last_error = error
+        db.commit()
+
+
+class ExecutionWorkerPool:
+    """Hilos daemon que consumen execution_jobs. Cada worker usa su propia sesión."""
+
+    def __init__(self):
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self, worker_count: int, poll_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._loop,
+                args=(poll_seconds,),
+                name=f"automations-worker-{i}",
+                daemon=True,
+            )
+            for i in range(worker_count)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _loop(self, poll_seconds: float) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                job = execution_queue.process_next(db)
+            except Exception as e:
+                logger.error(f"Worker de automatizaciones error: {e}")
+                db.rollback()
+                job = None
+            finally:
+                db.close()
+            if job is None:
+                self._stop.wait(poll_seconds)
+
+
+# Singletons globales
+execution_queue = ExecutionQueue()
+worker_pool     = ExecutionWorkerPool()
+
+
+def start_execution_workers() -> None:
+    """Arranca el pool de workers de la cola (en modo inline solo el write-behind, si está activo)."""
+    config = get_settings()
+    start_execution_write_buffer()
+    if config["AUTOMATIONS_EXECUTION_MODE"] == "inline":
+        logger.info("Automations en modo inline — workers de cola no iniciados")
+        return
+    worker_pool.start(config["AUTOMATIONS_WORKER_COUNT"], config["AUTOMATIONS_WORKER_POLL_SECONDS"])
+    logger.info(f"✅ Automations workers iniciados ({config['AUTOMATIONS_WORKER_COUNT']})")
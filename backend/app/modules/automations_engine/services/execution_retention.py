@@ -0,0 +1,281 @@
+"""
+Particiones mensuales, retención y resumen diario de automations.executions.
+
+executions está particionada por rango de started_at: una partición por mes
+(executions_pYYYYMM) más executions_default para lo que caiga fuera.
+
+Mantenimiento diario (job_execution_maintenance):
+1. ensure_partitions() crea el mes actual y los AUTOMATIONS_EXECUTION_PARTITIONS_AHEAD
+   siguientes. Si la partición DEFAULT ya tiene filas de ese mes, se mueven.
+2. apply_retention():
+   - El horizonte global es la retención más larga (default o política de algún usuario).
+     Las particiones enteras más viejas que el horizonte se resumen y se hacen DROP,
+     sin DELETE fila a fila.
+   - Los usuarios con retención más corta que el horizonte se limpian con DELETE
+     por usuario (resumen antes).
+   Solo se borran ejecuciones terminadas (TERMINAL): una WAITING (delay) o
+   PENDING/RUNNING más vieja que el corte se conserva. Al soltar una partición
+   se hace DETACH, sus filas no terminadas se reinsertan en el padre (van a
+   DEFAULT, el rango ya no está cubierto) y después DROP.
+   El resumen va a execution_daily_stats: conteos por estado, p50/p95 exactos
+   de duration_ms por automation y día (UTC) y el histograma de duraciones con
+   las cubetas de execution_profile. Los percentiles no se pueden fusionar: si
+   un día se resume dos veces, el upsert suma los histogramas y descarta los
+   exactos, y p50/p95 pasan a interpolarse del histograma.
+"""
+import logging
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from ..manifest import get_settings
+from .execution_profile import BOUNDS_MS, BUCKETS
+from ..models.execution_retention_policy import ExecutionRetentionPolicy
+from ..exceptions import InvalidRetentionPolicyError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA            = "automations"
+PARENT            = f"{SCHEMA}.executions"
+DEFAULT_PARTITION = f"{SCHEMA}.executions_default"
+PARTITION_PREFIX  = "executions_p"
+
+TERMINAL = "status IN ('SUCCESS', 'FAILED', 'SKIPPED')"
+
+# bucket_of() en SQL: BOUNDS_MS son límites superiores inclusivos y width_bucket
+# cuenta los límites <= valor, de ahí el duration_ms - 1
+_BUCKET = f"width_bucket(duration_ms - 1, ARRAY{list(BOUNDS_MS)})"
+_HISTOGRAM = "ARRAY[" + ", ".join(f"count(*) FILTER (WHERE {_BUCKET} = {i})" for i in range(BUCKETS)) + "]"
+
+_ROLLUP_SQL = """
+    INSERT INTO automations.execution_daily_stats AS s (
+        automation_id, day, user_id, total, success_count, failed_count, other_count,
+        p50_duration_ms, p95_duration_ms, max_duration_ms, duration_histogram
+    )
+    SELECT
+        automation_id,
+        (started_at AT TIME ZONE 'UTC')::date AS day,
+        min(user_id),
+        count(*),
+        count(*) FILTER (WHERE status = 'SUCCESS'),
+        count(*) FILTER (WHERE status = 'FAILED'),
+        count(*) FILTER (WHERE status NOT IN ('SUCCESS', 'FAILED')),
+        percentile_cont(0.5)  WITHIN GROUP (ORDER BY duration_ms),
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms),
+        max(duration_ms),
+        """ + _HISTOGRAM + """
+    FROM {source}
+    WHERE {where}
+    GROUP BY automation_id, day
+    ON CONFLICT (automation_id, day) DO UPDATE SET
+        total              = s.total         + EXCLUDED.total,
+        success_count      = s.success_count + EXCLUDED.success_count,
+        failed_count       = s.failed_count  + EXCLUDED.failed_count,
+        other_count        = s.other_count   + EXCLUDED.other_count,
+        p50_duration_ms    = NULL,
+        p95_duration_ms    = NULL,
+        max_duration_ms    = GREATEST(s.max_duration_ms, EXCLUDED.max_duration_ms),
+        duration_histogram = CASE WHEN s.duration_histogram IS NULL THEN NULL ELSE
+            ARRAY(SELECT a + b FROM unnest(s.duration_histogram, EXCLUDED.duration_histogram) AS t(a, b))
+        END
+"""
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return moment.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}{month.month:02d}"
+
+
+class ExecutionRetention:
+
+    # ── Políticas por usuario ─────────────────────────────────────────────────
+
+    def get_policy(self, user_id: int, db: Session) -> dict:
+        policy = db.get(ExecutionRetentionPolicy, user_id)
+        if policy is None:
+            return {"retention_days": get_settings()["AUTOMATIONS_EXECUTION_RETENTION_DAYS"], "is_default": True}
+        return {"retention_days": policy.retention_days, "is_default": False}
+
+    def set_policy(self, user_id: int, retention_days: int, db: Session) -> dict:
+        max_days = get_settings()["AUTOMATIONS_EXECUTION_MAX_RETENTION_DAYS"]
+        if not 1 <= retention_days <= max_days:
+            raise InvalidRetentionPolicyError(retention_days, max_days)
+
+        policy = db.get(ExecutionRetentionPolicy, user_id)
+        if policy is None:
+            db.add(ExecutionRetentionPolicy(user_id=user_id, retention_days=retention_days))
+        else:
+            policy.retention_days = retention_days
+        db.commit()
+        return self.get_policy(user_id, db)
+
+    def reset_policy(self, user_id: int, db: Session) -> dict:
+        db.query(ExecutionRetentionPolicy).filter(ExecutionRetentionPolicy.user_id == user_id).delete()
+        db.commit()
+        return self.get_policy(user_id, db)
+
+    # ── Particiones ───────────────────────────────────────────────────────────
+
+    def list_partitions(self, db: Session) -> list[datetime]:
+        """Meses (primer día, UTC) que tienen partición propia, ordenados."""
+        names = db.execute(text("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+        """), {"parent": PARENT}).scalars().all()
+
+        months = []
+        for name in names:
+            if name.startswith(PARTITION_PREFIX):
+                stamp = name[len(PARTITION_PREFIX):]
+                months.append(datetime(int(stamp[:4]), int(stamp[4:]), 1, tzinfo=timezone.utc))
+        return sorted(months)
+
+    def ensure_partitions(self, db: Session, now: datetime | None = None) -> list[str]:
+        """Crea las particiones del mes actual y los siguientes. Devuelve las creadas."""
+        ahead    = get_settings()["AUTOMATIONS_EXECUTION_PARTITIONS_AHEAD"]
+        current  = month_start(now or datetime.now(timezone.utc))
+        existing = set(self.list_partitions(db))
+
+        created = []
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                self.create_partition(month, db)
+                created.append(partition_name(month))
+        db.commit()
+        return created
+
+    def create_partition(self, month: datetime, db: Session) -> None:
+        """
+        Crea la partición de un mes. Postgres no deja crearla si DEFAULT tiene filas
+        de ese rango: se sacan a una tabla temporal y se reinsertan tras crearla.
+        """
+        lower, upper = month, add_months(month, 1)
+        bounds = {"lower": lower, "upper": upper}
+        name   = partition_name(month)
+
+        db.execute(text(f"""
+            CREATE TEMP TABLE _moved_executions ON COMMIT DROP AS
+            SELECT * FROM {DEFAULT_PARTITION} WHERE started_at >= :lower AND started_at < :upper
+        """), bounds)
+        db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE started_at >= :lower AND started_at < :upper"), bounds)
+        db.execute(text(
+            f"CREATE TABLE {SCHEMA}.{name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        db.execute(text(f"INSERT INTO {PARENT} SELECT * FROM _moved_executions"))
+        db.execute(text("DROP TABLE _moved_executions"))
+        logger.info(f"Partición {name} creada")
+
+    # ── Retención ─────────────────────────────────────────────────────────────
+
+    def apply_retention(self, db: Session, now: datetime | None = None) -> dict:
+        """Resume y borra las ejecuciones vencidas. Devuelve un resumen de lo hecho."""
+        config   = get_settings()
+        today    = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0,
+        )
+        default  = config["AUTOMATIONS_EXECUTION_RETENTION_DAYS"]
+        policies = db.query(ExecutionRetentionPolicy).all()
+        horizon  = max([default] + [p.retention_days for p in policies])
+
+        summary = {"deleted_rows": 0, "dropped_partitions": []}
+
+        # 1. Usuarios con retención más corta que el horizonte: DELETE por grupo
+        groups: dict[int, list[int]] = {}
+        for policy in policies:
+            if policy.retention_days < horizon:
+                groups.setdefault(policy.retention_days, []).append(policy.user_id)
+        for days, user_ids in groups.items():
+            summary["deleted_rows"] += self._rollup_and_delete(
+                PARENT, f"started_at < :cutoff AND user_id = ANY(:user_ids) AND {TERMINAL}",
+                {"cutoff": today - timedelta(days=days), "user_ids": user_ids}, db,
+            )
+        if default < horizon:
+            summary["deleted_rows"] += self._rollup_and_delete(
+                PARENT,
+                "started_at < :cutoff AND user_id NOT IN (SELECT user_id FROM automations.execution_retention_policies) "
+                f"AND {TERMINAL}",
+                {"cutoff": today - timedelta(days=default)}, db,
+            )
+
+        # 2. Horizonte global: DROP de particiones enteras, DELETE solo en DEFAULT
+        cutoff = today - timedelta(days=horizon)
+        for month in self.list_partitions(db):
+            if add_months(month, 1) <= cutoff:
+                name  = partition_name(month)
+                kept  = self.drop_partition(month, db)
+                summary["dropped_partitions"].append(name)
+                logger.info(f"Partición {name} resumida y eliminada ({kept} ejecuciones sin terminar movidas a DEFAULT)")
+        summary["deleted_rows"] += self._rollup_and_delete(
+            DEFAULT_PARTITION, f"started_at < :cutoff AND {TERMINAL}", {"cutoff": cutoff}, db,
+        )
+        return summary
+
+    def drop_partition(self, month: datetime, db: Session) -> int:
+        """
+        Resume y elimina la partición de un mes. Las ejecuciones sin terminar
+        (un delay pendiente, un job en curso) se sacan antes: tras el DETACH el
+        rango ya no tiene partición y el INSERT en el padre las lleva a DEFAULT.
+        Devuelve cuántas se conservaron.
+        """
+        table = f"{SCHEMA}.{partition_name(month)}"
+        db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {table}"))
+        db.execute(text(_ROLLUP_SQL.format(source=table, where=TERMINAL)))
+        kept = db.execute(text(f"INSERT INTO {PARENT} SELECT * FROM {table} WHERE NOT ({TERMINAL})")).rowcount
+        db.execute(text(f"DROP TABLE {table}"))
+        db.commit()
+        return kept
+
+    def _rollup_and_delete(self, source: str, where: str, params: dict, db: Session) -> int:
+        """Resume en execution_daily_stats y borra, en una transacción."""
+        db.execute(text(_ROLLUP_SQL.format(source=source, where=where)), params)
+        deleted = db.execute(text(f"DELETE FROM {source} WHERE {where}"), params).rowcount
+        db.commit()
+        return deleted
+
+
+# Singleton global
+execution_retention = ExecutionRetention()
+
+
+def job_execution_maintenance() -> None:
+    """Job diario: particiones de los próximos meses + retención y resumen + purga del perfil."""
+    db = SessionLocal()
+    try:
+        execution_retention.ensure_partitions(db)
+        summary = execution_retention.apply_retention(db)
+        logger.info(
+            f"Mantenimiento de executions: {summary['deleted_rows']} filas borradas, "
+            f"particiones eliminadas: {summary['dropped_partitions'] or 'ninguna'}"
+        )
+        from .execution_profile import execution_profile
+        execution_profile.purge(db)
+    except Exception as e:
+        logger.error(f"job_execution_maintenance error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def start_execution_maintenance() -> None:
+    """Registra el mantenimiento diario de executions (y una pasada cuando el proceso pasa a ser líder)."""
+    from app.core.scheduler import scheduler_host
+
+    if not get_settings()["AUTOMATIONS_EXECUTION_MAINTENANCE_ENABLED"]:
+        logger.info("Mantenimiento de executions desactivado")
+        return
+    scheduler_host.add_job(job_execution_maintenance, "cron", hour=3, minute=30, id="execution_maintenance")
+    # Sin límite de retraso: el scheduler arranca en pausa hasta ganar el liderazgo
+    scheduler_host.add_job(job_execution_maintenance, "date", id="execution_maintenance_startup", misfire_grace_time=None)
+    logger.info("✅ Automations execution maintenance registrado")
@@ -1,15 +1,85 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import Integer, bindparam, cast, extract, insert, inspect, update
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 from datetime import datetime, timezone
+from ..models.automation import Automation
 from ..models.execution import Execution
+from ..models.execution_daily_stat import ExecutionDailyStat
 from ..enums import ExecutionStatus
-from ..exceptions import ExecutionNotFoundError
+from ..exceptions import ExecutionNotFoundError, ExecutionNodeNotFoundError
+from . import node_output_store
+from .execution_profile import execution_profile, profile_rows
+
+
+_executions = Execution.__table__
+_automations = Automation.__table__
+
+# UPDATE de cierre de una ejecución. Se ejecuta con un dict (finish) o con una
+# lista (executemany del write-behind); duration_ms se calcula en el propio UPDATE
+# a partir de started_at, así no hace falta leer la fila antes. started_at va en
+# el WHERE para que Postgres pode las particiones y solo toque la del mes.
+TERMINAL_UPDATE = update(_executions).where(
+    _executions.c.id         == bindparam("b_id"),
+    _executions.c.started_at == bindparam("b_started_at"),
+).values(
+    status        = bindparam("b_status"),
+    finished_at   = bindparam("b_finished_at"),
+    duration_ms   = cast(extract("epoch", bindparam("b_finished_at") - _executions.c.started_at) * 1000, Integer),
+    error_message = bindparam("b_error"),
+    node_logs     = bindparam("b_node_logs"),
+    node_outputs  = bindparam("b_node_outputs"),
+)
+
+# run_count += b_runs sin tocar updated_at (versiona el flujo en flow_cache)
+RECORD_RUN_UPDATE = update(_automations).where(_automations.c.id == bindparam("b_id")).values(
+    run_count   = _automations.c.run_count + bindparam("b_runs"),
+    last_run_at = bindparam("b_last_run_at"),
+    updated_at  = _automations.c.updated_at,
+)
+
+
+def terminal_params(
+    execution_id: int,
+    started_at: datetime,
+    status: ExecutionStatus,
+    error: Optional[str],
+    node_logs: list,
+    previous_outputs: Optional[bytes] = None,
+) -> dict:
+    node_logs, node_outputs = node_output_store.compact(node_logs, previous_outputs)
+    return {
+        "b_id":           execution_id,
+        "b_started_at":   started_at,
+        "b_status":       status.name,
+        "b_finished_at":  datetime.now(timezone.utc),
+        "b_error":        error,
+        "b_node_logs":    node_logs,
+        "b_node_outputs": node_outputs,
+    }
+
+
+def execution_id_of(execution: Execution) -> int:
+    """PK sin disparar un refresh: tras el commit la instancia está expirada."""
+    return inspect(execution).identity[0]
+
+
+def started_at_of(execution: Execution) -> datetime:
+    """
+    started_at (clave de partición) sin refresh si se puede: start() lo guarda
+    fuera de los atributos mapeados, que el commit expira.
+    """
+    started_at = inspect(execution).dict.get("started_at") or getattr(execution, "_started_at", None)
+    return started_at if started_at is not None else execution.started_at
 
 
 class ExecutionService:
 
     def get_all(self, automation_id: int, db: Session, user_id: int) -> List[Execution]:
-        return db.query(Execution).filter(
+        """Filas ligeras para el historial: sin trigger_payload ni node_logs."""
+        return db.query(Execution).options(load_only(
+            Execution.id, Execution.automation_id, Execution.status, Execution.started_at,
+            Execution.finished_at, Execution.duration_ms, Execution.error_message,
+        )).filter(
             Execution.automation_id == automation_id,
             Execution.user_id       == user_id,
         ).order_by(Execution.started_at.desc()).limit(100).all()
@@ -23,44 +93,128 @@ class ExecutionService:
             raise ExecutionNotFoundError(execution_id)
         return execution
 
-    def create(self, automation_id: int, user_id: int, trigger_payload: dict, db: Session) -> Execution:
-        execution = Execution(
-            automation_id   = automation_id,
-            user_id         = user_id,
-            trigger_payload = trigger_payload,
-            status          = ExecutionStatus.PENDING,
-        )
-        db.add(execution)
-        db.commit()
-        db.refresh(execution)
+    def get_node_log(self, execution_id: int, node_id: str, db: Session, user_id: int) -> dict:
+        """Log de un nodo con su output completo (descomprimido si se recortó)."""
+        execution = self.get_by_id(execution_id, db, user_id)
+        log = next((l for l in execution.node_logs or [] if l.get("node_id") == node_id), None)
+        if log is None:
+            raise ExecutionNodeNotFoundError(execution_id, node_id)
+        output = node_output_store.full_output(log, execution.node_outputs if log.get("output_truncated") else None)
+        return {**log, "output": output}
+
+    def get_daily_stats(self, automation_id: int, db: Session, user_id: int, days: int = 90) -> List[ExecutionDailyStat]:
+        """Resumen diario de las ejecuciones ya purgadas por la retención (más reciente primero)."""
+        return db.query(ExecutionDailyStat).filter(
+            ExecutionDailyStat.automation_id == automation_id,
+            ExecutionDailyStat.user_id       == user_id,
+        ).order_by(ExecutionDailyStat.day.desc()).limit(days).all()
+
+    def start(self, automation_id: int, user_id: int, trigger_payload: dict, db: Session, commit: bool = True) -> Execution:
+        """
+        Inserta la ejecución ya en RUNNING con INSERT ... RETURNING: una sola
+        ida y vuelta, sin pasar por PENDING (INSERT + UPDATE, dos commits y dos refresh).
+        commit=False deja el INSERT en la transacción del llamador.
+        """
+        execution = db.scalars(
+            insert(Execution).values(
+                automation_id   = automation_id,
+                user_id         = user_id,
+                trigger_payload = trigger_payload,
+                status          = ExecutionStatus.RUNNING,
+            ).returning(Execution)
+        ).one()
+        execution._started_at = execution.started_at
+        if commit:
+            db.commit()
         return execution
 
-    def mark_running(self, execution: Execution, db: Session) -> Execution:
-        execution.status = ExecutionStatus.RUNNING
-        db.commit()
-        db.refresh(execution)
+    def start_many(
+        self,
+        automation_id: int,
+        user_id: int,
+        trigger_payloads: list[dict],
+        db: Session,
+        status: ExecutionStatus = ExecutionStatus.PENDING,
+    ) -> list[int]:
+        """
+        Inserta varias ejecuciones con un solo executemany ... RETURNING id (sin commit).
+        Devuelve los ids en el orden de trigger_payloads.
+        """
+        rows = db.execute(
+            insert(_executions).returning(_executions.c.id, sort_by_parameter_order=True),
+            [
+                {"automation_id": automation_id, "user_id": user_id, "trigger_payload": payload, "status": status}
+                for payload in trigger_payloads
+            ],
+        )
+        return list(rows.scalars())
+
+    def mark_waiting(self, execution: Execution, node_logs: list, db: Session, commit: bool = True) -> Execution:
+        execution.status = ExecutionStatus.WAITING
+        self._set_node_logs(execution, node_logs)
+        if commit:
+            db.commit()
+            db.refresh(execution)
         return execution
 
-    def mark_success(self, execution: Execution, node_logs: list, db: Session) -> Execution:
-        now = datetime.now(timezone.utc)
-        execution.status      = ExecutionStatus.SUCCESS
-        execution.finished_at = now
-        execution.duration_ms = int((now - execution.started_at).total_seconds() * 1000)
-        execution.node_logs   = node_logs
+    def finish(
+        self,
+        execution: Execution,
+        result: dict,
+        db: Session,
+        automation_id: Optional[int] = None,
+        previous_outputs: Optional[bytes] = None,
+    ) -> Execution:
+        """
+        Registra el resultado de flow_executor en una sola transacción: success,
+        waiting (suspendida en un delay) o failed, más run_count/last_run_at de la
+        automation si se pasa automation_id. No refresca la instancia.
+        previous_outputs: node_outputs ya guardados (ejecución reanudada), se conservan.
+        Las duraciones de los nodos se suman en memoria a execution_profile.
+        """
+        if result["status"] == "waiting":
+            from .delay_resumer import delay_resumer
+            delay_resumer.suspend(execution, result, db, commit=False)
+            profiled_id = execution.automation_id
+        else:
+            status = ExecutionStatus.SUCCESS if result["status"] in ("success", "skipped") else ExecutionStatus.FAILED
+            error  = None if status == ExecutionStatus.SUCCESS else result.get("error", "")
+            profiled_id = db.execute(TERMINAL_UPDATE.returning(_executions.c.automation_id), terminal_params(
+                execution_id_of(execution), started_at_of(execution), status, error, result["node_logs"], previous_outputs,
+            )).scalar()
+
+        if profiled_id is not None:
+            execution_profile.add(profile_rows(
+                profiled_id, result["node_logs"], result["status"], new_from=result.get("new_logs_from", 0),
+            ))
+
+        if automation_id is not None:
+            self.record_run(automation_id, db)
         db.commit()
-        db.refresh(execution)
         return execution
 
+    def fail(self, execution: Execution, error: str, db: Session, automation_id: Optional[int] = None) -> Execution:
+        """finish() para cuando flow_executor lanza en lugar de devolver un resultado."""
+        return self.finish(execution, {"status": "failed", "error": error, "node_logs": []}, db, automation_id)
+
+    def record_run(self, automation_id: int, db: Session, runs: int = 1) -> None:
+        """Suma runs a run_count y fija last_run_at (sin commit)."""
+        db.execute(RECORD_RUN_UPDATE, {"b_id": automation_id, "b_runs": runs, "b_last_run_at": datetime.now(timezone.utc)})
+
     def mark_failed(self, execution: Execution, error: str, node_logs: list, db: Session) -> Execution:
+        """Cierra en FAILED una Execution cargada que no llegó a flow_executor (cola y delay_resumer)."""
         now = datetime.now(timezone.utc)
         execution.status        = ExecutionStatus.FAILED
         execution.finished_at   = now
         execution.duration_ms   = int((now - execution.started_at).total_seconds() * 1000)
         execution.error_message = error
-        execution.node_logs     = node_logs
+        self._set_node_logs(execution, node_logs)
         db.commit()
         db.refresh(execution)
         return execution
 
+    def _set_node_logs(self, execution: Execution, node_logs: list) -> None:
+        execution.node_logs, execution.node_outputs = node_output_store.compact(node_logs, execution.node_outputs)
+
 
 execution_service = ExecutionService()
\ No newline at end of file
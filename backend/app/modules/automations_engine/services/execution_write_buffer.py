@@ -0,0 +1,143 @@
+"""
+Write-behind opcional para el cierre de ejecuciones.
+
+Con triggers de mucho volumen, cada ejecución termina con su propio UPDATE de
+executions + UPDATE de automations + commit. Con
+AUTOMATIONS_EXECUTION_WRITE_BEHIND activo, automation_runner deja aquí los
+cierres success/failed y se escriben por lotes:
+
+- un executemany de TERMINAL_UPDATE con todas las ejecuciones del lote
+- un UPDATE por automation con el número de runs acumulado
+- una sola transacción por lote
+
+El lote se vuelca al llegar a AUTOMATIONS_EXECUTION_FLUSH_SIZE o cada
+AUTOMATIONS_EXECUTION_FLUSH_SECONDS desde un hilo daemon. Hasta entonces la
+Execution sigue en RUNNING; si el proceso muere antes del volcado, esas
+ejecuciones quedan en RUNNING (la contrapartida del modo).
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from app.core.database import SessionLocal
+from ..enums import ExecutionStatus
+from ..manifest import get_settings
+from .execution_profile import execution_profile, profile_rows
+from .execution_service import RECORD_RUN_UPDATE, TERMINAL_UPDATE, terminal_params
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionWriteBuffer:
+
+    def __init__(self):
+        self._pending: list[dict]             = []
+        self._runs:    dict[int, list]        = {}   # automation_id → [runs, last_run_at]
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return get_settings()["AUTOMATIONS_EXECUTION_WRITE_BEHIND"]
+
+    def add(
+        self,
+        execution_id: int,
+        started_at: datetime,
+        automation_id: int,
+        status: ExecutionStatus,
+        node_logs: list,
+        error: Optional[str] = None,
+    ) -> None:
+        """Encola el cierre de una ejecución; vuelca si el lote está lleno."""
+        params = terminal_params(execution_id, started_at, status, error, node_logs)
+        execution_profile.add(profile_rows(
+            automation_id, node_logs, "failed" if status == ExecutionStatus.FAILED else "success",
+            at=params["b_finished_at"],
+        ))
+        with self._lock:
+            self._pending.append(params)
+            runs = self._runs.setdefault(automation_id, [0, None])
+            runs[0] += 1
+            runs[1]  = params["b_finished_at"]
+            full     = len(self._pending) >= get_settings()["AUTOMATIONS_EXECUTION_FLUSH_SIZE"]
+        if full:
+            self.flush()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Escribe el lote acumulado en una transacción. Devuelve cuántas ejecuciones cerró."""
+        with self._lock:
+            pending, runs = self._pending, self._runs
+            self._pending, self._runs = [], {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(TERMINAL_UPDATE, pending)
+            db.execute(RECORD_RUN_UPDATE, [
+                {"b_id": automation_id, "b_runs": count, "b_last_run_at": last_run_at}
+                for automation_id, (count, last_run_at) in runs.items()
+            ])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error volcando {len(pending)} cierres de ejecución: {e}")
+            with self._lock:
+                # Se reintentan en el siguiente volcado
+                self._pending = pending + self._pending
+                for automation_id, (count, last_run_at) in runs.items():
+                    merged = self._runs.setdefault(automation_id, [0, last_run_at])
+                    merged[0] += count
+            return 0
+        finally:
+            db.close()
+        return len(pending)
+
+    # ── Hilo ──────────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, flush_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(flush_seconds,), name="automations-execution-flush", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def _loop(self, flush_seconds: float) -> None:
+        while not self._stop.wait(flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Execution write-behind error: {e}")
+
+
+# Singleton global
+execution_write_buffer = ExecutionWriteBuffer()
+
+
+def start_execution_write_buffer() -> None:
+    """Arranca el volcado periódico del write-behind (solo si está activado)."""
+    config = get_settings()
+    if not config["AUTOMATIONS_EXECUTION_WRITE_BEHIND"]:
+        return
+    execution_write_buffer.start(config["AUTOMATIONS_EXECUTION_FLUSH_SECONDS"])
+    logger.info("✅ Automations execution write-behind iniciado")
@@ -1,51 +1,341 @@
+"""
+Ejecución de flujos compilados.
+
+Los nodos pendientes salen en orden topológico (Frontier): un nodo al que se
+llega por varios caminos corre una sola vez por ejecución y después de todas
+sus entradas que vayan a ejecutarse (join).
+
+Cada recorrido tiene un presupuesto (AUTOMATIONS_MAX_NODES_PER_EXECUTION nodos
+y AUTOMATIONS_EXECUTION_DEADLINE_SECONDS de reloj). Se comprueba entre nodos:
+al agotarse la ejecución termina en failed con "budget exceeded" y no se
+interrumpe un nodo a medias. La espera de un delay no cuenta: al reanudar el
+presupuesto empieza de nuevo.
+
+Con "parallel": true en el flow, los nodos pendientes consecutivos del
+frontier que no dependen entre sí y son de un tipo paralelizable (action,
+outbound_webhook, automation_call) corren a la vez en un pool de hilos
+acotado (AUTOMATIONS_PARALLEL_MAX_WORKERS). action y automation_call usan una
+sesión propia que se confirma al terminar el nodo. Los resultados se aplican
+en orden de rank: ctx["vars"], node_logs y los eventos node quedan igual que
+en el modo secuencial; solo cambia el tiempo total.
+"""
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Generator
+from typing import Generator, Iterable, Optional
 from sqlalchemy.orm import Session
-from ..core.graph import build_graph, resolve_next_nodes, Graph, Node
-from ..core.node_handlers import NODE_HANDLERS
+from app.core.database import SessionLocal
+from ..core.graph import Node
+from ..core.compiled_flow import CompiledFlow, compile_flow, flow_cache
+from ..core.event_bus import LiveChannel
 from ..core.node_handlers.stop_handler import StopExecution
+from ..core.node_handlers.delay_handler import SuspendExecution
+from ..manifest import get_settings
 from ..models.automation import Automation
 
+BUDGET_EXCEEDED = "budget exceeded"
+
+# Tipos que no suspenden ni cortan el flujo; los de PARALLEL_SESSION_TYPES tocan la BD
+PARALLEL_NODE_TYPES    = frozenset({"action", "outbound_webhook", "automation_call"})
+PARALLEL_SESSION_TYPES = frozenset({"action", "automation_call"})
+
+
+class Frontier:
+    """Nodos pendientes por rank topológico; cada nodo se programa como mucho una vez."""
+
+    def __init__(self, compiled: CompiledFlow, done: Iterable[str] = ()):
+        self._compiled = compiled
+        self._heap: list[tuple[int, str]] = []
+        self._seen = set(done)
+
+    def push(self, nodes: Iterable[Node]) -> None:
+        for node in nodes:
+            if node.id not in self._seen:
+                self._seen.add(node.id)
+                heapq.heappush(self._heap, (self._compiled.rank[node.id], node.id))
+
+    def pop(self) -> Node:
+        return self._compiled.nodes[heapq.heappop(self._heap)[1]]
+
+    def peek(self) -> Optional[Node]:
+        return self._compiled.nodes[self._heap[0][1]] if self._heap else None
+
+    def ids(self) -> list[str]:
+        return [node_id for _, node_id in sorted(self._heap)]
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+
+class Budget:
+    """Límite de nodos y de tiempo de un recorrido."""
+
+    def __init__(self, max_nodes: int, deadline_seconds: float):
+        self.max_nodes = max_nodes
+        self.deadline_seconds = deadline_seconds
+        self._deadline = time.monotonic() + deadline_seconds
+        self._steps    = 0
+
+    @classmethod
+    def from_settings(cls) -> "Budget":
+        config = get_settings()
+        return cls(config["AUTOMATIONS_MAX_NODES_PER_EXECUTION"], config["AUTOMATIONS_EXECUTION_DEADLINE_SECONDS"])
+
+    def spend(self) -> Optional[str]:
+        """Cuenta un nodo más; devuelve el error si el presupuesto está agotado."""
+        if self._steps >= self.max_nodes:
+            return f"{BUDGET_EXCEEDED}: más de {self.max_nodes} nodos en una ejecución"
+        if time.monotonic() > self._deadline:
+            return f"{BUDGET_EXCEEDED}: más de {self.deadline_seconds:g}s de ejecución"
+        self._steps += 1
+        return None
+
+
+class BranchPool:
+    """
+    Pool de hilos compartido para las ramas paralelas, creado al primer uso.
+    Un nodo que ya corre en el pool (p.ej. automation_call de un flujo
+    parallel) ejecuta sus ramas en secuencia: esperar al propio pool podría
+    bloquearlo.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock  = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def in_branch(self) -> bool:
+        return getattr(self._local, "active", False)
+
+    def map(self, fn, items: list) -> list:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=get_settings()["AUTOMATIONS_PARALLEL_MAX_WORKERS"],
+                    thread_name_prefix="automations-branch",
+                )
+        return list(self._executor.map(lambda item: self._run(fn, item), items))
+
+    def _run(self, fn, item):
+        self._local.active = True
+        try:
+            return fn(item)
+        finally:
+            self._local.active = False
+
+
+# Singleton global
+branch_pool = BranchPool()
+
 
 class FlowExecutor:
 
-    def execute(self, automation: Automation, payload: dict, db: Session, user_id: int) -> dict:
+    def execute(
+        self, automation: Automation, payload: dict, db: Session, user_id: int, execution_id: int | None = None,
+    ) -> dict:
+        """Los eventos node_start / node / done se publican en execution_bus con execution_id."""
         ctx = {
             "payload": payload,
             "vars":    {},
             "_depth":  0,
             "user_id": user_id,
         }
-        return self.execute_flow(automation.flow, ctx, db, user_id)
+        live = LiveChannel(automation.id, execution_id)
+        try:
+            return self.execute_compiled(flow_cache.get(automation), ctx, db, user_id, live=live)
+        except Exception as e:
+            live.done({"status": "failed", "error": str(e)})
+            raise
 
     def execute_flow(self, flow: dict, ctx: dict, db: Session, user_id: int) -> dict:
-        graph     = build_graph(flow)
-        node_logs = []
+        """Ejecuta un flow JSON suelto (sin automation asociada, no pasa por la caché)."""
+        return self.execute_compiled(compile_flow(flow), ctx, db, user_id)
+
+    def execute_compiled(
+        self, compiled: CompiledFlow, ctx: dict, db: Session, user_id: int, live: LiveChannel | None = None,
+    ) -> dict:
+        if not compiled.root:
+            result = {"status": "skipped", "reason": "no trigger node", "node_logs": []}
+        else:
+            frontier = Frontier(compiled)
+            frontier.push([compiled.root])
+            result = self._run(compiled, frontier, ctx, [], db, user_id, live)
+        if live:
+            live.done(result)
+        return result
+
+    def resume(
+        self,
+        compiled: CompiledFlow,
+        cursor: list[str],
+        ctx: dict,
+        node_logs: list,
+        db: Session,
+        user_id: int,
+        live: LiveChannel | None = None,
+    ) -> dict:
+        """Continúa una ejecución suspendida desde los nodos pendientes del cursor."""
+        missing = [node_id for node_id in cursor if node_id not in compiled.nodes]
+        if missing:
+            result = {
+                "status":    "failed",
+                "error":     f"El flujo cambió durante la espera — nodos inexistentes: {missing}",
+                "node_logs": node_logs,
+            }
+        else:
+            new_from = len(node_logs)
+            frontier = Frontier(compiled, done=(log["node_id"] for log in node_logs))
+            frontier.push(compiled.nodes[node_id] for node_id in cursor)
+            result   = self._run(compiled, frontier, ctx, node_logs, db, user_id, live)
+            # Los nodos anteriores a la espera ya se sumaron al perfil al suspender
+            result["new_logs_from"] = new_from
+        if live:
+            live.done(result)
+        return result
 
-        if not graph.root:
-            return {"status": "skipped", "reason": "no trigger node", "node_logs": node_logs}
+    def _run(
+        self,
+        compiled: CompiledFlow,
+        frontier: Frontier,
+        ctx: dict,
+        node_logs: list,
+        db: Session,
+        user_id: int,
+        live: LiveChannel | None = None,
+    ) -> dict:
+        steps = self._steps(compiled, frontier, ctx, node_logs, db, user_id, live)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+    def _steps(
+        self,
+        compiled: CompiledFlow,
+        frontier: Frontier,
+        ctx: dict,
+        node_logs: list,
+        db: Session,
+        user_id: int,
+        live: LiveChannel | None,
+    ) -> Generator[dict, None, dict]:
+        """
+        Recorre el frontier haciendo yield de node_start / node y devuelve el
+        resultado. "waiting" con cursor + ctx si un nodo delay suspende la
+        ejecución y quedan nodos pendientes.
+        """
+        budget = Budget.from_settings()
+        while frontier:
+            exceeded = budget.spend()
+            if exceeded:
+                return {"status": "failed", "error": exceeded, "node_logs": node_logs}
 
-        queue = [graph.root]
+            batch = self._batch(compiled, frontier, budget)
+            for node in batch:
+                event = {"type": "node_start", "node_id": node.id}
+                if live:
+                    live.publish(event)
+                yield event
 
-        while queue:
-            node = queue.pop(0)
-            log_entry, condition_result = self._execute_node(node, ctx, db, user_id)
-            node_logs.append(log_entry)
+            if len(batch) == 1:
+                outcomes = [self._execute_node(compiled, batch[0], ctx, db, user_id)]
+            else:
+                outcomes = self._execute_parallel(compiled, batch, ctx, user_id)
 
-            if log_entry["status"] == "failed" and not node.continue_on_error:
-                return {"status": "failed", "error": log_entry.get("error"), "node_logs": node_logs}
+            failed    = None
+            resume_at = None
+            for node, (log_entry, condition_result, node_resume_at) in zip(batch, outcomes):
+                node_logs.append(log_entry)
+                event = {"type": "node", **log_entry}
+                if live:
+                    live.publish(event)
+                yield event
 
-            next_nodes = resolve_next_nodes(graph, node.id, condition_result)
-            queue.extend(next_nodes)
+                if log_entry["status"] == "failed" and not node.continue_on_error:
+                    failed = failed or log_entry
+                    continue
+                frontier.push(compiled.next_nodes(node.id, condition_result))
+                resume_at = resume_at or node_resume_at
+
+            if failed:
+                return {"status": "failed", "error": failed.get("error"), "node_logs": node_logs}
+
+            if resume_at and frontier:
+                return self._suspended(frontier, ctx, node_logs, resume_at)
 
         return {"status": "success", "node_logs": node_logs}
 
+    def _batch(self, compiled: CompiledFlow, frontier: Frontier, budget: Budget) -> list[Node]:
+        """
+        El siguiente nodo y, en flujos parallel, los pendientes que le siguen
+        en rank mientras sean paralelizables e independientes de los ya
+        elegidos. El primero ya descontó su paso del presupuesto.
+        """
+        batch = [frontier.pop()]
+        if not compiled.parallel or branch_pool.in_branch or batch[0].type not in PARALLEL_NODE_TYPES:
+            return batch
+
+        max_workers = get_settings()["AUTOMATIONS_PARALLEL_MAX_WORKERS"]
+        while len(batch) < max_workers:
+            node = frontier.peek()
+            if node is None or node.type not in PARALLEL_NODE_TYPES:
+                break
+            if any(node.id in compiled.reach.get(chosen.id, ()) for chosen in batch):
+                break
+            if budget.spend():
+                break
+            batch.append(frontier.pop())
+        return batch
+
+    def _execute_parallel(
+        self, compiled: CompiledFlow, batch: list[Node], ctx: dict, user_id: int,
+    ) -> list[tuple[dict, bool | None, datetime | None]]:
+        """Ejecuta el batch en branch_pool y vuelca en ctx["vars"] las salidas en orden de rank."""
+
+        def run(node: Node):
+            branch_ctx = {**ctx, "vars": dict(ctx["vars"])}
+            if node.type not in PARALLEL_SESSION_TYPES:
+                return self._execute_node(compiled, node, branch_ctx, None, user_id), branch_ctx
+
+            branch_db = SessionLocal()
+            try:
+                outcome = self._execute_node(compiled, node, branch_ctx, branch_db, user_id)
+                if outcome[0]["status"] == "failed":
+                    branch_db.rollback()
+                else:
+                    branch_db.commit()
+                return outcome, branch_ctx
+            finally:
+                branch_db.close()
+
+        outcomes = []
+        for node, (outcome, branch_ctx) in zip(batch, branch_pool.map(run, batch)):
+            key = f"node_{node.id}"
+            if key in branch_ctx["vars"]:
+                ctx["vars"][key] = branch_ctx["vars"][key]
+            outcomes.append(outcome)
+        return outcomes
+
+    def _suspended(self, frontier: Frontier, ctx: dict, node_logs: list, resume_at: datetime) -> dict:
+        return {
+            "status":    "waiting",
+            "node_logs": node_logs,
+            "resume_at": resume_at,
+            "cursor":    frontier.ids(),
+            "ctx":       ctx,
+        }
+
     def execute_stream(
         self,
         automation: Automation,
         payload: dict,
         db: Session,
         user_id: int,
+        execution_id: int | None = None,
     ) -> Generator[dict, None, None]:
         """
         Versión streaming de execute_flow.
@@ -53,6 +343,9 @@ class FlowExecutor:
           {"type": "node_start", "node_id": "n1"}
           {"type": "node", "node_id": "n1", "status": "success", "duration_ms": 42, "output": {...}}
           {"type": "done", "status": "success", "duration_ms": 123, "node_logs": [...]}
+        Si un delay suspende la ejecución, "done" llega con status "waiting" y
+        "resume_at"; la clave "suspension" (cursor + ctx) es para el router, no para el cliente.
+        Los mismos eventos se publican en execution_bus para /executions/live.
         """
         ctx = {
             "payload": payload,
@@ -61,38 +354,52 @@ class FlowExecutor:
             "user_id": user_id,
         }
 
-        graph     = build_graph(automation.flow)
+        compiled  = flow_cache.get(automation)
         node_logs = []
         started   = datetime.now(timezone.utc)
+        live      = LiveChannel(automation.id, execution_id)
 
-        if not graph.root:
+        if not compiled.root:
+            live.done({"status": "skipped"})
             yield {"type": "done", "status": "skipped", "duration_ms": 0, "node_logs": []}
             return
 
-        queue = [graph.root]
-
-        while queue:
-            node = queue.pop(0)
-
-            # Emitir antes de ejecutar — el frontend pone el nodo en azul
-            yield {"type": "node_start", "node_id": node.id}
-
-            log_entry, condition_result = self._execute_node(node, ctx, db, user_id)
-            node_logs.append(log_entry)
+        frontier = Frontier(compiled)
+        frontier.push([compiled.root])
 
-            # Emitir resultado real del nodo — el frontend lo pone en verde/rojo
-            yield {"type": "node", **log_entry}
-
-            if log_entry["status"] == "failed" and not node.continue_on_error:
+        # node_start se emite antes de ejecutar (el frontend pone el nodo en azul)
+        # y node con el resultado real (verde/rojo)
+        steps = self._steps(compiled, frontier, ctx, node_logs, db, user_id, live)
+        while True:
+            try:
+                yield next(steps)
+            except StopIteration as stop:
+                result = stop.value
                 break
 
-            next_nodes = resolve_next_nodes(graph, node.id, condition_result)
-            queue.extend(next_nodes)
+        duration_ms = int((datetime.now(timezone.utc) - started).total_seconds() * 1000)
+
+        if result["status"] == "waiting":
+            live.done(result)
+            yield {
+                "type":            "done",
+                "status":          "waiting",
+                "duration_ms":     duration_ms,
+                "error_message":   None,
+                "resume_at":       result["resume_at"].isoformat(),
+                "trigger_payload": payload,
+                "node_logs":       node_logs,
+                "suspension":      result,
+            }
+            return
 
-        duration_ms  = int((datetime.now(timezone.utc) - started).total_seconds() * 1000)
-        final_status = "failed" if any(l["status"] == "failed" for l in node_logs) else "success"
-        error        = next((l.get("error") for l in node_logs if l["status"] == "failed"), None)
+        if result["status"] == "failed" and result.get("error", "").startswith(BUDGET_EXCEEDED):
+            final_status, error = "failed", result["error"]
+        else:
+            final_status = "failed" if any(l["status"] == "failed" for l in node_logs) else "success"
+            error        = next((l.get("error") for l in node_logs if l["status"] == "failed"), None)
 
+        live.done({"status": final_status, "error": error})
         yield {
             "type":          "done",
             "status":        final_status,
@@ -102,17 +409,20 @@ class FlowExecutor:
             "node_logs":     node_logs,
         }
 
-    def _execute_node(self, node: Node, ctx: dict, db: Session, user_id: int) -> tuple[dict, bool | None]:
-        handler          = NODE_HANDLERS.get(node.type)
+    def _execute_node(
+        self, compiled: CompiledFlow, node: Node, ctx: dict, db: Session, user_id: int,
+    ) -> tuple[dict, bool | None, datetime | None]:
+        """Devuelve (log_entry, condition_result, resume_at). resume_at solo si el nodo suspende."""
+        handler          = compiled.handlers.get(node.id)
         start            = datetime.now(timezone.utc)
         condition_result = None
 
         if not handler:
             return {"node_id": node.id, "node_type": node.type, "status": "failed",
-                    "error": f"Tipo de nodo desconocido: {node.type}"}, None
+                    "error": f"Tipo de nodo desconocido: {node.type}"}, None, None
 
         try:
-            result           = handler.execute(node.config, ctx, db, user_id)
+            result           = handler(node.config, ctx, db, user_id)
             condition_result = result.get("condition_result")
             duration_ms      = int((datetime.now(timezone.utc) - start).total_seconds() * 1000)
 
@@ -125,11 +435,21 @@ class FlowExecutor:
                 "status":     "success",
                 "output":     result,
                 "duration_ms": duration_ms,
-            }, condition_result
+            }, condition_result, None
+
+        except SuspendExecution as e:
+            ctx["vars"][f"node_{node.id}"] = e.output
+            return {
+                "node_id":    node.id,
+                "node_type":  node.type,
+                "status":     "success",
+                "output":     e.output,
+                "duration_ms": int((datetime.now(timezone.utc) - start).total_seconds() * 1000),
+            }, None, e.resume_at
 
         except StopExecution as e:
             return {"node_id": node.id, "node_type": node.type,
-                    "status": "skipped", "reason": e.reason}, None
+                    "status": "skipped", "reason": e.reason}, None, None
 
         except Exception as e:
             duration_ms = int((datetime.now(timezone.utc) - start).total_seconds() * 1000)
@@ -139,7 +459,7 @@ class FlowExecutor:
                 "status":     "failed",
                 "error":      str(e),
                 "duration_ms": duration_ms,
-            }, None
+            }, None, None
 
 
 flow_executor = FlowExecutor()
\ No newline at end of file
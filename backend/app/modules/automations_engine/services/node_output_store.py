@@ -0,0 +1,75 @@
+"""
+Almacenamiento compacto de los outputs de nodo.
+
+node_logs guardaba el output completo de cada nodo, incluidas listas grandes
+(agenda del día, progresión de ejercicios, suscripciones...). Ahora:
+
+- En node_logs, un output que supera AUTOMATIONS_NODE_OUTPUT_MAX_BYTES (JSON)
+  se sustituye por un marcador {"_truncated": true, "size_bytes", "preview"}
+  y el log lleva output_truncated=True.
+- Los outputs completos de esos nodos van comprimidos (zlib) en
+  executions.node_outputs, columna deferred: solo la carga el endpoint de
+  detalle de nodo.
+"""
+import json
+import zlib
+from typing import Optional
+
+from ..manifest import get_settings
+
+PREVIEW_CHARS = 200
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def unpack(blob: Optional[bytes]) -> dict:
+    """node_id → output completo."""
+    if not blob:
+        return {}
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def pack(outputs: dict) -> Optional[bytes]:
+    if not outputs:
+        return None
+    return zlib.compress(_dumps(outputs).encode("utf-8"))
+
+
+def compact(node_logs: list, previous: Optional[bytes] = None) -> tuple[list, Optional[bytes]]:
+    """
+    Devuelve (node_logs recortados, blob comprimido con los outputs completos).
+    previous es el blob ya guardado (ejecución reanudada tras un delay): se conserva.
+    """
+    max_bytes = get_settings()["AUTOMATIONS_NODE_OUTPUT_MAX_BYTES"]
+    outputs   = unpack(previous)
+    slim      = []
+
+    for log in node_logs:
+        output = log.get("output")
+        if output is None or log.get("output_truncated"):
+            slim.append(log)
+            continue
+
+        encoded = _dumps(output)
+        size    = len(encoded.encode("utf-8"))
+        if size <= max_bytes:
+            slim.append(log)
+            continue
+
+        outputs[log["node_id"]] = output
+        slim.append({
+            **log,
+            "output": {"_truncated": True, "size_bytes": size, "preview": encoded[:PREVIEW_CHARS]},
+            "output_truncated": True,
+        })
+
+    return slim, pack(outputs)
+
+
+def full_output(log: dict, blob: Optional[bytes]):
+    """Output completo de un log: del blob si se recortó, si no el del propio log."""
+    if not log.get("output_truncated"):
+        return log.get("output")
+    return unpack(blob).get(log["node_id"])
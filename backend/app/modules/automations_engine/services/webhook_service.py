@@ -1,10 +1,21 @@
+import logging
 import secrets
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timezone
+from ..core.webhook_token_cache import webhook_token_cache
+from ..enums import ExecutionStatus
+from ..manifest import get_settings
+from ..models.automation import Automation
 from ..models.webhook_inbound import WebhookInbound
 from ..schemas import WebhookCreate
-from ..exceptions import WebhookNotFoundError, WebhookTokenInvalidError
+from ..exceptions import WebhookNotFoundError, WebhookTokenInvalidError, WebhookBatchTooLargeError
+from .webhook_touch_buffer import webhook_touch_buffer
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_TRIGGER_REF = "system.webhook_inbound"
 
 
 class WebhookService:
@@ -25,6 +36,7 @@ class WebhookService:
         db.add(webhook)
         db.commit()
         db.refresh(webhook)
+        webhook_token_cache.invalidate(webhook.token)
         return webhook
 
     def delete(self, webhook_id: int, db: Session, user_id: int) -> None:
@@ -34,19 +46,68 @@ class WebhookService:
         ).first()
         if not webhook:
             raise WebhookNotFoundError(webhook_id)
+        token = webhook.token
         db.delete(webhook)
         db.commit()
+        webhook_token_cache.invalidate(token)
 
-    def get_by_token(self, token: str, db: Session) -> WebhookInbound:
-        webhook = db.query(WebhookInbound).filter(
-            WebhookInbound.token     == token,
-            WebhookInbound.is_active == True,
-        ).first()
-        if not webhook:
+    def ingest(self, token: str, payloads: list[dict], db: Session) -> list[dict]:
+        """
+        Ingress de POST /webhooks/in/{token}: un evento por payload.
+
+        Modo queue: token desde webhook_token_cache, Execution en PENDING + job por
+        evento en una transacción y vuelta inmediata con los execution_id; el flujo
+        lo ejecutan los workers. Modo inline (tests, desarrollo): se ejecuta aquí.
+        last_triggered_at se anota en webhook_touch_buffer, sin commit propio.
+        """
+        max_events = get_settings()["AUTOMATIONS_WEBHOOK_MAX_EVENTS"]
+        if len(payloads) > max_events:
+            raise WebhookBatchTooLargeError(len(payloads), max_events)
+
+        entry = webhook_token_cache.lookup(token, db)
+        if entry is None:
             raise WebhookTokenInvalidError()
-        webhook.last_triggered_at = datetime.now(timezone.utc)
-        db.commit()
-        return webhook
+        webhook_touch_buffer.touch(entry.webhook_id, datetime.now(timezone.utc))
+        if not payloads:
+            return []
+
+        if get_settings()["AUTOMATIONS_EXECUTION_MODE"] == "inline":
+            return self._run_inline(token, entry, payloads, db)
+
+        from .execution_queue import execution_queue
+        try:
+            execution_ids = execution_queue.enqueue_executions(
+                entry.automation_id, entry.user_id, WEBHOOK_TRIGGER_REF, payloads, db,
+            )
+        except IntegrityError:
+            # La automation se borró en otro proceso y la caché aún no lo sabía
+            db.rollback()
+            webhook_token_cache.invalidate(token)
+            raise WebhookTokenInvalidError()
+        return [{"execution_id": execution_id, "status": ExecutionStatus.PENDING} for execution_id in execution_ids]
+
+    def _run_inline(self, token: str, entry, payloads: list[dict], db: Session) -> list[dict]:
+        from .automation_runner import automation_runner
+        from .execution_service import execution_id_of, execution_service
+
+        automation = db.get(Automation, entry.automation_id)
+        if automation is None:
+            webhook_token_cache.invalidate(token)
+            raise WebhookTokenInvalidError()
+        automation_id = automation.id
+
+        results = []
+        for payload in payloads:
+            execution    = execution_service.start(automation_id, entry.user_id, payload, db)
+            execution_id = execution_id_of(execution)
+            try:
+                execution = automation_runner.run(automation, payload, entry.user_id, db, execution=execution)
+                status    = execution.status
+            except Exception as e:
+                logger.error(f"Error ejecutando webhook entrante de automation_id={automation_id}: {e}")
+                status = ExecutionStatus.FAILED
+            results.append({"execution_id": execution_id, "status": status})
+        return results
 
 
 webhook_service = WebhookService()
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+last_triggered_at de los webhooks entrantes, agrupado.
+
+Cada llamada a /webhooks/in/{token} hacía su propio UPDATE + commit de
+webhooks_inbound.last_triggered_at. Ahora el ingress solo anota aquí el
+último instante por webhook y un hilo daemon lo escribe cada
+AUTOMATIONS_WEBHOOK_TOUCH_FLUSH_SECONDS con un único executemany.
+
+last_triggered_at puede ir hasta ese intervalo por detrás; si el proceso
+muere antes del volcado se pierde solo esa marca, no la ejecución.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import bindparam, update
+
+from app.core.database import SessionLocal
+from ..manifest import get_settings
+from ..models.webhook_inbound import WebhookInbound
+
+logger = logging.getLogger(__name__)
+
+_webhooks = WebhookInbound.__table__
+
+TOUCH_UPDATE = update(_webhooks).where(_webhooks.c.id == bindparam("b_id")).values(
+    last_triggered_at = bindparam("b_at"),
+)
+
+
+class WebhookTouchBuffer:
+
+    def __init__(self):
+        self._pending: dict[int, datetime] = {}   # webhook_id → último disparo
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, webhook_id: int, at: datetime) -> None:
+        with self._lock:
+            previous = self._pending.get(webhook_id)
+            if previous is None or at > previous:
+                self._pending[webhook_id] = at
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def discard(self) -> None:
+        with self._lock:
+            self._pending = {}
+
+    def flush(self) -> int:
+        """Escribe las marcas acumuladas en una transacción. Devuelve cuántos webhooks actualizó."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(TOUCH_UPDATE, [{"b_id": webhook_id, "b_at": at} for webhook_id, at in pending.items()])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error volcando last_triggered_at de {len(pending)} webhooks: {e}")
+            for webhook_id, at in pending.items():
+                self.touch(webhook_id, at)
+            return 0
+        finally:
+            db.close()
+        return len(pending)
+
+    # ── Hilo ──────────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, flush_seconds: float) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(flush_seconds,), name="automations-webhook-touch", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def _loop(self, flush_seconds: float) -> None:
+        while not self._stop.wait(flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Webhook touch buffer error: {e}")
+
+
+# Singleton global
+webhook_touch_buffer = WebhookTouchBuffer()
+
+
+def start_webhook_touch_buffer() -> None:
+    """Arranca el volcado periódico de last_triggered_at."""
+    webhook_touch_buffer.start(get_settings()["AUTOMATIONS_WEBHOOK_TOUCH_FLUSH_SECONDS"])
+    logger.info("✅ Automations webhook touch buffer iniciado")
@@ -0,0 +1,47 @@
+"""
+Microbenchmark del dispatch por nodo action/trigger.
+
+Compara la resolución antigua (importlib.import_module + getattr sobre
+handler_path en cada nodo) con la llamada directa al callable que el
+registry guarda al registrar. No necesita BD.
+
+Uso (desde backend/):
+    python -m app.modules.automations_engine.tests.bench_registry_dispatch
+"""
+import importlib
+import timeit
+
+from app.modules.automations_engine.core.registry import registry
+from app.modules.automations_engine.core.node_handlers import action_handler
+
+HANDLER_PATH = "app.modules.automations_engine.tests.handlers_for_testing.handle_test_action"
+ACTION_ID    = "bench_module.bench_action"
+NUMBER       = 200_000
+
+
+def _legacy_execute(node_config: dict, ctx: dict, db, user_id: int) -> dict:
+    """Camino anterior: importlib por cada ejecución de nodo."""
+    action_def = registry.get_action(node_config.get("action_id"))
+    module_path, func_name = action_def.handler_path.rsplit(".", 1)
+    handler = getattr(importlib.import_module(module_path), func_name)
+    return handler(payload=ctx.get("payload", {}), config=node_config, db=db, user_id=user_id)
+
+
+def main() -> None:
+    registry.register_action(
+        module_id="bench_module", action_id="bench_action",
+        label="Bench", config_schema={}, handler=HANDLER_PATH,
+    )
+    config = {"action_id": ACTION_ID}
+    ctx    = {"payload": {"value": 1}, "vars": {}}
+
+    before = timeit.timeit(lambda: _legacy_execute(config, ctx, None, 1), number=NUMBER)
+    after  = timeit.timeit(lambda: action_handler.execute(config, ctx, None, 1), number=NUMBER)
+
+    print(f"importlib por nodo:  {before / NUMBER * 1e6:7.3f} µs/nodo")
+    print(f"callable resuelto:   {after  / NUMBER * 1e6:7.3f} µs/nodo")
+    print(f"speedup:             {before / after:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,14 @@ def register_mock_triggers():
         config_schema={},
         handler="app.modules.automations_engine.core.node_handlers.trigger_handler.handle",
     )
+    registry.register_trigger(
+        module_id="test_module",
+        trigger_id="threshold_trigger",
+        label="Test trigger con prefilter",
+        config_schema={},
+        handler="app.modules.automations_engine.tests.handlers_for_testing.handle_test_threshold",
+        prefilter="app.modules.automations_engine.tests.handlers_for_testing.prefilter_test_threshold",
+    )
     registry.register_action(
         module_id="test_module",
         action_id="test_action",
@@ -42,6 +50,12 @@ def register_mock_triggers():
     yield
 
 
+@pytest.fixture(autouse=True)
+def no_webhook_backoff(monkeypatch):
+    """Los reintentos del webhook_client no esperan entre intentos en los tests."""
+    monkeypatch.setenv("AUTOMATIONS_WEBHOOK_BACKOFF_SECONDS", "0")
+
+
 # ── Flujos ────────────────────────────────────────────────────────────────────
 
 @pytest.fixture
@@ -22,4 +22,17 @@ def handle_test_action_with_output(payload: dict, config: dict, db, user_id: int
 
 
 def handle_test_action_that_fails(payload: dict, config: dict, db, user_id: int) -> dict:
-    raise RuntimeError("Este handler falla a propósito")
\ No newline at end of file
+    raise RuntimeError("Este handler falla a propósito")
+
+def handle_test_threshold(payload: dict, config: dict, db, user_id: int) -> dict:
+    if payload.get("value", 0) < config.get("min_value", 0):
+        return {"matched": False, "reason": "below min_value"}
+    return {"matched": True}
+
+
+def prefilter_test_threshold(payload: dict, config: dict) -> str | None:
+    if payload.get("explode"):
+        raise RuntimeError("prefilter roto a propósito")
+    if payload.get("value", 0) < config.get("min_value", 0):
+        return "below min_value"
+    return None
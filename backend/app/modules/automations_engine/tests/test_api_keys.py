@@ -158,4 +158,108 @@ class TestRegistryEndpoints:
             assert "ref_id"        in t
             assert "module_id"     in t
             assert "label"         in t
-            assert "config_schema" in t
\ No newline at end of file
+            assert "config_schema" in t
+
+class TestValidateApiKey:
+
+    def _validate(self, db, token, scope="trigger"):
+        from app.modules.automations_engine.services import api_key_service
+        return api_key_service.validate(token, scope, db)
+
+    def test_validate_returns_metadata(self, db, api_key_id_and_token):
+        key_id, token = api_key_id_and_token
+        entry = self._validate(db, token)
+        assert entry.id == key_id
+        assert entry.scopes == {"read", "trigger"}
+
+    def test_validate_invalid_token(self, db):
+        from app.modules.automations_engine.exceptions import ApiKeyInvalidError
+        with pytest.raises(ApiKeyInvalidError):
+            self._validate(db, "ak_live_nope")
+
+    def test_validate_insufficient_scope(self, db, auth_client):
+        from app.modules.automations_engine.exceptions import ApiKeyInsufficientScopeError
+        token = auth_client.post("/api/v1/automations/api-keys/", json={"name": "R", "scopes": ["read"]}).json()["token"]
+        with pytest.raises(ApiKeyInsufficientScopeError):
+            self._validate(db, token)
+
+    def test_validate_expired(self, db, api_key_id_and_token):
+        from datetime import datetime, timedelta, timezone
+        from app.modules.automations_engine.exceptions import ApiKeyExpiredError
+        from app.modules.automations_engine.models.api_key import ApiKey
+        key_id, token = api_key_id_and_token
+        db.get(ApiKey, key_id).expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db.commit()
+        with pytest.raises(ApiKeyExpiredError):
+            self._validate(db, token)
+
+    def test_validate_hits_cache(self, db, api_key_id_and_token):
+        from sqlalchemy import event
+        _, token = api_key_id_and_token
+        self._validate(db, token)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            for _ in range(5):
+                self._validate(db, token)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        assert statements == []
+
+    def test_revoke_invalidates_cache(self, db, auth_client, api_key_id_and_token):
+        from app.modules.automations_engine.exceptions import ApiKeyInvalidError
+        key_id, token = api_key_id_and_token
+        self._validate(db, token)
+        auth_client.delete(f"/api/v1/automations/api-keys/{key_id}")
+        with pytest.raises(ApiKeyInvalidError):
+            self._validate(db, token)
+
+    def test_revoke_in_other_worker_bounded_by_ttl(self, db, api_key_id_and_token):
+        """Otro worker revoca (sin tocar esta caché): la key se acepta como mucho durante el TTL."""
+        from unittest.mock import patch
+        from app.modules.automations_engine.core import api_key_cache as cache_module
+        from app.modules.automations_engine.exceptions import ApiKeyInvalidError
+        from app.modules.automations_engine.manifest import get_settings
+        from app.modules.automations_engine.models.api_key import ApiKey
+
+        key_id, token = api_key_id_and_token
+        ttl   = get_settings()["AUTOMATIONS_API_KEY_CACHE_TTL_SECONDS"]
+        start = cache_module.time.monotonic()
+        with patch.object(cache_module.time, "monotonic", return_value=start):
+            self._validate(db, token)
+        db.get(ApiKey, key_id).is_active = False
+        db.commit()
+
+        assert ttl <= 5
+        with patch.object(cache_module.time, "monotonic", return_value=start + ttl - 0.1):
+            assert self._validate(db, token).id == key_id   # ventana de revocación
+        with patch.object(cache_module.time, "monotonic", return_value=start + ttl + 0.1):
+            with pytest.raises(ApiKeyInvalidError):
+                self._validate(db, token)
+
+    def test_last_used_at_is_batched(self, db, auth_client, api_key_id_and_token):
+        from unittest.mock import patch
+        from sqlalchemy.orm import sessionmaker
+        from app.modules.automations_engine.models.api_key import ApiKey
+        from app.modules.automations_engine.services.api_key_usage_buffer import api_key_usage_buffer
+
+        key_id, token = api_key_id_and_token
+        second = auth_client.post("/api/v1/automations/api-keys/", json={"name": "K2", "scopes": ["trigger"]}).json()
+        for _ in range(3):
+            self._validate(db, token)
+        self._validate(db, second["token"])
+
+        assert db.get(ApiKey, key_id).last_used_at is None
+        assert api_key_usage_buffer.pending() == 2
+
+        with patch(
+            "app.modules.automations_engine.services.api_key_usage_buffer.SessionLocal",
+            sessionmaker(bind=db.get_bind()),
+        ):
+            assert api_key_usage_buffer.flush() == 2
+
+        db.expire_all()
+        assert db.get(ApiKey, key_id).last_used_at is not None
+        assert db.get(ApiKey, second["id"]).last_used_at is not None
@@ -1,4 +1,5 @@
 import pytest
+from app.modules.automations_engine.models.automation import Automation
 
 
 class TestAutomationsAuth:
@@ -57,6 +58,13 @@ class TestCreateAutomation:
         })
         assert response.status_code == 201
 
+    def test_create_denormalizes_trigger_config(self, db, auth_client, conditional_flow):
+        response = auth_client.post("/api/v1/automations/", json={
+            "name": "Config", "trigger_type": "module_event", "flow": conditional_flow,
+        })
+        automation = db.get(Automation, response.json()["id"])
+        assert automation.trigger_config == {"trigger_id": "test_module.test_trigger"}
+
     def test_create_duplicate_name_fails(self, auth_client, automation_data, automation_id):
         response = auth_client.post("/api/v1/automations/", json=automation_data)
         assert response.status_code == 409
@@ -76,6 +84,36 @@ class TestCreateAutomation:
         })
         assert response.status_code == 422
 
+    def test_create_with_invalid_condition_fails(self, auth_client):
+        response = auth_client.post("/api/v1/automations/", json={
+            "name": "Bad condition",
+            "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "n1", "type": "trigger",   "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "n2", "type": "condition", "config": {"field": "x", "op": "regex", "value": "("}},
+                ],
+                "edges": [{"from": "n1", "to": "n2"}]
+            }
+        })
+        assert response.status_code == 422
+
+    def test_create_with_cycle_fails(self, auth_client):
+        response = auth_client.post("/api/v1/automations/", json={
+            "name": "Cycle",
+            "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "n1", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "n2", "type": "action",  "config": {"action_id": "test_module.test_action"}},
+                    {"id": "n3", "type": "action",  "config": {"action_id": "test_module.test_action"}},
+                ],
+                "edges": [{"from": "n1", "to": "n2"}, {"from": "n2", "to": "n3"}, {"from": "n3", "to": "n2"}]
+            }
+        })
+        assert response.status_code == 422
+        assert "n2 → n3 → n2" in response.json()["detail"]
+
     def test_create_with_conditional_flow(self, auth_client, conditional_flow):
         response = auth_client.post("/api/v1/automations/", json={
             "name": "Conditional", "trigger_type": "module_event", "flow": conditional_flow
@@ -149,6 +187,13 @@ class TestUpdateAutomation:
         assert response.status_code == 200
         assert len(response.json()["flow"]["nodes"]) == 4
 
+    def test_update_flow_refreshes_trigger_config(self, db, auth_client, automation_id, webhook_flow):
+        auth_client.put(f"/api/v1/automations/{automation_id}/flow", json={
+            "flow": webhook_flow, "trigger_type": "webhook"
+        })
+        db.expire_all()
+        assert db.get(Automation, automation_id).trigger_config == {"trigger_id": "webhook.inbound"}
+
 
 class TestDeleteAutomation:
 
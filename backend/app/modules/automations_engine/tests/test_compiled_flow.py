@@ -0,0 +1,138 @@
+from app.modules.automations_engine.core.compiled_flow import compile_flow, flow_cache
+from app.modules.automations_engine.core.graph import build_graph, find_cycle, topological_order
+from app.modules.automations_engine.models.automation import Automation
+
+
+def _branching_flow():
+    return {
+        "nodes": [
+            {"id": "n1", "type": "trigger",   "config": {"trigger_id": "test_module.test_trigger"}},
+            {"id": "n2", "type": "condition", "config": {"field": "x", "op": "eq", "value": 1}},
+            {"id": "n3", "type": "action",    "config": {"action_id": "test_module.test_action"}},
+            {"id": "n4", "type": "stop",      "config": {}},
+            {"id": "n5", "type": "action",    "config": {"action_id": "test_module.test_action"}},
+        ],
+        "edges": [
+            {"from": "n1", "to": "n2"},
+            {"from": "n2", "to": "n3", "when": "true"},
+            {"from": "n2", "to": "n5"},
+            {"from": "n2", "to": "n4", "when": "false"},
+        ],
+    }
+
+
+class TestCompileFlow:
+
+    def test_root_is_trigger(self):
+        assert compile_flow(_branching_flow()).root.id == "n1"
+
+    def test_no_trigger_root_is_none(self):
+        assert compile_flow({"nodes": [], "edges": []}).root is None
+
+    def test_branch_tables_keep_edge_order(self):
+        compiled = compile_flow(_branching_flow())
+        assert [n.id for n in compiled.next_nodes("n2", True)]  == ["n3", "n5"]
+        assert [n.id for n in compiled.next_nodes("n2", False)] == ["n5", "n4"]
+        assert [n.id for n in compiled.next_nodes("n2", None)]  == ["n5"]
+
+    def test_leaf_has_no_next_nodes(self):
+        assert compile_flow(_branching_flow()).next_nodes("n3", None) == ()
+
+    def test_handlers_resolved(self):
+        compiled = compile_flow(_branching_flow())
+        assert callable(compiled.handlers["n2"])
+
+    def test_unknown_node_type_has_no_handler(self):
+        compiled = compile_flow({"nodes": [{"id": "x", "type": "bogus", "config": {}}], "edges": []})
+        assert compiled.handlers["x"] is None
+
+
+def _flow(node_ids, edges):
+    return {
+        "nodes": [{"id": n, "type": "action", "config": {}} for n in node_ids],
+        "edges": [{"from": a, "to": b} for a, b in edges],
+    }
+
+
+class TestGraphOrder:
+
+    def test_join_node_after_all_inputs(self):
+        graph = build_graph(_flow(["t", "a", "b", "x", "c"], [("t", "a"), ("t", "b"), ("a", "c"), ("b", "x"), ("x", "c")]))
+        order = topological_order(graph)
+        assert order.index("c") > order.index("x") > order.index("b")
+
+    def test_cycle_nodes_go_last(self):
+        graph = build_graph(_flow(["t", "a", "b", "z"], [("t", "a"), ("a", "b"), ("b", "a")]))
+        assert topological_order(graph) == ["t", "z", "a", "b"]
+
+    def test_find_cycle(self):
+        graph = build_graph(_flow(["t", "a", "b", "c"], [("t", "a"), ("a", "b"), ("b", "c"), ("c", "a")]))
+        assert find_cycle(graph) == ["a", "b", "c", "a"]
+
+    def test_self_loop(self):
+        assert find_cycle(build_graph(_flow(["t"], [("t", "t")]))) == ["t", "t"]
+
+    def test_dag_has_no_cycle(self):
+        assert find_cycle(build_graph(_flow(["t", "a", "b", "c"], [("t", "a"), ("t", "b"), ("a", "c"), ("b", "c")]))) is None
+
+    def test_compiled_rank(self):
+        compiled = compile_flow(_branching_flow())
+        assert compiled.rank["n1"] < compiled.rank["n2"] < compiled.rank["n3"]
+
+
+class TestFlowCache:
+
+    def test_same_version_reuses_compiled(self, db, automation_id):
+        automation = db.query(Automation).filter(Automation.id == automation_id).first()
+        assert flow_cache.get(automation) is flow_cache.get(automation)
+
+    def test_run_does_not_invalidate(self, db, automation_id):
+        """Ejecutar actualiza run_count pero no updated_at — el compilado sigue valiendo."""
+        from app.modules.automations_engine.services.automation_runner import automation_runner
+        automation = db.query(Automation).filter(Automation.id == automation_id).first()
+        compiled   = flow_cache.get(automation)
+
+        automation_runner.run(automation, {}, automation.user_id, db)
+
+        db.refresh(automation)
+        assert automation.run_count == 1
+        assert flow_cache.get(automation) is compiled
+
+    def test_flow_update_recompiles(self, db, auth_client, automation_id, conditional_flow):
+        automation = db.query(Automation).filter(Automation.id == automation_id).first()
+        compiled   = flow_cache.get(automation)
+
+        auth_client.put(f"/api/v1/automations/{automation_id}/flow", json={"flow": conditional_flow})
+
+        db.refresh(automation)
+        recompiled = flow_cache.get(automation)
+        assert recompiled is not compiled
+        assert "n4" in recompiled.nodes
+
+    def test_lru_eviction(self, simple_flow):
+        from types import SimpleNamespace
+        from app.modules.automations_engine.core.compiled_flow import FlowCache
+        cache = FlowCache(max_entries=1)
+        first  = SimpleNamespace(id=1, updated_at=None, flow=simple_flow)
+        second = SimpleNamespace(id=2, updated_at=None, flow=simple_flow)
+
+        compiled_first = cache.get(first)
+        cache.get(second)
+
+        assert len(cache) == 1
+        assert cache.get(first) is not compiled_first
+
+
+class TestPreparedHandlers:
+
+    def test_webhook_template_compiled_with_flow(self):
+        """El body_template se compila al compilar el flujo y llega a execute como prepared."""
+        compiled = compile_flow({
+            "nodes": [
+                {"id": "t", "type": "trigger",          "config": {"trigger_id": "test_module.test_trigger"}},
+                {"id": "w", "type": "outbound_webhook", "config": {"url": "https://example.com", "body_template": {"n": "{{n}}"}}},
+            ],
+            "edges": [{"from": "t", "to": "w"}],
+        })
+        prepared = compiled.handlers["w"].keywords["prepared"]
+        assert prepared.render({"payload": {"n": 5}, "vars": {}}) == {"n": 5}
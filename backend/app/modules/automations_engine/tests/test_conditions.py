@@ -0,0 +1,89 @@
+import pytest
+from app.modules.automations_engine.core.conditions import compile_condition
+from app.modules.automations_engine.core.node_handlers import condition_handler
+
+
+def _ctx(payload=None, vars=None):
+    return {"payload": payload or {}, "vars": vars or {}}
+
+
+def _eval(config, payload=None, vars=None):
+    return compile_condition(config)(_ctx(payload, vars))
+
+
+class TestOperators:
+
+    @pytest.mark.parametrize("op,value,field,expected", [
+        ("eq",      5,       5,       True),
+        ("eq",      5,       "5",     True),
+        ("neq",     5,       "5.0",   False),
+        ("gt",      10,      "12",    True),
+        ("gte",     10,      10,      True),
+        ("lt",      10,      "abc",   False),
+        ("lte",     "b",     "a",     True),
+        ("in",      [1, 2],  "2",     True),
+        ("not_in",  ["a"],   "b",     True),
+        ("between", [10, 20], 20,     True),
+        ("between", [10, 20], "21",   False),
+        ("regex",   r"^gym", "gym:leg", True),
+        ("regex",   r"^gym", None,    False),
+        ("contains", "x",    ["x"],   True),
+        ("contains", "x",    5,       False),
+    ])
+    def test_operator(self, op, value, field, expected):
+        assert _eval({"field": "f", "op": op, "value": value}, {"f": field}) is expected
+
+    def test_bool_is_not_numeric(self):
+        assert _eval({"field": "f", "op": "eq", "value": 1}, {"f": True}) is True  # True == 1 en Python
+        assert _eval({"field": "f", "op": "gt", "value": 0}, {"f": "true"}) is False
+
+    def test_nested_field_and_vars_precedence(self):
+        config = {"field": "node_n1.matched", "op": "eq", "value": True}
+        assert _eval(config, {"node_n1": {"matched": False}}, {"node_n1": {"matched": True}}) is True
+
+    def test_unknown_operator_is_false(self):
+        assert _eval({"field": "f", "op": "bogus", "value": 1}, {"f": 1}) is False
+
+
+class TestGroups:
+
+    def test_and_or_not(self):
+        config = {"and": [
+            {"field": "kcal", "op": "gt", "value": 2500},
+            {"or": [
+                {"field": "meal", "op": "in", "value": ["dinner", "snack"]},
+                {"not": {"field": "weekday", "op": "between", "value": [1, 5]}},
+            ]},
+        ]}
+        assert _eval(config, {"kcal": 2600, "meal": "snack", "weekday": 3}) is True
+        assert _eval(config, {"kcal": 2600, "meal": "lunch", "weekday": 6}) is True
+        assert _eval(config, {"kcal": 2600, "meal": "lunch", "weekday": 3}) is False
+        assert _eval(config, {"kcal": 2000, "meal": "snack", "weekday": 6}) is False
+
+    def test_empty_groups(self):
+        assert _eval({"and": []}) is True
+        assert _eval({"or": []}) is False
+
+
+class TestInvalidConfig:
+
+    @pytest.mark.parametrize("config", [
+        {"field": "f", "op": "between", "value": [1]},
+        {"field": "f", "op": "in", "value": "a"},
+        {"field": "f", "op": "regex", "value": "("},
+        {"and": {"field": "f"}},
+        {"and": [], "or": []},
+        {"not": "f"},
+    ])
+    def test_malformed_raises(self, config):
+        with pytest.raises(ValueError):
+            compile_condition(config)
+
+    def test_strict_rejects_unknown_operator(self):
+        with pytest.raises(ValueError):
+            compile_condition({"field": "f", "op": "bogus"}, strict=True)
+
+    def test_handler_fails_node_on_invalid_config(self):
+        predicate = condition_handler.prepare({"field": "f", "op": "regex", "value": "("})
+        with pytest.raises(ValueError, match="Condición inválida"):
+            condition_handler.execute({}, _ctx(), None, 1, prepared=predicate)
@@ -0,0 +1,167 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from app.modules.automations_engine.core.schedule import (
+    SCHEDULE_CRON, SCHEDULE_INTERVAL, SCHEDULE_ONCE, compute_next_run, validate_schedule,
+)
+from app.modules.automations_engine.models.automation import Automation
+from app.modules.automations_engine.enums import ExecutionStatus
+from app.modules.automations_engine.models.execution import Execution
+from app.modules.automations_engine.models.execution_job import ExecutionJob
+from app.modules.automations_engine.services.cron_scheduler_service import cron_scheduler
+from app.modules.automations_engine.services.execution_queue import execution_queue
+
+# Sábado 17/10/2026 12:07:30 UTC (Madrid en horario de verano, UTC+2)
+NOW = datetime(2026, 10, 17, 12, 7, 30, tzinfo=timezone.utc)
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestComputeNextRun:
+
+    def test_once_runs_at_run_at_only_once(self):
+        config = {"run_at": "2026-10-20T08:00:00Z"}
+        assert compute_next_run(SCHEDULE_ONCE, config, None, NOW) == _utc(2026, 10, 20, 8, 0)
+        assert compute_next_run(SCHEDULE_ONCE, config, NOW, NOW) is None
+
+    def test_interval_from_last_run(self):
+        config = {"interval_value": 2, "interval_unit": "hours"}
+        assert compute_next_run(SCHEDULE_INTERVAL, config, None, NOW) == NOW
+        assert compute_next_run(SCHEDULE_INTERVAL, config, NOW, NOW) == NOW + timedelta(hours=2)
+        assert compute_next_run(SCHEDULE_INTERVAL, config, NOW - timedelta(days=1), NOW) == NOW
+
+    def test_non_positive_interval_never_runs(self):
+        # filas guardadas antes de validar el intervalo: sin next_run_at, no en bucle
+        assert compute_next_run(SCHEDULE_INTERVAL, {"interval_value": 0}, NOW, NOW) is None
+        assert compute_next_run(SCHEDULE_INTERVAL, {"interval_value": -1}, None, NOW) is None
+
+    def test_interval_window_in_timezone(self):
+        config = {"interval_value": 30, "active_from": "22:00", "active_until": "06:00", "timezone": "Europe/Madrid"}
+        assert compute_next_run(SCHEDULE_INTERVAL, config, None, NOW) == _utc(2026, 10, 17, 20, 0)
+
+    def test_cron_weekdays_in_timezone(self):
+        config = {"expression": "*/15 9-17 * * 1-5", "timezone": "Europe/Madrid"}
+        assert compute_next_run(SCHEDULE_CRON, config, None, NOW) == _utc(2026, 10, 19, 7, 0)
+
+    def test_cron_sunday_is_zero(self):
+        assert compute_next_run(SCHEDULE_CRON, {"expression": "0 8 * * 0"}, None, NOW) == _utc(2026, 10, 18, 8, 0)
+
+    def test_cron_does_not_repeat_same_minute(self):
+        fired = NOW.replace(second=0)
+        assert compute_next_run(SCHEDULE_CRON, {"expression": "7 12 * * *"}, fired, fired) == _utc(2026, 10, 18, 12, 7)
+
+    def test_cron_respects_window(self):
+        config = {"expression": "*/5 * * * *", "active_from": "22:00", "active_until": "06:00"}
+        assert compute_next_run(SCHEDULE_CRON, config, None, NOW) == _utc(2026, 10, 17, 22, 0)
+
+    @pytest.mark.parametrize("trigger_id,config", [
+        (SCHEDULE_CRON,     {"expression": "* * *"}),
+        (SCHEDULE_CRON,     {"expression": "61 * * * *"}),
+        (SCHEDULE_CRON,     {"expression": "* * * * *", "timezone": "Mars/Olympus"}),
+        (SCHEDULE_INTERVAL, {"interval_unit": "weeks"}),
+        (SCHEDULE_INTERVAL, {"interval_value": 0}),
+        (SCHEDULE_INTERVAL, {"interval_value": -5}),
+        (SCHEDULE_INTERVAL, {"active_from": "25:00", "active_until": "06:00"}),
+    ])
+    def test_invalid_config(self, trigger_id, config):
+        with pytest.raises(ValueError):
+            validate_schedule(trigger_id, config)
+
+
+def _cron_automation(auth_client, config, name="Cron"):
+    response = auth_client.post("/api/v1/automations/", json={
+        "name": name, "trigger_type": "cron",
+        "flow": {
+            "nodes": [
+                {"id": "n1", "type": "trigger", "config": config},
+                {"id": "n2", "type": "action",  "config": {"action_id": "test_module.test_action"}},
+            ],
+            "edges": [{"from": "n1", "to": "n2"}],
+        },
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class TestCronScheduler:
+
+    def test_create_sets_next_run_at(self, auth_client):
+        data = _cron_automation(auth_client, {"trigger_id": "system.schedule_cron", "expression": "0 8 * * *"})
+        assert data["next_run_at"] is not None
+
+    def test_non_cron_automation_has_no_next_run(self, auth_client, automation_id):
+        assert auth_client.get(f"/api/v1/automations/{automation_id}").json()["next_run_at"] is None
+
+    def test_invalid_expression_rejected(self, auth_client):
+        response = auth_client.post("/api/v1/automations/", json={
+            "name": "Bad cron", "trigger_type": "cron",
+            "flow": {"nodes": [{"id": "n1", "type": "trigger",
+                                "config": {"trigger_id": "system.schedule_cron", "expression": "every day"}}],
+                     "edges": []},
+        })
+        assert response.status_code == 422
+
+    def test_deactivate_clears_next_run(self, auth_client):
+        data = _cron_automation(auth_client, {"trigger_id": "system.schedule_interval", "interval_value": 5})
+        response = auth_client.patch(f"/api/v1/automations/{data['id']}", json={"is_active": False})
+        assert response.json()["next_run_at"] is None
+
+    def test_run_due_executes_and_advances(self, auth_client, db):
+        data = _cron_automation(auth_client, {"trigger_id": "system.schedule_interval", "interval_value": 5})
+        automation = db.get(Automation, data["id"])
+        updated_at = automation.updated_at
+
+        now = datetime.now(timezone.utc) + timedelta(seconds=1)
+        assert cron_scheduler.run_due(db, now=now) == 1
+        assert cron_scheduler.run_due(db, now=now) == 0
+
+        db.expire_all()
+        automation = db.get(Automation, data["id"])
+        assert automation.run_count == 1
+        assert automation.next_run_at == now + timedelta(minutes=5)
+        assert automation.updated_at == updated_at
+        assert db.query(Execution).filter(Execution.automation_id == automation.id).count() == 1
+
+    def test_not_due_is_not_claimed(self, auth_client, db):
+        _cron_automation(auth_client, {"trigger_id": "system.schedule_once", "run_at": "2099-01-01T00:00:00Z"})
+        assert cron_scheduler.run_due(db) == 0
+
+    def test_schedule_once_deactivates(self, auth_client, db):
+        data = _cron_automation(auth_client, {"trigger_id": "system.schedule_once", "run_at": "2020-01-01T00:00:00Z"})
+
+        assert cron_scheduler.run_due(db) == 1
+
+        db.expire_all()
+        automation = db.get(Automation, data["id"])
+        assert automation.is_active is False
+        assert automation.next_run_at is None
+        assert automation.run_count == 1
+
+    def test_queue_mode_enqueues_instead_of_running(self, auth_client, db, monkeypatch):
+        data = _cron_automation(auth_client, {"trigger_id": "system.schedule_once", "run_at": "2020-01-01T00:00:00Z"})
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+        assert cron_scheduler.run_due(db) == 1
+
+        job = db.query(ExecutionJob).one()
+        assert (job.automation_id, job.trigger_ref) == (data["id"], "system.schedule_once")
+        assert db.query(Execution).count() == 0             # el hilo del cron no ejecuta
+        db.expire_all()
+        assert db.get(Automation, data["id"]).is_active is False
+
+        execution_queue.process_next(db)
+
+        db.expire_all()
+        assert db.get(Automation, data["id"]).run_count == 1
+        assert db.query(Execution).filter(Execution.automation_id == data["id"]).one().status == ExecutionStatus.SUCCESS
+
+    def test_sync_missing_backfills(self, auth_client, db):
+        data = _cron_automation(auth_client, {"trigger_id": "system.schedule_interval", "interval_value": 5})
+        automation = db.get(Automation, data["id"])
+        automation.next_run_at = None
+        db.commit()
+
+        assert cron_scheduler.sync_missing(db) == 1
+        db.expire_all()
+        assert db.get(Automation, data["id"]).next_run_at is not None
@@ -0,0 +1,269 @@
+import json
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from app.modules.automations_engine.enums import ExecutionJobStatus, ExecutionStatus
+from app.modules.automations_engine.models.automation import Automation
+from app.modules.automations_engine.models.execution import Execution
+from app.modules.automations_engine.models.execution_job import ExecutionJob
+from app.modules.automations_engine.models.suspended_execution import SuspendedExecution
+from app.modules.automations_engine.services.delay_resumer import DelayResumer, delay_resumer
+from app.modules.automations_engine.services.execution_queue import RESUME_TRIGGER_REF, execution_queue
+
+
+def _later(minutes: int) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+
+def _delay_flow(*delays_minutes):
+    """trigger → delay(m1) → action → delay(m2) → action ..."""
+    nodes = [{"id": "t", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}}]
+    edges = []
+    prev  = "t"
+    for i, minutes in enumerate(delays_minutes):
+        nodes.append({"id": f"d{i}", "type": "delay",  "config": {"minutes": minutes}})
+        nodes.append({"id": f"a{i}", "type": "action", "config": {"action_id": "test_module.test_action"}})
+        edges += [{"from": prev, "to": f"d{i}"}, {"from": f"d{i}", "to": f"a{i}"}]
+        prev = f"a{i}"
+    return {"nodes": nodes, "edges": edges}
+
+
+@pytest.fixture
+def make_waiting(auth_client):
+    def _make(flow, payload=None):
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": f"Delay {len(flow['nodes'])}", "trigger_type": "module_event", "flow": flow,
+        }).json()["id"]
+        execution = auth_client.post(
+            f"/api/v1/automations/{aid}/trigger", json={"payload": payload or {}},
+        ).json()
+        return aid, execution
+    return _make
+
+
+class TestSuspend:
+
+    def test_waiting_execution_persists_cursor_and_ctx(self, db, make_waiting):
+        _, execution = make_waiting(_delay_flow(5), {"k": "v"})
+
+        assert execution["status"] == "waiting"
+        row = db.query(SuspendedExecution).filter(SuspendedExecution.execution_id == execution["id"]).one()
+        assert row.cursor == ["a0"]
+        assert row.ctx["payload"] == {"k": "v"}
+        assert row.resume_at > _later(4)
+
+    def test_not_resumed_before_due(self, db, make_waiting):
+        _, execution = make_waiting(_delay_flow(5))
+
+        assert delay_resumer.resume_due(db) == 0
+        assert db.get(Execution, execution["id"]).status == ExecutionStatus.WAITING
+
+    def test_delay_as_last_node_does_not_suspend(self, auth_client, db):
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Delay at end", "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "t", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "d", "type": "delay",   "config": {"minutes": 5}},
+                ],
+                "edges": [{"from": "t", "to": "d"}],
+            },
+        }).json()["id"]
+
+        response = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}})
+
+        assert response.json()["status"] == "success"
+        assert db.query(SuspendedExecution).count() == 0
+
+
+class TestResume:
+
+    def test_resume_completes_and_removes_row(self, db, make_waiting):
+        _, execution = make_waiting(_delay_flow(5))
+
+        assert delay_resumer.resume_due(db, now=_later(6)) == 1
+
+        finished = db.get(Execution, execution["id"])
+        db.refresh(finished)
+        assert finished.status == ExecutionStatus.SUCCESS
+        assert [l["node_id"] for l in finished.node_logs] == ["t", "d0", "a0"]
+        assert db.query(SuspendedExecution).count() == 0
+
+    def test_chained_delays_suspend_again(self, db, make_waiting):
+        _, execution = make_waiting(_delay_flow(5, 60))
+
+        delay_resumer.resume_due(db, now=_later(6))
+        waiting = db.get(Execution, execution["id"])
+        db.refresh(waiting)
+        assert waiting.status == ExecutionStatus.WAITING
+        assert db.query(SuspendedExecution).one().cursor == ["a1"]
+
+        delay_resumer.resume_due(db, now=_later(70))
+        db.refresh(waiting)
+        assert waiting.status == ExecutionStatus.SUCCESS
+        assert [l["node_id"] for l in waiting.node_logs] == ["t", "d0", "a0", "d1", "a1"]
+
+    def test_claimed_row_is_not_resumed_twice(self, db, make_waiting):
+        make_waiting(_delay_flow(5))
+        row = db.query(SuspendedExecution).one()
+        row.locked_until = _later(30)
+        db.commit()
+
+        assert delay_resumer.resume_due(db, now=_later(6)) == 0
+
+    def test_deactivated_automation_fails_execution(self, auth_client, db, make_waiting):
+        aid, execution = make_waiting(_delay_flow(5))
+        auth_client.patch(f"/api/v1/automations/{aid}", json={"is_active": False})
+
+        delay_resumer.resume_due(db, now=_later(6))
+
+        failed = db.get(Execution, execution["id"])
+        db.refresh(failed)
+        assert failed.status == ExecutionStatus.FAILED
+        assert db.query(SuspendedExecution).count() == 0
+
+    def test_truncated_outputs_survive_resume(self, auth_client, db):
+        flow = _delay_flow(5)
+        flow["nodes"].insert(1, {"id": "big", "type": "action", "config": {"action_id": "test_module.test_action"}})
+        flow["edges"][0] = {"from": "t", "to": "big"}
+        flow["edges"].insert(1, {"from": "big", "to": "d0"})
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Big then delay", "trigger_type": "module_event", "flow": flow,
+        }).json()["id"]
+        payload   = {"items": list(range(2000))}
+        execution = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": payload}).json()
+
+        delay_resumer.resume_due(db, now=_later(6))
+
+        node = auth_client.get(f"/api/v1/automations/{aid}/executions/{execution['id']}/nodes/big").json()
+        assert node["output_truncated"] is True
+        assert node["output"]["received_payload"] == payload
+
+    def test_queue_mode_hands_resume_to_workers(self, db, make_waiting, monkeypatch):
+        _, execution = make_waiting(_delay_flow(5))
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+        assert delay_resumer.resume_due(db, now=_later(6)) == 1
+        job = db.query(ExecutionJob).one()
+        assert (job.trigger_ref, job.execution_id) == (RESUME_TRIGGER_REF, execution["id"])
+        waiting = db.get(Execution, execution["id"])
+        db.refresh(waiting)
+        assert waiting.status == ExecutionStatus.WAITING     # el hilo del resumer no la ejecuta
+
+        execution_queue.process_next(db)
+
+        db.refresh(waiting)
+        db.refresh(job)
+        assert waiting.status == ExecutionStatus.SUCCESS
+        assert job.status == ExecutionJobStatus.DONE
+        assert db.query(SuspendedExecution).count() == 0
+
+    def test_queue_mode_does_not_duplicate_live_job(self, db, make_waiting, monkeypatch):
+        make_waiting(_delay_flow(5))
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+        delay_resumer.resume_due(db, now=_later(6))
+        assert delay_resumer.resume_due(db, now=_later(120)) == 1   # locked_until vencido, job aún en cola
+        assert db.query(ExecutionJob).count() == 1
+
+    def test_flow_changed_during_wait_fails(self, auth_client, db, make_waiting, simple_flow):
+        aid, execution = make_waiting(_delay_flow(5))
+        auth_client.put(f"/api/v1/automations/{aid}/flow", json={"flow": simple_flow})
+
+        delay_resumer.resume_due(db, now=_later(6))
+
+        failed = db.get(Execution, execution["id"])
+        db.refresh(failed)
+        assert failed.status == ExecutionStatus.FAILED
+        assert "El flujo cambió" in failed.error_message
+
+
+def _flow(*nodes):
+    """trigger → nodos en cadena."""
+    chain = [{"id": "t", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}}, *nodes]
+    return {"nodes": chain, "edges": [{"from": a["id"], "to": b["id"]} for a, b in zip(chain, chain[1:])]}
+
+
+def _create(auth_client, name, flow):
+    return auth_client.post("/api/v1/automations/", json={"name": name, "trigger_type": "module_event", "flow": flow})
+
+
+class TestChildFlowDelay:
+    """Un flujo hijo corre dentro del nodo automation_call del padre: no puede tener delays."""
+
+    DELAY = {"id": "d", "type": "delay", "config": {"minutes": 60}}
+
+    def _call(self, automation_id):
+        return {"id": "c", "type": "automation_call", "config": {"automation_id": automation_id}}
+
+    def test_calling_flow_with_delay_rejected(self, auth_client):
+        child = _create(auth_client, "Child", _flow(self.DELAY)).json()["id"]
+        middle = _create(auth_client, "Middle", _flow(self._call(child)))
+
+        assert middle.status_code == 422
+
+    def test_adding_delay_to_called_flow_rejected(self, auth_client):
+        child = _create(auth_client, "Child", _flow()).json()["id"]
+        assert _create(auth_client, "Parent", _flow(self._call(child))).status_code == 201
+
+        response = auth_client.put(f"/api/v1/automations/{child}/flow", json={"flow": _flow(self.DELAY)})
+        assert response.status_code == 422
+
+    def test_delay_in_child_fails_without_sleeping(self, auth_client, db):
+        """Si la validación se salta (filas previas), el nodo falla en vez de dormir el hilo."""
+        child  = _create(auth_client, "Child", _flow()).json()["id"]
+        parent = _create(auth_client, "Parent", _flow(self._call(child))).json()["id"]
+        automation = db.get(Automation, child)
+        automation.flow = _flow(self.DELAY)
+        db.commit()
+
+        with patch("time.sleep") as mock_sleep:
+            response = auth_client.post(f"/api/v1/automations/{parent}/trigger", json={"payload": {}})
+
+        mock_sleep.assert_not_called()
+        assert response.json()["status"] == "success"
+        node = auth_client.get(f"/api/v1/automations/{parent}/executions/{response.json()['id']}/nodes/c").json()
+        assert node["output"]["result"]["status"] == "failed"
+
+
+class TestStreamDelay:
+
+    def test_stream_done_event_is_waiting(self, auth_client, db):
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Stream delay", "trigger_type": "module_event", "flow": _delay_flow(5),
+        }).json()["id"]
+
+        response = auth_client.post(f"/api/v1/automations/{aid}/trigger/stream", json={"payload": {}})
+        events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+        done   = events[-1]
+
+        assert done["type"] == "done"
+        assert done["status"] == "waiting"
+        assert "resume_at" in done
+        assert "suspension" not in done
+
+
+class TestTimerHeap:
+
+    def test_next_wakeup_tracks_earliest(self):
+        resumer = DelayResumer()
+        now     = datetime.now(timezone.utc)
+        resumer._schedule(now + timedelta(seconds=20))
+        resumer._schedule(now + timedelta(seconds=5))
+
+        wait = resumer.next_wakeup(now.timestamp(), poll_seconds=30)
+        assert 4 <= wait <= 5
+
+    def test_next_wakeup_bounded_by_poll(self):
+        resumer = DelayResumer()
+        now     = datetime.now(timezone.utc)
+        resumer._schedule(now + timedelta(hours=3))
+        assert resumer.next_wakeup(now.timestamp(), poll_seconds=30) == 30
+
+    def test_pop_due_only_removes_past_entries(self):
+        resumer = DelayResumer()
+        now     = datetime.now(timezone.utc)
+        resumer._schedule(now - timedelta(seconds=1))
+        resumer._schedule(now + timedelta(seconds=60))
+        assert resumer._pop_due(now.timestamp()) == 1
+        assert resumer._pop_due(now.timestamp()) == 0
@@ -0,0 +1,158 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+from app.modules.automations_engine.models.automation import Automation
+from app.modules.automations_engine.models.node_latency_stat import NodeLatencyStat
+from app.modules.automations_engine.services.automation_runner import automation_runner
+from app.modules.automations_engine.services.execution_profile import (
+    BUCKETS, EXECUTION_NODE, bucket_of, execution_profile, percentile, profile_rows,
+)
+
+
+def _log(node_id, ms, status="success"):
+    return {"node_id": node_id, "node_type": "action", "status": status, "duration_ms": ms}
+
+
+@pytest.fixture
+def flush(db):
+    test_sessions = sessionmaker(bind=db.get_bind())
+
+    def _flush():
+        with patch("app.modules.automations_engine.services.execution_profile.SessionLocal", test_sessions):
+            return execution_profile.flush()
+    return _flush
+
+
+class TestHistogram:
+
+    def test_bucket_bounds_are_inclusive(self):
+        assert bucket_of(0) == 0
+        assert bucket_of(1) == 0
+        assert bucket_of(2) == 1
+        assert bucket_of(60_000) == BUCKETS - 2
+        assert bucket_of(60_001) == BUCKETS - 1
+
+    def test_percentile_interpolates_inside_bucket(self):
+        histogram = [0] * BUCKETS
+        histogram[bucket_of(100)] = 100   # 50 < d <= 100
+        assert percentile(histogram, 0.5, max_ms=100) == 75
+        assert percentile(histogram, 1.0, max_ms=100) == 100
+
+    def test_percentile_capped_by_max(self):
+        histogram = [0] * BUCKETS
+        histogram[bucket_of(900)] = 1
+        assert percentile(histogram, 0.99, max_ms=600) == 600
+
+    def test_percentile_empty(self):
+        assert percentile([0] * BUCKETS, 0.5, max_ms=0) is None
+
+
+class TestProfileRows:
+
+    def test_groups_nodes_and_adds_execution_row(self):
+        rows = {r["node_id"]: r for r in profile_rows(1, [_log("a", 10), _log("b", 5, "failed"), _log("a", 30)], "failed")}
+
+        assert rows["a"]["calls"] == 2
+        assert rows["a"]["total_ms"] == 40
+        assert rows["a"]["max_ms"] == 30
+        assert rows["b"]["errors"] == 1
+        assert rows[EXECUTION_NODE]["total_ms"] == 45
+        assert rows[EXECUTION_NODE]["errors"] == 1
+
+    def test_waiting_has_no_execution_row(self):
+        rows = profile_rows(1, [_log("a", 10)], "waiting")
+        assert [r["node_id"] for r in rows] == ["a"]
+
+    def test_resumed_only_counts_new_nodes(self):
+        rows = {r["node_id"]: r for r in profile_rows(1, [_log("a", 10), _log("b", 20)], "success", new_from=1)}
+        assert "a" not in rows
+        assert rows["b"]["calls"] == 1
+        assert rows[EXECUTION_NODE]["total_ms"] == 30
+
+    def test_skipped_nodes_and_empty_logs_are_ignored(self):
+        assert profile_rows(1, [{"node_id": "s", "status": "skipped"}], "success")[0]["node_id"] == EXECUTION_NODE
+        assert profile_rows(1, [], "failed") == []
+
+
+class TestRecording:
+
+    def test_finish_accumulates_without_writing(self, db, automation_id):
+        automation = db.get(Automation, automation_id)
+        automation_runner.run(automation, {}, automation.user_id, db)
+
+        assert execution_profile.pending() == 3   # n1, n2 y la ejecución
+        assert db.query(NodeLatencyStat).count() == 0
+
+    def test_flush_upserts_and_merges_histograms(self, db, automation_id, flush):
+        automation = db.get(Automation, automation_id)
+        for _ in range(2):
+            automation_runner.run(automation, {}, automation.user_id, db)
+        assert flush() == 3
+        automation_runner.run(automation, {}, automation.user_id, db)
+        assert flush() == 3
+
+        row = db.query(NodeLatencyStat).filter(
+            NodeLatencyStat.automation_id == automation_id, NodeLatencyStat.node_id == "n2",
+        ).one()
+        assert row.calls == 3
+        assert sum(row.histogram) == 3
+        assert len(row.histogram) == BUCKETS
+
+    def test_flush_skips_deleted_automation(self, db, automation_id, flush):
+        execution_profile.add(profile_rows(automation_id, [_log("n2", 5)], "success"))
+        execution_profile.add(profile_rows(999_999, [_log("n2", 5)], "success"))
+
+        assert flush() == 2                     # sin la automation inexistente
+        assert execution_profile.pending() == 0
+        assert db.query(NodeLatencyStat).count() == 2
+
+    def test_delete_discards_pending_rows(self, auth_client, db, automation_id):
+        automation = db.get(Automation, automation_id)
+        automation_runner.run(automation, {}, automation.user_id, db)
+        assert execution_profile.pending() == 3
+
+        auth_client.delete(f"/api/v1/automations/{automation_id}")
+        assert execution_profile.pending() == 0
+
+    def test_purge_drops_old_hours(self, db, automation_id, flush):
+        old = datetime.now(timezone.utc) - timedelta(days=60)
+        execution_profile.add(profile_rows(automation_id, [_log("n2", 5)], "success", at=old))
+        execution_profile.add(profile_rows(automation_id, [_log("n2", 5)], "success"))
+        flush()
+
+        assert execution_profile.purge(db) == 2
+        assert db.query(NodeLatencyStat).count() == 2
+
+
+class TestProfileEndpoints:
+
+    def test_profile(self, auth_client, db, automation_id, flush):
+        for _ in range(3):
+            auth_client.post(f"/api/v1/automations/{automation_id}/trigger", json={"payload": {}})
+        flush()
+
+        body = auth_client.get(f"/api/v1/automations/{automation_id}/profile").json()
+        assert body["execution"]["calls"] == 3
+        assert body["execution"]["error_rate"] == 0
+        assert {n["node_id"] for n in body["nodes"]} == {"n1", "n2"}
+        node = body["nodes"][0]
+        assert node["calls"] == 3
+        assert node["p50_ms"] <= node["p95_ms"] <= node["p99_ms"] <= node["max_ms"]
+
+    def test_profile_empty(self, auth_client, automation_id):
+        body = auth_client.get(f"/api/v1/automations/{automation_id}/profile").json()
+        assert body["execution"] is None
+        assert body["nodes"] == []
+
+    def test_profile_other_user(self, other_auth_client, automation_id):
+        assert other_auth_client.get(f"/api/v1/automations/{automation_id}/profile").status_code == 404
+
+    def test_slowest(self, auth_client, other_auth_client, automation_id, flush):
+        execution_profile.add(profile_rows(automation_id, [_log("n2", 900)], "success"))
+        flush()
+
+        slowest = auth_client.get("/api/v1/automations/profile/slowest").json()
+        assert slowest[0]["automation_id"] == automation_id
+        assert slowest[0]["p95_ms"] > 500
+        assert other_auth_client.get("/api/v1/automations/profile/slowest").json() == []
@@ -0,0 +1,168 @@
+import time
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from app.modules.automations_engine.enums import ExecutionJobStatus, ExecutionStatus
+from app.modules.automations_engine.models.automation import Automation
+from app.modules.automations_engine.models.execution import Execution
+from app.modules.automations_engine.models.execution_job import ExecutionJob
+from app.modules.automations_engine.services.execution_queue import execution_queue
+
+
+TRIGGER_REF = "test_module.test_trigger"
+
+
+@pytest.fixture
+def queue_mode(monkeypatch):
+    monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+
+@pytest.fixture
+def automation(db, automation_id):
+    return db.query(Automation).filter(Automation.id == automation_id).first()
+
+
+@pytest.fixture
+def job(db, queue_mode, automation):
+    execution_queue.dispatch(TRIGGER_REF, {"key": "value"}, automation.user_id, db)
+    return db.query(ExecutionJob).one()
+
+
+class TestDispatch:
+
+    def test_queue_mode_enqueues_without_executing(self, db, job, automation):
+        assert job.automation_id == automation.id
+        assert job.status == ExecutionJobStatus.QUEUED
+        assert job.payload == {"key": "value"}
+        assert db.query(Execution).count() == 0
+
+    def test_no_subscriptions_enqueues_nothing(self, db, queue_mode, automation):
+        execution_queue.dispatch("test_module.other", {}, automation.user_id, db)
+        assert db.query(ExecutionJob).count() == 0
+
+    def test_inline_mode_executes_immediately(self, db, automation):
+        execution_queue.dispatch(TRIGGER_REF, {}, automation.user_id, db)
+        assert db.query(ExecutionJob).count() == 0
+        execution = db.query(Execution).one()
+        assert execution.status == ExecutionStatus.SUCCESS
+
+
+class TestProcessNext:
+
+    def test_empty_queue_returns_none(self, db, queue_mode):
+        assert execution_queue.process_next(db) is None
+
+    def test_runs_job_and_records_execution(self, db, job, automation):
+        processed = execution_queue.process_next(db)
+
+        assert processed.id == job.id
+        assert processed.status == ExecutionJobStatus.DONE
+        assert processed.attempts == 1
+        execution = db.query(Execution).filter(Execution.id == processed.execution_id).one()
+        assert execution.status == ExecutionStatus.SUCCESS
+        assert execution.trigger_payload == {"key": "value"}
+        db.refresh(automation)
+        assert automation.run_count == 1
+
+    def test_inactive_automation_is_skipped(self, db, job, automation):
+        automation.is_active = False
+        db.commit()
+
+        processed = execution_queue.process_next(db)
+
+        assert processed.status == ExecutionJobStatus.DONE
+        assert db.query(Execution).count() == 0
+
+
+class TestRetries:
+
+    def test_exception_requeues_with_backoff(self, db, job):
+        with patch(
+            "app.modules.automations_engine.services.execution_queue.automation_runner.run",
+            side_effect=RuntimeError("db down"),
+        ):
+            processed = execution_queue.process_next(db)
+
+        assert processed.status == ExecutionJobStatus.QUEUED
+        assert processed.attempts == 1
+        assert processed.last_error == "db down"
+        assert processed.available_at > datetime.now(timezone.utc)
+        # No disponible hasta que pase el backoff
+        assert execution_queue.process_next(db) is None
+
+    def test_fails_after_max_attempts(self, db, job):
+        job.max_attempts = 1
+        db.commit()
+
+        with patch(
+            "app.modules.automations_engine.services.execution_queue.automation_runner.run",
+            side_effect=RuntimeError("boom"),
+        ):
+            processed = execution_queue.process_next(db)
+
+        assert processed.status == ExecutionJobStatus.FAILED
+        assert processed.finished_at is not None
+
+    def test_backoff_is_exponential(self, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_JOB_BACKOFF_SECONDS", "10")
+        assert [execution_queue._backoff(n) for n in (1, 2, 3)] == [10, 20, 40]
+
+
+class TestVisibilityTimeout:
+
+    def test_claimed_job_is_invisible(self, db, job):
+        claimed = execution_queue.claim(db)
+        assert claimed.id == job.id
+        assert execution_queue.claim(db) is None
+
+    def test_expired_lock_is_reclaimed(self, db, job):
+        claimed = execution_queue.claim(db)
+        claimed.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+        processed = execution_queue.process_next(db)
+
+        assert processed.id == job.id
+        assert processed.attempts == 2
+        assert processed.status == ExecutionJobStatus.DONE
+
+    def test_heartbeat_keeps_long_job_claimed(self, db, job, monkeypatch):
+        """Un flujo más largo que el visibility timeout no se vuelve a reclamar mientras corre."""
+        from sqlalchemy.orm import sessionmaker
+        monkeypatch.setenv("AUTOMATIONS_JOB_VISIBILITY_TIMEOUT_SECONDS", "1")
+        other     = sessionmaker(bind=db.get_bind())
+        reclaimed = []
+
+        def long_run(*args, **kwargs):
+            time.sleep(1.5)
+            session = other()
+            try:
+                reclaimed.append(execution_queue.claim(session))
+            finally:
+                session.close()
+
+        with patch("app.modules.automations_engine.services.execution_queue.SessionLocal", other), \
+             patch("app.modules.automations_engine.services.execution_queue.automation_runner.run", side_effect=long_run):
+            processed = execution_queue.process_next(db)
+
+        assert reclaimed == [None]
+        assert processed.attempts == 1
+        assert processed.status == ExecutionJobStatus.DONE
+
+    def test_reclaimed_job_closes_abandoned_execution(self, db, job, automation):
+        claimed   = execution_queue.claim(db)
+        abandoned = Execution(
+            automation_id=automation.id, user_id=automation.user_id,
+            trigger_payload={}, status=ExecutionStatus.RUNNING,
+        )
+        db.add(abandoned)
+        db.commit()
+        claimed.execution_id = abandoned.id
+        claimed.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+        execution_queue.process_next(db)
+
+        db.refresh(abandoned)
+        assert abandoned.status == ExecutionStatus.FAILED
+        assert abandoned.error_message == "worker interrumpido"
@@ -0,0 +1,140 @@
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.modules.automations_engine.enums import ExecutionStatus
+from app.modules.automations_engine.models.automation import Automation
+from app.modules.automations_engine.models.execution import Execution
+from app.modules.automations_engine.services.automation_runner import automation_runner
+from app.modules.automations_engine.services.execution_service import execution_id_of, execution_service
+from app.modules.automations_engine.services.execution_write_buffer import execution_write_buffer
+
+
+@contextmanager
+def count_statements(db):
+    """Cuenta las sentencias SQL que llegan a la BD dentro del bloque."""
+    statements = []
+    engine     = db.get_bind()
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+@pytest.fixture
+def automation(db, automation_id):
+    return db.get(Automation, automation_id)
+
+
+@pytest.fixture
+def write_behind(monkeypatch, db):
+    monkeypatch.setenv("AUTOMATIONS_EXECUTION_WRITE_BEHIND", "true")
+    monkeypatch.setenv("AUTOMATIONS_EXECUTION_FLUSH_SIZE", "100")
+    test_sessions = sessionmaker(bind=db.get_bind(), autoflush=False)
+    with patch("app.modules.automations_engine.services.execution_write_buffer.SessionLocal", test_sessions):
+        yield execution_write_buffer
+    execution_write_buffer.flush()
+
+
+class TestStart:
+
+    def test_inserts_running_in_one_statement(self, db, automation):
+        with count_statements(db) as statements:
+            execution = execution_service.start(automation.id, automation.user_id, {"k": 1}, db)
+            execution_id = execution_id_of(execution)
+
+        assert statements == ["INSERT"]
+        row = db.get(Execution, execution_id)
+        assert row.status == ExecutionStatus.RUNNING
+        assert row.started_at is not None
+        assert row.trigger_payload == {"k": 1}
+
+
+class TestFinish:
+
+    def test_success_and_run_count_in_one_transaction(self, db, automation):
+        updated_at, aid = automation.updated_at, automation.id
+        execution = execution_service.start(aid, automation.user_id, {}, db)
+
+        with count_statements(db) as statements:
+            execution_service.finish(
+                execution, {"status": "success", "node_logs": [{"node_id": "n1"}]}, db, automation_id=aid,
+            )
+
+        assert statements == ["UPDATE", "UPDATE"]
+        db.refresh(execution)
+        assert execution.status == ExecutionStatus.SUCCESS
+        assert execution.node_logs == [{"node_id": "n1"}]
+        assert execution.finished_at is not None
+        assert execution.duration_ms >= 0
+        db.refresh(automation)
+        assert automation.run_count == 1
+        assert automation.last_run_at is not None
+        assert automation.updated_at == updated_at
+
+    def test_fail_records_error(self, db, automation):
+        execution = execution_service.start(automation.id, automation.user_id, {}, db)
+        execution_service.fail(execution, "boom", db)
+
+        db.refresh(execution)
+        assert execution.status == ExecutionStatus.FAILED
+        assert execution.error_message == "boom"
+        assert execution.node_logs == []
+
+    def test_runner_bookkeeping_round_trips(self, db, automation):
+        """INSERT al empezar + 2 UPDATE al terminar; el resto de sentencias son del flujo."""
+        with count_statements(db) as statements:
+            automation_runner.run(automation, {}, automation.user_id, db)
+
+        assert statements.count("INSERT") == 1
+        assert statements.count("UPDATE") == 2
+
+
+class TestWriteBehind:
+
+    def test_terminal_updates_wait_for_flush(self, db, automation, write_behind):
+        for _ in range(3):
+            automation_runner.run(automation, {}, automation.user_id, db)
+
+        assert write_behind.pending() == 3
+        assert db.query(Execution).filter(Execution.status == ExecutionStatus.RUNNING).count() == 3
+
+        assert write_behind.flush() == 3
+
+        db.expire_all()
+        assert db.query(Execution).filter(Execution.status == ExecutionStatus.SUCCESS).count() == 3
+        assert db.get(Automation, automation.id).run_count == 3
+
+    def test_full_batch_flushes_immediately(self, db, automation, write_behind, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_FLUSH_SIZE", "2")
+        automation_runner.run(automation, {}, automation.user_id, db)
+        automation_runner.run(automation, {}, automation.user_id, db)
+
+        assert write_behind.pending() == 0
+        db.expire_all()
+        assert db.query(Execution).filter(Execution.status == ExecutionStatus.SUCCESS).count() == 2
+
+    def test_waiting_execution_is_not_buffered(self, db, auth_client, write_behind):
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Delay", "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "t", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "d", "type": "delay",   "config": {"minutes": 5}},
+                    {"id": "a", "type": "action",  "config": {"action_id": "test_module.test_action"}},
+                ],
+                "edges": [{"from": "t", "to": "d"}, {"from": "d", "to": "a"}],
+            },
+        }).json()["id"]
+        automation = db.get(Automation, aid)
+
+        execution = automation_runner.run(automation, {}, automation.user_id, db)
+
+        assert write_behind.pending() == 0
+        assert execution.status == ExecutionStatus.WAITING
@@ -0,0 +1,226 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import text
+from app.modules.automations_engine.enums import ExecutionStatus
+from app.modules.automations_engine.models.automation import Automation
+from app.modules.automations_engine.models.execution import Execution
+from app.modules.automations_engine.models.execution_daily_stat import ExecutionDailyStat
+from app.modules.automations_engine.services.execution_retention import (
+    execution_retention, month_start, partition_name,
+)
+
+
+def _partition_of(db, execution_id: int) -> str:
+    return db.execute(text(
+        "SELECT tableoid::regclass::text FROM automations.executions WHERE id = :id"
+    ), {"id": execution_id}).scalar()
+
+
+@pytest.fixture(autouse=True)
+def drop_monthly_partitions(db):
+    """Las particiones sobreviven al TRUNCATE de cada test: se eliminan al terminar."""
+    yield
+    db.rollback()
+    for month in execution_retention.list_partitions(db):
+        db.execute(text(f"DROP TABLE automations.{partition_name(month)}"))
+    db.commit()
+
+
+@pytest.fixture
+def automation(db, automation_id):
+    return db.get(Automation, automation_id)
+
+
+@pytest.fixture
+def add_execution(db, automation):
+    def _add(days_ago: float = 0, status=ExecutionStatus.SUCCESS, duration_ms=100, started_at=None):
+        execution = Execution(
+            automation_id = automation.id,
+            user_id       = automation.user_id,
+            status        = status,
+            started_at    = started_at or datetime.now(timezone.utc) - timedelta(days=days_ago),
+            duration_ms   = duration_ms,
+        )
+        db.add(execution)
+        db.commit()
+        return execution.id
+    return _add
+
+
+class TestPartitions:
+
+    def test_rows_without_monthly_partition_go_to_default(self, db, add_execution):
+        execution_id = add_execution(0)
+        assert _partition_of(db, execution_id) == "automations.executions_default"
+
+    def test_ensure_partitions_creates_current_and_ahead(self, db, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_PARTITIONS_AHEAD", "2")
+        now = datetime(2026, 11, 15, tzinfo=timezone.utc)
+
+        created = execution_retention.ensure_partitions(db, now=now)
+
+        assert created == ["executions_p202611", "executions_p202612", "executions_p202701"]
+        assert execution_retention.ensure_partitions(db, now=now) == []
+
+    def test_ensure_partitions_moves_rows_out_of_default(self, db, add_execution):
+        execution_id = add_execution(0)
+
+        execution_retention.ensure_partitions(db)
+
+        assert _partition_of(db, execution_id) == f"automations.{partition_name(month_start(datetime.now(timezone.utc)))}"
+        assert db.get(Execution, execution_id) is not None
+
+
+class TestRetention:
+
+    def test_expired_partition_is_rolled_up_and_dropped(self, db, automation, add_execution):
+        old_month = month_start(datetime.now(timezone.utc) - timedelta(days=200))
+        execution_retention.create_partition(old_month, db)
+        db.commit()
+        old_ok     = add_execution(started_at=old_month + timedelta(days=3))
+        old_failed = add_execution(started_at=old_month + timedelta(days=3), status=ExecutionStatus.FAILED)
+        recent     = add_execution(1)
+        assert _partition_of(db, old_ok) == f"automations.{partition_name(old_month)}"
+
+        summary = execution_retention.apply_retention(db)
+
+        assert summary["dropped_partitions"] == [partition_name(old_month)]
+        assert execution_retention.list_partitions(db) == []
+        db.expire_all()
+        assert db.get(Execution, old_ok) is None
+        assert db.get(Execution, old_failed) is None
+        assert db.get(Execution, recent) is not None
+        stat = db.query(ExecutionDailyStat).filter(ExecutionDailyStat.automation_id == automation.id).one()
+        assert stat.day == (old_month + timedelta(days=3)).date()
+        assert (stat.total, stat.success_count, stat.failed_count) == (2, 1, 1)
+
+    def test_dropped_partition_keeps_unfinished_executions(self, db, automation, add_execution):
+        old_month = month_start(datetime.now(timezone.utc) - timedelta(days=200))
+        execution_retention.create_partition(old_month, db)
+        db.commit()
+        done    = add_execution(started_at=old_month + timedelta(days=3))
+        waiting = add_execution(started_at=old_month + timedelta(days=3), status=ExecutionStatus.WAITING)
+
+        summary = execution_retention.apply_retention(db)
+
+        assert summary["dropped_partitions"] == [partition_name(old_month)]
+        db.expire_all()
+        assert db.get(Execution, done) is None
+        assert db.get(Execution, waiting).status == ExecutionStatus.WAITING
+        assert _partition_of(db, waiting) == "automations.executions_default"
+        stat = db.query(ExecutionDailyStat).filter(ExecutionDailyStat.automation_id == automation.id).one()
+        assert stat.total == 1
+
+        execution_retention.apply_retention(db)           # tampoco se borra desde DEFAULT
+        db.expire_all()
+        assert db.get(Execution, waiting) is not None
+
+    def test_waiting_execution_survives_short_policy(self, db, automation, add_execution):
+        execution_retention.set_policy(automation.user_id, 1, db)
+        waiting = add_execution(10, status=ExecutionStatus.WAITING)
+        pending = add_execution(10, status=ExecutionStatus.PENDING)
+        done    = add_execution(10)
+
+        summary = execution_retention.apply_retention(db)
+
+        assert summary["deleted_rows"] == 1
+        db.expire_all()
+        assert db.get(Execution, done) is None
+        assert db.get(Execution, waiting) is not None
+        assert db.get(Execution, pending) is not None
+
+    def test_default_partition_rows_past_horizon_are_deleted(self, db, automation, add_execution):
+        old    = add_execution(120, duration_ms=100)
+        recent = add_execution(10)
+
+        summary = execution_retention.apply_retention(db)
+
+        assert summary["deleted_rows"] == 1
+        db.expire_all()
+        assert db.get(Execution, old) is None
+        assert db.get(Execution, recent) is not None
+
+    def test_rollup_counts_and_percentiles(self, db, automation, add_execution):
+        for duration in (100, 200, 300, 400):
+            add_execution(120, duration_ms=duration)
+        add_execution(120, status=ExecutionStatus.FAILED, duration_ms=1000)
+
+        execution_retention.apply_retention(db)
+
+        stat = db.query(ExecutionDailyStat).filter(ExecutionDailyStat.automation_id == automation.id).one()
+        assert stat.total == 5
+        assert stat.success_count == 4
+        assert stat.failed_count == 1
+        assert stat.p50_duration_ms == 300
+        assert stat.p95_duration_ms > 400
+        assert stat.day == (datetime.now(timezone.utc) - timedelta(days=120)).date()
+
+    def test_rollup_twice_merges_histograms(self, db, automation, add_execution):
+        started_at = datetime.now(timezone.utc) - timedelta(days=120)
+        for duration in (100, 200):
+            add_execution(started_at=started_at, duration_ms=duration)
+        execution_retention.apply_retention(db)
+        for duration in (300, 400):
+            add_execution(started_at=started_at, duration_ms=duration)
+        execution_retention.apply_retention(db)
+
+        stat = db.query(ExecutionDailyStat).filter(ExecutionDailyStat.automation_id == automation.id).one()
+        db.refresh(stat)
+        assert stat.total == 4
+        assert stat.exact_p50_ms is None                # los exactos no se pueden fusionar
+        assert sum(stat.duration_histogram) == 4
+        assert stat.p50_duration_ms == 200              # interpolado en la cubeta 100–200 ms
+        assert stat.p95_duration_ms == 400              # acotado por max_duration_ms
+
+    def test_shorter_user_policy_deletes_rows(self, db, automation, add_execution):
+        execution_retention.set_policy(automation.user_id, 7, db)
+        old    = add_execution(10)
+        recent = add_execution(1)
+
+        summary = execution_retention.apply_retention(db)
+
+        assert summary["deleted_rows"] == 1
+        assert summary["dropped_partitions"] == []
+        db.expire_all()
+        assert db.get(Execution, old) is None
+        assert db.get(Execution, recent) is not None
+
+    def test_longer_user_policy_extends_horizon(self, db, automation, add_execution):
+        execution_retention.set_policy(automation.user_id, 200, db)
+        kept = add_execution(120)
+
+        execution_retention.apply_retention(db)
+
+        db.expire_all()
+        assert db.get(Execution, kept) is not None
+
+
+class TestRetentionApi:
+
+    def test_default_policy(self, auth_client):
+        response = auth_client.get("/api/v1/automations/retention/")
+        assert response.status_code == 200
+        assert response.json() == {"retention_days": 90, "is_default": True}
+
+    def test_update_and_reset_policy(self, auth_client):
+        response = auth_client.put("/api/v1/automations/retention/", json={"retention_days": 30})
+        assert response.json() == {"retention_days": 30, "is_default": False}
+
+        response = auth_client.delete("/api/v1/automations/retention/")
+        assert response.json()["is_default"] is True
+
+    def test_out_of_range_policy_rejected(self, auth_client):
+        response = auth_client.put("/api/v1/automations/retention/", json={"retention_days": 5000})
+        assert response.status_code == 422
+
+    def test_daily_stats_endpoint(self, auth_client, db, automation, add_execution):
+        add_execution(120, duration_ms=50)
+        execution_retention.apply_retention(db)
+
+        response = auth_client.get(f"/api/v1/automations/{automation.id}/stats/daily")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["total"] == 1
+        assert data[0]["p50_duration_ms"] == 50
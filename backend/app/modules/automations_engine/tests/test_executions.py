@@ -46,9 +46,15 @@ class TestGetExecutions:
     def test_execution_response_fields(self, auth_client, automation_id):
         auth_client.post(f"/api/v1/automations/{automation_id}/trigger", json={"payload": {}})
         execution = auth_client.get(f"/api/v1/automations/{automation_id}/executions").json()[0]
-        for field in ["id", "automation_id", "status", "started_at", "node_logs"]:
+        for field in ["id", "automation_id", "status", "started_at", "duration_ms"]:
             assert field in execution
 
+    def test_list_rows_are_slim(self, auth_client, automation_id):
+        auth_client.post(f"/api/v1/automations/{automation_id}/trigger", json={"payload": {"k": "v"}})
+        execution = auth_client.get(f"/api/v1/automations/{automation_id}/executions").json()[0]
+        assert "node_logs" not in execution
+        assert "trigger_payload" not in execution
+
     def test_execution_status_is_success_or_failed(self, auth_client, automation_id):
         auth_client.post(f"/api/v1/automations/{automation_id}/trigger", json={"payload": {}})
         execution = auth_client.get(f"/api/v1/automations/{automation_id}/executions").json()[0]
@@ -84,4 +90,60 @@ class TestGetExecutions:
     def test_get_execution_not_found(self, auth_client, automation_id):
         assert auth_client.get(
             f"/api/v1/automations/{automation_id}/executions/99999"
-        ).status_code == 404
\ No newline at end of file
+        ).status_code == 404
+
+
+LARGE_PAYLOAD = {"items": [f"evento número {i}" for i in range(500)]}
+
+
+class TestNodeOutputs:
+
+    def _trigger(self, auth_client, automation_id, payload):
+        execution = auth_client.post(
+            f"/api/v1/automations/{automation_id}/trigger", json={"payload": payload},
+        ).json()
+        return auth_client.get(f"/api/v1/automations/{automation_id}/executions/{execution['id']}").json()
+
+    def test_large_output_is_truncated_in_node_logs(self, auth_client, automation_id):
+        execution = self._trigger(auth_client, automation_id, LARGE_PAYLOAD)
+        log = next(l for l in execution["node_logs"] if l["node_id"] == "n2")
+
+        assert log["output_truncated"] is True
+        assert log["output"]["_truncated"] is True
+        assert log["output"]["size_bytes"] > 2048
+        assert len(log["output"]["preview"]) <= 200
+
+    def test_node_endpoint_returns_full_output(self, auth_client, automation_id):
+        execution = self._trigger(auth_client, automation_id, LARGE_PAYLOAD)
+
+        response = auth_client.get(
+            f"/api/v1/automations/{automation_id}/executions/{execution['id']}/nodes/n2"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["output"]["received_payload"] == LARGE_PAYLOAD
+
+    def test_small_output_is_kept_inline(self, auth_client, automation_id):
+        execution = self._trigger(auth_client, automation_id, {"k": "v"})
+        log = next(l for l in execution["node_logs"] if l["node_id"] == "n2")
+
+        assert log["output_truncated"] is False
+        assert log["output"]["received_payload"] == {"k": "v"}
+        node = auth_client.get(
+            f"/api/v1/automations/{automation_id}/executions/{execution['id']}/nodes/n2"
+        ).json()
+        assert node["output"] == log["output"]
+
+    def test_unknown_node_is_404(self, auth_client, automation_id):
+        execution = self._trigger(auth_client, automation_id, {})
+        response = auth_client.get(
+            f"/api/v1/automations/{automation_id}/executions/{execution['id']}/nodes/nope"
+        )
+        assert response.status_code == 404
+
+    def test_other_user_cannot_read_node(self, auth_client, other_auth_client, automation_id):
+        execution = self._trigger(auth_client, automation_id, LARGE_PAYLOAD)
+        response = other_auth_client.get(
+            f"/api/v1/automations/{automation_id}/executions/{execution['id']}/nodes/n2"
+        )
+        assert response.status_code == 404
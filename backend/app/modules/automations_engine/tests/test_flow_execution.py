@@ -315,11 +315,42 @@ class TestConditionNodeExecution:
         logs = response.json()["node_logs"]
         assert any(l["node_type"] == "action" for l in logs)
 
+    def test_condition_compound_group(self, auth_client):
+        """Un solo nodo condition con grupos and/or y operadores between/in."""
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Cond compound", "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "n1", "type": "trigger",   "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "n2", "type": "condition", "config": {"and": [
+                        {"field": "protein", "op": "between", "value": [100, 180]},
+                        {"or": [
+                            {"field": "meal", "op": "in", "value": ["dinner"]},
+                            {"field": "kcal", "op": "gte", "value": 2500},
+                        ]},
+                    ]}},
+                    {"id": "n3", "type": "action",    "config": {"action_id": "test_module.test_action"}},
+                ],
+                "edges": [
+                    {"from": "n1", "to": "n2"},
+                    {"from": "n2", "to": "n3", "when": "true"},
+                ]
+            }
+        }).json()["id"]
+
+        response = auth_client.post(
+            f"/api/v1/automations/{aid}/trigger",
+            json={"payload": {"protein": "120", "meal": "lunch", "kcal": 2600}}
+        )
+        logs = response.json()["node_logs"]
+        assert logs[1]["output"]["condition_result"] is True
+        assert any(l["node_type"] == "action" for l in logs)
+
 
 class TestDelayNodeExecution:
 
     def test_delay_node_executes(self, auth_client):
-        """El nodo delay se ejecuta y reporta los segundos esperados."""
+        """El nodo delay suspende la ejecución sin dormir el hilo y reporta los segundos."""
         with patch("time.sleep") as mock_sleep:
             aid = auth_client.post("/api/v1/automations/", json={
                 "name": "Delay test", "trigger_type": "module_event",
@@ -341,55 +372,69 @@ class TestDelayNodeExecution:
                 json={"payload": {}}
             )
             assert response.status_code == 202
-            mock_sleep.assert_called_once_with(120)  # 2 min = 120s
+            assert response.json()["status"] == "waiting"
+            mock_sleep.assert_not_called()
 
             logs = response.json()["node_logs"]
             delay_log = next(l for l in logs if l["node_type"] == "delay")
             assert delay_log["status"] == "success"
-            assert delay_log["output"]["delayed_seconds"] == 120
+            assert delay_log["output"]["delayed_seconds"] == 120  # 2 min = 120s
+            assert not any(l["node_type"] == "action" for l in logs)
 
-    def test_delay_caps_at_300_seconds(self, auth_client):
-        """El delay máximo en modo síncrono es 300 segundos."""
+    def test_delay_not_capped_at_300_seconds(self, auth_client):
+        """Los delays largos ya no se recortan a 5 minutos — la ejecución espera lo pedido."""
         with patch("time.sleep") as mock_sleep:
             aid = auth_client.post("/api/v1/automations/", json={
                 "name": "Delay cap test", "trigger_type": "module_event",
                 "flow": {
                     "nodes": [
                         {"id": "n1", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}},
-                        {"id": "n2", "type": "delay",   "config": {"minutes": 60}},
+                        {"id": "n2", "type": "delay",   "config": {"delay_value": 2, "delay_unit": "days"}},
+                        {"id": "n3", "type": "action",  "config": {"action_id": "test_module.test_action"}},
                     ],
-                    "edges": [{"from": "n1", "to": "n2"}]
+                    "edges": [{"from": "n1", "to": "n2"}, {"from": "n2", "to": "n3"}]
                 }
             }).json()["id"]
 
-            auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}})
-            mock_sleep.assert_called_once_with(300)  # cap a 300s
+            response = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}})
+            mock_sleep.assert_not_called()
+            delay_log = next(l for l in response.json()["node_logs"] if l["node_type"] == "delay")
+            assert delay_log["output"]["delayed_seconds"] == 2 * 86400
+            assert delay_log["output"]["capped"] is False
 
-    def test_delay_then_action_executes_action(self, auth_client):
-        with patch("time.sleep"):
-            aid = auth_client.post("/api/v1/automations/", json={
-                "name": "Delay then action", "trigger_type": "module_event",
-                "flow": {
-                    "nodes": [
-                        {"id": "n1", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}},
-                        {"id": "n2", "type": "delay",   "config": {"minutes": 1}},
-                        {"id": "n3", "type": "action",  "config": {"action_id": "test_module.test_action"}},
-                    ],
-                    "edges": [
-                        {"from": "n1", "to": "n2"},
-                        {"from": "n2", "to": "n3"},
-                    ]
-                }
-            }).json()["id"]
+    def test_delay_then_action_executes_action(self, auth_client, db):
+        """Al reanudar, el flujo sigue desde el nodo posterior al delay con el mismo payload."""
+        from datetime import datetime, timezone, timedelta
+        from app.modules.automations_engine.services.delay_resumer import delay_resumer
 
-            response = auth_client.post(
-                f"/api/v1/automations/{aid}/trigger",
-                json={"payload": {"value": 42}}
-            )
-            logs = response.json()["node_logs"]
-            action_log = next(l for l in logs if l["node_type"] == "action")
-            assert action_log["status"] == "success"
-            assert action_log["output"]["received_payload"]["value"] == 42
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Delay then action", "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "n1", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "n2", "type": "delay",   "config": {"minutes": 1}},
+                    {"id": "n3", "type": "action",  "config": {"action_id": "test_module.test_action"}},
+                ],
+                "edges": [
+                    {"from": "n1", "to": "n2"},
+                    {"from": "n2", "to": "n3"},
+                ]
+            }
+        }).json()["id"]
+
+        execution_id = auth_client.post(
+            f"/api/v1/automations/{aid}/trigger",
+            json={"payload": {"value": 42}}
+        ).json()["id"]
+
+        delay_resumer.resume_due(db, now=datetime.now(timezone.utc) + timedelta(minutes=2))
+
+        response = auth_client.get(f"/api/v1/automations/{aid}/executions/{execution_id}")
+        assert response.json()["status"] == "success"
+        logs = response.json()["node_logs"]
+        action_log = next(l for l in logs if l["node_type"] == "action")
+        assert action_log["status"] == "success"
+        assert action_log["output"]["received_payload"]["value"] == 42
 
 
 class TestAutomationCallNode:
@@ -490,6 +535,162 @@ class TestAutomationCallNode:
 
 
 
+def _action(node_id):
+    return {"id": node_id, "type": "action", "config": {"action_id": "test_module.test_action"}}
+
+
+class TestJoinAndBudgets:
+
+    TRIGGER = {"id": "t", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}}
+
+    def _create(self, auth_client, nodes, edges, name="Join"):
+        return auth_client.post("/api/v1/automations/", json={
+            "name": name, "trigger_type": "module_event",
+            "flow": {"nodes": [self.TRIGGER, *nodes], "edges": [{"from": a, "to": b} for a, b in edges]},
+        }).json()["id"]
+
+    def test_join_node_runs_once_after_all_inputs(self, auth_client):
+        aid = self._create(
+            auth_client, [_action("a"), _action("b"), _action("x"), _action("c")],
+            [("t", "a"), ("t", "b"), ("a", "c"), ("b", "x"), ("x", "c")],
+        )
+        logs = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}}).json()["node_logs"]
+        assert [l["node_id"] for l in logs] == ["t", "a", "b", "x", "c"]
+
+    def test_legacy_cycle_terminates(self, auth_client, db):
+        """Un flujo con ciclo guardado antes de la validación ejecuta cada nodo una vez."""
+        from app.modules.automations_engine.models.automation import Automation
+        aid = self._create(auth_client, [_action("a"), _action("b")], [("t", "a"), ("a", "b")])
+        automation = db.get(Automation, aid)
+        automation.flow = {**automation.flow, "edges": automation.flow["edges"] + [{"from": "b", "to": "a"}]}
+        db.commit()
+
+        body = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}}).json()
+        assert body["status"] == "success"
+        assert [l["node_id"] for l in body["node_logs"]] == ["t", "a", "b"]
+
+    def test_max_nodes_budget(self, auth_client, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_MAX_NODES_PER_EXECUTION", "2")
+        aid = self._create(auth_client, [_action("a"), _action("b")], [("t", "a"), ("a", "b")])
+
+        body = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}}).json()
+        assert body["status"] == "failed"
+        assert body["error_message"].startswith("budget exceeded")
+        assert len(body["node_logs"]) == 2
+
+    def test_deadline_budget(self, auth_client, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_DEADLINE_SECONDS", "0.000001")
+        aid = self._create(auth_client, [_action("a")], [("t", "a")])
+
+        body = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}}).json()
+        assert body["status"] == "failed"
+        assert body["error_message"].startswith("budget exceeded")
+
+    def test_stream_reports_budget_exceeded(self, auth_client, monkeypatch):
+        import json
+        monkeypatch.setenv("AUTOMATIONS_MAX_NODES_PER_EXECUTION", "1")
+        aid = self._create(auth_client, [_action("a")], [("t", "a")])
+
+        response = auth_client.post(f"/api/v1/automations/{aid}/trigger/stream", json={"payload": {}})
+        events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+        assert events[-1]["status"] == "failed"
+        assert events[-1]["error_message"].startswith("budget exceeded")
+
+
+def _webhook(node_id):
+    return {"id": node_id, "type": "outbound_webhook", "config": {"url": f"https://example.com/{node_id}"}}
+
+
+class TestParallelBranches:
+
+    TRIGGER = {"id": "t", "type": "trigger", "config": {"trigger_id": "test_module.test_trigger"}}
+
+    def _create(self, auth_client, nodes, edges, parallel=True):
+        return auth_client.post("/api/v1/automations/", json={
+            "name": "Parallel", "trigger_type": "module_event",
+            "flow": {
+                "nodes": [self.TRIGGER, *nodes],
+                "edges": [{"from": a, "to": b} for a, b in edges],
+                "parallel": parallel,
+            },
+        }).json()["id"]
+
+    def _slow_http(self, threads):
+        import threading
+        import time
+
+        def request(**kwargs):
+            threads.append(threading.current_thread().name)
+            time.sleep(0.3)
+            response = type("Response", (), {"status_code": 200, "is_success": True, "text": "ok"})
+            return response
+        return patch(
+            "app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=request,
+        )
+
+    def test_independent_webhooks_overlap(self, auth_client):
+        import time
+        aid = self._create(
+            auth_client, [_webhook("a"), _webhook("b"), _webhook("c")], [("t", "a"), ("t", "b"), ("t", "c")],
+        )
+        threads = []
+        with self._slow_http(threads):
+            started = time.monotonic()
+            body    = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}}).json()
+            elapsed = time.monotonic() - started
+
+        assert body["status"] == "success"
+        assert [l["node_id"] for l in body["node_logs"]] == ["t", "a", "b", "c"]
+        assert elapsed < 0.8
+        assert all(name.startswith("automations-branch") for name in threads)
+
+    def test_sequential_without_flag(self, auth_client):
+        aid = self._create(auth_client, [_webhook("a"), _webhook("b")], [("t", "a"), ("t", "b")], parallel=False)
+        threads = []
+        with self._slow_http(threads):
+            auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}})
+        assert not any(name.startswith("automations-branch") for name in threads)
+
+    def test_join_after_parallel_actions(self, auth_client):
+        aid = self._create(
+            auth_client, [_action("a"), _action("b"), _action("c")], [("t", "a"), ("t", "b"), ("a", "c"), ("b", "c")],
+        )
+        body = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {"k": 1}}).json()
+
+        assert body["status"] == "success"
+        assert [l["node_id"] for l in body["node_logs"]] == ["t", "a", "b", "c"]
+        assert body["node_logs"][1]["output"]["received_payload"] == {"k": 1}
+
+    def test_failed_branch_stops_flow_after_batch(self, auth_client):
+        failing = {"id": "a", "type": "action", "config": {"action_id": "test_module.test_action_that_fails"}}
+        aid = self._create(auth_client, [failing, _action("b"), _action("x")], [("t", "a"), ("t", "b"), ("b", "x")])
+        body = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}}).json()
+
+        assert body["status"] == "failed"
+        assert [(l["node_id"], l["status"]) for l in body["node_logs"]] == [
+            ("t", "success"), ("a", "failed"), ("b", "success"),
+        ]
+
+    def test_batch_skips_dependent_and_unsafe_nodes(self):
+        from app.modules.automations_engine.core.compiled_flow import compile_flow
+        from app.modules.automations_engine.services.flow_executor import Budget, Frontier, flow_executor
+
+        compiled = compile_flow({
+            "parallel": True,
+            "nodes": [self.TRIGGER, _action("a"), _action("b"), _action("c"),
+                      {"id": "d", "type": "delay", "config": {"seconds": 1}}],
+            "edges": [{"from": "t", "to": n} for n in ("a", "c", "d")] + [{"from": "a", "to": "b"}],
+        })
+        frontier = Frontier(compiled)
+        frontier.push(compiled.nodes[n] for n in ("a", "b", "c", "d"))
+        budget   = Budget(100, 60)
+
+        # b depende de a; d (delay) no se paraleliza
+        assert [n.id for n in flow_executor._batch(compiled, frontier, budget)] == ["a", "c"]
+        assert [n.id for n in flow_executor._batch(compiled, frontier, budget)] == ["d"]
+        assert [n.id for n in flow_executor._batch(compiled, frontier, budget)] == ["b"]
+
+
 class TestExecutionMetadata:
 
     def test_execution_has_duration_ms(self, auth_client, automation_id):
@@ -513,7 +714,8 @@ class TestExecutionMetadata:
             f"/api/v1/automations/{automation_id}/trigger",
             json={"payload": {"source": "test", "value": 42}}
         )
-        execution = auth_client.get(f"/api/v1/automations/{automation_id}/executions").json()[0]
+        exec_id   = auth_client.get(f"/api/v1/automations/{automation_id}/executions").json()[0]["id"]
+        execution = auth_client.get(f"/api/v1/automations/{automation_id}/executions/{exec_id}").json()
         assert execution["trigger_payload"]["source"] == "test"
         assert execution["trigger_payload"]["value"] == 42
 
@@ -556,7 +758,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_makes_http_call(self, auth_client):
         """El nodo outbound_webhook hace una llamada HTTP real."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 200
             mock_req.return_value.is_success   = True
             mock_req.return_value.text         = '{"ok": true}'
@@ -575,7 +777,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_log_contains_status_code(self, auth_client):
         """El node_log contiene status_code y success."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 200
             mock_req.return_value.is_success   = True
             mock_req.return_value.text         = "ok"
@@ -594,7 +796,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_resolves_body_template(self, auth_client):
         """Las variables {{field}} del body_template se resuelven con el payload."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 200
             mock_req.return_value.is_success   = True
             mock_req.return_value.text         = "ok"
@@ -621,7 +823,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_resolves_nested_body_template(self, auth_client):
         """Las variables se resuelven también en body_template anidados."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 200
             mock_req.return_value.is_success   = True
             mock_req.return_value.text         = "ok"
@@ -646,10 +848,31 @@ class TestOutboundWebhookNode:
             assert sent_body["data"]["id"]    == "99"
             assert sent_body["data"]["label"] == "test"
 
+    def test_webhook_body_template_keeps_types(self, auth_client):
+        """Un valor que es exactamente {{campo}} conserva su tipo; los strings mixtos se interpolan."""
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
+            mock_req.return_value.status_code = 200
+            mock_req.return_value.is_success   = True
+            mock_req.return_value.text         = "ok"
+
+            aid = self._make_webhook_flow(
+                auth_client,
+                url="https://example.com/hook",
+                body_template={"amount": "{{amount}}", "text": "Total: {{amount}}"},
+            )
+
+            auth_client.post(
+                f"/api/v1/automations/{aid}/trigger",
+                json={"payload": {"amount": 12.5}}
+            )
+
+            sent_body = mock_req.call_args.kwargs["json"]
+            assert sent_body == {"amount": 12.5, "text": "Total: 12.5"}
+
     def test_webhook_uses_correct_method(self, auth_client):
         """El método HTTP configurado se usa correctamente."""
         for method in ("GET", "PUT", "PATCH"):
-            with patch("httpx.request") as mock_req:
+            with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
                 mock_req.return_value.status_code = 200
                 mock_req.return_value.is_success   = True
                 mock_req.return_value.text         = "ok"
@@ -676,7 +899,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_sends_custom_headers(self, auth_client):
         """Los headers configurados se envían en la llamada HTTP."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 200
             mock_req.return_value.is_success   = True
             mock_req.return_value.text         = "ok"
@@ -700,7 +923,7 @@ class TestOutboundWebhookNode:
         """Un timeout devuelve success=False en el log sin romper el flujo."""
         import httpx as httpx_lib
 
-        with patch("httpx.request", side_effect=httpx_lib.TimeoutException("timeout")):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=httpx_lib.TimeoutException("timeout")):
             aid = self._make_webhook_flow(
                 auth_client,
                 url="https://example.com/hook",
@@ -719,7 +942,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_4xx_response_success_false(self, auth_client):
         """Un status 4xx devuelve success=False."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 404
             mock_req.return_value.is_success   = False
             mock_req.return_value.text         = "Not Found"
@@ -737,7 +960,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_5xx_response_success_false(self, auth_client):
         """Un status 5xx devuelve success=False."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 500
             mock_req.return_value.is_success   = False
             mock_req.return_value.text         = "Internal Server Error"
@@ -755,7 +978,7 @@ class TestOutboundWebhookNode:
 
     def test_webhook_body_truncated_at_1000_chars(self, auth_client):
         """El body de la respuesta se trunca a 1000 caracteres en el log."""
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_req.return_value.status_code = 200
             mock_req.return_value.is_success   = True
             mock_req.return_value.text         = "x" * 2000
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import pytest
+from app.modules.automations_engine.core.event_bus import ExecutionEventBus, LiveChannel, execution_bus
+from app.modules.automations_engine.models.automation import Automation
+
+
+async def _drain(subscription, until_type="done", timeout=5):
+    events = []
+    while True:
+        event = await subscription.get(timeout=timeout)
+        assert event is not None, f"sin eventos tras {timeout}s: {events}"
+        events.append(event)
+        if event["type"] == until_type:
+            return events
+
+
+class TestExecutionEventBus:
+
+    async def test_publish_from_thread(self):
+        bus = ExecutionEventBus()
+        with bus.subscribed(1) as subscription:
+            thread = threading.Thread(target=bus.publish, args=(1, {"type": "node_start"}))
+            thread.start()
+            thread.join()
+            assert await subscription.get(timeout=1) == {"type": "node_start"}
+
+    async def test_only_matching_automation(self):
+        bus = ExecutionEventBus()
+        with bus.subscribed(1) as subscription:
+            bus.publish(2, {"type": "other"})
+            assert await subscription.get(timeout=0.05) is None
+
+    async def test_multiple_subscribers(self):
+        bus = ExecutionEventBus()
+        with bus.subscribed(1) as first, bus.subscribed(1) as second:
+            bus.publish(1, {"type": "done"})
+            assert await first.get(timeout=1) == {"type": "done"}
+            assert await second.get(timeout=1) == {"type": "done"}
+
+    async def test_drop_oldest_when_full(self):
+        bus = ExecutionEventBus()
+        with bus.subscribed(1, max_events=2) as subscription:
+            for i in range(5):
+                bus.publish(1, {"type": "node", "i": i})
+            await asyncio.sleep(0)
+
+            assert await subscription.get(timeout=1) == {"type": "dropped", "count": 3}
+            assert (await subscription.get(timeout=1))["i"] == 3
+            assert (await subscription.get(timeout=1))["i"] == 4
+
+    async def test_unsubscribe_on_exit(self):
+        bus = ExecutionEventBus()
+        with bus.subscribed(1):
+            assert bus.has_subscribers(1)
+        assert not bus.has_subscribers(1)
+
+    async def test_tail_yields_none_on_heartbeat(self):
+        bus  = ExecutionEventBus()
+        tail = bus.tail(1, heartbeat_seconds=0.01)
+        assert await tail.__anext__() is None
+        await tail.aclose()
+        assert not bus.has_subscribers(1)
+
+    def test_channel_without_subscribers_is_noop(self):
+        bus = ExecutionEventBus()
+        LiveChannel(1, 10, bus=bus).publish({"type": "node_start"})
+        LiveChannel(1, 10, bus=bus).done({"status": "success"})
+
+
+class TestFlowExecutorPublishes:
+
+    async def test_runner_execution_is_published(self, db, automation_id):
+        from app.modules.automations_engine.services.automation_runner import automation_runner
+        from app.modules.automations_engine.services.execution_service import execution_id_of
+
+        automation = db.get(Automation, automation_id)
+        with execution_bus.subscribed(automation_id) as subscription:
+            execution = await asyncio.to_thread(automation_runner.run, automation, {}, automation.user_id, db)
+            events    = await _drain(subscription)
+
+        assert [e["type"] for e in events] == ["node_start", "node", "node_start", "node", "done"]
+        assert {e["execution_id"] for e in events} == {execution_id_of(execution)}
+        assert events[-1]["status"] == "success"
+
+    async def test_stream_trigger_is_published(self, auth_client, automation_id):
+        with execution_bus.subscribed(automation_id) as subscription:
+            await asyncio.to_thread(
+                auth_client.post, f"/api/v1/automations/{automation_id}/trigger/stream", json={"payload": {}},
+            )
+            events = await _drain(subscription)
+
+        assert events[-1]["status"] == "success"
+        assert events[0]["execution_id"] is not None
+
+
+class TestLiveEndpoint:
+
+    def test_requires_auth(self, client, automation_id):
+        assert client.get(f"/api/v1/automations/{automation_id}/executions/live").status_code == 401
+
+    def test_other_users_automation(self, other_auth_client, automation_id):
+        assert other_auth_client.get(f"/api/v1/automations/{automation_id}/executions/live").status_code == 404
@@ -0,0 +1,69 @@
+import pytest
+from app.modules.automations_engine.core.registry import AutomationRegistry, HandlerResolutionError
+from app.modules.automations_engine.tests import handlers_for_testing
+
+
+HANDLERS = "app.modules.automations_engine.tests.handlers_for_testing"
+
+
+class TestHandlerResolution:
+
+    def test_action_handler_resolved_at_register(self):
+        reg = AutomationRegistry()
+        reg.register_action(
+            module_id="m", action_id="a", label="A", config_schema={},
+            handler=f"{HANDLERS}.handle_test_action",
+        )
+        assert reg.get_action("m.a").handler is handlers_for_testing.handle_test_action
+
+    def test_trigger_handler_resolved_at_register(self):
+        reg = AutomationRegistry()
+        reg.register_trigger(
+            module_id="m", trigger_id="t", label="T", config_schema={},
+            handler=f"{HANDLERS}.handle_test_action",
+        )
+        assert reg.get_trigger("m.t").handler is handlers_for_testing.handle_test_action
+
+    @pytest.mark.parametrize("path", [
+        f"{HANDLERS}.does_not_exist",
+        "app.modules.no_such_module.handler",
+        "no_dots",
+    ])
+    def test_broken_path_fails_fast(self, path):
+        reg = AutomationRegistry()
+        with pytest.raises(HandlerResolutionError):
+            reg.register_action(module_id="m", action_id="a", label="A", config_schema={}, handler=path)
+        assert reg.get_action("m.a") is None
+
+    def test_non_callable_fails_fast(self):
+        reg = AutomationRegistry()
+        with pytest.raises(HandlerResolutionError):
+            reg.register_trigger(
+                module_id="m", trigger_id="t", label="T", config_schema={},
+                handler="app.modules.automations_engine.core.registry.registry",
+            )
+
+    def test_all_installed_modules_resolve(self):
+        """Todos los handlers registrados por los módulos instalados tienen callable."""
+        from app.modules.automations_engine.core.registry import registry
+        defs = registry.all_triggers() + registry.all_actions()
+        assert defs
+        assert all(callable(d.handler) for d in defs)
+
+
+class TestModuleLoaderFailFast:
+
+    def test_broken_handler_aborts_registration(self, monkeypatch):
+        import types
+        from app.core import module_loader
+
+        broken = types.ModuleType("broken_registry")
+        broken.register = lambda reg: reg.register_action(
+            module_id="broken", action_id="a", label="A", config_schema={},
+            handler=f"{HANDLERS}.missing",
+        )
+        monkeypatch.setattr(module_loader, "get_installed_modules", lambda: ["broken"])
+        monkeypatch.setattr(module_loader, "importlib", types.SimpleNamespace(import_module=lambda name: broken))
+
+        with pytest.raises(HandlerResolutionError):
+            module_loader.register_automation_handlers(AutomationRegistry())
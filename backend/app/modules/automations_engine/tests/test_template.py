@@ -0,0 +1,41 @@
+from app.modules.automations_engine.core.template import compile_template
+
+
+def _ctx(payload=None, vars=None):
+    return {"payload": payload or {}, "vars": vars or {}}
+
+
+class TestCompileTemplate:
+
+    def test_exact_placeholder_keeps_type(self):
+        template = compile_template({"amount": "{{amount}}", "tags": "{{ tags }}"})
+        body     = template.render(_ctx({"amount": 12.5, "tags": ["a", "b"]}))
+        assert body == {"amount": 12.5, "tags": ["a", "b"]}
+
+    def test_missing_exact_placeholder_is_none(self):
+        assert compile_template("{{missing}}").render(_ctx()) is None
+
+    def test_mixed_string_renders_text(self):
+        template = compile_template("Pedido {{id}}: {{total}}€ {{missing}}")
+        assert template.render(_ctx({"id": 7, "total": 0})) == "Pedido 7: 0€ "
+
+    def test_nested_paths_and_lists(self):
+        template = compile_template({"items": ["{{order.id}}", "fijo", {"who": "{{order.user.name}}"}]})
+        body     = template.render(_ctx({"order": {"id": 3, "user": {"name": "ana"}}}))
+        assert body == {"items": [3, "fijo", {"who": "ana"}]}
+
+    def test_vars_take_precedence_over_payload(self):
+        template = compile_template("{{x}}")
+        assert template.render(_ctx({"x": "payload"}, {"x": "vars"})) == "vars"
+
+    def test_path_through_non_dict_is_none(self):
+        assert compile_template("{{a.b}}").render(_ctx({"a": 5})) is None
+
+    def test_constant_template_is_not_walked(self):
+        template = compile_template({"a": 1, "b": ["x", {"c": True}]})
+        assert template.render(_ctx()) == {"a": 1, "b": ["x", {"c": True}]}
+        assert type(template).__name__ == "_Constant"
+
+    def test_compiled_once_renders_many(self):
+        template = compile_template({"n": "{{n}}"})
+        assert [template.render(_ctx({"n": i}))["n"] for i in range(3)] == [0, 1, 2]
@@ -0,0 +1,192 @@
+import pytest
+from sqlalchemy import text
+from app.modules.automations_engine.core.trigger_index import trigger_index
+
+
+TRIGGER_REF = "test_module.test_trigger"
+
+
+def _user_id(db, automation_id):
+    from app.modules.automations_engine.models.automation import Automation
+    return db.query(Automation).filter(Automation.id == automation_id).first().user_id
+
+
+class TestTriggerIndexLookup:
+
+    def test_lookup_returns_active_automation(self, db, auth_client, automation_id):
+        entries = trigger_index.lookup(TRIGGER_REF, _user_id(db, automation_id), db)
+        assert [e.automation_id for e in entries] == [automation_id]
+
+    def test_lookup_exposes_parsed_trigger_config(self, db, auth_client, automation_id):
+        entries = trigger_index.lookup(TRIGGER_REF, _user_id(db, automation_id), db)
+        assert entries[0].trigger_config["trigger_id"] == TRIGGER_REF
+
+    def test_lookup_no_match_returns_empty(self, db, auth_client, automation_id):
+        assert trigger_index.lookup("test_module.other", _user_id(db, automation_id), db) == []
+
+    def test_lookup_is_cached(self, db, auth_client, automation_id):
+        """Una segunda consulta no vuelve a la BD: un borrado por SQL directo no se ve."""
+        user_id = _user_id(db, automation_id)
+        trigger_index.lookup(TRIGGER_REF, user_id, db)
+
+        db.execute(text("DELETE FROM automations.automations"))
+        db.commit()
+
+        entries = trigger_index.lookup(TRIGGER_REF, user_id, db)
+        assert [e.automation_id for e in entries] == [automation_id]
+
+    def test_get_automations_rechecks_is_active(self, db, auth_client, automation_id):
+        """get_automations filtra por is_active aunque la entrada en caché esté desfasada."""
+        user_id = _user_id(db, automation_id)
+        trigger_index.lookup(TRIGGER_REF, user_id, db)
+
+        db.execute(text("UPDATE automations.automations SET is_active = false"))
+        db.commit()
+
+        assert trigger_index.get_automations(TRIGGER_REF, user_id, db) == []
+
+
+class TestTriggerIndexInvalidation:
+
+    def test_deactivate_invalidates(self, db, auth_client, automation_id):
+        user_id = _user_id(db, automation_id)
+        assert trigger_index.lookup(TRIGGER_REF, user_id, db)
+
+        auth_client.patch(f"/api/v1/automations/{automation_id}", json={"is_active": False})
+
+        assert trigger_index.lookup(TRIGGER_REF, user_id, db) == []
+
+    def test_create_invalidates_cached_empty_result(self, db, auth_client, automation_id, simple_flow):
+        user_id = _user_id(db, automation_id)
+        assert len(trigger_index.lookup(TRIGGER_REF, user_id, db)) == 1
+
+        auth_client.post("/api/v1/automations/", json={
+            "name": "Second", "trigger_ref": TRIGGER_REF, "flow": simple_flow,
+        })
+
+        assert len(trigger_index.lookup(TRIGGER_REF, user_id, db)) == 2
+
+    def test_update_flow_invalidates_trigger_ref_change(self, db, auth_client, automation_id, webhook_flow):
+        user_id = _user_id(db, automation_id)
+        assert trigger_index.lookup(TRIGGER_REF, user_id, db)
+
+        auth_client.put(f"/api/v1/automations/{automation_id}/flow", json={"flow": webhook_flow})
+
+        assert trigger_index.lookup(TRIGGER_REF, user_id, db) == []
+        assert trigger_index.lookup("webhook.inbound", user_id, db)
+
+    def test_delete_invalidates(self, db, auth_client, automation_id):
+        user_id = _user_id(db, automation_id)
+        assert trigger_index.lookup(TRIGGER_REF, user_id, db)
+
+        auth_client.delete(f"/api/v1/automations/{automation_id}")
+
+        assert trigger_index.lookup(TRIGGER_REF, user_id, db) == []
+
+
+class TestTriggerPrefilter:
+
+    REF = "test_module.threshold_trigger"
+
+    @pytest.fixture
+    def threshold_automation(self, auth_client, db):
+        response = auth_client.post("/api/v1/automations/", json={
+            "name": "Umbral", "trigger_type": "module_event",
+            "flow": {"nodes": [{"id": "t", "type": "trigger", "config": {"trigger_id": self.REF, "min_value": 10}}]},
+        })
+        assert response.status_code == 201, response.json()
+        return response.json()["id"]
+
+    def _dispatch(self, db, automation_id, payload):
+        from app.modules.automations_engine.models.execution import Execution
+        from app.modules.automations_engine.services.execution_queue import execution_queue
+
+        execution_queue.dispatch(self.REF, payload, _user_id(db, automation_id), db)
+        return db.query(Execution).count()
+
+    def test_match_applies_prefilter(self, db, threshold_automation):
+        user_id = _user_id(db, threshold_automation)
+        assert trigger_index.match(self.REF, {"value": 3}, user_id, db) == []
+        assert [e.automation_id for e in trigger_index.match(self.REF, {"value": 30}, user_id, db)] == [threshold_automation]
+
+    def test_rejected_event_creates_no_execution(self, db, threshold_automation):
+        assert self._dispatch(db, threshold_automation, {"value": 3}) == 0
+        assert self._dispatch(db, threshold_automation, {"value": 30}) == 1
+
+    def test_rejected_event_enqueues_no_job(self, db, threshold_automation, monkeypatch):
+        from app.modules.automations_engine.models.execution_job import ExecutionJob
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+        self._dispatch(db, threshold_automation, {"value": 3})
+        assert db.query(ExecutionJob).count() == 0
+
+    def test_failing_prefilter_lets_handler_decide(self, db, threshold_automation):
+        assert self._dispatch(db, threshold_automation, {"value": 30, "explode": True}) == 1
+
+    def test_trigger_without_prefilter_is_unfiltered(self, db, auth_client, automation_id):
+        entries = trigger_index.match(TRIGGER_REF, {"anything": 1}, _user_id(db, automation_id), db)
+        assert [e.automation_id for e in entries] == [automation_id]
+
+
+class TestDispatchMany:
+
+    @pytest.fixture
+    def two_users(self, db, auth_client, other_auth_client, automation_data):
+        ids = [
+            client.post("/api/v1/automations/", json=automation_data).json()["id"]
+            for client in (auth_client, other_auth_client)
+        ]
+        return [_user_id(db, automation_id) for automation_id in ids]
+
+    def test_lookup_many_one_query_for_misses(self, db, two_users):
+        from .test_execution_recorder import count_statements
+
+        with count_statements(db) as statements:
+            entries = trigger_index.lookup_many(TRIGGER_REF, two_users + [99999], db)
+        assert statements == ["SELECT"]
+        assert [len(entries[u]) for u in two_users] == [1, 1]
+        assert entries[99999] == []
+
+        with count_statements(db) as statements:
+            trigger_index.lookup_many(TRIGGER_REF, two_users, db)
+        assert statements == []
+
+    def test_queue_mode_single_insert(self, db, two_users, monkeypatch):
+        from app.modules.automations_engine.models.execution_job import ExecutionJob
+        from app.modules.automations_engine.services.execution_queue import execution_queue
+        from .test_execution_recorder import count_statements
+        monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+        events = [(user_id, {"n": i}) for i in range(5) for user_id in two_users]
+        with count_statements(db) as statements:
+            assert execution_queue.dispatch_many(TRIGGER_REF, events, db) == 10
+        assert statements.count("SELECT") == 1
+        assert statements.count("INSERT") == 1
+        assert db.query(ExecutionJob).count() == 10
+        assert {job.user_id for job in db.query(ExecutionJob)} == set(two_users)
+
+    def test_inline_mode_runs_matches(self, db, two_users):
+        from app.modules.automations_engine.models.execution import Execution
+        from app.modules.automations_engine.services.execution_queue import execution_queue
+
+        assert execution_queue.dispatch_many(TRIGGER_REF, [(u, {}) for u in two_users], db) == 2
+        assert db.query(Execution).count() == 2
+
+    def test_applies_prefilter(self, db, auth_client):
+        ref      = TestTriggerPrefilter.REF
+        response = auth_client.post("/api/v1/automations/", json={
+            "name": "Umbral", "trigger_type": "module_event",
+            "flow": {"nodes": [{"id": "t", "type": "trigger", "config": {"trigger_id": ref, "min_value": 10}}]},
+        })
+        user_id = _user_id(db, response.json()["id"])
+
+        matches = trigger_index.match_many(ref, [(user_id, {"value": 3}), (user_id, {"value": 30})], db)
+        assert [payload for _, _, payload in matches] == [{"value": 30}]
+
+    def test_empty_batch_is_noop(self, db):
+        from app.modules.automations_engine.services.execution_queue import execution_queue
+        from .test_execution_recorder import count_statements
+
+        with count_statements(db) as statements:
+            assert execution_queue.dispatch_many(TRIGGER_REF, [], db) == 0
+        assert statements == []
@@ -0,0 +1,158 @@
+import httpx
+import pytest
+import threading
+from unittest.mock import patch, MagicMock
+from app.modules.automations_engine.core.webhook_client import WebhookClient, webhook_client
+
+
+def _response(status_code: int, text: str = "ok"):
+    response = MagicMock()
+    response.status_code = status_code
+    response.is_success  = 200 <= status_code < 300
+    response.text        = text
+    return response
+
+
+@pytest.fixture
+def client():
+    c = WebhookClient()
+    yield c
+    c.close()
+
+
+class TestPooling:
+
+    def test_single_client_reused(self, client):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", return_value=_response(200)):
+            client.request("POST", "https://example.com/a")
+            first = client._client
+            client.request("POST", "https://example.com/b")
+        assert client._client is first
+
+    def test_singleton_shared_by_nodes(self):
+        from app.modules.automations_engine.core.node_handlers import outbound_webhook_handler
+        assert outbound_webhook_handler.webhook_client is webhook_client
+
+
+class TestRetries:
+
+    def test_5xx_retried_then_succeeds(self, client):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=[_response(503), _response(200)]) as mock_req:
+            result = client.request("POST", "https://example.com/hook", retries=2)
+
+        assert mock_req.call_count == 2
+        assert result.success is True
+        assert result.attempts == 2
+        assert client.stats()["retries"] == 1
+
+    def test_timeout_retried_until_exhausted(self, client):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=httpx.TimeoutException("timeout")) as mock_req:
+            result = client.request("POST", "https://example.com/hook", retries=2)
+
+        assert mock_req.call_count == 3
+        assert result.success is False
+        assert result.error == "timeout"
+        assert result.attempts == 3
+
+    def test_4xx_not_retried(self, client):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", return_value=_response(404)) as mock_req:
+            result = client.request("POST", "https://example.com/hook", retries=2)
+
+        assert mock_req.call_count == 1
+        assert result.status_code == 404
+        assert result.success is False
+
+    @pytest.mark.parametrize("url", ["not a url", "http://", "http://[::1"])
+    def test_invalid_url_not_retried(self, client, url):
+        with patch("app.modules.automations_engine.core.webhook_client.time.sleep") as mock_sleep:
+            result = client.request("POST", url, retries=2)
+
+        assert result.success is False
+        assert result.attempts == 1
+        assert result.error
+        mock_sleep.assert_not_called()
+
+    def test_connect_error_retried(self, client):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request",
+                   side_effect=[httpx.ConnectError("refused"), _response(200)]), \
+             patch("app.modules.automations_engine.core.webhook_client.time.sleep"):
+            result = client.request("POST", "https://example.com/hook", retries=2)
+
+        assert result.success is True
+        assert result.attempts == 2
+
+    def test_backoff_is_exponential(self, client, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_WEBHOOK_BACKOFF_SECONDS", "0.5")
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", return_value=_response(500)), \
+             patch("app.modules.automations_engine.core.webhook_client.time.sleep") as mock_sleep:
+            client.request("POST", "https://example.com/hook", retries=2)
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+
+
+class TestConcurrencyLimits:
+
+    def test_per_host_limit(self, client, monkeypatch):
+        """Con 1 slot por host, una segunda petición al mismo host no entra mientras la primera sigue."""
+        monkeypatch.setenv("AUTOMATIONS_WEBHOOK_MAX_PER_HOST", "1")
+        monkeypatch.setenv("AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS", "0.1")
+        release = threading.Event()
+        entered = threading.Event()
+
+        def slow(**kwargs):
+            entered.set()
+            release.wait(5)
+            return _response(200)
+
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=slow):
+            t = threading.Thread(target=client.request, args=("POST", "https://slow.example.com/a"))
+            t.start()
+            entered.wait(5)
+            blocked = client.request("POST", "https://slow.example.com/b")
+            release.set()
+            t.join(5)
+
+        assert blocked.success is False
+        assert "por host" in blocked.error
+
+    def test_other_hosts_not_blocked(self, client, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_WEBHOOK_MAX_PER_HOST", "1")
+        monkeypatch.setenv("AUTOMATIONS_WEBHOOK_QUEUE_TIMEOUT_SECONDS", "0.1")
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", return_value=_response(200)):
+            client.request("POST", "https://a.example.com/")
+            with client._host_slot("https://a.example.com/") as slot:
+                slot.acquire()
+                try:
+                    result = client.request("POST", "https://b.example.com/")
+                finally:
+                    slot.release()
+        assert result.success is True
+
+    def test_host_slots_dropped_when_idle(self, client):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", return_value=_response(200)):
+            for i in range(20):
+                client.request("POST", f"https://host{i}.example.com/")
+        assert client._host_slots == {}
+
+
+class TestNodeLogMetrics:
+
+    def test_node_output_has_attempts_and_latency(self, auth_client):
+        aid = auth_client.post("/api/v1/automations/", json={
+            "name": "Webhook metrics", "trigger_type": "module_event",
+            "flow": {
+                "nodes": [
+                    {"id": "n1", "type": "trigger",          "config": {"trigger_id": "test_module.test_trigger"}},
+                    {"id": "n2", "type": "outbound_webhook", "config": {"url": "https://example.com/hook"}},
+                ],
+                "edges": [{"from": "n1", "to": "n2"}],
+            },
+        }).json()["id"]
+
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=[_response(502), _response(200)]):
+            response = auth_client.post(f"/api/v1/automations/{aid}/trigger", json={"payload": {}})
+
+        wh_log = next(l for l in response.json()["node_logs"] if l["node_type"] == "outbound_webhook")
+        assert wh_log["output"]["attempts"] == 2
+        assert wh_log["output"]["status_code"] == 200
+        assert "latency_ms" in wh_log["output"]
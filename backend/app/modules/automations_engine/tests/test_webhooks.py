@@ -91,7 +91,7 @@ class TestDeleteWebhook:
 class TestInboundWebhook:
 
     def test_inbound_webhook_triggers_automation(self, auth_client, webhook_token):
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_resp = MagicMock()
             mock_resp.status_code  = 200
             mock_resp.is_success   = True
@@ -115,7 +115,7 @@ class TestInboundWebhook:
         assert response.status_code == 404
 
     def test_inbound_webhook_calls_outbound(self, auth_client, webhook_token):
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_resp = MagicMock()
             mock_resp.status_code = 200
             mock_resp.is_success  = True
@@ -132,7 +132,7 @@ class TestInboundWebhook:
             assert call_kwargs[1]["method"] == "POST"
 
     def test_inbound_webhook_payload_passed_to_flow(self, auth_client, webhook_token):
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_resp = MagicMock()
             mock_resp.status_code = 200
             mock_resp.is_success  = True
@@ -148,7 +148,7 @@ class TestInboundWebhook:
 
     def test_inbound_webhook_outbound_timeout_continue(self, auth_client, webhook_token):
         import httpx as httpx_module
-        with patch("httpx.request", side_effect=httpx_module.TimeoutException("timeout")):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request", side_effect=httpx_module.TimeoutException("timeout")):
             response = auth_client.post(
                 f"/api/v1/webhooks/in/{webhook_token}",
                 json={"source": "test", "data": {}}
@@ -156,7 +156,7 @@ class TestInboundWebhook:
             assert response.status_code == 202
 
     def test_inbound_webhook_no_auth_required(self, client, webhook_token):
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_resp = MagicMock()
             mock_resp.status_code = 200
             mock_resp.is_success  = True
@@ -170,7 +170,7 @@ class TestInboundWebhook:
             assert response.status_code == 202
 
     def test_inbound_webhook_creates_execution_log(self, auth_client, webhook_token, webhook_automation_id):
-        with patch("httpx.request") as mock_req:
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
             mock_resp = MagicMock()
             mock_resp.status_code = 200
             mock_resp.is_success  = True
@@ -184,4 +184,106 @@ class TestInboundWebhook:
             executions = auth_client.get(
                 f"/api/v1/automations/{webhook_automation_id}/executions"
             ).json()
-            assert len(executions) == 1
\ No newline at end of file
+            assert len(executions) == 1
+
+@pytest.fixture
+def queue_mode(monkeypatch):
+    monkeypatch.setenv("AUTOMATIONS_EXECUTION_MODE", "queue")
+
+
+class TestInboundIngress:
+
+    def test_queue_mode_returns_pending_execution(self, client, db, webhook_token, queue_mode):
+        from app.modules.automations_engine.models.execution import Execution
+        from app.modules.automations_engine.models.execution_job import ExecutionJob
+
+        response = client.post(f"/api/v1/webhooks/in/{webhook_token}", json={"source": "s", "data": {"k": 1}})
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] == "pending"
+        job = db.query(ExecutionJob).one()
+        assert job.execution_id == body["execution_id"]
+        assert job.payload == {"source": "s", "k": 1}
+        assert db.get(Execution, body["execution_id"]).trigger_payload == {"source": "s", "k": 1}
+
+    def test_worker_adopts_pending_execution(self, client, db, webhook_token, queue_mode):
+        from app.modules.automations_engine.enums import ExecutionStatus
+        from app.modules.automations_engine.models.execution import Execution
+        from app.modules.automations_engine.services.execution_queue import execution_queue
+
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
+            mock_req.return_value.status_code = 200
+            mock_req.return_value.is_success  = True
+            mock_req.return_value.text        = "ok"
+            execution_id = client.post(f"/api/v1/webhooks/in/{webhook_token}", json={"source": "s"}).json()["execution_id"]
+
+            job = execution_queue.process_next(db)
+
+        assert job.execution_id == execution_id
+        db.expire_all()
+        assert db.query(Execution).count() == 1
+        assert db.get(Execution, execution_id).status == ExecutionStatus.SUCCESS
+
+    def test_array_fans_out(self, client, db, webhook_token, queue_mode):
+        from app.modules.automations_engine.models.execution_job import ExecutionJob
+
+        response = client.post(f"/api/v1/webhooks/in/{webhook_token}", json=[
+            {"source": "a"}, {"source": "b"}, {"source": "c", "data": {"n": 3}},
+        ])
+
+        assert response.status_code == 202
+        body = response.json()
+        assert len(body) == 3
+        assert len({r["execution_id"] for r in body}) == 3
+        jobs = db.query(ExecutionJob).order_by(ExecutionJob.id).all()
+        assert [j.payload["source"] for j in jobs] == ["a", "b", "c"]
+        assert [j.execution_id for j in jobs] == [r["execution_id"] for r in body]
+
+    def test_array_inline_runs_each_event(self, client, webhook_token):
+        with patch("app.modules.automations_engine.core.webhook_client.PooledHttpClient.request") as mock_req:
+            mock_req.return_value.status_code = 200
+            mock_req.return_value.is_success  = True
+            mock_req.return_value.text        = "ok"
+            response = client.post(f"/api/v1/webhooks/in/{webhook_token}", json=[{"source": "a"}, {"source": "b"}])
+
+        assert [r["status"] for r in response.json()] == ["success", "success"]
+        assert mock_req.call_count == 2
+
+    def test_too_many_events_rejected(self, client, webhook_token, monkeypatch):
+        monkeypatch.setenv("AUTOMATIONS_WEBHOOK_MAX_EVENTS", "2")
+        response = client.post(f"/api/v1/webhooks/in/{webhook_token}", json=[{}, {}, {}])
+        assert response.status_code == 413
+
+    def test_token_is_cached_and_invalidated_on_delete(self, client, auth_client, db, webhook_token, webhook_automation_id, queue_mode):
+        from app.modules.automations_engine.core.webhook_token_cache import webhook_token_cache
+
+        client.post(f"/api/v1/webhooks/in/{webhook_token}", json={})
+        entry = webhook_token_cache.lookup(webhook_token, db)
+        assert entry.automation_id == webhook_automation_id
+
+        webhook_id = auth_client.get(f"/api/v1/automations/{webhook_automation_id}/webhooks").json()[0]["id"]
+        auth_client.delete(f"/api/v1/automations/webhooks/{webhook_id}")
+
+        assert client.post(f"/api/v1/webhooks/in/{webhook_token}", json={}).status_code == 404
+
+    def test_last_triggered_at_is_batched(self, client, auth_client, db, webhook_token, webhook_automation_id, queue_mode):
+        from sqlalchemy.orm import sessionmaker
+        from app.modules.automations_engine.services.webhook_touch_buffer import webhook_touch_buffer
+
+        for _ in range(3):
+            client.post(f"/api/v1/webhooks/in/{webhook_token}", json={})
+
+        listed = auth_client.get(f"/api/v1/automations/{webhook_automation_id}/webhooks").json()[0]
+        assert listed["last_triggered_at"] is None
+        assert webhook_touch_buffer.pending() == 1
+
+        with patch(
+            "app.modules.automations_engine.services.webhook_touch_buffer.SessionLocal",
+            sessionmaker(bind=db.get_bind()),
+        ):
+            assert webhook_touch_buffer.flush() == 1
+
+        db.expire_all()
+        listed = auth_client.get(f"/api/v1/automations/{webhook_automation_id}/webhooks").json()[0]
+        assert listed["last_triggered_at"] is not None
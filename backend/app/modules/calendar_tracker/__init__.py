@@ -18,7 +18,7 @@ TAG_GROUP = {
 
 
 def start_calendar_scheduler() -> None:
-    from apscheduler.schedulers.background import BackgroundScheduler
+    from app.core.scheduler import scheduler_host
     import logging as _logging
     from .services.scheduler_service import (
         job_process_notifications,
@@ -30,25 +30,22 @@ def start_calendar_scheduler() -> None:
         job_sync_calendars,
     )
 
-    scheduler = BackgroundScheduler(timezone="UTC")
-
     # Notificaciones — cada 60 segundos
-    scheduler.add_job(job_process_notifications,  "interval", seconds=60,   id="calendar_notifications")
+    scheduler_host.add_job(job_process_notifications,  "interval", seconds=60,   id="calendar_notifications", sharded=True)
     # Eventos que empiezan — cada 60 segundos
-    scheduler.add_job(job_check_event_starts,     "interval", seconds=60,   id="calendar_event_starts")
+    scheduler_host.add_job(job_check_event_starts,     "interval", seconds=60,   id="calendar_event_starts", sharded=True)
     # Eventos que terminan — cada 60 segundos
-    scheduler.add_job(job_check_event_ends,       "interval", seconds=60,   id="calendar_event_ends")
+    scheduler_host.add_job(job_check_event_ends,       "interval", seconds=60,   id="calendar_event_ends", sharded=True)
     # Recordatorios que vencen hoy — cada 5 minutos
-    scheduler.add_job(job_check_reminders_due,    "interval", minutes=5,    id="calendar_reminders_due")
+    scheduler_host.add_job(job_check_reminders_due,    "interval", minutes=5,    id="calendar_reminders_due", sharded=True)
     # Ventanas de tiempo libre — cada 30 minutos
-    scheduler.add_job(job_check_free_windows,     "interval", minutes=30,   id="calendar_free_windows")
+    scheduler_host.add_job(job_check_free_windows,     "interval", minutes=30,   id="calendar_free_windows", sharded=True)
     # Recordatorios vencidos acumulados — una vez al día a las 9:00 UTC
-    scheduler.add_job(job_check_overdue_reminders,"cron",     hour=9,       id="calendar_overdue_reminders")
+    scheduler_host.add_job(job_check_overdue_reminders,"cron",     hour=9,       id="calendar_overdue_reminders", sharded=True)
     # Sincronización con Google/Apple Calendar — cada 10 minutos
-    scheduler.add_job(job_sync_calendars,         "interval", minutes=10,   id="calendar_sync")
+    scheduler_host.add_job(job_sync_calendars,         "interval", minutes=10,   id="calendar_sync", sharded=True)
 
-    scheduler.start()
-    _logging.getLogger(__name__).info("✅ Calendar scheduler iniciado")
+    _logging.getLogger(__name__).info("✅ Calendar jobs registrados")
 
 
 __all__ = ["router", "register_handlers", "TAGS", "TAG_GROUP", "start_calendar_scheduler"]
@@ -11,6 +11,9 @@ TRIGGERS que despacha:
     calendar_tracker.reminder_due           — Cuando vence un recordatorio
     calendar_tracker.no_events_in_window    — Cuando hay tiempo libre
     calendar_tracker.overdue_reminders_exist — Cuando hay recordatorios vencidos
+
+Los métodos *_many reciben todos los eventos de un tick del scheduler y
+los despachan en un solo lote (ver execution_queue.dispatch_many).
 """
 import logging
 from datetime import datetime, timezone, timedelta
@@ -22,77 +25,108 @@ logger = logging.getLogger(__name__)
 class CalendarAutomationDispatcher:
 
     def _find_and_execute(self, trigger_ref: str, payload: dict, user_id: int, db: Session) -> None:
+        """Encola las automations suscritas — los workers del motor ejecutan los flujos."""
         try:
-            from app.modules.automations_engine.models.automation import Automation
-            from app.modules.automations_engine.services.flow_executor import flow_executor
-            from app.modules.automations_engine.services.execution_service import execution_service
-
-            automations = db.query(Automation).filter(
-                Automation.trigger_ref == trigger_ref,
-                Automation.user_id     == user_id,
-                Automation.is_active   == True,
-            ).all()
-
-            for automation in automations:
-                try:
-                    logger.info(
-                        f"Disparando automatización '{automation.name}' "
-                        f"(id={automation.id}) via {trigger_ref}"
-                    )
-                    execution = execution_service.create(automation.id, user_id, payload, db)
-                    execution = execution_service.mark_running(execution, db)
-
-                    result = flow_executor.execute(automation, payload, db, user_id)
-
-                    if result["status"] == "success":
-                        execution_service.mark_success(execution, result["node_logs"], db)
-                    else:
-                        execution_service.mark_failed(
-                            execution, result.get("error", ""), result["node_logs"], db
-                        )
-
-                    automation.last_run_at = datetime.now(timezone.utc)
-                    automation.run_count   = (automation.run_count or 0) + 1
-                    db.commit()
-
-                    logger.info(
-                        f"Automatización '{automation.name}' terminó con status={result['status']}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error ejecutando automatización '{automation.name}' "
-                        f"(id={automation.id}): {e}"
-                    )
+            from app.modules.automations_engine.services.execution_queue import execution_queue
+
+            execution_queue.dispatch(trigger_ref, payload, user_id, db)
 
         except ImportError:
             pass
         except Exception as e:
             logger.error(f"_find_and_execute({trigger_ref}) error: {e}")
 
-    def on_event_start(self, event_id: int, user_id: int, db: Session) -> None:
+    def _find_and_execute_many(self, trigger_ref: str, events: list[tuple[int, dict]], db: Session) -> None:
+        """Encola en un lote las automations suscritas a cada (user_id, payload)."""
+        if not events:
+            return
+        try:
+            from app.modules.automations_engine.services.execution_queue import execution_queue
+
+            execution_queue.dispatch_many(trigger_ref, events, db)
+
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.error(f"_find_and_execute_many({trigger_ref}) error: {e}")
+
+    # Los campos opcionales (categoría, DND, prioridad) viajan en el payload
+    # para que los prefilters descarten sin crear la ejecución. Con
+    # enable_dnd=None el llamador no conoce el evento y solo va event_id.
+
+    @staticmethod
+    def _event_payload(event_id: int, category_id: int | None = None, enable_dnd: bool | None = None) -> dict:
+        payload = {"event_id": event_id}
+        if enable_dnd is not None:
+            payload["category_id"] = category_id
+            payload["enable_dnd"]  = enable_dnd
+        return payload
+
+    @staticmethod
+    def _reminder_payload(reminder_id: int, priority: str | None = None) -> dict:
+        payload = {"reminder_id": reminder_id}
+        if priority is not None:
+            payload["priority"] = priority
+        return payload
+
+    def on_event_start(
+        self, event_id: int, user_id: int, db: Session, category_id: int | None = None, enable_dnd: bool | None = None,
+    ) -> None:
         self._find_and_execute(
             trigger_ref="calendar_tracker.event_start",
-            payload={"event_id": event_id},
+            payload=self._event_payload(event_id, category_id, enable_dnd),
             user_id=user_id,
             db=db,
         )
 
-    def on_event_end(self, event_id: int, user_id: int, db: Session) -> None:
+    def on_event_start_many(self, events: list[dict], db: Session) -> None:
+        """events: dicts con los argumentos de on_event_start (event_id, user_id, category_id, enable_dnd)."""
+        self._find_and_execute_many(
+            trigger_ref="calendar_tracker.event_start",
+            events=[
+                (e["user_id"], self._event_payload(e["event_id"], e.get("category_id"), e.get("enable_dnd")))
+                for e in events
+            ],
+            db=db,
+        )
+
+    def on_event_end(
+        self, event_id: int, user_id: int, db: Session, category_id: int | None = None, enable_dnd: bool | None = None,
+    ) -> None:
         self._find_and_execute(
             trigger_ref="calendar_tracker.event_end",
-            payload={"event_id": event_id},
+            payload=self._event_payload(event_id, category_id, enable_dnd),
             user_id=user_id,
             db=db,
         )
 
-    def on_reminder_due(self, reminder_id: int, user_id: int, db: Session) -> None:
+    def on_event_end_many(self, events: list[dict], db: Session) -> None:
+        """events: dicts con los argumentos de on_event_end."""
+        self._find_and_execute_many(
+            trigger_ref="calendar_tracker.event_end",
+            events=[
+                (e["user_id"], self._event_payload(e["event_id"], e.get("category_id"), e.get("enable_dnd")))
+                for e in events
+            ],
+            db=db,
+        )
+
+    def on_reminder_due(self, reminder_id: int, user_id: int, db: Session, priority: str | None = None) -> None:
         self._find_and_execute(
             trigger_ref="calendar_tracker.reminder_due",
-            payload={"reminder_id": reminder_id},
+            payload=self._reminder_payload(reminder_id, priority),
             user_id=user_id,
             db=db,
         )
 
+    def on_reminder_due_many(self, reminders: list[dict], db: Session) -> None:
+        """reminders: dicts con los argumentos de on_reminder_due (reminder_id, user_id, priority)."""
+        self._find_and_execute_many(
+            trigger_ref="calendar_tracker.reminder_due",
+            events=[(r["user_id"], self._reminder_payload(r["reminder_id"], r.get("priority"))) for r in reminders],
+            db=db,
+        )
+
     def on_no_events_in_window(self, user_id: int, db: Session) -> None:
         from app.modules.calendar_tracker.models.event import Event
 
@@ -124,5 +158,12 @@ class CalendarAutomationDispatcher:
             db=db,
         )
 
+    def on_overdue_reminders_exist_many(self, user_ids: list[int], db: Session) -> None:
+        self._find_and_execute_many(
+            trigger_ref="calendar_tracker.overdue_reminders_exist",
+            events=[(user_id, {}) for user_id in user_ids],
+            db=db,
+        )
+
 
 dispatcher = CalendarAutomationDispatcher()
\ No newline at end of file
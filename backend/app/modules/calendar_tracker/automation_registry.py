@@ -35,6 +35,7 @@ def register(registry) -> None:
             "enable_dnd_only": {"type": "bool",      "label": "Solo si DND activo",    "default": False},
         },
         handler="app.modules.calendar_tracker.services.automation_handlers.handle_event_start",
+        prefilter="app.modules.calendar_tracker.services.automation_handlers.prefilter_event_start",
     )
 
     registry.register_trigger(
@@ -45,6 +46,7 @@ def register(registry) -> None:
             "category_ids": {"type": "list[int]", "label": "Solo estas categorías", "optional": True},
         },
         handler="app.modules.calendar_tracker.services.automation_handlers.handle_event_end",
+        prefilter="app.modules.calendar_tracker.services.automation_handlers.prefilter_event_end",
     )
 
     registry.register_trigger(
@@ -59,6 +61,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.calendar_tracker.services.automation_handlers.handle_reminder_due",
+        prefilter="app.modules.calendar_tracker.services.automation_handlers.prefilter_reminder_due",
     )
 
     registry.register_trigger(
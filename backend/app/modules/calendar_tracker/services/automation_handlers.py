@@ -21,6 +21,11 @@ TRIGGERS:
     handle_no_events_in_window    — Cuando no hay eventos en una ventana de tiempo futura.
     handle_overdue_reminders_exist — Cuando existen N o más recordatorios vencidos pendientes.
 
+PREFILTERS (solo payload + config, sin BD; los evalúa el motor antes de crear la ejecución):
+    prefilter_event_start, prefilter_event_end, prefilter_reminder_due
+    — usan category_id / enable_dnd / priority si el scheduler los manda en el
+      payload; el handler vuelve a comprobarlos contra la BD.
+
 ACCIONES:
     action_create_event           — Crea un evento con título, duración, categoría y DND configurables.
     action_create_reminder        — Crea un recordatorio con prioridad y fecha de vencimiento.
@@ -73,6 +78,39 @@ def _reminder_to_dict(reminder: Reminder) -> dict:
     }
 
 
+# ── PREFILTERS ───────────────────────────────────────────────────────────────
+
+def prefilter_event_start(payload: dict, config: dict) -> str | None:
+    reason = prefilter_event_end(payload, config)
+    if reason:
+        return reason
+    if config.get("enable_dnd_only") and payload.get("enable_dnd") is False:
+        return "event does not have DND enabled"
+    return None
+
+
+def prefilter_event_end(payload: dict, config: dict) -> str | None:
+    if not payload.get("event_id"):
+        return "no event_id in payload"
+    category_ids = config.get("category_ids")
+    if category_ids and "category_id" in payload and payload["category_id"] not in category_ids:
+        return "category not in filter"
+    return None
+
+
+def prefilter_reminder_due(payload: dict, config: dict) -> str | None:
+    if not payload.get("reminder_id"):
+        return "no reminder_id in payload"
+    priority = _PRIORITY_MAP.get(payload.get("priority"))
+    if priority is None:
+        return None
+    min_priority_str = config.get("min_priority", "high")
+    min_priority     = _PRIORITY_MAP.get(min_priority_str, ReminderPriority.HIGH)
+    if _PRIORITY_ORDER[priority] < _PRIORITY_ORDER[min_priority]:
+        return f"priority {priority.value} below minimum {min_priority_str}"
+    return None
+
+
 # ── TRIGGER HANDLERS ──────────────────────────────────────────────────────────
 
 def handle_event_start(payload: dict, config: dict, db: Session, user_id: int) -> dict:
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
+from app.core.scheduler import shard_clause
 from ..models.notification import Notification
 from ..models.event import Event
 
@@ -44,13 +45,14 @@ class NotificationService:
             self.schedule_for_event(db, event)
 
     def get_pending_due(self, db: Session) -> list[Notification]:
-        """Devuelve notificaciones pendientes cuyo trigger_at ya ha llegado."""
+        """Devuelve notificaciones pendientes cuyo trigger_at ya ha llegado (del shard de este nodo)."""
         now = datetime.now(timezone.utc)
         return (
             db.query(Notification)
             .filter(
                 Notification.status == "pending",
                 Notification.trigger_at <= now,
+                shard_clause(Notification.user_id),
             )
             .all()
         )
@@ -6,12 +6,17 @@ envía notificaciones y dispara automatizaciones.
 Se ejecuta cada 60 segundos en background via APScheduler.
 Es completamente independiente del motor de automatizaciones —
 si automation_dispatcher.py no existe, el scheduler sigue funcionando.
+
+Cada job junta los eventos del tick y los despacha en un solo lote
+(on_*_many): el coste en queries no crece con el número de eventos.
 """
 import logging
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
+from app.core.dedup import dedup
+from app.core.scheduler import shard_clause
 from ..models.event import Event
 from ..models.reminder import Reminder
 from ..enums import ReminderStatus
@@ -20,31 +25,12 @@ from .notification_service import NotificationService
 logger = logging.getLogger(__name__)
 notification_service = NotificationService()
 
-# ── Deduplicación en memoria ──────────────────────────────────────────────────
+# ── Deduplicación ─────────────────────────────────────────────────────────────
 # Evita disparar el mismo trigger dos veces para el mismo objeto en poco tiempo.
-# Estructura: {(object_id, trigger_ref): datetime_of_last_dispatch}
-_dispatch_cache: dict[tuple, datetime] = {}
+# Claves en app/core/dedup.py (namespace = trigger_ref), compartidas por el cluster.
 _DEDUP_TTL = timedelta(minutes=5)
 
 
-def _already_dispatched(object_id: int, trigger_ref: str) -> bool:
-    key = (object_id, trigger_ref)
-    last = _dispatch_cache.get(key)
-    if last and (datetime.now(timezone.utc) - last) < _DEDUP_TTL:
-        return True
-    return False
-
-
-def _mark_dispatched(object_id: int, trigger_ref: str) -> None:
-    key = (object_id, trigger_ref)
-    _dispatch_cache[key] = datetime.now(timezone.utc)
-    # Limpiar entradas expiradas para no crecer indefinidamente
-    now = datetime.now(timezone.utc)
-    expired = [k for k, v in _dispatch_cache.items() if (now - v) >= _DEDUP_TTL]
-    for k in expired:
-        del _dispatch_cache[k]
-
-
 def _get_db() -> Session:
     return SessionLocal()
 
@@ -99,14 +85,21 @@ def job_check_event_starts() -> None:
             Event.is_cancelled == False,
             Event.start_at >= window_start,
             Event.start_at <= window_end,
+            shard_clause(Event.user_id),
         ).all()
 
+        claimed = dedup.claim_many("calendar_tracker.event_start", [event.id for event in events], _DEDUP_TTL)
+        batch   = []
         for event in events:
-            if _already_dispatched(event.id, "event_start"):
+            if event.id not in claimed:
                 continue
             logger.info(f"Evento iniciando: '{event.title}' (id={event.id}, user={event.user_id})")
-            _mark_dispatched(event.id, "event_start")
-            _try_dispatch("on_event_start", event_id=event.id, user_id=event.user_id, db=db)
+            batch.append({
+                "event_id": event.id, "user_id": event.user_id,
+                "category_id": event.category_id, "enable_dnd": event.enable_dnd,
+            })
+        if batch:
+            _try_dispatch("on_event_start_many", events=batch, db=db)
 
     except Exception as e:
         logger.error(f"job_check_event_starts error: {e}")
@@ -129,14 +122,21 @@ def job_check_event_ends() -> None:
             Event.is_cancelled == False,
             Event.end_at >= window_start,
             Event.end_at <= window_end,
+            shard_clause(Event.user_id),
         ).all()
 
+        claimed = dedup.claim_many("calendar_tracker.event_end", [event.id for event in events], _DEDUP_TTL)
+        batch   = []
         for event in events:
-            if _already_dispatched(event.id, "event_end"):
+            if event.id not in claimed:
                 continue
             logger.info(f"Evento terminando: '{event.title}' (id={event.id}, user={event.user_id})")
-            _mark_dispatched(event.id, "event_end")
-            _try_dispatch("on_event_end", event_id=event.id, user_id=event.user_id, db=db)
+            batch.append({
+                "event_id": event.id, "user_id": event.user_id,
+                "category_id": event.category_id, "enable_dnd": event.enable_dnd,
+            })
+        if batch:
+            _try_dispatch("on_event_end_many", events=batch, db=db)
 
     except Exception as e:
         logger.error(f"job_check_event_ends error: {e}")
@@ -157,14 +157,20 @@ def job_check_reminders_due() -> None:
         reminders = db.query(Reminder).filter(
             Reminder.status   == ReminderStatus.PENDING,
             Reminder.due_date == today,
+            shard_clause(Reminder.user_id),
         ).all()
 
+        claimed = dedup.claim_many(
+            "calendar_tracker.reminder_due", [(reminder.id, today) for reminder in reminders], timedelta(days=1),
+        )
+        batch = []
         for reminder in reminders:
-            if _already_dispatched(reminder.id, "reminder_due"):
+            if (reminder.id, today) not in claimed:
                 continue
             logger.info(f"Recordatorio vencido: '{reminder.title}' (id={reminder.id}, user={reminder.user_id})")
-            _mark_dispatched(reminder.id, "reminder_due")
-            _try_dispatch("on_reminder_due", reminder_id=reminder.id, user_id=reminder.user_id, db=db)
+            batch.append({"reminder_id": reminder.id, "user_id": reminder.user_id, "priority": reminder.priority.value})
+        if batch:
+            _try_dispatch("on_reminder_due_many", reminders=batch, db=db)
 
     except Exception as e:
         logger.error(f"job_check_reminders_due error: {e}")
@@ -186,6 +192,7 @@ def job_check_free_windows() -> None:
             row[0] for row in db.query(Automation.user_id).filter(
                 Automation.trigger_ref == "calendar_tracker.no_events_in_window",
                 Automation.is_active   == True,
+                shard_clause(Automation.user_id),
             ).distinct().all()
         ]
 
@@ -212,12 +219,14 @@ def job_check_overdue_reminders() -> None:
             row[0] for row in db.query(distinct(Reminder.user_id)).filter(
                 Reminder.status   == ReminderStatus.PENDING,
                 Reminder.due_date <  today,
+                shard_clause(Reminder.user_id),
             ).all()
         ]
 
         for user_id in user_ids:
             logger.info(f"Recordatorios vencidos detectados para user {user_id}")
-            _try_dispatch("on_overdue_reminders_exist", user_id=user_id, db=db)
+        if user_ids:
+            _try_dispatch("on_overdue_reminders_exist_many", user_ids=user_ids, db=db)
 
     except Exception as e:
         logger.error(f"job_check_overdue_reminders error: {e}")
@@ -231,7 +240,8 @@ def job_sync_calendars() -> None:
         from app.modules.calendar_tracker.services.sync_service import sync_service
 
         connections = db.query(CalendarConnection).filter(
-            CalendarConnection.is_active == True
+            CalendarConnection.is_active == True,
+            shard_clause(CalendarConnection.user_id),
         ).all()
 
         for connection in connections:
@@ -4,8 +4,8 @@ from datetime import datetime, timezone, timedelta
 
 @pytest.fixture(autouse=True)
 def clear_scheduler_dispatch_cache():
-    from app.modules.calendar_tracker.services.scheduler_service import _dispatch_cache
-    _dispatch_cache.clear()
+    from app.core.dedup import dedup
+    dedup.clear()
 
 
 # ── Fixtures de categorías ────────────────────────────────────────────────────
@@ -146,6 +146,7 @@ def register_calendar_triggers():
         label="Al iniciar un evento",
         config_schema={},
         handler="app.modules.calendar_tracker.services.automation_handlers.handle_event_start",
+        prefilter="app.modules.calendar_tracker.services.automation_handlers.prefilter_event_start",
     )
     registry.register_trigger(
         module_id="calendar_tracker",
@@ -153,6 +154,7 @@ def register_calendar_triggers():
         label="Al finalizar un evento",
         config_schema={},
         handler="app.modules.calendar_tracker.services.automation_handlers.handle_event_end",
+        prefilter="app.modules.calendar_tracker.services.automation_handlers.prefilter_event_end",
     )
     registry.register_trigger(
         module_id="calendar_tracker",
@@ -160,6 +162,7 @@ def register_calendar_triggers():
         label="Cuando vence un recordatorio",
         config_schema={},
         handler="app.modules.calendar_tracker.services.automation_handlers.handle_reminder_due",
+        prefilter="app.modules.calendar_tracker.services.automation_handlers.prefilter_reminder_due",
     )
     registry.register_trigger(
         module_id="calendar_tracker",
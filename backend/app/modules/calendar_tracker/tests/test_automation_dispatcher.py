@@ -288,6 +288,62 @@ class TestSchedulerJobs:
         ).all()
         assert len(executions) >= 1
 
+    def test_job_event_starts_batches_all_events(
+        self, db, auth_client, event_starting_now, automation_for_event_start
+    ):
+        """Varios eventos en la misma ventana se despachan en un lote y ejecutan todos."""
+        from app.modules.automations_engine.models.execution import Execution
+        from unittest.mock import patch
+
+        now      = datetime.now(timezone.utc)
+        response = auth_client.post("/api/v1/calendar/events", json={
+            "title":    "Otro evento ahora",
+            "start_at": (now - timedelta(seconds=10)).isoformat(),
+            "end_at":   (now + timedelta(hours=1)).isoformat(),
+        })
+        assert response.status_code == 201, response.json()
+
+        with patch(
+            "app.modules.calendar_tracker.services.scheduler_service._get_db",
+            return_value=db
+        ), patch.object(dispatcher, "on_event_start", side_effect=AssertionError("no debe despachar uno a uno")):
+            job_check_event_starts()
+
+        executions = db.query(Execution).filter(
+            Execution.automation_id == automation_for_event_start
+        ).all()
+        assert sorted(e.trigger_payload["event_id"] for e in executions) == sorted(
+            [event_starting_now, response.json()["id"]]
+        )
+
+    def test_job_event_starts_prefilter_skips_without_execution(
+        self, db, auth_client, event_starting_now, second_category_id
+    ):
+        """Si el prefilter descarta el evento (otra categoría) no se crea ninguna Execution."""
+        from app.modules.automations_engine.models.execution import Execution
+        from unittest.mock import patch
+
+        response = auth_client.post("/api/v1/automations/", json={
+            "name":         "Solo otra categoría",
+            "trigger_type": "module_event",
+            "trigger_ref":  "calendar_tracker.event_start",
+            "flow": {
+                "nodes": [{"id": "n1", "type": "trigger", "config": {
+                    "trigger_id": "calendar_tracker.event_start", "category_ids": [second_category_id],
+                }}],
+                "edges": [],
+            },
+        })
+        assert response.status_code == 201, response.json()
+
+        with patch(
+            "app.modules.calendar_tracker.services.scheduler_service._get_db",
+            return_value=db
+        ):
+            job_check_event_starts()
+
+        assert db.query(Execution).count() == 0
+
     def test_job_reminders_due_detects_today(
         self, db, auth_client, reminder_due_today_id, automation_for_reminder_due
     ):
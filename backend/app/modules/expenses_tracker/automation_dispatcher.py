@@ -20,54 +20,31 @@ logger = logging.getLogger(__name__)
 class ExpensesAutomationDispatcher:
 
     def _find_and_execute(self, trigger_ref: str, payload: dict, user_id: int, db: Session) -> None:
+        """Encola las automations suscritas — los workers del motor ejecutan los flujos."""
         try:
-            from app.modules.automations_engine.models.automation import Automation
-            from app.modules.automations_engine.services.flow_executor import flow_executor
-            from app.modules.automations_engine.services.execution_service import execution_service
-            from datetime import datetime, timezone
-
-            automations = db.query(Automation).filter(
-                Automation.trigger_ref == trigger_ref,
-                Automation.user_id     == user_id,
-                Automation.is_active   == True,
-            ).all()
-
-            for automation in automations:
-                try:
-                    logger.info(
-                        f"Disparando automatización '{automation.name}' "
-                        f"(id={automation.id}) via {trigger_ref}"
-                    )
-                    execution = execution_service.create(automation.id, user_id, payload, db)
-                    execution = execution_service.mark_running(execution, db)
-
-                    result = flow_executor.execute(automation, payload, db, user_id)
-
-                    if result["status"] == "success":
-                        execution_service.mark_success(execution, result["node_logs"], db)
-                    else:
-                        execution_service.mark_failed(
-                            execution, result.get("error", ""), result["node_logs"], db
-                        )
-
-                    automation.last_run_at = datetime.now(timezone.utc)
-                    automation.run_count   = (automation.run_count or 0) + 1
-                    db.commit()
-
-                    logger.info(
-                        f"Automatización '{automation.name}' terminó con status={result['status']}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error ejecutando automatización '{automation.name}' "
-                        f"(id={automation.id}): {e}"
-                    )
+            from app.modules.automations_engine.services.execution_queue import execution_queue
+
+            execution_queue.dispatch(trigger_ref, payload, user_id, db)
 
         except ImportError:
             pass
         except Exception as e:
             logger.error(f"_find_and_execute({trigger_ref}) error: {e}")
 
+    def _find_and_execute_many(self, trigger_ref: str, events: list[tuple[int, dict]], db: Session) -> None:
+        """Encola en un lote las automations suscritas a cada (user_id, payload)."""
+        if not events:
+            return
+        try:
+            from app.modules.automations_engine.services.execution_queue import execution_queue
+
+            execution_queue.dispatch_many(trigger_ref, events, db)
+
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.error(f"_find_and_execute_many({trigger_ref}) error: {e}")
+
     def on_large_expense_created(
         self, expense_id: int, amount: float, account: str, user_id: int, db: Session
     ) -> None:
@@ -121,16 +98,33 @@ class ExpensesAutomationDispatcher:
     ) -> None:
         self._find_and_execute(
             trigger_ref="expenses_tracker.subscription_due_soon",
-            payload={
-                "scheduled_id": scheduled_id,
-                "name":         name,
-                "amount":       amount,
-                "due_date":     due_date,
-                "days_until":   days_until,
-            },
+            payload=self._subscription_payload(scheduled_id, name, amount, due_date, days_until),
             user_id=user_id,
             db=db,
         )
 
+    def on_subscription_due_soon_many(self, items: list[dict], db: Session) -> None:
+        """items: dicts con los argumentos de on_subscription_due_soon; se despachan en un lote."""
+        self._find_and_execute_many(
+            trigger_ref="expenses_tracker.subscription_due_soon",
+            events=[
+                (i["user_id"], self._subscription_payload(
+                    i["scheduled_id"], i["name"], i["amount"], i["due_date"], i["days_until"],
+                ))
+                for i in items
+            ],
+            db=db,
+        )
+
+    @staticmethod
+    def _subscription_payload(scheduled_id: int, name: str, amount: float, due_date: str, days_until: int) -> dict:
+        return {
+            "scheduled_id": scheduled_id,
+            "name":         name,
+            "amount":       amount,
+            "due_date":     due_date,
+            "days_until":   days_until,
+        }
+
 
 dispatcher = ExpensesAutomationDispatcher()
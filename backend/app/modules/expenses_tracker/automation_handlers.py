@@ -8,6 +8,10 @@ TRIGGERS:
     handle_subscription_due_soon    — Suscripción vence en N días
     handle_subscription_converted   — Suscripción vencida convertida en gasto real
 
+PREFILTERS (solo payload + config, sin BD; los evalúa el motor antes de crear la ejecución):
+    prefilter_large_expense_created, prefilter_monthly_budget_exceeded,
+    prefilter_subscription_due_soon
+
 ACCIONES:
     action_create_expense             — Crear gasto puntual
     action_get_monthly_summary        — Totales mensuales por cuenta
@@ -49,6 +53,24 @@ def _scheduled_to_dict(item: ScheduledExpense) -> dict:
 
 # ── TRIGGER HANDLERS ──────────────────────────────────────────────────────────
 
+def prefilter_large_expense_created(payload: dict, config: dict) -> str | None:
+    """El handler compara con el gasto en BD; aquí se usa el amount/account del payload si viene."""
+    if not payload.get("expense_id"):
+        return "no expense_id in payload"
+
+    amount     = payload.get("amount")
+    min_amount = config.get("min_amount", 100.0)
+    if amount is not None and amount < min_amount:
+        return f"amount {amount} below threshold {min_amount}"
+
+    account        = payload.get("account")
+    filter_account = config.get("account")
+    if filter_account and account is not None and account != filter_account:
+        return f"account {account} not matching filter {filter_account}"
+
+    return None
+
+
 def handle_large_expense_created(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: cuando se crea un gasto por encima del umbral configurado.
@@ -86,14 +108,7 @@ def handle_large_expense_created(payload: dict, config: dict, db: Session, user_
     return {"matched": True, "expense": _expense_to_dict(expense)}
 
 
-def handle_monthly_budget_exceeded(payload: dict, config: dict, db: Session, user_id: int) -> dict:
-    """
-    Trigger: cuando el total del mes actual supera el límite configurado.
-    Payload esperado: {"total": float, "month": str, "account": str}
-    Config:
-        - limit: float  — límite mensual (default 1000.0)
-        - account: str  — cuenta a controlar (default "all")
-    """
+def prefilter_monthly_budget_exceeded(payload: dict, config: dict) -> str | None:
     total   = payload.get("total", 0.0)
     limit   = config.get("limit", 1000.0)
     account = config.get("account", "all")
@@ -102,16 +117,29 @@ def handle_monthly_budget_exceeded(payload: dict, config: dict, db: Session, use
 
     # Si la config filtra por cuenta y el payload es de otra, no disparar
     if account != "all" and payload_account != "all" and account != payload_account:
-        return {
-            "matched": False,
-            "reason":  f"account filter mismatch: config={account}, payload={payload_account}",
-        }
+        return f"account filter mismatch: config={account}, payload={payload_account}"
 
     if total < limit:
-        return {
-            "matched": False,
-            "reason":  f"total {total:.2f} below limit {limit:.2f}",
-        }
+        return f"total {total:.2f} below limit {limit:.2f}"
+
+    return None
+
+
+def handle_monthly_budget_exceeded(payload: dict, config: dict, db: Session, user_id: int) -> dict:
+    """
+    Trigger: cuando el total del mes actual supera el límite configurado.
+    Payload esperado: {"total": float, "month": str, "account": str}
+    Config:
+        - limit: float  — límite mensual (default 1000.0)
+        - account: str  — cuenta a controlar (default "all")
+    """
+    reason = prefilter_monthly_budget_exceeded(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
+    total           = payload.get("total", 0.0)
+    limit           = config.get("limit", 1000.0)
+    payload_account = payload.get("account", "all")
 
     return {
         "matched": True,
@@ -122,6 +150,18 @@ def handle_monthly_budget_exceeded(payload: dict, config: dict, db: Session, use
     }
 
 
+def prefilter_subscription_due_soon(payload: dict, config: dict) -> str | None:
+    if not payload.get("scheduled_id"):
+        return "no scheduled_id in payload"
+
+    days_ahead = config.get("days_ahead", 3)
+    days_until = payload.get("days_until", 0)
+    if days_until > days_ahead:
+        return f"due in {days_until} days, threshold is {days_ahead}"
+
+    return None
+
+
 def handle_subscription_due_soon(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: cuando una suscripción vence en N días.
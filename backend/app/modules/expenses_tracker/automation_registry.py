@@ -27,6 +27,7 @@ def register(registry) -> None:
             "account":    {"type": "enum[Revolut,Imagin]", "label": "Solo esta cuenta", "optional": True},
         },
         handler="app.modules.expenses_tracker.automation_handlers.handle_large_expense_created",
+        prefilter="app.modules.expenses_tracker.automation_handlers.prefilter_large_expense_created",
     )
 
     registry.register_trigger(
@@ -38,6 +39,7 @@ def register(registry) -> None:
             "account": {"type": "enum[Revolut,Imagin,all]","label": "Cuenta a controlar",   "default": "all"},
         },
         handler="app.modules.expenses_tracker.automation_handlers.handle_monthly_budget_exceeded",
+        prefilter="app.modules.expenses_tracker.automation_handlers.prefilter_monthly_budget_exceeded",
     )
 
     registry.register_trigger(
@@ -48,6 +50,7 @@ def register(registry) -> None:
             "days_ahead": {"type": "int", "label": "Días de antelación", "default": 3},
         },
         handler="app.modules.expenses_tracker.automation_handlers.handle_subscription_due_soon",
+        prefilter="app.modules.expenses_tracker.automation_handlers.prefilter_subscription_due_soon",
     )
 
     registry.register_trigger(
@@ -11,13 +11,16 @@ import logging
 from datetime import date, datetime, timezone, timedelta
 
 from app.core.database import SessionLocal
+from app.core.dedup import dedup
+from app.core.scheduler import shard_clause
 
 logger = logging.getLogger(__name__)
 
-# ── Deduplicación en memoria ──────────────────────────────────────────────────
-# Evita disparar el mismo trigger dos veces en el mismo día para el mismo objeto.
-_subscription_due_cache: dict[tuple, date] = {}   # (scheduled_id, "YYYY-MM-DD") -> dispatched_date
-_budget_exceeded_cache: dict[tuple, str]  = {}    # (user_id, "YYYY-MM") -> dispatched_month
+# ── Deduplicación ─────────────────────────────────────────────────────────────
+# Evita disparar el mismo trigger dos veces en el mismo día (o mes) para el mismo
+# objeto. Claves en app/core/dedup.py, compartidas por el cluster.
+_SUBSCRIPTION_DUE = "expenses_tracker.subscription_due_soon"   # (scheduled_id, due_date, today)
+_BUDGET_EXCEEDED  = "expenses_tracker.monthly_budget_exceeded" # (user_id, "YYYY-MM")
 
 
 def _get_db():
@@ -57,11 +60,17 @@ def job_check_subscription_due_soon() -> None:
             ScheduledExpense.next_payment_date >  today,
             ScheduledExpense.next_payment_date <= cutoff,
             ScheduledExpense.category          == ScheduledCategory.SUBSCRIPTION,
+            shard_clause(ScheduledExpense.user_id),
         ).all()
 
+        claimed = dedup.claim_many(
+            _SUBSCRIPTION_DUE,
+            [(item.id, item.next_payment_date.isoformat(), today.isoformat()) for item in items],
+            timedelta(days=1),
+        )
+        batch = []
         for item in items:
-            due_key = (item.id, item.next_payment_date.isoformat())
-            if _subscription_due_cache.get(due_key) == today:
+            if (item.id, item.next_payment_date.isoformat(), today.isoformat()) not in claimed:
                 continue  # ya despachado hoy
 
             days_until = (item.next_payment_date - today).days
@@ -69,17 +78,16 @@ def job_check_subscription_due_soon() -> None:
                 f"Suscripción próxima: '{item.name}' (id={item.id}, "
                 f"user={item.user_id}, days_until={days_until})"
             )
-            _subscription_due_cache[due_key] = today
-            _try_dispatch(
-                "on_subscription_due_soon",
-                scheduled_id=item.id,
-                name=item.name,
-                amount=item.amount,
-                due_date=item.next_payment_date.isoformat(),
-                days_until=days_until,
-                user_id=item.user_id,
-                db=db,
-            )
+            batch.append({
+                "scheduled_id": item.id,
+                "name":         item.name,
+                "amount":       item.amount,
+                "due_date":     item.next_payment_date.isoformat(),
+                "days_until":   days_until,
+                "user_id":      item.user_id,
+            })
+        if batch:
+            _try_dispatch("on_subscription_due_soon_many", items=batch, db=db)
 
     except Exception as e:
         logger.error(f"job_check_subscription_due_soon error: {e}")
@@ -109,26 +117,14 @@ def job_check_monthly_budget() -> None:
         else:
             month_end = datetime(today.year, today.month + 1, 1, tzinfo=timezone.utc)
 
-        automations = db.query(Automation).filter(
+        automations = db.query(Automation.user_id, Automation.trigger_config).filter(
             Automation.trigger_ref == "expenses_tracker.monthly_budget_exceeded",
             Automation.is_active   == True,
+            shard_clause(Automation.user_id),
         ).all()
 
-        for automation in automations:
-            user_id = automation.user_id
-
-            dedup_key = (user_id, month_key)
-            if _budget_exceeded_cache.get(dedup_key) == month_key:
-                continue  # ya despachado este mes
-
-            # Extraer config del nodo trigger del flow
-            flow    = automation.flow or {}
-            nodes   = flow.get("nodes", [])
-            trigger_node = next(
-                (n for n in nodes if n.get("type") == "trigger"), None
-            )
-            config = trigger_node.get("config", {}) if trigger_node else {}
-
+        for user_id, config in automations:
+            config       = config or {}
             limit        = float(config.get("limit", 1000.0))
             account_cfg  = config.get("account", "all")
 
@@ -150,11 +146,12 @@ def job_check_monthly_budget() -> None:
             total    = sum(e.quantity for e in expenses)
 
             if total >= limit:
+                if not dedup.claim(_BUDGET_EXCEEDED, (user_id, month_key), timedelta(days=31)):
+                    continue  # ya despachado este mes
                 logger.info(
                     f"Presupuesto superado para user {user_id}: "
                     f"{total:.2f} >= {limit:.2f} ({account_cfg}, {month_key})"
                 )
-                _budget_exceeded_cache[dedup_key] = month_key
                 _try_dispatch(
                     "on_monthly_budget_exceeded",
                     total=round(total, 2),
@@ -6,12 +6,10 @@ from datetime import date, timedelta
 @pytest.fixture(autouse=True)
 def clear_expenses_dispatch_cache():
     """Limpia los caches de deduplicación del scheduler entre tests."""
-    from app.modules.expenses_tracker import scheduler_service
-    scheduler_service._subscription_due_cache.clear()
-    scheduler_service._budget_exceeded_cache.clear()
+    from app.core.dedup import dedup
+    dedup.clear()
     yield
-    scheduler_service._subscription_due_cache.clear()
-    scheduler_service._budget_exceeded_cache.clear()
+    dedup.clear()
 
 
 # ── Fixtures existentes ───────────────────────────────────────────────────────
@@ -11,17 +11,14 @@ TAG_GROUP = {
 
 
 def start_flights_scheduler() -> None:
-    from apscheduler.schedulers.background import BackgroundScheduler
+    from app.core.scheduler import scheduler_host
     import logging as _logging
     from .scheduler_service import job_check_flight_departing_soon
 
-    scheduler = BackgroundScheduler(timezone="UTC")
-
     # Vuelos próximos a salir — cada hora en punto
-    scheduler.add_job(job_check_flight_departing_soon, "cron", minute=0, id="flights_departing_soon")
+    scheduler_host.add_job(job_check_flight_departing_soon, "cron", minute=0, id="flights_departing_soon", sharded=True)
 
-    scheduler.start()
-    _logging.getLogger(__name__).info("✅ Flights scheduler iniciado")
+    _logging.getLogger(__name__).info("✅ Flights jobs registrados")
 
 
 __all__ = ["router", "register_handlers", "TAGS", "TAG_GROUP", "start_flights_scheduler"]
\ No newline at end of file
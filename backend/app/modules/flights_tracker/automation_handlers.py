@@ -7,6 +7,9 @@ TRIGGERS:
     handle_flight_status_changed   — Estado del vuelo cambió
     handle_flight_departing_soon   — Vuelo sale en N horas
 
+PREFILTERS (solo payload + config, sin BD; los evalúa el motor antes de crear la ejecución):
+    prefilter_flight_status_changed, prefilter_flight_departing_soon
+
 ACCIONES:
     action_get_flight_details      — Obtener info completa del vuelo
     action_refresh_flight          — Refrescar datos via AeroDataBox
@@ -61,6 +64,17 @@ def handle_flight_added(payload: dict, config: dict, db: Session, user_id: int)
     return {"matched": True, "flight": _flight_to_dict(flight)}
 
 
+def prefilter_flight_status_changed(payload: dict, config: dict) -> str | None:
+    if not payload.get("flight_id"):
+        return "no flight_id in payload"
+
+    new_status = payload.get("new_status")
+    to_status  = config.get("to_status")
+    if to_status and new_status != to_status:
+        return f"new_status '{new_status}' does not match filter '{to_status}'"
+    return None
+
+
 def handle_flight_status_changed(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: cuando el estado de un vuelo cambia.
@@ -68,19 +82,13 @@ def handle_flight_status_changed(payload: dict, config: dict, db: Session, user_
     Config:
         - to_status: str  — filtrar por estado destino (opcional)
     """
+    reason = prefilter_flight_status_changed(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
     flight_id  = payload.get("flight_id")
     new_status = payload.get("new_status")
 
-    if not flight_id:
-        return {"matched": False, "reason": "no flight_id in payload"}
-
-    to_status = config.get("to_status")
-    if to_status and new_status != to_status:
-        return {
-            "matched": False,
-            "reason":  f"new_status '{new_status}' does not match filter '{to_status}'",
-        }
-
     flight = db.query(Flight).filter(
         Flight.id      == flight_id,
         Flight.user_id == user_id,
@@ -97,6 +105,19 @@ def handle_flight_status_changed(payload: dict, config: dict, db: Session, user_
     }
 
 
+def prefilter_flight_departing_soon(payload: dict, config: dict) -> str | None:
+    if not payload.get("flight_id"):
+        return "no flight_id in payload"
+
+    hours_until_departure = payload.get("hours_until_departure", 0)
+    hours_before          = config.get("hours_before", 24)
+
+    # El scheduler ya verificó la ventana; validamos por si acaso
+    if hours_until_departure > hours_before + 0.5:
+        return f"hours_until_departure {hours_until_departure:.1f} > threshold {hours_before}"
+    return None
+
+
 def handle_flight_departing_soon(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: cuando un vuelo sale en N horas.
@@ -104,20 +125,13 @@ def handle_flight_departing_soon(payload: dict, config: dict, db: Session, user_
     Config:
         - hours_before: int  — umbral en horas (default 24)
     """
+    reason = prefilter_flight_departing_soon(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
     flight_id             = payload.get("flight_id")
     hours_until_departure = payload.get("hours_until_departure", 0)
-
-    if not flight_id:
-        return {"matched": False, "reason": "no flight_id in payload"}
-
-    hours_before = config.get("hours_before", 24)
-
-    # El scheduler ya verificó la ventana; validamos por si acaso
-    if hours_until_departure > hours_before + 0.5:
-        return {
-            "matched": False,
-            "reason":  f"hours_until_departure {hours_until_departure:.1f} > threshold {hours_before}",
-        }
+    hours_before          = config.get("hours_before", 24)
 
     flight = db.query(Flight).filter(
         Flight.id      == flight_id,
@@ -169,10 +183,9 @@ def action_refresh_flight(payload: dict, config: dict, db: Session, user_id: int
     Config:
         - flight_id: int  — ID del vuelo (opcional, fallback a payload)
 
-    NOTA: flight_service.refresh_flight() es async. Se ejecuta sincrónicamente
-    creando un event loop nuevo para evitar conflictos con el loop de FastAPI.
+    NOTA: usa flight_service.refresh_flight_sync() — la ruta async trabaja con
+    AsyncSession; aquí hay una Session síncrona y ningún event loop corriendo.
     """
-    import asyncio
     from .services.flight_service import flight_service
     from .exceptions import FlightRefreshThrottleError, FlightNotFoundError
 
@@ -181,13 +194,7 @@ def action_refresh_flight(payload: dict, config: dict, db: Session, user_id: int
         return {"done": False, "reason": "no flight_id in config or payload"}
 
     try:
-        loop = asyncio.new_event_loop()
-        try:
-            flight = loop.run_until_complete(
-                flight_service.refresh_flight(db, user_id, flight_id)
-            )
-        finally:
-            loop.close()
+        flight = flight_service.refresh_flight_sync(db, user_id, flight_id)
 
         return {"done": True, "flight": _flight_to_dict(flight)}
 
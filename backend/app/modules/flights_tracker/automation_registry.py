@@ -36,6 +36,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.flights_tracker.automation_handlers.handle_flight_status_changed",
+        prefilter="app.modules.flights_tracker.automation_handlers.prefilter_flight_status_changed",
     )
 
     registry.register_trigger(
@@ -50,6 +51,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.flights_tracker.automation_handlers.handle_flight_departing_soon",
+        prefilter="app.modules.flights_tracker.automation_handlers.prefilter_flight_departing_soon",
     )
 
     # ── ACCIONES ──────────────────────────────────────────────────────────────
@@ -2,9 +2,10 @@ from datetime import date
 from typing import List
 
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.dependencies import get_current_user
 from app.core.auth.user import User
 from .services import flight_service, passport_service
@@ -41,10 +42,11 @@ def get_passport(
 @router.post("/", response_model=FlightResponse, description="⚡ Consume 1 llamada a AeroDataBox", status_code=201)
 async def add_flight(
     data: FlightCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    sync_db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    return await flight_service.add_flight(db, user_id=user.id, data=data)
+    return await flight_service.add_flight(db, sync_db, user_id=user.id, data=data)
 
 
 @router.get("/", response_model=List[FlightResponse])
@@ -83,10 +85,11 @@ def update_notes(
 @router.post("/{flight_id}/refresh", description="⚡ Consume 1 llamada a AeroDataBox",  response_model=FlightResponse)
 async def refresh_flight(
     flight_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    sync_db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    return await flight_service.refresh_flight(db, user_id=user.id, flight_id=flight_id)
+    return await flight_service.refresh_flight(db, sync_db, user_id=user.id, flight_id=flight_id)
 
 
 @router.delete("/{flight_id}", status_code=204)
@@ -8,15 +8,18 @@ si automation_dispatcher.py no existe, el scheduler sigue funcionando.
 """
 import logging
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import func
 
 from app.core.database import SessionLocal
+from app.core.dedup import dedup
+from app.core.scheduler import shard_clause
 
 logger = logging.getLogger(__name__)
 
-# ── Deduplicación en memoria ──────────────────────────────────────────────────
+# ── Deduplicación ─────────────────────────────────────────────────────────────
 # Evita disparar el mismo trigger dos veces en el mismo día para el mismo vuelo.
-# Clave: (flight_id, hours_before, "YYYY-MM-DD") → fecha en que se despachó
-_departing_soon_cache: dict[tuple, str] = {}
+# Clave en app/core/dedup.py: (flight_id, hours_before, "YYYY-MM-DD")
+_DEPARTING_SOON = "flights_tracker.flight_departing_soon"
 
 
 def _get_db():
@@ -40,29 +43,17 @@ def job_check_flight_departing_soon() -> None:
         now      = datetime.now(timezone.utc)
         today    = now.strftime("%Y-%m-%d")
 
-        automations = db.query(Automation).filter(
+        # Pares (user_id, hours_before) distintos: el umbral sale de trigger_config, sin leer el flow
+        hours_before = func.coalesce(Automation.trigger_config["hours_before"].as_integer(), 24)
+        pairs        = db.query(Automation.user_id, hours_before).filter(
             Automation.trigger_ref == "flights_tracker.flight_departing_soon",
             Automation.is_active   == True,
-        ).all()
+            shard_clause(Automation.user_id),
+        ).distinct().all()
 
-        # Agrupar por (user_id, hours_before) para minimizar queries
-        processed: set[tuple] = set()  # (user_id, hours_before) ya procesados en esta ejecución
-
-        for automation in automations:
-            user_id = automation.user_id
-
-            # Extraer hours_before de la config del nodo trigger
-            flow         = automation.flow or {}
-            nodes        = flow.get("nodes", [])
-            trigger_node = next((n for n in nodes if n.get("type") == "trigger"), None)
-            config       = trigger_node.get("config", {}) if trigger_node else {}
-            hours_before = int(config.get("hours_before", 24))
-
-            pair_key = (user_id, hours_before)
-            if pair_key in processed:
-                continue
-            processed.add(pair_key)
+        batch: list[dict] = []   # se despacha en un solo lote al final
 
+        for user_id, hours_before in pairs:
             # Ventana: [now + hours_before - 30min, now + hours_before + 30min]
             window_start = now + timedelta(hours=hours_before) - timedelta(minutes=30)
             window_end   = now + timedelta(hours=hours_before) + timedelta(minutes=30)
@@ -74,9 +65,11 @@ def job_check_flight_departing_soon() -> None:
                 Flight.scheduled_departure <= window_end,
             ).all()
 
+            claimed = dedup.claim_many(
+                _DEPARTING_SOON, [(flight.id, hours_before, today) for flight in flights], timedelta(days=1),
+            )
             for flight in flights:
-                dedup_key = (flight.id, hours_before, today)
-                if _departing_soon_cache.get(dedup_key) == today:
+                if (flight.id, hours_before, today) not in claimed:
                     continue  # ya despachado hoy para este (vuelo, umbral)
 
                 hours_until = (flight.scheduled_departure - now).total_seconds() / 3600
@@ -84,21 +77,21 @@ def job_check_flight_departing_soon() -> None:
                     f"Vuelo próximo: '{flight.flight_number}' (id={flight.id}, "
                     f"user={user_id}, hours_until={hours_until:.1f}, threshold={hours_before}h)"
                 )
-                _departing_soon_cache[dedup_key] = today
-
-                try:
-                    from .automation_dispatcher import dispatcher
-                    dispatcher.on_flight_departing_soon(
-                        flight_id=flight.id,
-                        hours_until_departure=hours_until,
-                        flight_dict=_flight_to_dict(flight),
-                        user_id=user_id,
-                        db=db,
-                    )
-                except ImportError:
-                    pass
-                except Exception as e:
-                    logger.warning(f"automation_dispatcher.on_flight_departing_soon falló: {e}")
+                batch.append({
+                    "flight_id":             flight.id,
+                    "hours_until_departure": hours_until,
+                    "flight_dict":           _flight_to_dict(flight),
+                    "user_id":               user_id,
+                })
+
+        if batch:
+            try:
+                from .automation_dispatcher import dispatcher
+                dispatcher.on_flight_departing_soon_many(flights=batch, db=db)
+            except ImportError:
+                pass
+            except Exception as e:
+                logger.warning(f"automation_dispatcher.on_flight_departing_soon_many falló: {e}")
 
     except Exception as e:
         logger.error(f"job_check_flight_departing_soon error: {e}")
@@ -1,4 +1,8 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..aerodatabox_client import AeroDataBoxClient
@@ -22,12 +26,12 @@ def _is_past(actual_arrival, scheduled_arrival) -> bool:
 
 class FlightService:
 
-    async def add_flight(self, db: Session, user_id: int, data: FlightCreate) -> Flight:
-        existing = db.query(Flight).filter(
+    async def add_flight(self, db: AsyncSession, sync_db: Session, user_id: int, data: FlightCreate) -> Flight:
+        existing = (await db.execute(select(Flight).where(
             Flight.user_id       == user_id,
             Flight.flight_number == data.flight_number,
             Flight.flight_date   == data.flight_date,
-        ).first()
+        ))).scalars().first()
         if existing:
             raise FlightAlreadyExistsError(data.flight_number, str(data.flight_date))
 
@@ -46,24 +50,32 @@ class FlightService:
         )
 
         db.add(flight)
-        db.commit()
-        db.refresh(flight)
+        await db.commit()
+        await db.refresh(flight)
 
+        # El dispatcher es síncrono (Session): fuera del event loop
+        await run_in_threadpool(
+            self._dispatch_flight_added,
+            sync_db, flight.id, flight.flight_number, str(flight.flight_date), flight.status.value, user_id,
+        )
+        return flight
+
+    def _dispatch_flight_added(
+        self, db: Session, flight_id: int, flight_number: str, flight_date: str, status: str, user_id: int,
+    ) -> None:
         try:
             from ..automation_dispatcher import dispatcher
             dispatcher.on_flight_added(
-                flight_id=flight.id,
-                flight_number=flight.flight_number,
-                flight_date=str(flight.flight_date),
-                status=flight.status.value,
+                flight_id=flight_id,
+                flight_number=flight_number,
+                flight_date=flight_date,
+                status=status,
                 user_id=user_id,
                 db=db,
             )
         except Exception:
             pass
 
-        return flight
-
     def get_flights(
         self,
         db: Session,
@@ -98,46 +110,83 @@ class FlightService:
         db.delete(flight)
         db.commit()
 
-    async def refresh_flight(self, db: Session, user_id: int, flight_id: int) -> Flight:
+    async def refresh_flight(self, db: AsyncSession, sync_db: Session, user_id: int, flight_id: int) -> Flight:
+        flight = (await db.execute(select(Flight).where(
+            Flight.id      == flight_id,
+            Flight.user_id == user_id,
+        ))).scalars().first()
+        if not flight:
+            raise FlightNotFoundError(flight_id)
+        self._check_refresh_throttle(flight)
+
+        old_status = flight.status.value
+
+        client = AeroDataBoxClient()
+        raw    = await client.get_flight(flight.flight_number, str(flight.flight_date))
+        self._apply_refresh(flight, client.parse_flight_data(raw))
+
+        await db.commit()
+        await db.refresh(flight)
+
+        if old_status != flight.status.value:
+            from ..automation_handlers import _flight_to_dict
+            await run_in_threadpool(
+                self._dispatch_status_changed, sync_db, _flight_to_dict(flight), old_status, user_id,
+            )
+        return flight
+
+    def refresh_flight_sync(self, db: Session, user_id: int, flight_id: int) -> Flight:
+        """
+        refresh_flight para código síncrono sin event loop (acción de automatización
+        en un worker): la llamada a AeroDataBox corre en un event loop propio.
+        """
         flight = self.get_flight_by_id(db, user_id, flight_id)
+        self._check_refresh_throttle(flight)
+
+        old_status = flight.status.value
+
+        client = AeroDataBoxClient()
+        loop   = asyncio.new_event_loop()
+        try:
+            raw = loop.run_until_complete(client.get_flight(flight.flight_number, str(flight.flight_date)))
+        finally:
+            loop.close()
+        self._apply_refresh(flight, client.parse_flight_data(raw))
+
+        db.commit()
+        db.refresh(flight)
+
+        if old_status != flight.status.value:
+            from ..automation_handlers import _flight_to_dict
+            self._dispatch_status_changed(db, _flight_to_dict(flight), old_status, user_id)
+        return flight
 
+    def _check_refresh_throttle(self, flight: Flight) -> None:
         if flight.last_refreshed_at:
             elapsed = datetime.now(timezone.utc) - flight.last_refreshed_at
             if elapsed < timedelta(minutes=5):
                 raise FlightRefreshThrottleError()
 
-        old_status = flight.status.value
-
-        client = AeroDataBoxClient()
-        raw    = await client.get_flight(flight.flight_number, str(flight.flight_date))
-        parsed = client.parse_flight_data(raw)
-
+    def _apply_refresh(self, flight: Flight, parsed: dict) -> None:
         for key, value in parsed.items():
             setattr(flight, key, value)
 
         flight.is_past           = _is_past(parsed.get("actual_arrival"), parsed.get("scheduled_arrival"))
         flight.last_refreshed_at = datetime.now(timezone.utc)
 
-        db.commit()
-        db.refresh(flight)
-
-        new_status = flight.status.value
-        if old_status != new_status:
-            try:
-                from ..automation_dispatcher import dispatcher
-                from ..automation_handlers import _flight_to_dict
-                dispatcher.on_flight_status_changed(
-                    flight_id=flight.id,
-                    old_status=old_status,
-                    new_status=new_status,
-                    flight_dict=_flight_to_dict(flight),
-                    user_id=user_id,
-                    db=db,
-                )
-            except Exception:
-                pass
-
-        return flight
+    def _dispatch_status_changed(self, db: Session, flight_dict: dict, old_status: str, user_id: int) -> None:
+        try:
+            from ..automation_dispatcher import dispatcher
+            dispatcher.on_flight_status_changed(
+                flight_id=flight_dict["id"],
+                old_status=old_status,
+                new_status=flight_dict["status"],
+                flight_dict=flight_dict,
+                user_id=user_id,
+                db=db,
+            )
+        except Exception:
+            pass
 
     async def search_flight(self, flight_number: str, flight_date: str) -> dict:
         client = AeroDataBoxClient()
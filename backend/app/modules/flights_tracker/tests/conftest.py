@@ -147,10 +147,10 @@ def multiple_flights(auth_client, mock_aerodatabox):
 @pytest.fixture(autouse=True)
 def clear_flights_dispatch_cache():
     """Limpia el cache de deduplicación del scheduler entre tests."""
-    from app.modules.flights_tracker import scheduler_service
-    scheduler_service._departing_soon_cache.clear()
+    from app.core.dedup import dedup
+    dedup.clear()
     yield
-    scheduler_service._departing_soon_cache.clear()
+    dedup.clear()
 
 
 def _make_departing_soon_mock_raw():
@@ -22,48 +22,11 @@ logger = logging.getLogger(__name__)
 class GymAutomationDispatcher:
 
     def _find_and_execute(self, trigger_ref: str, payload: dict, user_id: int, db: Session) -> None:
+        """Encola las automations suscritas — los workers del motor ejecutan los flujos."""
         try:
-            from app.modules.automations_engine.models.automation import Automation
-            from app.modules.automations_engine.services.flow_executor import flow_executor
-            from app.modules.automations_engine.services.execution_service import execution_service
-            from datetime import datetime, timezone
-
-            automations = db.query(Automation).filter(
-                Automation.trigger_ref == trigger_ref,
-                Automation.user_id     == user_id,
-                Automation.is_active   == True,
-            ).all()
-
-            for automation in automations:
-                try:
-                    logger.info(
-                        f"Disparando automatización '{automation.name}' "
-                        f"(id={automation.id}) via {trigger_ref}"
-                    )
-                    execution = execution_service.create(automation.id, user_id, payload, db)
-                    execution = execution_service.mark_running(execution, db)
-
-                    result = flow_executor.execute(automation, payload, db, user_id)
-
-                    if result["status"] == "success":
-                        execution_service.mark_success(execution, result["node_logs"], db)
-                    else:
-                        execution_service.mark_failed(
-                            execution, result.get("error", ""), result["node_logs"], db
-                        )
-
-                    automation.last_run_at = datetime.now(timezone.utc)
-                    automation.run_count   = (automation.run_count or 0) + 1
-                    db.commit()
-
-                    logger.info(
-                        f"Automatización '{automation.name}' terminó con status={result['status']}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error ejecutando automatización '{automation.name}' "
-                        f"(id={automation.id}): {e}"
-                    )
+            from app.modules.automations_engine.services.execution_queue import execution_queue
+
+            execution_queue.dispatch(trigger_ref, payload, user_id, db)
 
         except ImportError:
             pass
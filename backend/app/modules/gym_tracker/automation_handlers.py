@@ -9,6 +9,10 @@ TRIGGERS:
     handle_body_measurement_recorded    — Medición corporal registrada
     handle_workout_inactivity           — N días sin entrenar
 
+PREFILTERS (solo payload + config, sin BD; los evalúa el motor antes de crear la ejecución):
+    prefilter_workout_started, prefilter_workout_ended,
+    prefilter_personal_record_weight, prefilter_body_measurement_recorded
+
 ACCIONES:
     action_get_last_workout_summary     — Resumen del último workout
     action_get_weekly_stats             — Estadísticas semanales
@@ -52,19 +56,11 @@ def _measurement_to_dict(m: BodyMeasurement) -> dict:
 
 # ── TRIGGER HANDLERS ──────────────────────────────────────────────────────────
 
-def handle_workout_started(payload: dict, config: dict, db: Session, user_id: int) -> dict:
-    """
-    Trigger: cuando se inicia un workout.
-    Payload: {"workout_id": int, "started_at": str}
-    Config:  {"day_of_week": str (optional)}
-    """
-    workout_id = payload.get("workout_id")
-    started_at = payload.get("started_at")
-
-    if not workout_id:
-        return {"matched": False, "reason": "no workout_id in payload"}
-    if not started_at:
-        return {"matched": False, "reason": "no started_at in payload"}
+def prefilter_workout_started(payload: dict, config: dict) -> str | None:
+    if not payload.get("workout_id"):
+        return "no workout_id in payload"
+    if not payload.get("started_at"):
+        return "no started_at in payload"
 
     # Filtro: day_of_week
     day_of_week = config.get("day_of_week")
@@ -73,8 +69,23 @@ def handle_workout_started(payload: dict, config: dict, db: Session, user_id: in
         if day_of_week in DAYS:
             today_idx = datetime.now(timezone.utc).weekday()  # 0=lunes
             if DAYS[today_idx] != day_of_week:
-                return {"matched": False, "reason": "day_of_week filter not matched"}
+                return "day_of_week filter not matched"
         # valor inválido → no filtrar (fall through)
+    return None
+
+
+def handle_workout_started(payload: dict, config: dict, db: Session, user_id: int) -> dict:
+    """
+    Trigger: cuando se inicia un workout.
+    Payload: {"workout_id": int, "started_at": str}
+    Config:  {"day_of_week": str (optional)}
+    """
+    reason = prefilter_workout_started(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
+    workout_id = payload.get("workout_id")
+    started_at = payload.get("started_at")
 
     workout = db.query(Workout).filter(
         Workout.id == workout_id,
@@ -86,17 +97,9 @@ def handle_workout_started(payload: dict, config: dict, db: Session, user_id: in
     return {"matched": True, "workout_id": workout_id, "started_at": started_at}
 
 
-def handle_workout_ended(payload: dict, config: dict, db: Session, user_id: int) -> dict:
-    """
-    Trigger: cuando se termina un workout.
-    Payload: {"workout_id": int, "duration_minutes": int|None, "total_exercises": int,
-              "total_sets": int, "muscle_groups": list[str]}
-    Config:  {min_duration_minutes, max_duration_minutes, min_exercises, min_sets,
-              required_muscle_groups: list[str]}
-    """
-    workout_id = payload.get("workout_id")
-    if not workout_id:
-        return {"matched": False, "reason": "no workout_id in payload"}
+def prefilter_workout_ended(payload: dict, config: dict) -> str | None:
+    if not payload.get("workout_id"):
+        return "no workout_id in payload"
 
     duration    = payload.get("duration_minutes")
     total_ex    = payload.get("total_exercises", 0)
@@ -107,31 +110,31 @@ def handle_workout_ended(payload: dict, config: dict, db: Session, user_id: int)
     min_dur = config.get("min_duration_minutes")
     max_dur = config.get("max_duration_minutes")
     if min_dur is not None and max_dur is not None and min_dur > max_dur:
-        return {"matched": False, "reason": "invalid config: min_duration_minutes > max_duration_minutes"}
+        return "invalid config: min_duration_minutes > max_duration_minutes"
 
     # Filtro: min_duration_minutes
     if min_dur is not None:
         if duration is None:
-            return {"matched": False, "reason": "duration_minutes unavailable"}
+            return "duration_minutes unavailable"
         if duration < min_dur:
-            return {"matched": False, "reason": f"duration {duration} min below minimum {min_dur} min"}
+            return f"duration {duration} min below minimum {min_dur} min"
 
     # Filtro: max_duration_minutes
     if max_dur is not None:
         if duration is None:
-            return {"matched": False, "reason": "duration_minutes unavailable"}
+            return "duration_minutes unavailable"
         if duration > max_dur:
-            return {"matched": False, "reason": f"duration {duration} min above maximum {max_dur} min"}
+            return f"duration {duration} min above maximum {max_dur} min"
 
     # Filtro: min_exercises
     min_ex = config.get("min_exercises")
     if min_ex is not None and total_ex < min_ex:
-        return {"matched": False, "reason": f"total_exercises {total_ex} below minimum {min_ex}"}
+        return f"total_exercises {total_ex} below minimum {min_ex}"
 
     # Filtro: min_sets
     min_s = config.get("min_sets")
     if min_s is not None and total_sets < min_s:
-        return {"matched": False, "reason": f"total_sets {total_sets} below minimum {min_s}"}
+        return f"total_sets {total_sets} below minimum {min_s}"
 
     # Filtro: required_muscle_groups (strings — el modelo usa enum values)
     req_groups = config.get("required_muscle_groups")
@@ -139,7 +142,24 @@ def handle_workout_ended(payload: dict, config: dict, db: Session, user_id: int)
         valid_req = [g for g in req_groups if isinstance(g, str)]
         missing = [g for g in valid_req if g not in muscle_grps]
         if missing:
-            return {"matched": False, "reason": f"missing required muscle groups: {missing}"}
+            return f"missing required muscle groups: {missing}"
+
+    return None
+
+
+def handle_workout_ended(payload: dict, config: dict, db: Session, user_id: int) -> dict:
+    """
+    Trigger: cuando se termina un workout.
+    Payload: {"workout_id": int, "duration_minutes": int|None, "total_exercises": int,
+              "total_sets": int, "muscle_groups": list[str]}
+    Config:  {min_duration_minutes, max_duration_minutes, min_exercises, min_sets,
+              required_muscle_groups: list[str]}
+    """
+    reason = prefilter_workout_ended(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
+    workout_id = payload.get("workout_id")
 
     workout = db.query(Workout).filter(
         Workout.id == workout_id,
@@ -151,33 +171,44 @@ def handle_workout_ended(payload: dict, config: dict, db: Session, user_id: int)
     return {"matched": True, "workout": _workout_to_dict(workout)}
 
 
-def handle_personal_record_weight(payload: dict, config: dict, db: Session, user_id: int) -> dict:
-    """
-    Trigger: cuando se establece un récord personal de peso.
-    Payload: {"exercise_name": str, "new_weight_kg": float, "previous_record_kg": float|None,
-              "reps": int|None, "workout_id": int, "set_id": int}
-    Config:  {"exercise_name": str (opt), "min_weight_kg": int (opt)}
-    """
+def prefilter_personal_record_weight(payload: dict, config: dict) -> str | None:
     exercise_name   = payload.get("exercise_name")
     new_weight_kg   = payload.get("new_weight_kg")
-    previous_record = payload.get("previous_record_kg")
 
     if not exercise_name:
-        return {"matched": False, "reason": "missing required payload field: exercise_name"}
+        return "missing required payload field: exercise_name"
     if new_weight_kg is None:
-        return {"matched": False, "reason": "missing required payload field: new_weight_kg"}
+        return "missing required payload field: new_weight_kg"
     if new_weight_kg <= 0:
-        return {"matched": False, "reason": "weight_kg must be > 0"}
+        return "weight_kg must be > 0"
 
     # Filtro: exercise_name (case-insensitive)
     filter_ex = config.get("exercise_name")
     if filter_ex and filter_ex.lower() != exercise_name.lower():
-        return {"matched": False, "reason": "exercise_name filter not matched"}
+        return "exercise_name filter not matched"
 
     # Filtro: min_weight_kg
     min_w = config.get("min_weight_kg")
     if min_w is not None and new_weight_kg < min_w:
-        return {"matched": False, "reason": f"new_weight_kg {new_weight_kg} below min_weight_kg {min_w}"}
+        return f"new_weight_kg {new_weight_kg} below min_weight_kg {min_w}"
+
+    return None
+
+
+def handle_personal_record_weight(payload: dict, config: dict, db: Session, user_id: int) -> dict:
+    """
+    Trigger: cuando se establece un récord personal de peso.
+    Payload: {"exercise_name": str, "new_weight_kg": float, "previous_record_kg": float|None,
+              "reps": int|None, "workout_id": int, "set_id": int}
+    Config:  {"exercise_name": str (opt), "min_weight_kg": int (opt)}
+    """
+    reason = prefilter_personal_record_weight(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
+    exercise_name   = payload.get("exercise_name")
+    new_weight_kg   = payload.get("new_weight_kg")
+    previous_record = payload.get("previous_record_kg")
 
     return {
         "matched":            True,
@@ -190,16 +221,9 @@ def handle_personal_record_weight(payload: dict, config: dict, db: Session, user
     }
 
 
-def handle_body_measurement_recorded(payload: dict, config: dict, db: Session, user_id: int) -> dict:
-    """
-    Trigger: cuando se registra una medición corporal.
-    Payload: {"measurement_id": int, "weight_kg": float|None, "body_fat_percentage": float|None,
-              "recorded_at": str}
-    Config:  {"min_weight_kg": int (opt), "max_weight_kg": int (opt), "require_body_fat": bool (opt)}
-    """
-    measurement_id = payload.get("measurement_id")
-    if not measurement_id:
-        return {"matched": False, "reason": "no measurement_id in payload"}
+def prefilter_body_measurement_recorded(payload: dict, config: dict) -> str | None:
+    if not payload.get("measurement_id"):
+        return "no measurement_id in payload"
 
     weight_kg = payload.get("weight_kg")
     body_fat  = payload.get("body_fat_percentage")
@@ -208,25 +232,43 @@ def handle_body_measurement_recorded(payload: dict, config: dict, db: Session, u
     min_w = config.get("min_weight_kg")
     max_w = config.get("max_weight_kg")
     if min_w is not None and max_w is not None and min_w > max_w:
-        return {"matched": False, "reason": "invalid config: min_weight_kg > max_weight_kg"}
+        return "invalid config: min_weight_kg > max_weight_kg"
 
     # Filtro: min_weight_kg
     if min_w is not None:
         if weight_kg is None:
-            return {"matched": False, "reason": "weight_kg not available for comparison"}
+            return "weight_kg not available for comparison"
         if weight_kg < min_w:
-            return {"matched": False, "reason": f"weight_kg {weight_kg} below min_weight_kg {min_w}"}
+            return f"weight_kg {weight_kg} below min_weight_kg {min_w}"
 
     # Filtro: max_weight_kg
     if max_w is not None:
         if weight_kg is None:
-            return {"matched": False, "reason": "weight_kg not available for comparison"}
+            return "weight_kg not available for comparison"
         if weight_kg > max_w:
-            return {"matched": False, "reason": f"weight_kg {weight_kg} above max_weight_kg {max_w}"}
+            return f"weight_kg {weight_kg} above max_weight_kg {max_w}"
 
     # Filtro: require_body_fat
     if config.get("require_body_fat") and body_fat is None:
-        return {"matched": False, "reason": "body_fat_percentage required but not present"}
+        return "body_fat_percentage required but not present"
+
+    return None
+
+
+def handle_body_measurement_recorded(payload: dict, config: dict, db: Session, user_id: int) -> dict:
+    """
+    Trigger: cuando se registra una medición corporal.
+    Payload: {"measurement_id": int, "weight_kg": float|None, "body_fat_percentage": float|None,
+              "recorded_at": str}
+    Config:  {"min_weight_kg": int (opt), "max_weight_kg": int (opt), "require_body_fat": bool (opt)}
+    """
+    reason = prefilter_body_measurement_recorded(payload, config)
+    if reason:
+        return {"matched": False, "reason": reason}
+
+    measurement_id = payload.get("measurement_id")
+    weight_kg      = payload.get("weight_kg")
+    body_fat       = payload.get("body_fat_percentage")
 
     m = db.query(BodyMeasurement).filter(
         BodyMeasurement.id == measurement_id,
@@ -32,6 +32,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.gym_tracker.automation_handlers.handle_workout_started",
+        prefilter="app.modules.gym_tracker.automation_handlers.prefilter_workout_started",
     )
 
     registry.register_trigger(
@@ -66,6 +67,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.gym_tracker.automation_handlers.handle_workout_ended",
+        prefilter="app.modules.gym_tracker.automation_handlers.prefilter_workout_ended",
     )
 
     registry.register_trigger(
@@ -85,6 +87,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.gym_tracker.automation_handlers.handle_personal_record_weight",
+        prefilter="app.modules.gym_tracker.automation_handlers.prefilter_personal_record_weight",
     )
 
     registry.register_trigger(
@@ -109,6 +112,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.gym_tracker.automation_handlers.handle_body_measurement_recorded",
+        prefilter="app.modules.gym_tracker.automation_handlers.prefilter_body_measurement_recorded",
     )
 
     registry.register_trigger(
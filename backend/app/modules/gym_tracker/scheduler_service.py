@@ -7,16 +7,18 @@ Es completamente independiente del motor de automatizaciones —
 si automation_dispatcher.py no existe, el scheduler sigue funcionando.
 """
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from app.core.database import SessionLocal
+from app.core.dedup import dedup
+from app.core.scheduler import shard_clause
 
 logger = logging.getLogger(__name__)
 
-# ── Deduplicación en memoria ──────────────────────────────────────────────────
+# ── Deduplicación ─────────────────────────────────────────────────────────────
 # Evita disparar el mismo trigger dos veces en el mismo día para el mismo usuario.
-# Clave: (user_id, "YYYY-MM-DD")
-_inactivity_fired: set[tuple] = set()
+# Clave en app/core/dedup.py: (user_id, "YYYY-MM-DD")
+_WORKOUT_INACTIVITY = "gym_tracker.workout_inactivity"
 
 
 def _get_db():
@@ -37,29 +39,25 @@ def job_check_workout_inactivity() -> None:
     try:
         from app.modules.automations_engine.models.automation import Automation
 
-        today     = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        processed: set = set()  # user_ids ya procesados en esta ejecución
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
         automations = db.query(Automation).filter(
             Automation.trigger_ref == "gym_tracker.workout_inactivity",
             Automation.is_active   == True,
+            shard_clause(Automation.user_id),
         ).all()
 
-        for automation in automations:
-            user_id = automation.user_id
+        # Un usuario por ejecución aunque tenga varias automations;
+        # deduplicación entre ejecuciones del día con una sola reclamación por lote
+        user_ids = list(dict.fromkeys(automation.user_id for automation in automations))
+        claimed  = dedup.claim_many(
+            _WORKOUT_INACTIVITY, [(user_id, today) for user_id in user_ids], timedelta(days=1),
+        )
 
-            # Evitar procesar el mismo usuario dos veces en la misma ejecución
-            if user_id in processed:
+        for user_id in user_ids:
+            if (user_id, today) not in claimed:
                 continue
 
-            # Deduplicación entre ejecuciones del día
-            dedup_key = (user_id, today)
-            if dedup_key in _inactivity_fired:
-                continue
-
-            processed.add(user_id)
-            _inactivity_fired.add(dedup_key)
-
             try:
                 from .automation_dispatcher import dispatcher
                 dispatcher.on_workout_inactivity_check(user_id=user_id, db=db)
@@ -79,18 +77,17 @@ def job_check_workout_inactivity() -> None:
 
 def start_gym_scheduler() -> None:
     """
-    Arranca el scheduler de gym_tracker.
+    Registra los jobs de gym_tracker en el scheduler compartido.
     Debe llamarse desde el startup_event de FastAPI (nunca en import-time).
     """
-    from apscheduler.schedulers.background import BackgroundScheduler
+    from app.core.scheduler import scheduler_host
 
-    scheduler = BackgroundScheduler(timezone="UTC")
-    scheduler.add_job(
+    scheduler_host.add_job(
         job_check_workout_inactivity,
         "cron",
         hour=9,
         minute=0,
         id="gym_workout_inactivity",
+        sharded=True,
     )
-    scheduler.start()
-    logger.info("Gym scheduler iniciado (inactividad @ 09:00 UTC)")
+    logger.info("Gym jobs registrados (inactividad @ 09:00 UTC)")
@@ -9,4 +9,18 @@ TAG_GROUP = {
     "tags": ["Macros"],
 }
 
-__all__ = ["router", "register_handlers", "TAGS", "TAG_GROUP"]
\ No newline at end of file
+
+def start_macro_scheduler() -> None:
+    from app.core.scheduler import scheduler_host
+    import logging as _logging
+    from .scheduler_service import job_check_no_entry_today, job_check_logging_streak
+
+    # Días sin registro — cada hora en punto (cada automation decide su check_hour)
+    scheduler_host.add_job(job_check_no_entry_today, "cron", minute=0,         id="macro_no_entry_today", sharded=True)
+    # Rachas de registro — una vez al día a las 00:05 UTC
+    scheduler_host.add_job(job_check_logging_streak, "cron", hour=0, minute=5, id="macro_logging_streak", sharded=True)
+
+    _logging.getLogger(__name__).info("✅ Macro jobs registrados")
+
+
+__all__ = ["router", "register_handlers", "TAGS", "TAG_GROUP", "start_macro_scheduler"]
\ No newline at end of file
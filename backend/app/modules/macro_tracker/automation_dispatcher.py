@@ -14,62 +14,27 @@ TRIGGERS que despacha:
     macro_tracker.logging_streak           — N días consecutivos
 """
 import logging
-from datetime import date
+from datetime import date, timedelta
 from sqlalchemy.orm import Session
 
+from app.core.dedup import dedup
+
 logger = logging.getLogger(__name__)
 
 MACRO_FIELDS = ["energy_kcal", "proteins_g", "carbohydrates_g", "fat_g", "fiber_g"]
 
-# Dedup para daily_macro_threshold: (user_id, date_str, macro, direction)
-_macro_threshold_cache: set = set()
+# Dedup para daily_macro_threshold (app/core/dedup.py): (user_id, date_str, macro, direction)
+_MACRO_THRESHOLD = "macro_tracker.daily_macro_threshold"
 
 
 class MacroAutomationDispatcher:
 
     def _find_and_execute(self, trigger_ref: str, payload: dict, user_id: int, db: Session) -> None:
+        """Encola las automations suscritas — los workers del motor ejecutan los flujos."""
         try:
-            from app.modules.automations_engine.models.automation import Automation
-            from app.modules.automations_engine.services.flow_executor import flow_executor
-            from app.modules.automations_engine.services.execution_service import execution_service
-            from datetime import datetime, timezone
-
-            automations = db.query(Automation).filter(
-                Automation.trigger_ref == trigger_ref,
-                Automation.user_id     == user_id,
-                Automation.is_active   == True,
-            ).all()
+            from app.modules.automations_engine.services.execution_queue import execution_queue
 
-            for automation in automations:
-                try:
-                    logger.info(
-                        f"Disparando automatización '{automation.name}' "
-                        f"(id={automation.id}) via {trigger_ref}"
-                    )
-                    execution = execution_service.create(automation.id, user_id, payload, db)
-                    execution = execution_service.mark_running(execution, db)
-
-                    result = flow_executor.execute(automation, payload, db, user_id)
-
-                    if result["status"] == "success":
-                        execution_service.mark_success(execution, result["node_logs"], db)
-                    else:
-                        execution_service.mark_failed(
-                            execution, result.get("error", ""), result["node_logs"], db
-                        )
-
-                    automation.last_run_at = datetime.now(timezone.utc)
-                    automation.run_count   = (automation.run_count or 0) + 1
-                    db.commit()
-
-                    logger.info(
-                        f"Automatización '{automation.name}' terminó con status={result['status']}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error ejecutando automatización '{automation.name}' "
-                        f"(id={automation.id}): {e}"
-                    )
+            execution_queue.dispatch(trigger_ref, payload, user_id, db)
 
         except ImportError:
             pass
@@ -96,19 +61,23 @@ class MacroAutomationDispatcher:
         Dedup: (user_id, date_str, macro, direction) — una vez por combo por día.
 
         Estrategia:
-        1. Calcular totales diarios del usuario
-        2. Obtener UserGoal — salir si no hay
-        3. Para cada automation activa con trigger_ref=daily_macro_threshold:
-           a. Extraer config (macro, threshold_pct, direction)
-           b. Comprobar dedup
-           c. Calcular progress_pct
-           d. Si condición → disparar con payload pre-construido
+        1. Consultar el trigger_index — salir sin tocar la BD si no hay suscripciones
+        2. Calcular totales diarios del usuario
+        3. Obtener UserGoal — salir si no hay
+        4. Para cada automation activa con trigger_ref=daily_macro_threshold:
+           a. Leer config (macro, threshold_pct, direction) ya parseado en el índice
+           b. Calcular progress_pct
+           c. Si condición y dedup.claim() → disparar con payload pre-construido
         """
         try:
-            from app.modules.automations_engine.models.automation import Automation
+            from app.modules.automations_engine.core.trigger_index import trigger_index
             from .diary_entry import DiaryEntry
             from .user_goal import UserGoal
 
+            subscriptions = trigger_index.lookup("macro_tracker.daily_macro_threshold", user_id, db)
+            if not subscriptions:
+                return
+
             today     = date.today()
             today_str = str(today)
 
@@ -123,17 +92,8 @@ class MacroAutomationDispatcher:
             if not goal:
                 return
 
-            automations = db.query(Automation).filter(
-                Automation.trigger_ref == "macro_tracker.daily_macro_threshold",
-                Automation.user_id     == user_id,
-                Automation.is_active   == True,
-            ).all()
-
-            for automation in automations:
-                flow         = automation.flow or {}
-                nodes        = flow.get("nodes", [])
-                trigger_node = next((n for n in nodes if n.get("type") == "trigger"), None)
-                config       = trigger_node.get("config", {}) if trigger_node else {}
+            for subscription in subscriptions:
+                config = subscription.trigger_config
 
                 macro         = config.get("macro")
                 threshold_pct = float(config.get("threshold_pct", 100))
@@ -142,10 +102,6 @@ class MacroAutomationDispatcher:
                 if not macro or macro not in MACRO_FIELDS:
                     continue
 
-                dedup_key = (user_id, today_str, macro, direction)
-                if dedup_key in _macro_threshold_cache:
-                    continue
-
                 goal_val = getattr(goal, macro, None)
                 if not goal_val:
                     continue
@@ -160,7 +116,8 @@ class MacroAutomationDispatcher:
                 if not condition_met:
                     continue
 
-                _macro_threshold_cache.add(dedup_key)
+                if not dedup.claim(_MACRO_THRESHOLD, (user_id, today_str, macro, direction), timedelta(days=1)):
+                    continue
 
                 self._find_and_execute(
                     trigger_ref="macro_tracker.daily_macro_threshold",
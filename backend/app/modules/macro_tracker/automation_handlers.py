@@ -6,6 +6,10 @@ Cada función sigue la firma estándar:
 
 Triggers devuelven {"matched": True/False, ...} — NUNCA lanzan excepciones.
 Acciones devuelven {"done": True/False, ...}    — NUNCA lanzan excepciones.
+
+Los triggers que filtran solo con payload + config exponen además
+prefilter_X(payload, config) -> str | None (motivo de descarte). El motor lo
+evalúa antes de crear la ejecución y el handler lo reutiliza.
 """
 import logging
 from sqlalchemy.orm import Session
@@ -104,6 +108,21 @@ def handle_meal_logged(payload: dict, config: dict, db: Session, user_id: int) -
         return {"matched": False, "reason": "internal error"}
 
 
+def prefilter_daily_macro_threshold(payload: dict, config: dict) -> str | None:
+    if not payload.get("macro") or payload.get("goal_value") is None:
+        return "missing macro data in payload"
+
+    progress_pct  = payload.get("progress_pct", 0.0)
+    threshold_pct = float(config.get("threshold_pct", 100))
+
+    if config.get("direction", "above") == "above":
+        matched = progress_pct >= threshold_pct
+    else:  # below
+        matched = progress_pct <= threshold_pct
+
+    return None if matched else "threshold not met"
+
+
 def handle_daily_macro_threshold(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: al superar/bajar de un % del objetivo diario de un macro.
@@ -113,25 +132,17 @@ def handle_daily_macro_threshold(payload: dict, config: dict, db: Session, user_
     Nota: la deduplicación vive en el dispatcher, no aquí.
     """
     try:
+        reason = prefilter_daily_macro_threshold(payload, config)
+        if reason:
+            return {"matched": False, "reason": reason}
+
         macro         = payload.get("macro")
         actual_value  = payload.get("actual_value", 0.0)
         goal_value    = payload.get("goal_value")
         progress_pct  = payload.get("progress_pct", 0.0)
-
-        if not macro or goal_value is None:
-            return {"matched": False, "reason": "missing macro data in payload"}
-
         threshold_pct = float(config.get("threshold_pct", 100))
         direction     = config.get("direction", "above")
 
-        if direction == "above":
-            matched = progress_pct >= threshold_pct
-        else:  # below
-            matched = progress_pct <= threshold_pct
-
-        if not matched:
-            return {"matched": False, "reason": "threshold not met"}
-
         return {
             "matched":       True,
             "macro":         macro,
@@ -148,6 +159,13 @@ def handle_daily_macro_threshold(payload: dict, config: dict, db: Session, user_
         return {"matched": False, "reason": "internal error"}
 
 
+def prefilter_goal_updated(payload: dict, config: dict) -> str | None:
+    macro_changed = config.get("macro_changed")
+    if macro_changed and macro_changed not in payload.get("changed_fields", []):
+        return f"target macro '{macro_changed}' did not change"
+    return None
+
+
 def handle_goal_updated(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: al actualizar los objetivos nutricionales.
@@ -155,14 +173,11 @@ def handle_goal_updated(payload: dict, config: dict, db: Session, user_id: int)
     Config: macro_changed (opcional) — solo dispara si cambió este macro específico.
     """
     try:
-        changed_fields = payload.get("changed_fields", [])
+        reason = prefilter_goal_updated(payload, config)
+        if reason:
+            return {"matched": False, "reason": reason}
 
-        macro_changed = config.get("macro_changed")
-        if macro_changed and macro_changed not in changed_fields:
-            return {
-                "matched": False,
-                "reason":  f"target macro '{macro_changed}' did not change",
-            }
+        changed_fields = payload.get("changed_fields", [])
 
         return {
             "matched":        True,
@@ -204,6 +219,17 @@ def handle_no_entry_logged_today(payload: dict, config: dict, db: Session, user_
         return {"matched": False, "reason": "internal error"}
 
 
+def prefilter_logging_streak(payload: dict, config: dict) -> str | None:
+    computed_streak = payload.get("streak_days", 0)
+    target_streak   = int(config.get("streak_days", 0))
+
+    if not target_streak:
+        return "streak_days not configured"
+    if computed_streak != target_streak:
+        return f"streak is {computed_streak}, target is {target_streak}"
+    return None
+
+
 def handle_logging_streak(payload: dict, config: dict, db: Session, user_id: int) -> dict:
     """
     Trigger: al alcanzar exactamente N días consecutivos.
@@ -211,17 +237,11 @@ def handle_logging_streak(payload: dict, config: dict, db: Session, user_id: int
     Config: streak_days (requerido) — coincidencia exacta, NO >=.
     """
     try:
-        computed_streak = payload.get("streak_days", 0)
-        target_streak   = int(config.get("streak_days", 0))
-
-        if not target_streak:
-            return {"matched": False, "reason": "streak_days not configured"}
+        reason = prefilter_logging_streak(payload, config)
+        if reason:
+            return {"matched": False, "reason": reason}
 
-        if computed_streak != target_streak:
-            return {
-                "matched": False,
-                "reason":  f"streak is {computed_streak}, target is {target_streak}",
-            }
+        computed_streak = payload.get("streak_days", 0)
 
         return {
             "matched":           True,
@@ -81,6 +81,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.macro_tracker.automation_handlers.handle_daily_macro_threshold",
+        prefilter="app.modules.macro_tracker.automation_handlers.prefilter_daily_macro_threshold",
     )
 
     registry.register_trigger(
@@ -95,6 +96,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.macro_tracker.automation_handlers.handle_goal_updated",
+        prefilter="app.modules.macro_tracker.automation_handlers.prefilter_goal_updated",
     )
 
     registry.register_trigger(
@@ -122,6 +124,7 @@ def register(registry) -> None:
             },
         },
         handler="app.modules.macro_tracker.automation_handlers.handle_logging_streak",
+        prefilter="app.modules.macro_tracker.automation_handlers.prefilter_logging_streak",
     )
 
     # ── ACCIONES ──────────────────────────────────────────────────────────────
@@ -1,9 +1,10 @@
 from datetime import date
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.dependencies import get_current_user
 from app.core.auth.user import User
 
@@ -35,7 +36,7 @@ stats_service = StatsService()
 @router.get("/products/barcode/{barcode}", response_model=ProductResponse)
 async def get_product_by_barcode(
     barcode: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Busca un producto por código de barras. Si no está en caché llama a OFF."""
@@ -46,7 +47,7 @@ async def get_product_by_barcode(
 async def search_products(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=20, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """Busca productos por nombre. Primero en BD local, luego en OFF."""
@@ -6,7 +6,7 @@ Dos jobs:
   - job_check_no_entry_today:  cada hora, comprueba si no hay entradas hoy
   - job_check_logging_streak:  diario a las 00:05 UTC, comprueba rachas consecutivas
 
-Deduplicación en memoria independiente por trigger.
+Deduplicación por trigger en app/core/dedup.py (compartida por el cluster).
 
 IMPORTANTE: Nunca llamar job_check_*() directamente en tests — usan SessionLocal()
 que apunta al DB de dev (puerto 5432). En tests, llamar dispatcher.on_*() directamente
@@ -14,14 +14,17 @@ con la sesión de test.
 """
 import logging
 from datetime import date, timedelta
+from sqlalchemy import func
 
 from app.core.database import SessionLocal
+from app.core.dedup import dedup
+from app.core.scheduler import shard_clause
 
 logger = logging.getLogger(__name__)
 
-# ── Deduplicación en memoria ──────────────────────────────────────────────────
-_no_entry_today_cache: dict = {}   # (user_id, "YYYY-MM-DD") -> today_str
-_logging_streak_cache: dict = {}   # (user_id, streak_days, "YYYY-MM-DD") -> today_str
+# ── Deduplicación ─────────────────────────────────────────────────────────────
+_NO_ENTRY_TODAY = "macro_tracker.no_entry_logged_today"   # (user_id, "YYYY-MM-DD")
+_LOGGING_STREAK = "macro_tracker.logging_streak"          # (user_id, streak_days, "YYYY-MM-DD")
 
 
 def _try_dispatch(method_name: str, *args, **kwargs) -> None:
@@ -37,12 +40,11 @@ def _try_dispatch(method_name: str, *args, **kwargs) -> None:
 def job_check_no_entry_today() -> None:
     """
     Runs every hour. Para cada automation activa con trigger_ref=macro_tracker.no_entry_logged_today:
-    1. Extraer check_hour del config del nodo trigger (default 20 UTC)
-    2. Saltar si hora UTC actual < check_hour
+    1. Usuarios con check_hour (trigger_config, default 20 UTC) <= hora UTC actual — filtrado en SQL
+    2. Contar DiaryEntry del usuario hoy — saltar si > 0
     3. Saltar si dedup key (user_id, today_str) ya disparó hoy
-    4. Contar DiaryEntry del usuario hoy — saltar si > 0
-    5. Calcular days_since_last_entry
-    6. Despachar via _try_dispatch
+    4. Calcular days_since_last_entry
+    5. Despachar via _try_dispatch
     """
     from datetime import datetime, timezone
     db = SessionLocal()
@@ -54,34 +56,18 @@ def job_check_no_entry_today() -> None:
         today     = now.date()
         today_str = str(today)
 
-        automations = db.query(Automation).filter(
-            Automation.trigger_ref == "macro_tracker.no_entry_logged_today",
-            Automation.is_active   == True,
-        ).all()
-
-        processed_users: set = set()  # evitar consultas duplicadas para el mismo usuario
-
-        for automation in automations:
-            user_id = automation.user_id
-
-            flow         = automation.flow or {}
-            nodes        = flow.get("nodes", [])
-            trigger_node = next((n for n in nodes if n.get("type") == "trigger"), None)
-            config       = trigger_node.get("config", {}) if trigger_node else {}
-            check_hour   = int(config.get("check_hour", 20))
-
-            # Comprobación de hora
-            if now.hour < check_hour:
-                continue
-
-            # Dedup
-            dedup_key = (user_id, today_str)
-            if _no_entry_today_cache.get(dedup_key) == today_str:
-                continue
-
-            if user_id in processed_users:
-                continue
-
+        # check_hour (default 20 UTC) se filtra en SQL sobre trigger_config
+        check_hour = func.coalesce(Automation.trigger_config["check_hour"].as_integer(), 20)
+        user_ids   = [
+            row.user_id for row in db.query(Automation.user_id).filter(
+                Automation.trigger_ref == "macro_tracker.no_entry_logged_today",
+                Automation.is_active   == True,
+                check_hour             <= now.hour,
+                shard_clause(Automation.user_id),
+            ).distinct().all()
+        ]
+
+        for user_id in user_ids:
             # Contar entradas de hoy
             count = db.query(DiaryEntry).filter(
                 DiaryEntry.user_id    == user_id,
@@ -89,7 +75,10 @@ def job_check_no_entry_today() -> None:
             ).count()
 
             if count > 0:
-                processed_users.add(user_id)
+                continue
+
+            # Dedup
+            if not dedup.claim(_NO_ENTRY_TODAY, (user_id, today_str), timedelta(days=1)):
                 continue
 
             # Calcular days_since_last_entry
@@ -107,8 +96,6 @@ def job_check_no_entry_today() -> None:
                 last_date  = None
 
             logger.info(f"Sin entradas hoy para user {user_id} (last={last_date})")
-            _no_entry_today_cache[dedup_key] = today_str
-            processed_users.add(user_id)
 
             _try_dispatch(
                 "on_no_entry_logged_today",
@@ -127,8 +114,8 @@ def job_check_no_entry_today() -> None:
 def job_check_logging_streak() -> None:
     """
     Runs daily at 00:05 UTC. Para cada automation activa con trigger_ref=macro_tracker.logging_streak:
-    1. Extraer streak_days del config del nodo trigger
-    2. Dedup: (user_id, streak_days, today_str)
+    1. (user_id, streak_days) distintos desde trigger_config — filtrado en SQL
+    2. Dedup al disparar: (user_id, streak_days, today_str)
     3. Computar racha hacia atrás desde AYER (hoy puede estar incompleto a las 00:05)
        Ventana limitada a streak_days+1 días para eficiencia
     4. Despachar solo si racha == target (coincidencia exacta)
@@ -144,32 +131,22 @@ def job_check_logging_streak() -> None:
         today_str = str(today)
         yesterday = today - timedelta(days=1)
 
-        automations = db.query(Automation).filter(
+        streak_days = Automation.trigger_config["streak_days"].as_integer()
+        targets     = db.query(Automation.user_id, streak_days.label("streak_days")).filter(
             Automation.trigger_ref == "macro_tracker.logging_streak",
             Automation.is_active   == True,
+            Automation.trigger_config.has_key("streak_days"),
+            streak_days > 0,
+            shard_clause(Automation.user_id),
+        ).distinct().order_by(
+            Automation.user_id, streak_days.desc()   # la ventana del mayor objetivo cubre los menores
         ).all()
 
         # Cache de racha por usuario para evitar recalcular
         streak_cache: dict = {}        # user_id -> streak_count
         streak_start_cache: dict = {}  # user_id -> streak_start_date str
 
-        for automation in automations:
-            user_id = automation.user_id
-
-            flow         = automation.flow or {}
-            nodes        = flow.get("nodes", [])
-            trigger_node = next((n for n in nodes if n.get("type") == "trigger"), None)
-            config       = trigger_node.get("config", {}) if trigger_node else {}
-            target_streak = int(config.get("streak_days", 0))
-
-            if not target_streak:
-                continue
-
-            # Dedup
-            dedup_key = (user_id, target_streak, today_str)
-            if _logging_streak_cache.get(dedup_key) == today_str:
-                continue
-
+        for user_id, target_streak in targets:
             # Calcular racha (limitada a target_streak+1 días para eficiencia)
             if user_id not in streak_cache:
                 lookback_start = yesterday - timedelta(days=target_streak)
@@ -199,8 +176,11 @@ def job_check_logging_streak() -> None:
             if streak != target_streak:
                 continue
 
+            # Dedup
+            if not dedup.claim(_LOGGING_STREAK, (user_id, target_streak, today_str), timedelta(days=1)):
+                continue
+
             logger.info(f"Racha de {streak} días para user {user_id} (start={streak_start})")
-            _logging_streak_cache[dedup_key] = today_str
 
             _try_dispatch(
                 "on_logging_streak",
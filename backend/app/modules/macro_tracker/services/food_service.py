@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..product import Product
 from ..openfoodfacts_client import OpenFoodFactsClient
@@ -15,11 +17,11 @@ class FoodService:
     def __init__(self):
         self.client = OpenFoodFactsClient()
 
-    async def get_or_fetch_by_barcode(self, db: Session, barcode: str) -> Product:
+    async def get_or_fetch_by_barcode(self, db: AsyncSession, barcode: str) -> Product:
         barcode = barcode.strip()
 
         # 1. Buscar en caché local primero
-        product = db.query(Product).filter(Product.barcode == barcode).first()
+        product = (await db.execute(select(Product).where(Product.barcode == barcode))).scalars().first()
         if product:
             return product
 
@@ -29,20 +31,19 @@ class FoodService:
 
         product = Product(**parsed)
         db.add(product)
-        db.commit()
-        db.refresh(product)
+        await db.commit()
+        await db.refresh(product)
         return product
 
-    async def search_products(self, db: Session, query: str, limit: int = 20) -> list[Product]:
+    async def search_products(self, db: AsyncSession, query: str, limit: int = 20) -> list[Product]:
         query_stripped = query.strip()
 
         # 1. Buscar en BD local primero
-        local_results = (
-            db.query(Product)
-            .filter(Product.product_name.ilike(f"%{query_stripped}%"))
+        local_results = list((await db.execute(
+            select(Product)
+            .where(Product.product_name.ilike(f"%{query_stripped}%"))
             .limit(limit)
-            .all()
-        )
+        )).scalars().all())
 
         if len(local_results) >= 5:
             return local_results
@@ -65,24 +66,25 @@ class FoodService:
 
             # Upsert: si ya existe en BD por barcode, no duplicar
             if barcode:
-                existing = db.query(Product).filter(Product.barcode == barcode).first()
+                existing = (await db.execute(select(Product).where(Product.barcode == barcode))).scalars().first()
                 if existing:
                     local_results.append(existing)
                     local_barcodes.add(barcode)
                     continue
 
-            # Persistir el producto de OFF para que tenga id
+            # Persistir el producto de OFF para que tenga id — un SAVEPOINT por producto:
+            # si falla solo se descarta ese, sin expirar los ya cargados
             product = Product(**parsed)
-            db.add(product)
             try:
-                db.commit()
-                db.refresh(product)
+                async with db.begin_nested():
+                    db.add(product)
                 local_results.append(product)
                 if barcode:
                     local_barcodes.add(barcode)
             except Exception:
-                db.rollback()
+                pass
 
+        await db.commit()
         return local_results[:limit]
 
     def get_product_by_id(self, db: Session, product_id: int) -> Product:
@@ -30,8 +30,9 @@ from app.modules.macro_tracker.automation_handlers import (
 )
 from app.modules.macro_tracker.automation_dispatcher import (
     MacroAutomationDispatcher,
-    _macro_threshold_cache,
+    _MACRO_THRESHOLD,
 )
+from app.core.dedup import dedup
 
 
 # ── Fixtures ──────────────────────────────────────────────────────────────────
@@ -116,9 +117,9 @@ def set_goal(auth_client):
 @pytest.fixture
 def clear_threshold_cache():
     """Limpia el caché de dedup del threshold entre tests."""
-    _macro_threshold_cache.clear()
+    dedup.clear(_MACRO_THRESHOLD)
     yield
-    _macro_threshold_cache.clear()
+    dedup.clear(_MACRO_THRESHOLD)
 
 
 # ── helpers para obtener user_id desde la sesión de test ─────────────────────
@@ -1106,8 +1107,6 @@ class TestDispatcherIntegration:
 
     def test_threshold_dedup_same_combo_fires_once(self, db, auth_client, sample_product_id, set_goal, clear_threshold_cache):
         """La misma combinación (user, date, macro, direction) no dispara dos veces."""
-        from app.modules.macro_tracker.automation_dispatcher import _macro_threshold_cache
-
         user_id = _get_user_id(db, auth_client)
         d = MacroAutomationDispatcher()
 
@@ -1126,11 +1125,57 @@ class TestDispatcherIntegration:
         today_str = str(date.today())
         test_key = (user_id, today_str, "energy_kcal", "above")
 
-        # Primera vez — key no está en cache
-        assert test_key not in _macro_threshold_cache
+        # Primera vez — se reclama la key (primer disparo)
+        assert dedup.claim(_MACRO_THRESHOLD, test_key, timedelta(days=1)) is True
+
+        # Segunda vez — key ya reclamada → no dispara
+        assert dedup.claim(_MACRO_THRESHOLD, test_key, timedelta(days=1)) is False
+
+
+# ── Tests: jobs del scheduler (filtros sobre trigger_config) ─────────────────
+
+def _create_trigger_automation(auth_client, name, trigger_id, config):
+    response = auth_client.post("/api/v1/automations/", json={
+        "name": name,
+        "trigger_type": "module_event",
+        "flow": {"nodes": [{"id": "n1", "type": "trigger", "config": {"trigger_id": trigger_id, **config}}], "edges": []},
+    })
+    assert response.status_code == 201, response.json()
+    return response.json()["id"]
+
 
-        # Insertar manualmente para simular el primer disparo
-        _macro_threshold_cache.add(test_key)
+class TestSchedulerJobs:
+
+    def _run(self, db, job):
+        from unittest.mock import patch
+        from app.modules.macro_tracker import scheduler_service
+
+        calls = []
+        with patch.object(scheduler_service, "SessionLocal", return_value=db), \
+             patch.object(scheduler_service, "_try_dispatch", side_effect=lambda name, **kw: calls.append(kw)):
+            job()
+        return calls
+
+    def test_no_entry_today_filters_check_hour_in_sql(self, db, auth_client):
+        from app.modules.macro_tracker.scheduler_service import job_check_no_entry_today
+        _create_trigger_automation(auth_client, "Nunca", "macro_tracker.no_entry_logged_today", {"check_hour": 24})
+        assert self._run(db, job_check_no_entry_today) == []
+
+        user_id = _get_user_id(db, auth_client)
+        _create_trigger_automation(auth_client, "Siempre", "macro_tracker.no_entry_logged_today", {"check_hour": 0})
+        calls = self._run(db, job_check_no_entry_today)
+        assert [c["user_id"] for c in calls] == [user_id]
+
+    def test_logging_streak_reads_streak_days_from_trigger_config(self, db, auth_client, sample_product_id):
+        from app.modules.macro_tracker.scheduler_service import job_check_logging_streak
+        _create_trigger_automation(auth_client, "Racha 1", "macro_tracker.logging_streak", {"streak_days": 1})
+        _create_trigger_automation(auth_client, "Sin racha", "macro_tracker.logging_streak", {})
+        auth_client.post("/api/v1/macros/diary", json={
+            "product_id": sample_product_id,
+            "entry_date": (date.today() - timedelta(days=1)).isoformat(),
+            "meal_type":  "lunch",
+            "amount_g":   100.0,
+        })
 
-        # Segunda vez — key ya está en cache → no dispara
-        assert test_key in _macro_threshold_cache
+        calls = self._run(db, job_check_logging_streak)
+        assert [c["streak_days"] for c in calls] == [1]
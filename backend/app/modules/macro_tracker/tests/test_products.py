@@ -117,6 +117,25 @@ class TestProductSearch:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+    def test_search_persists_off_results_and_skips_failing_insert(self, auth_client, db):
+        """Cada producto de OFF va en su SAVEPOINT: uno que falla no descarta los demás."""
+        from unittest.mock import AsyncMock, patch
+        from app.modules.macro_tracker.macro_router import food_service
+        from app.modules.macro_tracker.product import Product
+
+        remote = [
+            {"code": "1111111111111", "product_name": "Avena uno"},
+            {"code": "9" * 40,        "product_name": "Avena barcode demasiado largo"},
+            {"code": "2222222222222", "product_name": "Avena dos"},
+        ]
+        with patch.object(food_service.client, "search_by_name", new=AsyncMock(return_value=remote)):
+            response = auth_client.get("/api/v1/macros/products/search?q=avena")
+
+        assert response.status_code == 200
+        assert [p["barcode"] for p in response.json()] == ["1111111111111", "2222222222222"]
+        assert all(p["id"] for p in response.json())
+        assert db.query(Product).count() == 2
+
     def test_search_missing_q_fails(self, auth_client):
         response = auth_client.get("/api/v1/macros/products/search")
         assert response.status_code == 422
@@ -6,12 +6,28 @@ from pathlib import Path
 # Carga .env.test si existe, antes de importar nada de la app
 load_dotenv(Path(__file__).parent / ".env.test", override=True)
 
+# Los tests esperan las ejecuciones de los dispatchers dentro del propio request
+os.environ.setdefault("AUTOMATIONS_EXECUTION_MODE", "inline")
+# Los tests reanudan los delays llamando a delay_resumer.resume_due() explícitamente
+os.environ.setdefault("AUTOMATIONS_DELAY_RESUMER_ENABLED", "false")
+# El mantenimiento de executions crea/borra particiones: los tests lo llaman explícitamente
+os.environ.setdefault("AUTOMATIONS_EXECUTION_MAINTENANCE_ENABLED", "false")
+# Los tests ejecutan las CRON vencidas llamando a cron_scheduler.run_due() explícitamente
+os.environ.setdefault("AUTOMATIONS_CRON_SCHEDULER_ENABLED", "false")
+# Los tests llaman a los job_* de los schedulers explícitamente; no se compite por el lock de líder
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+# Dedup de schedulers en memoria; test_dedup prueba el backend Postgres explícitamente
+os.environ.setdefault("DEDUP_BACKEND", "memory")
+
 import pytest
 from unittest.mock import patch
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
-from app.core import Base, get_db
+from app.core import Base, get_db, get_async_db
+from app.core.database import async_url
 from app.main import app
 from app.core.module_loader import get_all_schemas
 
@@ -22,6 +38,10 @@ SQLALCHEMY_TEST_DATABASE_URL = os.environ.get(
 )
 engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Rutas async (get_async_db): cada TestClient abre su propio event loop y las
+# conexiones asyncpg no se comparten entre loops — sin pool
+async_engine = create_async_engine(async_url(SQLALCHEMY_TEST_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
 
 
 
@@ -61,6 +81,23 @@ def db(setup_database):
             conn.execute(text(
                 "TRUNCATE TABLE macro_tracker.products RESTART IDENTITY CASCADE"
             ))
+        # Los ids se reinician con el TRUNCATE — vaciar cachés en memoria del motor
+        from app.modules.automations_engine.core.trigger_index import trigger_index
+        from app.modules.automations_engine.core.compiled_flow import flow_cache
+        from app.modules.automations_engine.core.webhook_token_cache import webhook_token_cache
+        from app.modules.automations_engine.services.webhook_touch_buffer import webhook_touch_buffer
+        from app.modules.automations_engine.core.api_key_cache import api_key_cache
+        from app.modules.automations_engine.services.api_key_usage_buffer import api_key_usage_buffer
+        from app.modules.automations_engine.services.execution_profile import execution_profile
+        from app.core.dedup import dedup
+        trigger_index.clear()
+        flow_cache.clear()
+        webhook_token_cache.clear()
+        webhook_touch_buffer.discard()
+        api_key_cache.clear()
+        api_key_usage_buffer.discard()
+        execution_profile.discard()
+        dedup.clear()
 
 
 def make_db_override(db):
@@ -72,9 +109,15 @@ def make_db_override(db):
     return override_get_db
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def client(db):
     app.dependency_overrides[get_db] = make_db_override(db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -83,6 +126,7 @@ def client(db):
 @pytest.fixture(scope="function")
 def auth_client(db):
     app.dependency_overrides[get_db] = make_db_override(db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         c.post("/api/v1/auth/register", json={
             "email": "test@test.com", "username": "testuser", "password": "testpassword"
@@ -98,6 +142,7 @@ def auth_client(db):
 @pytest.fixture(scope="function")
 def other_auth_client(db):
     app.dependency_overrides[get_db] = make_db_override(db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         c.post("/api/v1/auth/register", json={
             "email": "other@test.com", "username": "otheruser", "password": "testpassword"
@@ -113,6 +158,7 @@ def other_auth_client(db):
 @pytest.fixture(scope="function")
 def auth_client_with_refresh(db):
     app.dependency_overrides[get_db] = make_db_override(db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         c.post("/api/v1/auth/register", json={
             "email": "test@test.com", "username": "testuser", "password": "testpassword"